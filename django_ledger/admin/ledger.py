@@ -211,6 +211,8 @@ class LedgerModelAdmin(ModelAdmin):
                 'posted',
                 'updated'
             ])
+        for obj in queryset:
+            obj.update_entity_data()
 
     def lock(self, request, queryset):
         for obj in queryset:
@@ -228,6 +230,8 @@ class LedgerModelAdmin(ModelAdmin):
                 'locked',
                 'updated'
             ])
+        for obj in queryset:
+            obj.update_entity_data(daily_balances=False)
 
     def unpost(self, request, queryset):
         for obj in queryset:
@@ -244,6 +248,8 @@ class LedgerModelAdmin(ModelAdmin):
                 'posted',
                 'updated'
             ])
+        for obj in queryset:
+            obj.update_entity_data()
 
     def unlock(self, request, queryset):
         for obj in queryset:
@@ -261,6 +267,8 @@ class LedgerModelAdmin(ModelAdmin):
                 'locked',
                 'updated'
             ])
+        for obj in queryset:
+            obj.update_entity_data(daily_balances=False)
 
     def journal_entry_count(self, obj):
         return obj.journal_entries__count
@@ -0,0 +1,472 @@
+"""
+Django Ledger created by Miguel Sanda <msanda@arrobalytics.com>.
+Copyright© EDMA Group Inc licensed under the GPLv3 Agreement.
+
+Contributions to this module:
+    * Miguel Sanda <msanda@arrobalytics.com>
+
+This module provides an immutable in-memory index of the AccountModels of a Chart of Accounts, so accounts can be
+looked up by code, role, UUID, role default or tree path without querying the database every time.
+
+Indexes are stored in a process-local LRU and, optionally, in a shared Django cache. Cache keys include the
+EntityModel accounts version, which is incremented every time an AccountModel of the EntityModel is created, updated,
+activated, locked or deleted. Stale indexes are never invalidated explicitly; they simply become unreachable.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from uuid import UUID
+
+from django.core.cache import caches
+from django.db import transaction
+
+from django_ledger import settings
+from django_ledger.io.roles import ROOT_GROUP
+from django_ledger.models.utils import lazy_loader
+
+ACCOUNT_INDEX_CACHE_KEY_PREFIX = 'djl-account-index'
+
+_account_index_invalidation: ContextVar[Optional[Set[UUID]]] = ContextVar('django_ledger_account_index_invalidation',
+                                                                          default=None)
+
+
+class AccountIndex:
+    """
+    Immutable index of the AccountModels of a ChartOfAccountModel.
+    Account data is stored as tuples of field values. A new AccountModel instance is returned on every lookup, so
+    instances may be modified by the caller without affecting the index.
+
+    Parameters
+    ----------
+    coa_model_id: UUID
+        The ChartOfAccountModel UUID.
+    accounts_version: int
+        The EntityModel accounts version the index was built from.
+    field_names: tuple
+        The AccountModel concrete field attribute names, in the same order as the row values.
+    rows: tuple
+        The AccountModel field values, ordered by tree path.
+    """
+
+    def __init__(self, coa_model_id: UUID, accounts_version: int, field_names: Tuple[str], rows: Tuple[Tuple]):
+        field_names = tuple(field_names)
+        rows = tuple(tuple(r) for r in rows)
+        idx = {f: i for i, f in enumerate(field_names)}
+        uuid_i, code_i, role_i, path_i = idx['uuid'], idx['code'], idx['role'], idx['path']
+        role_default_i = idx['role_default']
+
+        by_role = dict()
+        for row in sorted(rows, key=lambda r: r[code_i]):
+            by_role.setdefault(row[role_i], list()).append(row)
+
+        object.__setattr__(self, 'COA_MODEL_ID', coa_model_id)
+        object.__setattr__(self, 'ACCOUNTS_VERSION', accounts_version)
+        object.__setattr__(self, 'FIELD_NAMES', field_names)
+        object.__setattr__(self, 'FIELD_INDEX', MappingProxyType(idx))
+        object.__setattr__(self, 'ROWS', rows)
+        object.__setattr__(self, 'BY_UUID', MappingProxyType({r[uuid_i]: r for r in rows}))
+        object.__setattr__(self, 'BY_CODE', MappingProxyType({r[code_i]: r for r in rows}))
+        object.__setattr__(self, 'BY_PATH', MappingProxyType({r[path_i]: r for r in rows}))
+        object.__setattr__(self, 'BY_ROLE', MappingProxyType({k: tuple(v) for k, v in by_role.items()}))
+        object.__setattr__(self, 'ROLE_DEFAULTS', MappingProxyType({r[role_i]: r for r in rows if r[role_default_i]}))
+        object.__setattr__(self, 'COA_MODEL', None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f'{self.__class__.__name__} is immutable.')
+
+    def __len__(self):
+        return len(self.ROWS)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__} {self.COA_MODEL_ID} v{self.ACCOUNTS_VERSION}: {len(self)} accounts'
+
+    @classmethod
+    def get_field_names(cls) -> Tuple[str]:
+        AccountModel = lazy_loader.get_account_model()
+        return tuple(f.attname for f in AccountModel._meta.concrete_fields)
+
+    @classmethod
+    def from_db(cls, coa_model_id: UUID, accounts_version: int) -> 'AccountIndex':
+        """
+        Builds the index of the given ChartOfAccountModel with a single query.
+
+        Parameters
+        ----------
+        coa_model_id: UUID
+            The ChartOfAccountModel UUID.
+        accounts_version: int
+            The current EntityModel accounts version.
+
+        Returns
+        -------
+        AccountIndex
+        """
+        AccountModel = lazy_loader.get_account_model()
+        field_names = cls.get_field_names()
+        rows = AccountModel.objects.filter(
+            coa_model_id__exact=coa_model_id
+        ).order_by('path').values_list(*field_names)
+        return cls(coa_model_id=coa_model_id, accounts_version=accounts_version, field_names=field_names, rows=rows)
+
+    def to_cache(self) -> Tuple:
+        return self.COA_MODEL_ID, self.ACCOUNTS_VERSION, self.FIELD_NAMES, self.ROWS
+
+    @classmethod
+    def from_cache(cls, cached_value: Tuple) -> Optional['AccountIndex']:
+        coa_model_id, accounts_version, field_names, rows = cached_value
+        # indexes written by a different schema are treated as cache misses...
+        if tuple(field_names) != cls.get_field_names():
+            return
+        return cls(coa_model_id=coa_model_id, accounts_version=accounts_version, field_names=field_names, rows=rows)
+
+    def bind(self, coa_model) -> 'AccountIndex':
+        """
+        Returns a copy of the index which assigns the given ChartOfAccountModel instance to every AccountModel
+        returned, so accessing the account CoA does not hit the database.
+
+        Parameters
+        ----------
+        coa_model: ChartOfAccountModel
+            The ChartOfAccountModel of the index.
+
+        Returns
+        -------
+        AccountIndex
+        """
+        if coa_model.uuid != self.COA_MODEL_ID:
+            raise ValueError(f'Cannot bind CoA {coa_model.uuid} to AccountIndex of CoA {self.COA_MODEL_ID}.')
+        account_index = object.__new__(self.__class__)
+        for k, v in self.__dict__.items():
+            object.__setattr__(account_index, k, v)
+        object.__setattr__(account_index, 'COA_MODEL', coa_model)
+        return account_index
+
+    # ## LOOKUPS ###
+    def get_account_model(self, row: Tuple):
+        AccountModel = lazy_loader.get_account_model()
+        account_model = AccountModel.from_db(AccountModel.objects.db, self.FIELD_NAMES, row)
+        if self.COA_MODEL is not None:
+            account_model.coa_model = self.COA_MODEL
+        return account_model
+
+    def get_value(self, row: Tuple, field_name: str):
+        return row[self.FIELD_INDEX[field_name]]
+
+    def filter_rows(self, rows: Iterable[Tuple], active: Optional[bool] = None) -> List[Tuple]:
+        if active is None:
+            return list(rows)
+        active_i = self.FIELD_INDEX['active']
+        return [r for r in rows if bool(r[active_i]) is active]
+
+    def does_not_exist(self, message: str):
+        AccountModel = lazy_loader.get_account_model()
+        return AccountModel.DoesNotExist(f'{message} in CoA {self.COA_MODEL_ID}.')
+
+    def get_account_by_uuid(self, account_uuid: Union[UUID, str], active: Optional[bool] = None):
+        """
+        Gets the AccountModel with the given UUID.
+
+        Parameters
+        ----------
+        account_uuid: UUID or str
+            The AccountModel UUID.
+        active: bool
+            Optional active state the AccountModel must match.
+
+        Returns
+        -------
+        AccountModel
+            The AccountModel. Raises AccountModel.DoesNotExist if not found.
+        """
+        if not isinstance(account_uuid, UUID):
+            account_uuid = UUID(str(account_uuid))
+        rows = self.filter_rows([self.BY_UUID[account_uuid]] if account_uuid in self.BY_UUID else [], active=active)
+        if not rows:
+            raise self.does_not_exist(f'Account {account_uuid} not found')
+        return self.get_account_model(rows[0])
+
+    def get_account_by_code(self, code: str, active: Optional[bool] = None):
+        """
+        Gets the AccountModel with the given code.
+
+        Parameters
+        ----------
+        code: str
+            The AccountModel code.
+        active: bool
+            Optional active state the AccountModel must match.
+
+        Returns
+        -------
+        AccountModel
+            The AccountModel. Raises AccountModel.DoesNotExist if not found.
+        """
+        rows = self.filter_rows([self.BY_CODE[code]] if code in self.BY_CODE else [], active=active)
+        if not rows:
+            raise self.does_not_exist(f'Account with code {code} not found')
+        return self.get_account_model(rows[0])
+
+    def get_account_by_path(self, path: str):
+        """
+        Gets the AccountModel at the given tree path.
+
+        Parameters
+        ----------
+        path: str
+            The AccountModel materialized path.
+
+        Returns
+        -------
+        AccountModel
+            The AccountModel. Raises AccountModel.DoesNotExist if not found.
+        """
+        try:
+            return self.get_account_model(self.BY_PATH[path])
+        except KeyError:
+            raise self.does_not_exist(f'Account with path {path} not found')
+
+    def get_default_account_for_role(self, role: str, active: Optional[bool] = None):
+        """
+        Gets the default AccountModel of the given role.
+
+        Parameters
+        ----------
+        role: str
+            The CoA role to fetch the corresponding default AccountModel.
+        active: bool
+            Optional active state the AccountModel must match.
+
+        Returns
+        -------
+        AccountModel
+            The default AccountModel for the role. Raises AccountModel.DoesNotExist if not found.
+        """
+        rows = self.filter_rows([self.ROLE_DEFAULTS[role]] if role in self.ROLE_DEFAULTS else [], active=active)
+        if not rows:
+            raise self.does_not_exist(f'Default account for role {role} not found')
+        return self.get_account_model(rows[0])
+
+    def get_default_accounts_for_roles(self, roles: Iterable[str], active: Optional[bool] = None) -> Dict:
+        """
+        Gets the default AccountModel of each one of the given roles.
+
+        Parameters
+        ----------
+        roles: list
+            The CoA roles to fetch.
+        active: bool
+            Optional active state the AccountModels must match.
+
+        Returns
+        -------
+        dict
+            The default AccountModels by role. Raises AccountModel.DoesNotExist if any role is not found.
+        """
+        return {role: self.get_default_account_for_role(role, active=active) for role in roles}
+
+    def get_accounts(self,
+                     roles: Optional[Union[str, Iterable[str]]] = None,
+                     codes: Optional[Union[str, Iterable[str]]] = None,
+                     active: Optional[bool] = True,
+                     include_root: bool = False,
+                     order_by: Optional[Tuple[str]] = ('code',)) -> List:
+        """
+        Gets the AccountModels matching the given criteria.
+
+        Parameters
+        ----------
+        roles: str or list
+            Optional role or list of roles to match.
+        codes: str or list
+            Optional code or list of codes to match.
+        active: bool
+            Optional active state the AccountModels must match. Defaults to True.
+        include_root: bool
+            Includes the CoA root accounts. Defaults to False.
+        order_by: tuple
+            Optional AccountModel field names to sort by. Defaults to code.
+
+        Returns
+        -------
+        list
+            The list of matching AccountModels.
+        """
+        if roles is not None:
+            roles = [roles] if isinstance(roles, str) else roles
+            rows = [r for role in roles for r in self.BY_ROLE.get(role, ())]
+        else:
+            rows = self.ROWS
+
+        if codes is not None:
+            codes = {codes} if isinstance(codes, str) else set(codes)
+            code_i = self.FIELD_INDEX['code']
+            rows = [r for r in rows if r[code_i] in codes]
+
+        if not include_root:
+            role_i = self.FIELD_INDEX['role']
+            rows = [r for r in rows if r[role_i] not in ROOT_GROUP]
+
+        rows = self.filter_rows(rows, active=active)
+
+        if order_by:
+            order_i = [self.FIELD_INDEX[f] for f in order_by]
+            rows = sorted(rows, key=lambda r: tuple(r[i] for i in order_i))
+
+        return [self.get_account_model(r) for r in rows]
+
+    def get_ancestors(self, account_model) -> List:
+        """
+        Gets the ancestors of the given AccountModel, from the CoA root down to its parent.
+
+        Parameters
+        ----------
+        account_model: AccountModel
+            The AccountModel to get the ancestors for.
+
+        Returns
+        -------
+        list
+            The list of ancestor AccountModels.
+        """
+        steplen = account_model.steplen
+        path = account_model.path
+        return [
+            self.get_account_model(self.BY_PATH[path[0:i]]) for i in range(steplen, len(path), steplen)
+            if path[0:i] in self.BY_PATH
+        ]
+
+
+class AccountIndexCache:
+    """
+    Stores AccountIndexes in a process-local LRU, and optionally in the Django cache set by the
+    DJANGO_LEDGER_ACCOUNT_INDEX_CACHE_NAME setting when DJANGO_LEDGER_USE_ACCOUNT_INDEX_CACHE is enabled.
+    Only the latest index of each ChartOfAccountModel is held by the LRU.
+    """
+
+    LRU: 'OrderedDict[Tuple[UUID, UUID], AccountIndex]' = OrderedDict()
+    LRU_LOCK = Lock()
+
+    @staticmethod
+    def get_cache_key(entity_uuid: UUID, coa_model_id: UUID, accounts_version: int) -> str:
+        return f'{ACCOUNT_INDEX_CACHE_KEY_PREFIX}-{entity_uuid}-{coa_model_id}-{accounts_version}'
+
+    @classmethod
+    def get_lru(cls, entity_uuid: UUID, coa_model_id: UUID, accounts_version: int) -> Optional[AccountIndex]:
+        with cls.LRU_LOCK:
+            account_index = cls.LRU.get((entity_uuid, coa_model_id))
+            if account_index is None or account_index.ACCOUNTS_VERSION != accounts_version:
+                return
+            cls.LRU.move_to_end((entity_uuid, coa_model_id))
+            return account_index
+
+    @classmethod
+    def set_lru(cls, entity_uuid: UUID, account_index: AccountIndex):
+        with cls.LRU_LOCK:
+            cls.LRU[(entity_uuid, account_index.COA_MODEL_ID)] = account_index
+            cls.LRU.move_to_end((entity_uuid, account_index.COA_MODEL_ID))
+            while len(cls.LRU) > max(settings.DJANGO_LEDGER_ACCOUNT_INDEX_LRU_SIZE, 1):
+                cls.LRU.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        with cls.LRU_LOCK:
+            cls.LRU.clear()
+
+    @classmethod
+    def get_index(cls, entity_uuid: UUID, coa_model_id: UUID, accounts_version: int) -> AccountIndex:
+        """
+        Gets the AccountIndex of the given ChartOfAccountModel from the process-local LRU, the shared cache or the
+        database, in that order. Indexes built from the database are only stored in the LRU and the shared cache
+        once the current transaction commits.
+
+        Parameters
+        ----------
+        entity_uuid: UUID
+            The EntityModel UUID.
+        coa_model_id: UUID
+            The ChartOfAccountModel UUID.
+        accounts_version: int
+            The current EntityModel accounts version.
+
+        Returns
+        -------
+        AccountIndex
+        """
+        account_index = cls.get_lru(entity_uuid, coa_model_id, accounts_version)
+        if account_index is not None:
+            return account_index
+
+        cache_system = None
+        cache_key = cls.get_cache_key(entity_uuid, coa_model_id, accounts_version)
+        if settings.DJANGO_LEDGER_USE_ACCOUNT_INDEX_CACHE:
+            cache_system = caches[settings.DJANGO_LEDGER_ACCOUNT_INDEX_CACHE_NAME]
+            cached_value = cache_system.get(cache_key)
+            if cached_value is not None:
+                account_index = AccountIndex.from_cache(cached_value)
+
+        if account_index is not None:
+            cls.set_lru(entity_uuid, account_index)
+            return account_index
+
+        account_index = AccountIndex.from_db(coa_model_id=coa_model_id, accounts_version=accounts_version)
+
+        # an index built within a transaction that is rolled back must never be served for its accounts version...
+        def publish_index():
+            cls.set_lru(entity_uuid, account_index)
+            if cache_system is not None:
+                cache_system.set(cache_key,
+                                 account_index.to_cache(),
+                                 settings.DJANGO_LEDGER_ACCOUNT_INDEX_CACHE_TIMEOUT)
+
+        transaction.on_commit(publish_index)
+        return account_index
+
+
+def invalidate_account_index(coa_model_id: UUID):
+    """
+    Increments the accounts version of the EntityModel that owns the given ChartOfAccountModel. If called within
+    defer_account_index_invalidation(), the increment is deferred until the context exits.
+
+    Parameters
+    ----------
+    coa_model_id: UUID
+        The ChartOfAccountModel UUID.
+    """
+    deferred = _account_index_invalidation.get()
+    if deferred is not None:
+        deferred.add(coa_model_id)
+        return
+    EntityModel = lazy_loader.get_entity_model()
+    EntityModel.increment_accounts_version(coa_model_uuids=[coa_model_id])
+
+
+@contextmanager
+def defer_account_index_invalidation():
+    """
+    Collects all account index invalidations within the context and increments the accounts version of each
+    EntityModel affected once, when the context exits. Useful when many AccountModels are saved at once.
+
+    Examples
+    ________
+        >>> with defer_account_index_invalidation():
+        ...     for account_model in account_model_list:
+        ...         coa_model.allocate_account(account_model)
+    """
+    deferred = _account_index_invalidation.get()
+    if deferred is not None:
+        yield
+        return
+
+    token = _account_index_invalidation.set(set())
+    try:
+        yield
+    finally:
+        deferred = _account_index_invalidation.get()
+        _account_index_invalidation.reset(token)
+        # accounts saved before an exception must not be served from a stale index...
+        if deferred:
+            EntityModel = lazy_loader.get_entity_model()
+            EntityModel.increment_accounts_version(coa_model_uuids=deferred)
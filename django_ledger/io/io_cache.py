@@ -0,0 +1,152 @@
+"""
+Django Ledger created by Miguel Sanda <msanda@arrobalytics.com>.
+Copyright© EDMA Group Inc licensed under the GPLv3 Agreement.
+
+Contributions to this module:
+    * Miguel Sanda <msanda@arrobalytics.com>
+
+This module provides an opt-in cache for the IO digest state, built on the Django cache framework.
+Cache keys are derived from the full set of digest parameters and the EntityModel data version, which is incremented
+every time journal entries, ledgers or closing entries of the EntityModel change their posted or locked state.
+Stale entries are never invalidated explicitly; they simply become unreachable and expire.
+"""
+from collections import defaultdict
+from dataclasses import replace
+from datetime import date
+from hashlib import md5
+from threading import Lock
+from typing import Dict, Optional
+from uuid import UUID
+
+from django.core.cache import caches
+
+from django_ledger.settings import (DJANGO_LEDGER_DIGEST_CACHE_NAME, DJANGO_LEDGER_DIGEST_CACHE_TIMEOUT,
+                                    DJANGO_LEDGER_DIGEST_CACHE_KEY_PREFIX)
+
+
+def freeze_io_state(obj):
+    """
+    Converts the IO state into plain python containers so it can be pickled by the cache backend.
+    """
+    if isinstance(obj, (dict, defaultdict)):
+        return {k: freeze_io_state(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [freeze_io_state(v) for v in obj]
+    return obj
+
+
+class IODigestCache:
+    """
+    Stores and retrieves digested IO states.
+
+    Parameters
+    ----------
+    cache_name: str
+        The Django cache to use. Defaults to DJANGO_LEDGER_DIGEST_CACHE_NAME setting.
+    cache_timeout: int
+        The cache timeout in seconds. Defaults to DJANGO_LEDGER_DIGEST_CACHE_TIMEOUT setting.
+    """
+
+    HITS = 0
+    MISSES = 0
+    STATS_LOCK = Lock()
+
+    def __init__(self, cache_name: Optional[str] = None, cache_timeout: Optional[int] = None):
+        self.CACHE_NAME = cache_name or DJANGO_LEDGER_DIGEST_CACHE_NAME
+        self.CACHE_TIMEOUT = cache_timeout or DJANGO_LEDGER_DIGEST_CACHE_TIMEOUT
+        self.CACHE = caches[self.CACHE_NAME]
+
+    @classmethod
+    def record_hit(cls):
+        with cls.STATS_LOCK:
+            cls.HITS += 1
+
+    @classmethod
+    def record_miss(cls):
+        with cls.STATS_LOCK:
+            cls.MISSES += 1
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        """
+        Hit and miss counters of the current process, for monitoring purposes.
+
+        Returns
+        -------
+        dict
+            The hits, misses and hit ratio.
+        """
+        with cls.STATS_LOCK:
+            total = cls.HITS + cls.MISSES
+            return {
+                'hits': cls.HITS,
+                'misses': cls.MISSES,
+                'hit_ratio': cls.HITS / total if total else 0.0
+            }
+
+    @classmethod
+    def reset_stats(cls):
+        with cls.STATS_LOCK:
+            cls.HITS = 0
+            cls.MISSES = 0
+
+    @staticmethod
+    def serialize_param(value) -> str:
+        if isinstance(value, (set, frozenset)):
+            return repr(sorted(str(v) for v in value))
+        elif isinstance(value, (list, tuple)):
+            return repr([IODigestCache.serialize_param(v) for v in value])
+        elif isinstance(value, date):
+            return value.isoformat()
+        elif hasattr(value, 'pk'):
+            return f'{value.__class__.__name__}:{value.pk}'
+        return repr(value)
+
+    def get_cache_key(self,
+                      io_model,
+                      entity_uuid: UUID,
+                      data_version: int,
+                      user_model=None,
+                      **params) -> str:
+        """
+        Generates the cache key for a given digest request.
+
+        Parameters
+        ----------
+        io_model: IOMixIn
+            The model instance the digest is called from.
+        entity_uuid: UUID
+            The UUID of the EntityModel the data belongs to.
+        data_version: int
+            The current EntityModel data version.
+        user_model: UserModel
+            The UserModel requesting the digest. Results are not shared across users.
+        params: dict
+            The digest parameters.
+
+        Returns
+        -------
+        str
+            The cache key.
+        """
+        params_key = '|'.join(f'{k}={self.serialize_param(v)}' for k, v in sorted(params.items()))
+        params_key = f'{io_model.__class__.__name__}:{io_model.pk}|user={getattr(user_model, "pk", None)}|{params_key}'
+        params_hash = md5(params_key.encode(), usedforsecurity=False).hexdigest()
+        return f'{DJANGO_LEDGER_DIGEST_CACHE_KEY_PREFIX}-{entity_uuid}-{data_version}-{params_hash}'
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        io_state = self.CACHE.get(cache_key)
+        if io_state is None:
+            self.record_miss()
+            return
+        self.record_hit()
+        return io_state
+
+    def set(self, cache_key: str, io_state: Dict):
+        io_state = {k: v for k, v in io_state.items() if k != 'io_model'}
+        io_result = io_state.get('io_result')
+        if io_result is not None:
+            txs_queryset = io_result.txs_queryset
+            io_state['io_result'] = replace(io_result, profile=None)
+            io_state['io_result'].txs_queryset = list(txs_queryset) if txs_queryset is not None else None
+        self.CACHE.set(cache_key, freeze_io_state(io_state), self.CACHE_TIMEOUT)
@@ -0,0 +1,412 @@
+"""
+Django Ledger created by Miguel Sanda <msanda@arrobalytics.com>.
+Copyright© EDMA Group Inc licensed under the GPLv3 Agreement.
+
+Contributions to this module:
+    * Miguel Sanda <msanda@arrobalytics.com>
+
+This module provides the compact binary format used to cache the balances of a closing entry.
+A cached closing entry holds the account, unit and activity dimension tables, followed by columnar arrays of dimension
+indexes, transaction types and balances. The payload starts with a schema version, so payloads written by a different
+version are treated as cache misses.
+
+Cached balances are expanded into the same rows produced by the IOMixIn.database_digest aggregation query, so they can
+be combined with raw transactions without querying closing entry rows from the database.
+"""
+import struct
+import zlib
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple, Union
+from uuid import UUID
+
+CLOSING_ENTRY_CACHE_MAGIC = b'DJLCE'
+CLOSING_ENTRY_CACHE_SCHEMA_VERSION = 1
+
+# balances are stored as integers, scaled to the ClosingEntryTransactionModel balance decimal places...
+CLOSING_ENTRY_CACHE_BALANCE_SCALE = 6
+CLOSING_ENTRY_CACHE_BALANCE_INT64 = 0
+CLOSING_ENTRY_CACHE_BALANCE_TEXT = 1
+
+CLOSING_ENTRY_CACHE_TX_TYPES = ('debit', 'credit')
+
+_HEADER = struct.Struct('<5sHI')
+_COUNT = struct.Struct('<I')
+_STRING_LENGTH = struct.Struct('<H')
+
+
+class ClosingEntryCacheError(ValueError):
+    pass
+
+
+class _PayloadReader:
+
+    def __init__(self, payload: bytes):
+        self.PAYLOAD = payload
+        self.OFFSET = 0
+
+    def read(self, fmt: Union[str, struct.Struct]):
+        fmt = fmt if isinstance(fmt, struct.Struct) else struct.Struct(fmt)
+        values = fmt.unpack_from(self.PAYLOAD, self.OFFSET)
+        self.OFFSET += fmt.size
+        return values
+
+    def read_count(self) -> int:
+        return self.read(_COUNT)[0]
+
+    def read_bytes(self, size: int) -> bytes:
+        value = self.PAYLOAD[self.OFFSET:self.OFFSET + size]
+        self.OFFSET += size
+        return value
+
+    def read_strings(self, count: int) -> List[str]:
+        strings = list()
+        for _ in range(count):
+            size = self.read(_STRING_LENGTH)[0]
+            strings.append(self.read_bytes(size).decode('utf-8'))
+        return strings
+
+    def read_array(self, type_code: str, count: int) -> Tuple:
+        return self.read(f'<{count}{type_code}')
+
+
+def _pack_strings(strings: List[Optional[str]]) -> bytes:
+    chunks = list()
+    for s in strings:
+        s = (s or '').encode('utf-8')
+        chunks.append(_STRING_LENGTH.pack(len(s)))
+        chunks.append(s)
+    return b''.join(chunks)
+
+
+def _pack_array(type_code: str, values: List) -> bytes:
+    return struct.pack(f'<{len(values)}{type_code}', *values)
+
+
+@dataclass
+class ClosingEntryCacheData:
+    """
+    The digested balances of a closing entry, as columnar arrays.
+    Every row represents the ClosingEntryTransactionModel balance of an account, unit and activity.
+    Unit and activity indexes are -1 when not present.
+    """
+    closing_date: date
+    accounts: List[Tuple[UUID, str, str, str, str]] = field(default_factory=list)
+    units: List[Tuple[UUID, str, str]] = field(default_factory=list)
+    activities: List[str] = field(default_factory=list)
+    account_idx: List[int] = field(default_factory=list)
+    unit_idx: List[int] = field(default_factory=list)
+    activity_idx: List[int] = field(default_factory=list)
+    tx_type: List[str] = field(default_factory=list)
+    balance: List[Decimal] = field(default_factory=list)
+
+    @classmethod
+    def from_values(cls, closing_date: date, ce_values) -> 'ClosingEntryCacheData':
+        """
+        Builds the cache data from ClosingEntryTransactionModel values.
+
+        Parameters
+        ----------
+        closing_date: date
+            The closing date.
+        ce_values: iterable
+            The ClosingEntryTransactionModel values, as produced by ClosingEntryCacheData.get_values_fields().
+
+        Returns
+        -------
+        ClosingEntryCacheData
+        """
+        ce_data = cls(closing_date=closing_date)
+        accounts_index = dict()
+        units_index = dict()
+        activities_index = dict()
+
+        for ce in ce_values:
+            acc_uuid = ce['account_model__uuid']
+            if acc_uuid not in accounts_index:
+                accounts_index[acc_uuid] = len(ce_data.accounts)
+                ce_data.accounts.append((
+                    acc_uuid,
+                    ce['account_model__balance_type'],
+                    ce['account_model__code'],
+                    ce['account_model__name'],
+                    ce['account_model__role'],
+                ))
+
+            unit_uuid = ce['unit_model__uuid']
+            if unit_uuid is not None and unit_uuid not in units_index:
+                units_index[unit_uuid] = len(ce_data.units)
+                ce_data.units.append((unit_uuid, ce['unit_model__slug'], ce['unit_model__name']))
+
+            activity = ce['activity']
+            if activity and activity not in activities_index:
+                activities_index[activity] = len(ce_data.activities)
+                ce_data.activities.append(activity)
+
+            ce_data.account_idx.append(accounts_index[acc_uuid])
+            ce_data.unit_idx.append(units_index[unit_uuid] if unit_uuid is not None else -1)
+            ce_data.activity_idx.append(activities_index[activity] if activity else -1)
+            ce_data.tx_type.append(ce['tx_type'])
+            ce_data.balance.append(ce['balance'])
+
+        return ce_data
+
+    @staticmethod
+    def get_values_fields() -> List[str]:
+        return [
+            'account_model__uuid',
+            'account_model__balance_type',
+            'account_model__code',
+            'account_model__name',
+            'account_model__role',
+            'unit_model__uuid',
+            'unit_model__slug',
+            'unit_model__name',
+            'activity',
+            'tx_type',
+            'balance'
+        ]
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the cache data into the compact binary format.
+
+        Returns
+        -------
+        bytes
+            The compressed payload.
+        """
+        scale = Decimal(10) ** CLOSING_ENTRY_CACHE_BALANCE_SCALE
+        balances = [int(b * scale) for b in self.balance]
+        try:
+            balance_fmt = CLOSING_ENTRY_CACHE_BALANCE_INT64
+            balance_chunk = _pack_array('q', balances)
+        except struct.error:
+            # balances out of the 64-bit range are stored as text...
+            balance_fmt = CLOSING_ENTRY_CACHE_BALANCE_TEXT
+            balance_chunk = _pack_strings([str(b) for b in balances])
+
+        payload = b''.join([
+            _COUNT.pack(len(self.accounts)),
+            b''.join(a[0].bytes for a in self.accounts),
+            _pack_array('B', [CLOSING_ENTRY_CACHE_TX_TYPES.index(a[1]) for a in self.accounts]),
+            _pack_strings([a[2] for a in self.accounts]),
+            _pack_strings([a[3] for a in self.accounts]),
+            _pack_strings([a[4] for a in self.accounts]),
+            _COUNT.pack(len(self.units)),
+            b''.join(u[0].bytes for u in self.units),
+            _pack_strings([u[1] for u in self.units]),
+            _pack_strings([u[2] for u in self.units]),
+            _COUNT.pack(len(self.activities)),
+            _pack_strings(self.activities),
+            _COUNT.pack(len(self.account_idx)),
+            _pack_array('I', self.account_idx),
+            _pack_array('i', self.unit_idx),
+            _pack_array('i', self.activity_idx),
+            _pack_array('B', [CLOSING_ENTRY_CACHE_TX_TYPES.index(t) for t in self.tx_type]),
+            _pack_array('B', [balance_fmt]),
+            balance_chunk
+        ])
+
+        header = _HEADER.pack(
+            CLOSING_ENTRY_CACHE_MAGIC,
+            CLOSING_ENTRY_CACHE_SCHEMA_VERSION,
+            self.closing_date.toordinal()
+        )
+        return header + zlib.compress(payload)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ClosingEntryCacheData':
+        """
+        Decodes a payload produced by ClosingEntryCacheData.to_bytes().
+
+        Parameters
+        ----------
+        data: bytes
+            The cached payload.
+
+        Returns
+        -------
+        ClosingEntryCacheData
+
+        Raises
+        ------
+        ClosingEntryCacheError
+            If the payload is not a closing entry cache or was written with a different schema version.
+        """
+        if not isinstance(data, bytes) or len(data) < _HEADER.size:
+            raise ClosingEntryCacheError('Invalid closing entry cache payload.')
+
+        magic, version, closing_date_ord = _HEADER.unpack_from(data, 0)
+        if magic != CLOSING_ENTRY_CACHE_MAGIC:
+            raise ClosingEntryCacheError('Invalid closing entry cache payload.')
+        if version != CLOSING_ENTRY_CACHE_SCHEMA_VERSION:
+            raise ClosingEntryCacheError(f'Unsupported closing entry cache schema version {version}.')
+
+        try:
+            reader = _PayloadReader(zlib.decompress(data[_HEADER.size:]))
+
+            acc_count = reader.read_count()
+            acc_uuids = [UUID(bytes=reader.read_bytes(16)) for _ in range(acc_count)]
+            acc_balance_types = [CLOSING_ENTRY_CACHE_TX_TYPES[i] for i in reader.read_array('B', acc_count)]
+            acc_codes = reader.read_strings(acc_count)
+            acc_names = reader.read_strings(acc_count)
+            acc_roles = reader.read_strings(acc_count)
+
+            unit_count = reader.read_count()
+            unit_uuids = [UUID(bytes=reader.read_bytes(16)) for _ in range(unit_count)]
+            unit_slugs = reader.read_strings(unit_count)
+            unit_names = reader.read_strings(unit_count)
+
+            activities = reader.read_strings(reader.read_count())
+
+            row_count = reader.read_count()
+            account_idx = list(reader.read_array('I', row_count))
+            unit_idx = list(reader.read_array('i', row_count))
+            activity_idx = list(reader.read_array('i', row_count))
+            tx_type = [CLOSING_ENTRY_CACHE_TX_TYPES[i] for i in reader.read_array('B', row_count)]
+            balance_fmt = reader.read_array('B', 1)[0]
+            if balance_fmt == CLOSING_ENTRY_CACHE_BALANCE_INT64:
+                balances = reader.read_array('q', row_count)
+            else:
+                balances = [int(b) for b in reader.read_strings(row_count)]
+        except (zlib.error, struct.error, IndexError, ValueError) as e:
+            raise ClosingEntryCacheError(f'Corrupted closing entry cache payload. {e}')
+
+        return cls(
+            closing_date=date.fromordinal(closing_date_ord),
+            accounts=list(zip(acc_uuids, acc_balance_types, acc_codes, acc_names, acc_roles)),
+            units=list(zip(unit_uuids, unit_slugs, unit_names)),
+            activities=activities,
+            account_idx=account_idx,
+            unit_idx=unit_idx,
+            activity_idx=activity_idx,
+            tx_type=tx_type,
+            balance=[Decimal(b).scaleb(-CLOSING_ENTRY_CACHE_BALANCE_SCALE) for b in balances]
+        )
+
+    def get_digest_rows(self,
+                        by_unit: bool = False,
+                        by_period: bool = False,
+                        by_activity: bool = False,
+                        negate: bool = False,
+                        unit_slug: Optional[str] = None,
+                        accounts: Optional[List] = None,
+                        activity: Optional[Union[str, List[str]]] = None,
+                        role: Optional[Union[str, List[str]]] = None,
+                        exclude_zero_bal: bool = True) -> List[Dict]:
+        """
+        Expands the cached balances into the rows produced by the IOMixIn.database_digest aggregation query,
+        applying the same filters.
+
+        Parameters
+        ----------
+        by_unit: bool
+            Rows are aggregated by unit.
+        by_period: bool
+            Rows are aggregated by accounting period.
+        by_activity: bool
+            Rows are aggregated by activity.
+        negate: bool
+            Negates the balances, used when the closing entry is deducted from a bounded digest.
+        unit_slug: str
+            Only includes balances of the given EntityUnitModel slug.
+        accounts: list
+            Only includes balances of the given account codes or AccountModels.
+        activity: str or list
+            Only includes balances of the given activities.
+        role: str or list
+            Only includes balances of accounts with the given roles.
+        exclude_zero_bal: bool
+            Excludes zero balances.
+
+        Returns
+        -------
+        list
+            A list of rows, as dictionaries.
+        """
+        if isinstance(activity, str):
+            activity = [activity]
+        if isinstance(role, str):
+            role = [role]
+
+        account_codes = None
+        account_uuids = None
+        if accounts:
+            if isinstance(accounts[0], str):
+                account_codes = set(accounts)
+            else:
+                account_uuids = set(getattr(a, 'uuid', a) for a in accounts)
+
+        dt_idx = date(self.closing_date.year, self.closing_date.month, 1) if by_period else None
+
+        rows = dict()
+        for acc_i, unit_i, act_i, tx_type, balance in zip(self.account_idx,
+                                                          self.unit_idx,
+                                                          self.activity_idx,
+                                                          self.tx_type,
+                                                          self.balance):
+            if exclude_zero_bal and not balance > 0:
+                continue
+
+            acc_uuid, balance_type, code, name, acc_role = self.accounts[acc_i]
+            unit = self.units[unit_i] if unit_i >= 0 else None
+            ce_activity = self.activities[act_i] if act_i >= 0 else None
+
+            if unit_slug and (unit is None or unit[1] != unit_slug):
+                continue
+            if activity and ce_activity not in activity:
+                continue
+            if role and acc_role not in role:
+                continue
+            if account_codes is not None and code not in account_codes:
+                continue
+            if account_uuids is not None and acc_uuid not in account_uuids:
+                continue
+
+            row_key = (
+                acc_i,
+                unit_i if by_unit else None,
+                act_i if by_activity else None,
+                tx_type
+            )
+
+            row = rows.get(row_key)
+            if row is None:
+                row = {
+                    'account__uuid': acc_uuid,
+                    'account__balance_type': balance_type,
+                    'tx_type': tx_type,
+                    'account__code': code,
+                    'account__name': name,
+                    'account__role': acc_role,
+                    'balance': Decimal('0.00')
+                }
+                if by_unit:
+                    row['journal_entry__entity_unit__uuid'] = unit[0] if unit else None
+                    row['journal_entry__entity_unit__name'] = unit[2] if unit else None
+                if by_activity:
+                    row['journal_entry__activity'] = ce_activity
+                if by_period:
+                    row['dt_idx'] = dt_idx
+                rows[row_key] = row
+
+            row['balance'] += -balance if negate else balance
+
+        return list(rows.values())
+
+
+def get_digest_row_sort_key(row: Dict) -> Tuple:
+    """
+    Sorting key of database_digest rows, safe to use on rows mixing database and cached values.
+    Rows with the same account, unit, period, activity and transaction type are made contiguous.
+    """
+    dt_idx = row.get('dt_idx')
+    return (
+        str(row['account__uuid']),
+        str(row.get('journal_entry__entity_unit__uuid') or ''),
+        (dt_idx.year, dt_idx.month) if dt_idx else (0, 0),
+        row.get('journal_entry__activity') or '',
+        row.get('tx_type') or ''
+    )
@@ -0,0 +1,242 @@
+"""
+Django Ledger created by Miguel Sanda <msanda@arrobalytics.com>.
+Copyright© EDMA Group Inc licensed under the GPLv3 Agreement.
+
+Contributions to this module:
+    * Miguel Sanda <msanda@arrobalytics.com>
+
+This module provides an alternative, columnar implementation of the post-aggregation step performed by
+IODatabaseMixIn.python_digest. The aggregated rows returned by the database are loaded once into typed arrays
+(account balances are stored as scaled integers so no precision is lost) and the sign flip, grouping and balance
+summation are performed as batched array operations. NumPy is used when available, otherwise, or whenever the balances
+may not fit into 64-bit integers, the engine falls back to a reduction over arbitrary precision Python integers.
+
+The result honors the same accounts_digest contract produced by the default Python engine.
+"""
+from array import array
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.core.exceptions import ValidationError
+
+from django_ledger.io import roles as roles_module
+from django_ledger.models.utils import lazy_loader
+from django_ledger.settings import DJANGO_LEDGER_NUMPY_SUPPORT_ENABLED
+
+if DJANGO_LEDGER_NUMPY_SUPPORT_ENABLED:
+    import numpy as np
+
+IO_DIGEST_ENGINE_PYTHON = 'python'
+IO_DIGEST_ENGINE_COLUMNAR = 'columnar'
+
+INT64_MAX = 2 ** 63 - 1
+
+IO_DIGEST_ENGINES = [
+    IO_DIGEST_ENGINE_PYTHON,
+    IO_DIGEST_ENGINE_COLUMNAR
+]
+
+
+class ColumnarDigestValidationError(ValidationError):
+    pass
+
+
+def validate_digest_engine(engine: str) -> str:
+    if engine not in IO_DIGEST_ENGINES:
+        raise ColumnarDigestValidationError(
+            message=f'Invalid digest engine {engine}. Choices are {IO_DIGEST_ENGINES}.'
+        )
+    return engine
+
+
+class ColumnarDigestEngine:
+    """
+    Loads the aggregated database rows into columns and reduces them into the accounts digest.
+
+    Parameters
+    ----------
+    by_unit: bool
+        Groups balances by EntityUnitModel.
+    by_period: bool
+        Groups balances by year & month.
+    by_activity: bool
+        Groups balances by JournalEntryModel activity.
+    by_tx_type: bool
+        Groups balances by DEBIT/CREDIT.
+    use_numpy: bool
+        Uses NumPy arrays for the batched operations. Defaults to True if NumPy is installed.
+    """
+
+    def __init__(self,
+                 by_unit: bool = False,
+                 by_period: bool = False,
+                 by_activity: bool = False,
+                 by_tx_type: bool = False,
+                 use_numpy: Optional[bool] = None):
+
+        if use_numpy and not DJANGO_LEDGER_NUMPY_SUPPORT_ENABLED:
+            raise ColumnarDigestValidationError('NumPy support not enabled. Install NumPy from Pipfile.')
+
+        self.BY_UNIT = by_unit
+        self.BY_PERIOD = by_period
+        self.BY_ACTIVITY = by_activity
+        self.BY_TX_TYPE = by_tx_type
+        self.USE_NUMPY = DJANGO_LEDGER_NUMPY_SUPPORT_ENABLED if use_numpy is None else use_numpy
+
+        TransactionModel = lazy_loader.get_txs_model()
+        self.CREDIT = TransactionModel.CREDIT
+        self.DEBIT = TransactionModel.DEBIT
+        self.DECIMAL_PLACES = TransactionModel._meta.get_field('amount').decimal_places
+        self.SCALE = Decimal(10) ** self.DECIMAL_PLACES
+
+        # columns...
+        self.GROUP_INDEX = array('q')
+        self.BALANCE = array('q')
+        self.FLIP = array('b')
+        self.MAX_ABS_BALANCE = 0
+
+        # one record per group...
+        self.GROUP_KEYS: List[tuple] = list()
+        self.GROUP_ROWS: List[Dict] = list()
+
+    def get_group_key(self, row: Dict) -> tuple:
+        dt_idx = row.get('dt_idx') if self.BY_PERIOD else None
+        return (
+            row['account__uuid'],
+            row.get('journal_entry__entity_unit__uuid') if self.BY_UNIT else None,
+            dt_idx.year if dt_idx else None,
+            dt_idx.month if dt_idx else None,
+            row.get('journal_entry__activity') if self.BY_ACTIVITY else None,
+            row.get('tx_type') if self.BY_TX_TYPE else None,
+        )
+
+    def load(self, rows: Iterable[Dict]):
+        """
+        Loads the aggregated rows into columns. Each distinct group key is assigned a sequential index in order of
+        first appearance, so the digest preserves the database ordering. Balances that do not fit into a 64-bit
+        integer switch the balance column to a list of Python integers.
+        """
+        key_index = dict()
+        scale = self.SCALE
+
+        for row in rows:
+            key = self.get_group_key(row)
+            idx = key_index.get(key)
+            if idx is None:
+                idx = len(self.GROUP_KEYS)
+                key_index[key] = idx
+                self.GROUP_KEYS.append(key)
+                self.GROUP_ROWS.append(row)
+
+            self.GROUP_INDEX.append(idx)
+            balance = int((row['balance'] * scale).to_integral_value())
+            if abs(balance) > self.MAX_ABS_BALANCE:
+                self.MAX_ABS_BALANCE = abs(balance)
+                if self.MAX_ABS_BALANCE > INT64_MAX and isinstance(self.BALANCE, array):
+                    self.BALANCE = self.BALANCE.tolist()
+            self.BALANCE.append(balance)
+            self.FLIP.append(row['account__balance_type'] != row['tx_type'])
+
+    def is_int64_safe(self) -> bool:
+        """
+        Determines if the balances can be reduced with 64-bit integers. No group balance can exceed the number of rows
+        times the largest absolute balance loaded.
+        """
+        return len(self.BALANCE) * self.MAX_ABS_BALANCE <= INT64_MAX
+
+    def get_sign_mask(self) -> List[bool]:
+        """
+        Determines which groups must show a negative balance for display purposes.
+        (i.e. Contra-Asset accounts with a credit balance type.)
+        """
+        return [
+            any([
+                all([roles_module.BS_ROLES.get(r['account__role']) == roles_module.BS_ASSET_ROLE,
+                     r['account__balance_type'] == self.CREDIT]),
+                all([roles_module.BS_ROLES.get(r['account__role']) in (
+                    roles_module.BS_LIABILITIES_ROLE,
+                    roles_module.BS_EQUITY_ROLE
+                ),
+                     r['account__balance_type'] == self.DEBIT])
+            ]) for r in self.GROUP_ROWS
+        ]
+
+    def reduce_numpy(self, signs: bool) -> List[int]:
+        n_groups = len(self.GROUP_KEYS)
+        group_idx = np.frombuffer(self.GROUP_INDEX, dtype=np.int64)
+        balance = np.frombuffer(self.BALANCE, dtype=np.int64)
+        flip = np.frombuffer(self.FLIP, dtype=np.int8).astype(np.bool_)
+
+        balance = np.where(flip, -balance, balance)
+        balances = np.zeros(n_groups, dtype=np.int64)
+        np.add.at(balances, group_idx, balance)
+
+        if signs:
+            sign_mask = np.array(self.get_sign_mask(), dtype=np.bool_)
+            balances = np.where(sign_mask, -balances, balances)
+
+        return balances.tolist()
+
+    def reduce_array(self, signs: bool) -> List[int]:
+        """
+        Reduces the columns with a per-row loop over Python integers. This is a fallback for when NumPy is not
+        available or the balances may overflow 64-bit integers, and is not meant to be fast.
+        """
+        balances = [0] * len(self.GROUP_KEYS)
+        for idx, bal, flip in zip(self.GROUP_INDEX, self.BALANCE, self.FLIP):
+            balances[idx] += -bal if flip else bal
+
+        if signs:
+            for idx, neg in enumerate(self.get_sign_mask()):
+                if neg:
+                    balances[idx] = -balances[idx]
+
+        return balances
+
+    def digest(self, rows: Iterable[Dict], signs: bool = True) -> List[Dict]:
+        """
+        Loads and reduces the provided rows.
+
+        Parameters
+        ----------
+        rows: iterable of dict
+            The aggregated TransactionModel values produced by IODatabaseMixIn.database_digest.
+        signs: bool
+            Changes the balance of an account to negative if it represents a "negative" for display purposes.
+
+        Returns
+        -------
+        list
+            The accounts digest, honoring the same contract as IODatabaseMixIn.python_digest.
+        """
+        self.load(rows)
+
+        if not self.GROUP_KEYS:
+            return list()
+
+        if self.USE_NUMPY and self.is_int64_safe():
+            balances = self.reduce_numpy(signs=signs)
+        else:
+            balances = self.reduce_array(signs=signs)
+
+        places = -self.DECIMAL_PLACES
+        accounts_digest = list()
+        for key, row, bal in zip(self.GROUP_KEYS, self.GROUP_ROWS, balances):
+            balance = Decimal(bal).scaleb(places)
+            accounts_digest.append({
+                'account_uuid': key[0],
+                'unit_uuid': key[1],
+                'unit_name': row.get('journal_entry__entity_unit__name'),
+                'activity': row.get('journal_entry__activity'),
+                'period_year': key[2],
+                'period_month': key[3],
+                'role_bs': roles_module.BS_ROLES.get(row['account__role']),
+                'role': row['account__role'],
+                'code': row['account__code'],
+                'name': row['account__name'],
+                'balance_type': row['account__balance_type'],
+                'tx_type': key[5],
+                'balance': balance,
+                'balance_abs': abs(balance),
+            })
+        return accounts_digest
@@ -15,18 +15,21 @@ transactions during the digest method based on a specific request. The Python in
 accounting rules to the transactions associated with each Journal Entry so the appropriate account balances are computed.
 """
 from collections import namedtuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta
+from decimal import Decimal
 from itertools import groupby
 from pathlib import Path
 from random import choice
 from typing import List, Set, Union, Tuple, Optional, Dict
 from zoneinfo import ZoneInfo
 
+from asgiref.sync import sync_to_async
 from django.conf import settings as global_settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
-from django.db.models import Sum, QuerySet, F, DecimalField, When, Case
+from django.db import transaction, DatabaseError
+from django.db.models import Sum, QuerySet, F, DecimalField, When, Case, Q
 from django.db.models.functions import TruncMonth
 from django.http import Http404
 from django.utils.dateparse import parse_date, parse_datetime
@@ -36,12 +39,26 @@ from django.utils.translation import gettext_lazy as _
 from django_ledger import settings
 from django_ledger.exceptions import InvalidDateInputError, TransactionNotInBalanceError
 from django_ledger.io import roles as roles_module
+from django_ledger.io.io_cache import IODigestCache
+from django_ledger.io.io_closing_entry_cache import get_digest_row_sort_key
+from django_ledger.io.io_columnar import (
+    ColumnarDigestEngine, validate_digest_engine,
+    IO_DIGEST_ENGINE_PYTHON, IO_DIGEST_ENGINE_COLUMNAR
+)
 from django_ledger.io.io_digest import IODigestContextManager
 from django_ledger.io.io_middleware import (
     AccountRoleIOMiddleware, AccountGroupIOMiddleware, JEActivityIOMiddleware,
     BalanceSheetIOMiddleware, IncomeStatementIOMiddleware,
     CashFlowStatementIOMiddleware
 )
+from django_ledger.io.io_profile import (
+    IODigestProfile, profile_stage,
+    IO_PROFILE_STAGE_DATABASE_DIGEST, IO_PROFILE_STAGE_AGGREGATION, IO_PROFILE_STAGE_PYTHON_DIGEST,
+    IO_PROFILE_STAGE_REGISTRY, IO_PROFILE_STAGE_ROLES, IO_PROFILE_STAGE_GROUPS, IO_PROFILE_STAGE_RATIOS,
+    IO_PROFILE_STAGE_ACTIVITY, IO_PROFILE_STAGE_BALANCE_SHEET, IO_PROFILE_STAGE_INCOME_STATEMENT,
+    IO_PROFILE_STAGE_CASH_FLOW_STATEMENT
+)
+from django_ledger.io.io_registry import get_io_digest_registry
 from django_ledger.io.ratios import FinancialRatioManager
 from django_ledger.models.utils import lazy_loader
 from django_ledger.settings import DJANGO_LEDGER_PDF_SUPPORT_ENABLED
@@ -187,6 +204,73 @@ def validate_io_timestamp(
         return localtime()
 
 
+def get_timestamp_range(dt: Union[date, datetime]) -> Tuple[datetime, datetime]:
+    """
+    Converts a date or datetime into a half-open [start, end) timestamp range covering the whole local day.
+    Filtering a timestamp column by range, instead of casting it to a date (i.e. timestamp__date), allows the
+    database to perform an index range scan.
+
+    Parameters
+    ----------
+    dt: date or datetime
+        The date or datetime to convert. Aware datetimes are converted to the current timezone first.
+
+    Returns
+    -------
+    tuple
+        The aware start of the day (inclusive) and start of the following day (exclusive).
+    """
+    if isinstance(dt, datetime):
+        if global_settings.USE_TZ and not is_naive(dt):
+            dt = localtime(dt)
+        dt = dt.date()
+
+    start_dt = datetime.combine(dt, datetime.min.time())
+    end_dt = datetime.combine(dt + timedelta(days=1), datetime.min.time())
+    if global_settings.USE_TZ:
+        return make_aware(start_dt), make_aware(end_dt)
+    return start_dt, end_dt
+
+
+def get_timestamp_filter(field_name: str,
+                         dt: Union[date, datetime],
+                         lookup: str = 'exact') -> Dict:
+    """
+    Builds the keyword arguments needed to filter a timestamp field by its date value.
+    If DJANGO_LEDGER_USE_TIMESTAMP_RANGE_FILTERS is enabled, the date lookup is translated into an equivalent
+    timestamp range lookup. Otherwise, the __date transform is used.
+
+    Parameters
+    ----------
+    field_name: str
+        The timestamp field path. (i.e. journal_entry__timestamp).
+    dt: date or datetime
+        The date used for the lookup.
+    lookup: str
+        One of exact, gte or lte. Defaults to exact.
+
+    Returns
+    -------
+    dict
+        The filter keyword arguments.
+    """
+    if lookup not in ('exact', 'gte', 'lte'):
+        raise IOValidationError(message=f'Invalid timestamp lookup {lookup}.')
+
+    if not settings.DJANGO_LEDGER_USE_TIMESTAMP_RANGE_FILTERS:
+        return {f'{field_name}__date__{lookup}': dt}
+
+    start_dt, end_dt = get_timestamp_range(dt)
+    if lookup == 'gte':
+        return {f'{field_name}__gte': start_dt}
+    elif lookup == 'lte':
+        return {f'{field_name}__lt': end_dt}
+    return {
+        f'{field_name}__gte': start_dt,
+        f'{field_name}__lt': end_dt
+    }
+
+
 def validate_dates(
         from_date: Union[str, datetime, date] = None,
         to_date: Union[str, datetime, date] = None
@@ -226,12 +310,19 @@ class IOResult:
     ce_from_date: Optional[date] = None
     ce_to_date: Optional[date] = None
 
+    # DB Aggregation deducted from the from_date closing entry checkpoint...
+    db_deduct_from_date: Optional[date] = None
+    db_deduct_to_date: Optional[date] = None
+
     # the final queryset to evaluate...
     txs_queryset = None
 
     # the aggregated account balance...
     accounts_digest: Optional[List[Dict]] = None
 
+    # stage measurements, if profiling is enabled...
+    profile: Optional[IODigestProfile] = None
+
     @property
     def is_bounded(self) -> bool:
         return all([
@@ -240,6 +331,28 @@ class IOResult:
         ])
 
 
+@dataclass
+class IOBulkCommitResult:
+    """
+    A carrier class to store the outcome of a commit_txs_bulk call. Entries are identified by their position in the
+    provided list of entries.
+    """
+    je_models: Dict[int, object] = field(default_factory=dict)
+    txs_models: Dict[int, List] = field(default_factory=dict)
+    errors: Dict[int, Exception] = field(default_factory=dict)
+
+    @property
+    def committed_count(self) -> int:
+        return len(self.je_models)
+
+    @property
+    def error_count(self) -> int:
+        return len(self.errors)
+
+    def has_errors(self) -> bool:
+        return len(self.errors) > 0
+
+
 class IODatabaseMixIn:
     """
     The main entry point to query DB for transactions. The database_digest method pushes as much load as possible
@@ -273,6 +386,68 @@ class IODatabaseMixIn:
         elif self.is_entity_unit_model():
             return self.entity
 
+    def get_io_txs_queryset(self,
+                            entity_slug: Optional[str] = None,
+                            unit_slug: Optional[str] = None,
+                            user_model: Optional[UserModel] = None):
+        """
+        Determines the initial TransactionModelQuerySet where the IO model is operating from.
+
+        Parameters
+        ----------
+        entity_slug: str
+            EntityModel slug to use. Will be validated against current EntityModel instance for safety.
+        unit_slug: str
+            EntityUnitModel slug used to query transactions.
+        user_model: UserModel
+            The django UserModel to validate against transaction ownership and permissions (i.e. Admin and Manager).
+
+        Returns
+        -------
+        TransactionModelQuerySet
+        """
+        TransactionModel = lazy_loader.get_txs_model()
+
+        if self.is_entity_model():
+            if entity_slug:
+                if entity_slug != self.slug:
+                    raise IOValidationError('Inconsistent entity_slug. '
+                                            f'Provided {entity_slug} does not match actual {self.slug}')
+            if unit_slug:
+                txs_queryset_init = TransactionModel.objects.for_unit(
+                    user_model=user_model,
+                    entity_slug=entity_slug or self.slug,
+                    unit_slug=unit_slug
+                )
+            else:
+                txs_queryset_init = TransactionModel.objects.for_entity(
+                    user_model=user_model,
+                    entity_slug=self
+                )
+        elif self.is_entity_unit_model():
+            if not entity_slug:
+                raise IOValidationError(
+                    'Calling digest from Entity Unit requires entity_slug explicitly for safety')
+            txs_queryset_init = TransactionModel.objects.for_unit(
+                user_model=user_model,
+                entity_slug=entity_slug,
+                unit_slug=unit_slug or self
+            )
+        elif self.is_ledger_model():
+            if not entity_slug:
+                raise IOValidationError(
+                    'Calling digest from Ledger Model requires entity_slug explicitly for safety')
+            txs_queryset_init = TransactionModel.objects.for_ledger(
+                user_model=user_model,
+                entity_slug=entity_slug,
+                ledger_model=self
+            )
+        else:
+            raise IOValidationError(
+                message=f'Cannot call digest from {self.__class__.__name__}'
+            )
+        return txs_queryset_init
+
     def database_digest(self,
                         entity_slug: Optional[str] = None,
                         unit_slug: Optional[str] = None,
@@ -289,6 +464,7 @@ class IODatabaseMixIn:
                         posted: bool = True,
                         exclude_zero_bal: bool = True,
                         use_closing_entries: bool = False,
+                        use_daily_balances: Optional[bool] = None,
                         **kwargs) -> IOResult:
         """
         Performs the appropriate database aggregation query for a given request.
@@ -329,117 +505,123 @@ class IODatabaseMixIn:
             Returns results aggregated by unit if needed. Defaults to False.
         use_closing_entry: bool
             Overrides the DJANGO_LEDGER_USE_CLOSING_ENTRIES setting.
+        use_daily_balances: bool
+            Aggregates the AccountDailyBalanceModel table instead of TransactionModels when possible.
+            Overrides the DJANGO_LEDGER_USE_DAILY_BALANCES setting.
         Returns
         -------
         IOResult
         """
 
-        TransactionModel = lazy_loader.get_txs_model()
+        USE_DAILY_BALANCES = settings.DJANGO_LEDGER_USE_DAILY_BALANCES
+        if use_daily_balances is not None:
+            USE_DAILY_BALANCES = use_daily_balances
 
-        # get_initial txs_queryset... where the IO model is operating from??...
-        if self.is_entity_model():
-            if entity_slug:
-                if entity_slug != self.slug:
-                    raise IOValidationError('Inconsistent entity_slug. '
-                                            f'Provided {entity_slug} does not match actual {self.slug}')
-            if unit_slug:
-                txs_queryset_init = TransactionModel.objects.for_unit(
-                    user_model=user_model,
-                    entity_slug=entity_slug or self.slug,
-                    unit_slug=unit_slug
-                )
-            else:
-                txs_queryset_init = TransactionModel.objects.for_entity(
-                    user_model=user_model,
-                    entity_slug=self
-                )
-        elif self.is_entity_unit_model():
-            if not entity_slug:
-                raise IOValidationError(
-                    'Calling digest from Entity Unit requires entity_slug explicitly for safety')
-            txs_queryset_init = TransactionModel.objects.for_unit(
-                user_model=user_model,
+        # daily balances only hold posted transactions and are not tracked by ledger...
+        if USE_DAILY_BALANCES and posted and not self.is_ledger_model():
+            return self.database_daily_balance_digest(
                 entity_slug=entity_slug,
-                unit_slug=unit_slug or self
-            )
-        elif self.is_ledger_model():
-            if not entity_slug:
-                raise IOValidationError(
-                    'Calling digest from Ledger Model requires entity_slug explicitly for safety')
-            txs_queryset_init = TransactionModel.objects.for_ledger(
+                unit_slug=unit_slug,
                 user_model=user_model,
-                entity_slug=entity_slug,
-                ledger_model=self
-            )
-        else:
-            raise IOValidationError(
-                message=f'Cannot call digest from {self.__class__.__name__}'
+                from_date=from_date,
+                to_date=to_date,
+                by_activity=by_activity,
+                by_tx_type=by_tx_type,
+                by_period=by_period,
+                by_unit=by_unit,
+                activity=activity,
+                role=role,
+                accounts=accounts
             )
 
+        TransactionModel = lazy_loader.get_txs_model()
+        txs_queryset_init = self.get_io_txs_queryset(
+            entity_slug=entity_slug,
+            unit_slug=unit_slug,
+            user_model=user_model
+        )
+
         io_result = IOResult(db_to_date=to_date, db_from_date=from_date)
         txs_queryset_agg = txs_queryset_init.not_closing_entry()
         txs_queryset_from_closing_entry = txs_queryset_init.none()
         txs_queryset_to_closing_entry = txs_queryset_init.none()
+        txs_queryset_deduct = txs_queryset_init.none()
 
         USE_CLOSING_ENTRIES = settings.DJANGO_LEDGER_USE_CLOSING_ENTRIES
         if use_closing_entries is not None:
             USE_CLOSING_ENTRIES = use_closing_entries
 
         # use closing entries to minimize DB aggregation if possible and activated...
-        if USE_CLOSING_ENTRIES:
+        # closing entries are not recorded on the ledgers being closed, so ledger digests must aggregate all txs...
+        if USE_CLOSING_ENTRIES and to_date and not self.is_ledger_model():
             txs_queryset_closing_entry = txs_queryset_init.is_closing_entry()
             entity_model = self.get_entity_model_from_io()
 
-            # looking up available dates...
-            ce_from_date = entity_model.get_closing_entry_for_date(io_date=from_date, inclusive=False)
-            ce_to_date = entity_model.get_closing_entry_for_date(io_date=to_date)
-
-            # unbounded lookup, no date match
-            # finding the closest closing entry to aggregate from if present...
-            if not from_date and not ce_to_date:
-                ce_alt_from_date = entity_model.get_nearest_next_closing_entry(io_date=to_date)
-
-                # if there's a suitable closing entry...
-                if ce_alt_from_date:
-                    txs_queryset_from_closing_entry = txs_queryset_closing_entry.filter(
-                        journal_entry__timestamp__date=ce_alt_from_date)
-                    io_result.ce_match = True
-                    io_result.ce_from_date = ce_alt_from_date
-
-                    # limit db aggregation to unclosed entries...
-                    io_result.db_from_date = ce_alt_from_date + timedelta(days=1)
-                    io_result.db_to_date = to_date
-
-                    # print(f'Unbounded lookup no date match. Closest from_dt: {ce_alt_from_date}...')
+            # nearest closing entries at or before each bound, used as balance checkpoints...
+            to_local_date = get_timestamp_range(to_date)[0].date()
+            from_local_date = get_timestamp_range(from_date)[0].date() if from_date else None
+            ce_to_date = entity_model.get_closing_entry_checkpoint(io_date=to_local_date)
+            ce_from_date = entity_model.get_closing_entry_checkpoint(io_date=from_local_date, inclusive=False)
 
-            # unbounded lookup, exact to_date match...
-            elif not from_date and ce_to_date:
+            # unbounded lookup, aggregating from the nearest closing entry...
+            if not from_date and ce_to_date:
                 txs_queryset_to_closing_entry = txs_queryset_closing_entry.filter(
-                    journal_entry__timestamp__date=ce_to_date)
+                    **get_timestamp_filter('journal_entry__timestamp', ce_to_date))
                 io_result.ce_match = True
                 io_result.ce_to_date = ce_to_date
 
-                # no need to DB aggregate, just use closing entry...
+                # limit db aggregation to unclosed entries, if any...
                 io_result.db_from_date = None
                 io_result.db_to_date = None
-                txs_queryset_agg = TransactionModel.objects.none()
-
-            # bounded exact from_date and to_date match...
-            elif ce_from_date and ce_to_date:
-                txs_queryset_from_closing_entry = txs_queryset_closing_entry.filter(
-                    journal_entry__timestamp__date=ce_from_date)
+                if ce_to_date < to_local_date:
+                    io_result.db_from_date = ce_to_date + timedelta(days=1)
+                    io_result.db_to_date = to_date
+                else:
+                    txs_queryset_agg = TransactionModel.objects.none()
 
-                txs_queryset_to_closing_entry = txs_queryset_closing_entry.filter(
-                    journal_entry__timestamp__date=ce_to_date)
+            # bounded lookup, balance at to_date checkpoint minus balance at from_date checkpoint...
+            # if both bounds resolve to the same closing entry, the checkpoints cancel out...
+            elif from_date and ce_from_date and ce_to_date and ce_from_date < ce_to_date:
+                from_delta_days = (from_local_date - ce_from_date).days - 1
+                to_delta_days = (to_local_date - ce_to_date).days
+                window_days = (to_local_date - from_local_date).days + 1
 
-                io_result.ce_match = True
-                io_result.ce_from_date = ce_from_date
-                io_result.ce_to_date = ce_to_date
+                # only worth it if fewer days of transactions are left to aggregate...
+                if from_delta_days + to_delta_days < window_days:
+                    txs_queryset_from_closing_entry = txs_queryset_closing_entry.filter(
+                        **get_timestamp_filter('journal_entry__timestamp', ce_from_date))
+                    txs_queryset_to_closing_entry = txs_queryset_closing_entry.filter(
+                        **get_timestamp_filter('journal_entry__timestamp', ce_to_date))
 
-                # no need to aggregate, use both closing entries...
-                io_result.db_from_date = None
-                io_result.db_to_date = None
-                txs_queryset_agg = TransactionModel.objects.none()
+                    io_result.ce_match = True
+                    io_result.ce_from_date = ce_from_date
+                    io_result.ce_to_date = ce_to_date
+
+                    io_result.db_from_date = None
+                    io_result.db_to_date = None
+                    if to_delta_days:
+                        io_result.db_from_date = ce_to_date + timedelta(days=1)
+                        io_result.db_to_date = to_date
+                    else:
+                        txs_queryset_agg = TransactionModel.objects.none()
+
+                    # transactions between the from_date checkpoint and from_date are deducted...
+                    if from_delta_days:
+                        io_result.db_deduct_from_date = ce_from_date + timedelta(days=1)
+                        io_result.db_deduct_to_date = from_local_date - timedelta(days=1)
+                        txs_queryset_deduct = txs_queryset_init.not_closing_entry().from_date(
+                            from_date=io_result.db_deduct_from_date
+                        ).to_date(
+                            to_date=io_result.db_deduct_to_date
+                        )
+
+        # cached closing balances replace the closing entry transactions, if available...
+        ce_cache_list = list()
+        if io_result.ce_match and not accounts and settings.DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE:
+            ce_cache_list = self.get_closing_entry_cache_list(io_result=io_result, user_model=user_model)
+            if ce_cache_list:
+                txs_queryset_from_closing_entry = txs_queryset_init.none()
+                txs_queryset_to_closing_entry = txs_queryset_init.none()
 
         txs_queryset_closing_entry = txs_queryset_from_closing_entry | txs_queryset_to_closing_entry
 
@@ -449,7 +631,7 @@ class IODatabaseMixIn:
         if io_result.db_to_date:
             txs_queryset_agg = txs_queryset_agg.to_date(to_date=io_result.db_to_date)
 
-        txs_queryset = txs_queryset_agg | txs_queryset_closing_entry
+        txs_queryset = txs_queryset_agg | txs_queryset_closing_entry | txs_queryset_deduct
 
         if exclude_zero_bal:
             txs_queryset = txs_queryset.filter(amount__gt=0.00)
@@ -471,11 +653,23 @@ class IODatabaseMixIn:
             txs_queryset = txs_queryset.for_roles(role_list=role)
 
         if io_result.is_bounded:
+            AMOUNT_IO_WHEN = [
+                When(
+                    journal_entry__is_closing_entry=True,
+                    **get_timestamp_filter('journal_entry__timestamp', io_result.ce_from_date),
+                    then=-F('amount'))
+            ]
+            if io_result.db_deduct_from_date:
+                AMOUNT_IO_WHEN.append(
+                    When(
+                        journal_entry__is_closing_entry=False,
+                        **get_timestamp_filter('journal_entry__timestamp', io_result.db_deduct_from_date, 'gte'),
+                        **get_timestamp_filter('journal_entry__timestamp', io_result.db_deduct_to_date, 'lte'),
+                        then=-F('amount'))
+                )
             txs_queryset = txs_queryset.annotate(
                 amount_io=Case(
-                    When(
-                        journal_entry__timestamp__date=ce_from_date,
-                        then=-F('amount')),
+                    *AMOUNT_IO_WHEN,
                     default=F('amount'),
                     output_field=DecimalField()
                 ))
@@ -512,6 +706,182 @@ class IODatabaseMixIn:
             VALUES.append('tx_type')
 
         io_result.txs_queryset = txs_queryset.values(*VALUES).annotate(**ANNOTATE).order_by(*ORDER_BY)
+
+        if ce_cache_list:
+            if self.is_entity_unit_model():
+                unit_slug = unit_slug or self
+            txs_rows = list(io_result.txs_queryset)
+            for ce_cache_data, negate in ce_cache_list:
+                txs_rows += ce_cache_data.get_digest_rows(
+                    by_unit=by_unit,
+                    by_period=by_period,
+                    by_activity=by_activity,
+                    negate=negate,
+                    unit_slug=getattr(unit_slug, 'slug', unit_slug),
+                    activity=activity,
+                    role=role,
+                    exclude_zero_bal=exclude_zero_bal
+                )
+            txs_rows.sort(key=get_digest_row_sort_key)
+            io_result.txs_queryset = txs_rows
+
+        return io_result
+
+    def get_closing_entry_cache_list(self, io_result: IOResult, user_model: Optional[UserModel] = None) -> List[Tuple]:
+        """
+        Fetches the cached closing balances needed by a digest backed by closing entries. Cache misses are populated
+        from the ClosingEntryTransactionModel table, so following requests need no closing entry rows.
+
+        Parameters
+        ----------
+        io_result: IOResult
+            The IOResult with the matched closing entry dates.
+        user_model: UserModel
+            The UserModel requesting the digest, validated against the EntityModel admin and managers.
+
+        Returns
+        -------
+        list
+            A list of tuples of ClosingEntryCacheData and whether its balances must be deducted. Empty if the cached
+            balances cannot be used.
+        """
+        entity_model = self.get_entity_model_from_io()
+
+        # transactions are filtered by user, so cached balances must be too...
+        if user_model is not None and not user_model.is_superuser and not entity_model.is_admin_user(user_model):
+            EntityModel = lazy_loader.get_entity_model()
+            if not EntityModel.objects.for_user(user_model=user_model).filter(uuid__exact=entity_model.uuid).exists():
+                return list()
+
+        ce_cache_list = list()
+        ce_dates = [(io_result.ce_to_date, False)]
+        if io_result.is_bounded:
+            ce_dates.append((io_result.ce_from_date, True))
+
+        for ce_date, negate in ce_dates:
+            ce_cache_data = entity_model.get_closing_entry_cache_for_date(
+                closing_date=ce_date,
+                cache_name=settings.DJANGO_LEDGER_CLOSING_ENTRY_CACHE_NAME
+            )
+            if ce_cache_data is None:
+                ce_cache_data = entity_model.save_closing_entry_cache_for_date(
+                    closing_date=ce_date,
+                    cache_name=settings.DJANGO_LEDGER_CLOSING_ENTRY_CACHE_NAME
+                )
+            ce_cache_list.append((ce_cache_data, negate))
+        return ce_cache_list
+
+    def database_daily_balance_digest(self,
+                                      entity_slug: Optional[str] = None,
+                                      unit_slug: Optional[str] = None,
+                                      user_model: Optional[UserModel] = None,
+                                      from_date: Optional[Union[date, datetime]] = None,
+                                      to_date: Optional[Union[date, datetime]] = None,
+                                      by_activity: bool = False,
+                                      by_tx_type: bool = False,
+                                      by_period: bool = False,
+                                      by_unit: bool = False,
+                                      activity: Optional[str] = None,
+                                      role: Optional[str] = None,
+                                      accounts: Optional[Union[str, List[str], Set[str]]] = None) -> IOResult:
+        """
+        Performs the database aggregation query for a given request using the AccountDailyBalanceModel table.
+        Returns the same values produced by database_digest, so the result may be post-processed by python_digest.
+        Dates are inclusive and datetimes are converted into local dates.
+
+        Returns
+        -------
+        IOResult
+        """
+        AccountDailyBalanceModel = lazy_loader.get_daily_balance_model()
+
+        if self.is_entity_model():
+            if entity_slug and entity_slug != self.slug:
+                raise IOValidationError('Inconsistent entity_slug. '
+                                        f'Provided {entity_slug} does not match actual {self.slug}')
+            daily_balance_qs = AccountDailyBalanceModel.objects.for_entity(
+                entity_slug=self,
+                user_model=user_model
+            )
+            if unit_slug:
+                daily_balance_qs = daily_balance_qs.for_unit(unit_slug=unit_slug)
+        elif self.is_entity_unit_model():
+            if not entity_slug:
+                raise IOValidationError(
+                    'Calling digest from Entity Unit requires entity_slug explicitly for safety')
+            daily_balance_qs = AccountDailyBalanceModel.objects.for_entity(
+                entity_slug=entity_slug,
+                user_model=user_model
+            ).for_unit(unit_slug=unit_slug or self)
+        else:
+            raise IOValidationError(
+                message=f'Cannot call daily balance digest from {self.__class__.__name__}'
+            )
+
+        io_result = IOResult(db_to_date=to_date, db_from_date=from_date)
+
+        if from_date:
+            daily_balance_qs = daily_balance_qs.from_date(from_date=get_timestamp_range(from_date)[0].date())
+
+        if to_date:
+            daily_balance_qs = daily_balance_qs.to_date(to_date=get_timestamp_range(to_date)[0].date())
+
+        if accounts:
+            if not isinstance(accounts, str):
+                accounts = [accounts]
+            if len(accounts) > 0 and isinstance(accounts[0], str):
+                daily_balance_qs = daily_balance_qs.filter(account_model__code__in=accounts)
+            else:
+                daily_balance_qs = daily_balance_qs.filter(account_model__in=accounts)
+
+        if activity:
+            if isinstance(activity, str):
+                activity = [activity]
+            daily_balance_qs = daily_balance_qs.filter(activity__in=activity)
+
+        if role:
+            if isinstance(role, str):
+                role = [role]
+            daily_balance_qs = daily_balance_qs.filter(account_model__role__in=role)
+
+        # database_digest value name -> AccountDailyBalanceModel value name...
+        VALUES = {
+            'account__uuid': 'account_model__uuid',
+            'account__balance_type': 'account_model__balance_type',
+            'tx_type': 'tx_type',
+            'account__code': 'account_model__code',
+            'account__name': 'account_model__name',
+            'account__role': 'account_model__role',
+        }
+        ANNOTATE = {'balance': Sum('balance')}
+        ORDER_BY = ['account_model__uuid']
+
+        if by_unit:
+            ORDER_BY.append('unit_model__uuid')
+            VALUES['journal_entry__entity_unit__uuid'] = 'unit_model__uuid'
+            VALUES['journal_entry__entity_unit__name'] = 'unit_model__name'
+
+        if by_period:
+            ORDER_BY.append('dt_idx')
+            ANNOTATE['dt_idx'] = TruncMonth('date')
+
+        if by_activity:
+            ORDER_BY.append('activity')
+            VALUES['journal_entry__activity'] = 'activity'
+
+        if by_tx_type:
+            ORDER_BY.append('tx_type')
+
+        daily_balance_qs = daily_balance_qs.values(
+            *set(VALUES.values())
+        ).annotate(**ANNOTATE).order_by(*ORDER_BY)
+
+        io_result.txs_queryset = [
+            {
+                **{k: r[v] for k, v in VALUES.items()},
+                **{k: r[k] for k in ANNOTATE}
+            } for r in daily_balance_qs
+        ]
         return io_result
 
     def python_digest(self,
@@ -531,6 +901,8 @@ class IODatabaseMixIn:
                       by_period: bool = False,
                       use_closing_entries: bool = False,
                       force_queryset_sorting: bool = False,
+                      engine: Optional[str] = None,
+                      profile: Optional[IODigestProfile] = None,
                       **kwargs) -> IOResult:
         """
         Performs the appropriate transaction post-processing after DB aggregation..
@@ -576,6 +948,11 @@ class IODatabaseMixIn:
         force_queryset_sorting: bool
             Forces sorting of the TransactionModelQuerySet before aggregation balances.
             Defaults to false.
+        engine: str
+            The engine used to aggregate balances after DB aggregation. Must be one of "python" or "columnar".
+            Defaults to DJANGO_LEDGER_DIGEST_ENGINE setting.
+        profile: IODigestProfile
+            Records the database digest, aggregation and python digest stages if provided. Defaults to None.
 
         Returns
         -------
@@ -585,23 +962,94 @@ class IODatabaseMixIn:
         if equity_only:
             role = roles_module.GROUP_EARNINGS
 
-        io_result = self.database_digest(
-            user_model=user_model,
-            entity_slug=entity_slug,
-            unit_slug=unit_slug,
-            to_date=to_date,
-            from_date=from_date,
-            by_unit=by_unit,
-            by_activity=by_activity,
-            by_tx_type=by_tx_type,
-            by_period=by_period,
-            activity=activity,
-            role=role,
-            accounts=accounts,
-            use_closing_entries=use_closing_entries,
-            **kwargs)
+        if not engine:
+            engine = settings.DJANGO_LEDGER_DIGEST_ENGINE
+        engine = validate_digest_engine(engine)
+
+        with profile_stage(profile, IO_PROFILE_STAGE_DATABASE_DIGEST):
+            io_result = self.database_digest(
+                user_model=user_model,
+                entity_slug=entity_slug,
+                unit_slug=unit_slug,
+                to_date=to_date,
+                from_date=from_date,
+                by_unit=by_unit,
+                by_activity=by_activity,
+                by_tx_type=by_tx_type,
+                by_period=by_period,
+                activity=activity,
+                role=role,
+                accounts=accounts,
+                use_closing_entries=use_closing_entries,
+                **kwargs)
+
+        # the aggregation query is evaluated upfront so its cost is measured apart from the python digest...
+        if profile is not None:
+            io_result.profile = profile
+            with profile.stage(IO_PROFILE_STAGE_AGGREGATION) as io_stage:
+                io_stage.rows = len(io_result.txs_queryset)
+
+        with profile_stage(profile, IO_PROFILE_STAGE_PYTHON_DIGEST) as io_stage:
+            io_result.accounts_digest = self.process_digest_rows(
+                txs_rows=io_result.txs_queryset,
+                signs=signs,
+                by_unit=by_unit,
+                by_activity=by_activity,
+                by_tx_type=by_tx_type,
+                by_period=by_period,
+                force_queryset_sorting=force_queryset_sorting,
+                engine=engine
+            )
+            if io_stage is not None:
+                io_stage.rows = len(io_result.accounts_digest)
+        return io_result
+
+    def process_digest_rows(self,
+                            txs_rows,
+                            signs: bool = True,
+                            by_unit: bool = False,
+                            by_activity: bool = False,
+                            by_tx_type: bool = False,
+                            by_period: bool = False,
+                            force_queryset_sorting: bool = False,
+                            engine: str = IO_DIGEST_ENGINE_PYTHON) -> List[Dict]:
+        """
+        Groups and aggregates the rows produced by the database aggregation into the accounts digest.
+
+        Parameters
+        ----------
+        txs_rows: QuerySet or list
+            The aggregated TransactionModel values.
+        signs: bool
+            Changes the balance of an account to negative if it represents a "negative" for display purposes.
+        by_activity: bool
+            Rows are aggregated by activity.
+        by_tx_type: bool
+            Rows are aggregated by DEBIT/CREDIT.
+        by_period: bool
+            Rows are aggregated by accounting period.
+        by_unit: bool
+            Rows are aggregated by unit.
+        force_queryset_sorting: bool
+            Forces sorting of the rows before aggregation balances.
+        engine: str
+            The engine used to aggregate balances. Must be one of "python" or "columnar".
+
+        Returns
+        -------
+        list
+            The accounts digest.
+        """
+        if engine == IO_DIGEST_ENGINE_COLUMNAR:
+            columnar_engine = ColumnarDigestEngine(
+                by_unit=by_unit,
+                by_period=by_period,
+                by_activity=by_activity,
+                by_tx_type=by_tx_type
+            )
+            return columnar_engine.digest(rows=txs_rows, signs=signs)
 
-        for tx_model in io_result.txs_queryset:
+        for tx_model in txs_rows:
             if tx_model['account__balance_type'] != tx_model['tx_type']:
                 tx_model['balance'] = -tx_model['balance']
 
@@ -615,10 +1063,10 @@ class IODatabaseMixIn:
         )
 
         if force_queryset_sorting:
-            io_result.txs_queryset = list(io_result.txs_queryset)
-            io_result.txs_queryset.sort(key=gb_key)
+            txs_rows = list(txs_rows)
+            txs_rows.sort(key=gb_key)
 
-        accounts_gb_code = groupby(io_result.txs_queryset, key=gb_key)
+        accounts_gb_code = groupby(txs_rows, key=gb_key)
         accounts_digest = [self.aggregate_balances(k, g) for k, g in accounts_gb_code]
 
         for acc in accounts_digest:
@@ -638,8 +1086,7 @@ class IODatabaseMixIn:
                 ]):
                     acc['balance'] = -acc['balance']
 
-        io_result.accounts_digest = accounts_digest
-        return io_result
+        return accounts_digest
 
     @staticmethod
     def aggregate_balances(k, g):
@@ -683,6 +1130,9 @@ class IODatabaseMixIn:
                income_statement: bool = False,
                cash_flow_statement: bool = False,
                use_closing_entry: Optional[bool] = None,
+               engine: Optional[str] = None,
+               use_cache: Optional[bool] = None,
+               use_profiling: Optional[bool] = None,
                **kwargs) -> IODigestContextManager:
 
         if balance_sheet_statement:
@@ -698,6 +1148,55 @@ class IODatabaseMixIn:
 
         from_date, to_date = validate_dates(from_date, to_date)
 
+        USE_CACHE = settings.DJANGO_LEDGER_DIGEST_CACHE_ENABLED
+        if use_cache is not None:
+            USE_CACHE = use_cache
+
+        USE_PROFILING = settings.DJANGO_LEDGER_DIGEST_PROFILING_ENABLED
+        if use_profiling is not None:
+            USE_PROFILING = use_profiling
+        profile = IODigestProfile() if USE_PROFILING else None
+
+        if USE_CACHE:
+            entity_model = self.get_entity_model_from_io()
+            digest_cache = IODigestCache()
+            digest_cache_key = digest_cache.get_cache_key(
+                io_model=self,
+                entity_uuid=entity_model.uuid,
+                data_version=entity_model.get_data_version(),
+                user_model=user_model,
+                entity_slug=entity_slug,
+                unit_slug=unit_slug,
+                # date filters are inclusive of the whole local day...
+                from_date=get_timestamp_range(from_date)[0].date() if from_date else None,
+                to_date=get_timestamp_range(to_date)[0].date() if to_date else None,
+                accounts=accounts,
+                role=role,
+                activity=activity,
+                signs=signs,
+                process_roles=process_roles,
+                process_groups=process_groups,
+                process_ratios=process_ratios,
+                process_activity=process_activity,
+                equity_only=equity_only,
+                by_period=by_period,
+                by_unit=by_unit,
+                by_activity=by_activity,
+                by_tx_type=by_tx_type,
+                balance_sheet_statement=balance_sheet_statement,
+                income_statement=income_statement,
+                cash_flow_statement=cash_flow_statement,
+                use_closing_entry=use_closing_entry,
+                engine=engine,
+                **kwargs
+            )
+            io_state = digest_cache.get(digest_cache_key)
+            if io_state is not None:
+                io_state['io_model'] = self
+                io_state['from_date'] = from_date
+                io_state['to_date'] = to_date
+                return IODigestContextManager(io_state=io_state)
+
         io_state = dict()
         io_state['io_model'] = self
         io_state['from_date'] = from_date
@@ -709,39 +1208,422 @@ class IODatabaseMixIn:
         io_state['by_activity'] = by_activity
         io_state['by_tx_type'] = by_tx_type
 
-        io_result: IOResult = self.python_digest(
+        # overlapping digests within the active registry scope are served from a single aggregation...
+        io_result = None
+        io_registry = get_io_digest_registry()
+        if io_registry is not None:
+            registry_role = set(roles_module.GROUP_EARNINGS) if equity_only else set(role) if role else None
+            registry_grouping = {
+                'by_unit': by_unit,
+                'by_period': by_period,
+                'by_activity': by_activity,
+                'by_tx_type': by_tx_type
+            }
+            registry_scope_key = io_registry.get_scope_key(
+                io_model=self,
+                user_model=user_model,
+                entity_slug=entity_slug,
+                unit_slug=unit_slug,
+                from_date=get_timestamp_range(from_date)[0].date() if from_date else None,
+                to_date=get_timestamp_range(to_date)[0].date() if to_date else None,
+                accounts=accounts,
+                activity=activity,
+                signs=signs,
+                use_closing_entry=use_closing_entry,
+                **kwargs
+            )
+            with profile_stage(profile, IO_PROFILE_STAGE_REGISTRY):
+                io_result = io_registry.lookup(
+                    scope_key=registry_scope_key,
+                    grouping=registry_grouping,
+                    role=registry_role
+                )
+            if io_result is not None:
+                io_result.profile = profile
+
+        if io_result is None:
+            io_result: IOResult = self.python_digest(
+                user_model=user_model,
+                accounts=accounts,
+                role=role,
+                activity=activity,
+                entity_slug=entity_slug,
+                unit_slug=unit_slug,
+                to_date=to_date,
+                from_date=from_date,
+                signs=signs,
+                equity_only=equity_only,
+                by_period=by_period,
+                by_unit=by_unit,
+                by_activity=by_activity,
+                by_tx_type=by_tx_type,
+                use_closing_entries=use_closing_entry,
+                engine=engine,
+                profile=profile,
+                **kwargs
+            )
+
+            if io_registry is not None:
+                io_registry.register(
+                    scope_key=registry_scope_key,
+                    grouping=registry_grouping,
+                    role=registry_role,
+                    io_result=io_registry.derive(io_result)
+                )
+
+        io_state['io_result'] = io_result
+        io_state['accounts'] = io_result.accounts_digest
+
+        io_digest = self.process_io_middleware(
+            io_state=io_state,
+            process_roles=process_roles,
+            process_groups=process_groups,
+            process_ratios=process_ratios,
+            process_activity=process_activity,
+            balance_sheet_statement=balance_sheet_statement,
+            income_statement=income_statement,
+            cash_flow_statement=cash_flow_statement,
+            by_period=by_period,
+            by_unit=by_unit
+        )
+
+        if profile is not None:
+            profile.send(io_model=self, io_result=io_result)
+
+        if USE_CACHE:
+            digest_cache.set(digest_cache_key, io_digest.get_io_data())
+
+        return io_digest
+
+    def digest_many(self,
+                    periods: List[Tuple[Optional[Union[date, datetime, str]], Optional[Union[date, datetime, str]]]],
+                    entity_slug: Optional[str] = None,
+                    unit_slug: Optional[str] = None,
+                    user_model: Optional[UserModel] = None,
+                    accounts: Optional[Union[Set[str], List[str]]] = None,
+                    role: Optional[Union[Set[str], List[str]]] = None,
+                    activity: Optional[str] = None,
+                    signs: bool = True,
+                    process_roles: bool = False,
+                    process_groups: bool = False,
+                    process_ratios: bool = False,
+                    process_activity: bool = False,
+                    equity_only: bool = False,
+                    by_unit: bool = False,
+                    by_activity: bool = False,
+                    by_tx_type: bool = False,
+                    balance_sheet_statement: bool = False,
+                    income_statement: bool = False,
+                    cash_flow_statement: bool = False,
+                    engine: Optional[str] = None,
+                    **kwargs) -> List[IODigestContextManager]:
+        """
+        Digests multiple periods using a single database aggregation query. Each period balance is computed by a
+        conditional aggregation over the transactions within the period bounds. The account metadata is shared across
+        all periods. Closing entries are not used.
+
+        Parameters
+        ----------
+        periods: list
+            A list of (from_date, to_date) tuples. Either bound may be None for an unbounded period, same as digest().
+            Dates are inclusive.
+        entity_slug: str
+            EntityModel slug to use. Will be validated against current EntityModel instance for safety.
+        unit_slug: str
+            EntityUnitModel used to query transactions.
+        user_model: UserModel
+            The django UserModel to validate against transaction ownership and permissions (i.e. Admin and Manager).
+        accounts: list or set
+            Optional list of accounts to query. Defaults to None (all).
+        role: list or set
+            Filters transactions to match specific role. Defaults to None.
+        activity: str
+            Filters transactions to match specific activity. Defaults to None.
+        signs: bool
+            Changes the balance of an account to negative if it represents a "negative" for display purposes.
+
+        Returns
+        -------
+        list
+            A list of IODigestContextManager, one per period, in the same order as provided.
+        """
+
+        if not periods:
+            raise IOValidationError(message='Must provide at least one period.')
+
+        if cash_flow_statement:
+            by_activity = True
+
+        if activity:
+            activity = validate_activity(activity)
+        if role:
+            role = roles_module.validate_roles(role)
+        if equity_only:
+            role = roles_module.GROUP_EARNINGS
+
+        if not engine:
+            engine = settings.DJANGO_LEDGER_DIGEST_ENGINE
+        engine = validate_digest_engine(engine)
+
+        periods = [validate_dates(
+            from_date=None if balance_sheet_statement else from_date,
+            to_date=to_date
+        ) for from_date, to_date in periods]
+
+        txs_queryset = self.get_io_txs_queryset(
+            entity_slug=entity_slug,
+            unit_slug=unit_slug,
+            user_model=user_model
+        ).not_closing_entry().posted().filter(amount__gt=0.00)
+
+        # only the outer bounds of all periods are queried...
+        if all([p[0] for p in periods]):
+            txs_queryset = txs_queryset.from_date(from_date=min(p[0] for p in periods))
+        if all([p[1] for p in periods]):
+            txs_queryset = txs_queryset.to_date(to_date=max(p[1] for p in periods))
+
+        if accounts:
+            if not isinstance(accounts, str):
+                accounts = [accounts]
+            txs_queryset = txs_queryset.for_accounts(account_list=accounts)
+
+        if activity:
+            if isinstance(activity, str):
+                activity = [activity]
+            txs_queryset = txs_queryset.for_activity(activity_list=activity)
+
+        if role:
+            txs_queryset = txs_queryset.for_roles(role_list=role)
+
+        VALUES = [
+            'account__uuid',
+            'account__balance_type',
+            'tx_type',
+            'account__code',
+            'account__name',
+            'account__role',
+        ]
+        ORDER_BY = ['account__uuid']
+
+        if by_unit:
+            ORDER_BY.append('journal_entry__entity_unit__uuid')
+            VALUES += ['journal_entry__entity_unit__uuid', 'journal_entry__entity_unit__name']
+
+        if by_activity:
+            ORDER_BY.append('journal_entry__activity')
+            VALUES.append('journal_entry__activity')
+
+        if by_tx_type:
+            ORDER_BY.append('tx_type')
+
+        ANNOTATE = dict()
+        for i, (from_date, to_date) in enumerate(periods):
+            period_filter = Q()
+            if to_date:
+                period_filter &= Q(**get_timestamp_filter('journal_entry__timestamp', to_date, lookup='lte'))
+            if from_date:
+                period_filter &= Q(**get_timestamp_filter('journal_entry__timestamp', from_date, lookup='gte'))
+            ANNOTATE[f'balance_{i}'] = Sum('amount', filter=period_filter if period_filter else None)
+
+        txs_rows = list(txs_queryset.values(*VALUES).annotate(**ANNOTATE).order_by(*ORDER_BY))
+
+        io_digest_list = list()
+        for i, (from_date, to_date) in enumerate(periods):
+            balance_key = f'balance_{i}'
+
+            # account metadata values are shared across periods...
+            period_rows = [
+                {**r, 'balance': r[balance_key]} for r in txs_rows if r[balance_key] is not None
+            ]
+
+            io_result = IOResult(db_from_date=from_date, db_to_date=to_date)
+            io_result.txs_queryset = period_rows
+            io_result.accounts_digest = self.process_digest_rows(
+                txs_rows=period_rows,
+                signs=signs,
+                by_unit=by_unit,
+                by_activity=by_activity,
+                by_tx_type=by_tx_type,
+                engine=engine
+            )
+
+            io_state = dict()
+            io_state['io_model'] = self
+            io_state['from_date'] = from_date
+            io_state['to_date'] = to_date
+            io_state['by_unit'] = by_unit
+            io_state['unit_slug'] = unit_slug
+            io_state['entity_slug'] = entity_slug
+            io_state['by_period'] = False
+            io_state['by_activity'] = by_activity
+            io_state['by_tx_type'] = by_tx_type
+            io_state['io_result'] = io_result
+            io_state['accounts'] = io_result.accounts_digest
+
+            io_digest_list.append(
+                self.process_io_middleware(
+                    io_state=io_state,
+                    process_roles=process_roles,
+                    process_groups=process_groups,
+                    process_ratios=process_ratios,
+                    process_activity=process_activity,
+                    balance_sheet_statement=balance_sheet_statement,
+                    income_statement=income_statement,
+                    cash_flow_statement=cash_flow_statement,
+                    by_unit=by_unit
+                )
+            )
+
+        return io_digest_list
+
+    async def adigest(self,
+                      entity_slug: Optional[str] = None,
+                      unit_slug: Optional[str] = None,
+                      to_date: Optional[Union[date, datetime, str]] = None,
+                      from_date: Optional[Union[date, datetime, str]] = None,
+                      user_model: Optional[UserModel] = None,
+                      accounts: Optional[Union[Set[str], List[str]]] = None,
+                      role: Optional[Union[Set[str], List[str]]] = None,
+                      activity: Optional[str] = None,
+                      signs: bool = True,
+                      process_roles: bool = False,
+                      process_groups: bool = False,
+                      process_ratios: bool = False,
+                      process_activity: bool = False,
+                      equity_only: bool = False,
+                      by_period: bool = False,
+                      by_unit: bool = False,
+                      by_activity: bool = False,
+                      by_tx_type: bool = False,
+                      balance_sheet_statement: bool = False,
+                      income_statement: bool = False,
+                      cash_flow_statement: bool = False,
+                      use_closing_entry: Optional[bool] = None,
+                      engine: Optional[str] = None,
+                      **kwargs) -> IODigestContextManager:
+        """
+        Asynchronous version of digest(), suitable for ASGI deployments. The aggregation query is evaluated using the
+        Django async ORM, so no thread pool worker is held while the database aggregates. The digest cache is not used.
+
+        Returns
+        -------
+        IODigestContextManager
+        """
+
+        if balance_sheet_statement:
+            from_date = None
+
+        if cash_flow_statement:
+            by_activity = True
+
+        if activity:
+            activity = validate_activity(activity)
+        if role:
+            role = roles_module.validate_roles(role)
+        if equity_only:
+            role = roles_module.GROUP_EARNINGS
+
+        if not engine:
+            engine = settings.DJANGO_LEDGER_DIGEST_ENGINE
+        engine = validate_digest_engine(engine)
+
+        from_date, to_date = validate_dates(from_date, to_date)
+
+        # closing entry lookups may need the database, only the query build takes place here...
+        io_result: IOResult = await sync_to_async(self.database_digest)(
             user_model=user_model,
-            accounts=accounts,
-            role=role,
-            activity=activity,
             entity_slug=entity_slug,
             unit_slug=unit_slug,
             to_date=to_date,
             from_date=from_date,
-            signs=signs,
-            equity_only=equity_only,
-            by_period=by_period,
             by_unit=by_unit,
             by_activity=by_activity,
             by_tx_type=by_tx_type,
-            use_closing_entry=use_closing_entry,
+            by_period=by_period,
+            activity=activity,
+            role=role,
+            accounts=accounts,
+            use_closing_entries=use_closing_entry,
             **kwargs
         )
 
+        if isinstance(io_result.txs_queryset, QuerySet):
+            io_result.txs_queryset = [r async for r in io_result.txs_queryset.aiterator()]
+
+        io_result.accounts_digest = self.process_digest_rows(
+            txs_rows=io_result.txs_queryset,
+            signs=signs,
+            by_unit=by_unit,
+            by_activity=by_activity,
+            by_tx_type=by_tx_type,
+            by_period=by_period,
+            force_queryset_sorting=kwargs.get('force_queryset_sorting', False),
+            engine=engine
+        )
+
+        io_state = dict()
+        io_state['io_model'] = self
+        io_state['from_date'] = from_date
+        io_state['to_date'] = to_date
+        io_state['by_unit'] = by_unit
+        io_state['unit_slug'] = unit_slug
+        io_state['entity_slug'] = entity_slug
+        io_state['by_period'] = by_period
+        io_state['by_activity'] = by_activity
+        io_state['by_tx_type'] = by_tx_type
         io_state['io_result'] = io_result
         io_state['accounts'] = io_result.accounts_digest
 
+        return self.process_io_middleware(
+            io_state=io_state,
+            process_roles=process_roles,
+            process_groups=process_groups,
+            process_ratios=process_ratios,
+            process_activity=process_activity,
+            balance_sheet_statement=balance_sheet_statement,
+            income_statement=income_statement,
+            cash_flow_statement=cash_flow_statement,
+            by_period=by_period,
+            by_unit=by_unit
+        )
+
+    def process_io_middleware(self,
+                              io_state: Dict,
+                              process_roles: bool = False,
+                              process_groups: bool = False,
+                              process_ratios: bool = False,
+                              process_activity: bool = False,
+                              balance_sheet_statement: bool = False,
+                              income_statement: bool = False,
+                              cash_flow_statement: bool = False,
+                              by_period: bool = False,
+                              by_unit: bool = False) -> IODigestContextManager:
+        """
+        Runs the requested IO Middleware on a digested IO state.
+
+        Parameters
+        ----------
+        io_state: dict
+            The IO state containing the accounts digest.
+
+        Returns
+        -------
+        IODigestContextManager
+        """
+
         # IO Middleware...
+        profile = io_state['io_result'].profile
 
         if process_roles:
-            roles_mgr = AccountRoleIOMiddleware(
-                io_data=io_state,
-                by_period=by_period,
-                by_unit=by_unit
-            )
+            with profile_stage(profile, IO_PROFILE_STAGE_ROLES):
+                roles_mgr = AccountRoleIOMiddleware(
+                    io_data=io_state,
+                    by_period=by_period,
+                    by_unit=by_unit
+                )
 
-            # idea: change digest() name to something else? maybe aggregate, calculate?...
-            io_state = roles_mgr.digest()
+                # idea: change digest() name to something else? maybe aggregate, calculate?...
+                io_state = roles_mgr.digest()
 
         if any([
             process_groups,
@@ -749,40 +1631,46 @@ class IODatabaseMixIn:
             income_statement,
             cash_flow_statement
         ]):
-            group_mgr = AccountGroupIOMiddleware(
-                io_data=io_state,
-                by_period=by_period,
-                by_unit=by_unit
-            )
-            io_state = group_mgr.digest()
+            with profile_stage(profile, IO_PROFILE_STAGE_GROUPS):
+                group_mgr = AccountGroupIOMiddleware(
+                    io_data=io_state,
+                    by_period=by_period,
+                    by_unit=by_unit
+                )
+                io_state = group_mgr.digest()
 
-            # todo: migrate this to group manager...
-            io_state['group_account']['GROUP_ASSETS'].sort(
-                key=lambda acc: roles_module.ROLES_ORDER_ASSETS.index(acc['role']))
-            io_state['group_account']['GROUP_LIABILITIES'].sort(
-                key=lambda acc: roles_module.ROLES_ORDER_LIABILITIES.index(acc['role']))
-            io_state['group_account']['GROUP_CAPITAL'].sort(
-                key=lambda acc: roles_module.ROLES_ORDER_CAPITAL.index(acc['role']))
+                # todo: migrate this to group manager...
+                io_state['group_account']['GROUP_ASSETS'].sort(
+                    key=lambda acc: roles_module.ROLES_ORDER_RANK[acc['role']])
+                io_state['group_account']['GROUP_LIABILITIES'].sort(
+                    key=lambda acc: roles_module.ROLES_ORDER_RANK[acc['role']])
+                io_state['group_account']['GROUP_CAPITAL'].sort(
+                    key=lambda acc: roles_module.ROLES_ORDER_RANK[acc['role']])
 
         if process_ratios:
-            ratio_gen = FinancialRatioManager(io_data=io_state)
-            io_state = ratio_gen.digest()
+            with profile_stage(profile, IO_PROFILE_STAGE_RATIOS):
+                ratio_gen = FinancialRatioManager(io_data=io_state)
+                io_state = ratio_gen.digest()
 
         if process_activity:
-            activity_manager = JEActivityIOMiddleware(io_data=io_state, by_unit=by_unit, by_period=by_period)
-            activity_manager.digest()
+            with profile_stage(profile, IO_PROFILE_STAGE_ACTIVITY):
+                activity_manager = JEActivityIOMiddleware(io_data=io_state, by_unit=by_unit, by_period=by_period)
+                activity_manager.digest()
 
         if balance_sheet_statement:
-            balance_sheet_mgr = BalanceSheetIOMiddleware(io_data=io_state)
-            io_state = balance_sheet_mgr.digest()
+            with profile_stage(profile, IO_PROFILE_STAGE_BALANCE_SHEET):
+                balance_sheet_mgr = BalanceSheetIOMiddleware(io_data=io_state)
+                io_state = balance_sheet_mgr.digest()
 
         if income_statement:
-            income_statement_mgr = IncomeStatementIOMiddleware(io_data=io_state)
-            io_state = income_statement_mgr.digest()
+            with profile_stage(profile, IO_PROFILE_STAGE_INCOME_STATEMENT):
+                income_statement_mgr = IncomeStatementIOMiddleware(io_data=io_state)
+                io_state = income_statement_mgr.digest()
 
         if cash_flow_statement:
-            cfs = CashFlowStatementIOMiddleware(io_data=io_state)
-            io_state = cfs.digest()
+            with profile_stage(profile, IO_PROFILE_STAGE_CASH_FLOW_STATEMENT):
+                cfs = CashFlowStatementIOMiddleware(io_data=io_state)
+                io_state = cfs.digest()
 
         return IODigestContextManager(io_state=io_state)
 
@@ -857,7 +1745,9 @@ class IODatabaseMixIn:
                 if isinstance(je_timestamp, (datetime, str)):
                     je_model = je_ledger_model.journal_entries.get(timestamp__exact=je_timestamp)
                 elif isinstance(je_timestamp, date):
-                    je_model = je_ledger_model.journal_entries.get(timestamp__date__exact=je_timestamp)
+                    je_model = je_ledger_model.journal_entries.get(
+                        **get_timestamp_filter('timestamp', je_timestamp)
+                    )
                 else:
                     raise IOValidationError(message=_(f'Invalid timestamp type {type(je_timestamp)}'))
             except ObjectDoesNotExist:
@@ -894,9 +1784,218 @@ class IODatabaseMixIn:
                 staged_tx_model.transaction_model = tx
 
         txs_models = je_model.transactionmodel_set.bulk_create(i[0] for i in txs_models)
-        je_model.save(verify=True, post_on_verify=je_posted)
+        if force_je_retrieval:
+            je_model.save(verify=True, post_on_verify=je_posted)
+        else:
+            # the new JE has no other transactions, verification takes place in memory...
+            JournalEntryVerificationContext = lazy_loader.get_je_verification_context_class()
+            je_model.save(verify=True,
+                          post_on_verify=je_posted,
+                          verification_context=JournalEntryVerificationContext(txs_models=txs_models))
+        entity_model.increment_data_version(entity_uuid=entity_model.uuid)
         return je_model, txs_models
 
+    def commit_txs_bulk(self,
+                        entries: List[Dict],
+                        batch_size: Optional[int] = None) -> IOBulkCommitResult:
+        """
+        Commits many Journal Entries at once. All entries are validated in memory, Journal Entry numbers are reserved
+        as a block per fiscal year and EntityUnitModel, and JournalEntryModels and TransactionModels are bulk created
+        in batches within a single database transaction. The cash flow activity of each Journal Entry is determined
+        from the roles of the provided AccountModels, so no additional queries are performed per entry.
+
+        An entry that fails validation does not abort the operation. Its error is reported in the result and the
+        remaining entries are committed. If a batch fails at the database level, all entries of that batch are
+        reported as failed and their reserved document numbers are not reused.
+
+        Parameters
+        ----------
+        entries: list
+            A list of dictionaries with the same keyword arguments accepted by commit_txs: je_timestamp, je_txs,
+            je_posted, je_ledger_model, je_unit_model, je_desc and je_origin. Retrieving existing Journal Entries
+            (force_je_retrieval) is not supported.
+        batch_size: int
+            The number of Journal Entries created per batch. Defaults to DJANGO_LEDGER_COMMIT_TXS_BULK_BATCH_SIZE.
+
+        Returns
+        -------
+        IOBulkCommitResult
+            The committed JournalEntryModels and TransactionModels, and the errors of the failed entries, by entry
+            position.
+        """
+        JournalEntryModel = lazy_loader.get_journal_entry_model()
+        TransactionModel = lazy_loader.get_txs_model()
+        AccountModel = lazy_loader.get_account_model()
+
+        if self.is_ledger_model():
+            if self.is_locked():
+                raise IOValidationError(
+                    message=_('Cannot commit on locked ledger')
+                )
+
+        batch_size = batch_size or settings.DJANGO_LEDGER_COMMIT_TXS_BULK_BATCH_SIZE
+        entity_model = self.get_entity_model_from_io()
+        bulk_result = IOBulkCommitResult()
+        localtime_now = get_localtime()
+
+        je_candidates = list()
+        for i, entry in enumerate(entries):
+            try:
+                if not isinstance(entry, dict):
+                    raise IOValidationError(message=_(f'Invalid entry {entry}. Must be a dictionary.'))
+
+                je_txs = entry['je_txs']
+                je_posted = entry.get('je_posted', False)
+                je_ledger_model = entry.get('je_ledger_model')
+                je_unit_model = entry.get('je_unit_model')
+
+                # entry values are checked upfront, so a malformed entry is reported instead of aborting the batch...
+                if not isinstance(je_txs, (list, tuple)):
+                    raise IOValidationError(message=_('Invalid je_txs. Must be a list of transactions.'))
+                for txm_kwargs in je_txs:
+                    if not isinstance(txm_kwargs, dict):
+                        raise IOValidationError(message=_(f'Invalid transaction {txm_kwargs}. Must be a dictionary.'))
+                    if not isinstance(txm_kwargs.get('account'), AccountModel):
+                        raise IOValidationError(
+                            message=_(f'Invalid account {txm_kwargs.get("account")}. Must be an AccountModel.')
+                        )
+                    if isinstance(txm_kwargs.get('amount'), bool) or not isinstance(txm_kwargs.get('amount'),
+                                                                                    (int, float, Decimal)):
+                        raise IOValidationError(message=_(f'Invalid amount {txm_kwargs.get("amount")}.'))
+                    if txm_kwargs.get('tx_type') not in (TransactionModel.CREDIT, TransactionModel.DEBIT):
+                        raise IOValidationError(message=_(f'Invalid tx_type {txm_kwargs.get("tx_type")}.'))
+
+                if je_ledger_model is not None and not isinstance(je_ledger_model, lazy_loader.get_ledger_model()):
+                    raise IOValidationError(message=_(f'Invalid je_ledger_model {je_ledger_model}.'))
+                if je_unit_model is not None and not isinstance(je_unit_model, lazy_loader.get_unit_model()):
+                    raise IOValidationError(message=_(f'Invalid je_unit_model {je_unit_model}.'))
+
+                if not check_tx_balance(je_txs, perform_correction=False):
+                    raise TransactionNotInBalanceError(
+                        message=_('Cannot commit transactions. Credits and Debits are not in balance.')
+                    )
+
+                je_timestamp = validate_io_timestamp(dt=entry['je_timestamp'])
+                if not isinstance(je_timestamp, datetime):
+                    raise IOValidationError(message=_(f'Invalid je_timestamp {entry["je_timestamp"]}.'))
+                if entity_model.last_closing_date and entity_model.last_closing_date >= je_timestamp.date():
+                    raise IOValidationError(
+                        message=_(
+                            f'Cannot commit transactions. The journal entry date {je_timestamp} is on a closed period.')
+                    )
+
+                if je_posted and je_timestamp > localtime_now:
+                    raise IOValidationError(message=_('Cannot Post JE Models with timestamp in the future.'))
+
+                if not je_ledger_model:
+                    if not self.is_ledger_model():
+                        raise IOValidationError(
+                            message=_('Committing from EntityModel requires an instance of LedgerModel')
+                        )
+                    je_ledger_model = self
+                elif je_ledger_model.entity_id != entity_model.uuid:
+                    raise IOValidationError(f'LedgerModel {je_ledger_model} does not belong to {entity_model}')
+
+                if je_ledger_model.is_locked():
+                    raise IOValidationError(message=_('Cannot commit on locked ledger'))
+
+                if je_unit_model is not None and je_unit_model.entity_id != entity_model.uuid:
+                    raise IOValidationError(f'EntityUnitModel {je_unit_model} does not belong to {entity_model}')
+
+                if je_posted and not je_txs:
+                    raise IOValidationError(message=_('Cannot post an empty Journal Entry.'))
+
+                role_set = set()
+                for txm_kwargs in je_txs:
+                    if txm_kwargs['account'].is_root_account():
+                        raise IOValidationError(message=_('Cannot transact on root accounts'))
+                    role_set.add(txm_kwargs['account'].role)
+
+                activity = None
+                if roles_module.ASSET_CA_CASH in role_set:
+                    role_set.discard(roles_module.ASSET_CA_CASH)
+                    activity = JournalEntryModel.get_activity_from_roles(role_set=role_set)
+
+                je_model = JournalEntryModel(
+                    ledger=je_ledger_model,
+                    entity_unit=je_unit_model,
+                    description=entry.get('je_desc'),
+                    timestamp=je_timestamp,
+                    origin=entry.get('je_origin'),
+                    activity=activity,
+                    posted=je_posted,
+                    locked=je_posted
+                )
+                je_candidates.append((i, je_model, je_txs))
+            except (ValidationError, KeyError) as e:
+                bulk_result.errors[i] = e
+
+        if not je_candidates:
+            return bulk_result
+
+        with transaction.atomic():
+
+            # reserves a block of document numbers per fiscal year & unit...
+            je_numbering = dict()
+            for i, je_model, je_txs in je_candidates:
+                fy_key = entity_model.get_fy_for_date(dt=je_model.timestamp)
+                je_numbering.setdefault((fy_key, je_model.entity_unit_id), list()).append(je_model)
+
+            for (fy_key, _unit_uuid), je_models in je_numbering.items():
+                je_numbers = JournalEntryModel.reserve_je_numbers(
+                    entity_model=entity_model,
+                    fiscal_year=fy_key,
+                    count=len(je_models),
+                    entity_unit_model=je_models[0].entity_unit
+                )
+                for je_model, je_number in zip(je_models, je_numbers):
+                    je_model.je_number = je_number
+
+            for b in range(0, len(je_candidates), batch_size):
+                je_batch = je_candidates[b:b + batch_size]
+
+                txs_batch = list()
+                for i, je_model, je_txs in je_batch:
+                    txs_models = list()
+                    for txm_kwargs in je_txs:
+                        tx = TransactionModel(
+                            account=txm_kwargs['account'],
+                            amount=txm_kwargs['amount'],
+                            tx_type=txm_kwargs['tx_type'],
+                            description=txm_kwargs.get('description'),
+                            journal_entry=je_model,
+                        )
+                        txs_models.append(tx)
+                        staged_tx_model = txm_kwargs.get('staged_tx_model')
+                        if staged_tx_model:
+                            staged_tx_model.transaction_model = tx
+                    txs_batch.append((i, je_model, txs_models))
+
+                try:
+                    with transaction.atomic():
+                        JournalEntryModel.objects.bulk_create([je_model for _i, je_model, _txs in je_batch])
+                        TransactionModel.objects.bulk_create([tx for _i, _je, txs in txs_batch for tx in txs])
+                except DatabaseError as e:
+                    for i, _je, _txs in je_batch:
+                        bulk_result.errors[i] = e
+                    continue
+
+                for i, je_model, txs_models in txs_batch:
+                    je_model._verified = True
+                    bulk_result.je_models[i] = je_model
+                    bulk_result.txs_models[i] = txs_models
+
+            if bulk_result.je_models:
+                if settings.DJANGO_LEDGER_USE_DAILY_BALANCES:
+                    AccountDailyBalanceModel = lazy_loader.get_daily_balance_model()
+                    AccountDailyBalanceModel.objects.refresh_for_journal_entries(
+                        je_models=[je for je in bulk_result.je_models.values() if je.is_posted()],
+                        entity_model=entity_model
+                    )
+                entity_model.increment_data_version(entity_uuid=entity_model.uuid)
+
+        return bulk_result
+
 
 class IOReportMixIn:
     PDF_REPORT_ORIENTATION = 'P'
@@ -924,6 +2023,17 @@ class IOReportMixIn:
             **kwargs
         )
 
+    async def adigest_balance_sheet(self,
+                                    to_date: Union[date, datetime],
+                                    user_model: Optional[UserModel] = None,
+                                    **kwargs: Dict) -> IODigestContextManager:
+        return await self.adigest(
+            user_model=user_model,
+            to_date=to_date,
+            balance_sheet_statement=True,
+            **kwargs
+        )
+
     def get_balance_sheet_statement(self,
                                     to_date: Union[date, datetime],
                                     subtitle: Optional[str] = None,
@@ -977,6 +2087,19 @@ class IOReportMixIn:
             **kwargs
         )
 
+    async def adigest_income_statement(self,
+                                      from_date: Union[date, datetime],
+                                      to_date: Union[date, datetime],
+                                      user_model: Optional[UserModel] = None,
+                                      **kwargs) -> IODigestContextManager:
+        return await self.adigest(
+            user_model=user_model,
+            from_date=from_date,
+            to_date=to_date,
+            income_statement=True,
+            **kwargs
+        )
+
     def get_income_statement(self,
                              from_date: Union[date, datetime],
                              to_date: Union[date, datetime],
@@ -1032,6 +2155,19 @@ class IOReportMixIn:
             **kwargs
         )
 
+    async def adigest_cash_flow_statement(self,
+                                         from_date: Union[date, datetime],
+                                         to_date: Union[date, datetime],
+                                         user_model: Optional[UserModel] = None,
+                                         **kwargs) -> IODigestContextManager:
+        return await self.adigest(
+            user_model=user_model,
+            from_date=from_date,
+            to_date=to_date,
+            cash_flow_statement=True,
+            **kwargs
+        )
+
     def get_cash_flow_statement(self,
                                 from_date: Union[date, datetime],
                                 to_date: Union[date, datetime],
@@ -149,7 +149,7 @@ class EntityDataGenerator(LoggingMixIn):
 
         self.create_coa()
         self.logger.info(f'Pulling Entity {self.entity_model} accounts...')
-        self.account_models = self.entity_model.get_coa_accounts(order_by=('role', 'code'))
+        self.account_models = self.entity_model.get_account_index().get_accounts(order_by=('role', 'code'))
         self.accounts_by_role = {g: list(v) for g, v in groupby(self.account_models, key=lambda a: a.role)}
         self.create_vendors()
         self.create_customers()
@@ -638,6 +638,7 @@ class EntityDataGenerator(LoggingMixIn):
                             'bill_model',
                             'po_item_status'
                         ])
+                    po_model.update_perpetual_inventory()
 
                     if random() > 0.25:
                         date_bill_review = self.get_next_timestamp(date_bill_draft)
@@ -728,6 +729,7 @@ class EntityDataGenerator(LoggingMixIn):
                     invoice_items.append(itm)
 
         invoice_items = invoice_model.itemtransactionmodel_set.bulk_create(invoice_items)
+        invoice_model.update_perpetual_inventory()
         invoice_model.update_amount_due(itemtxs_qs=invoice_items)
         invoice_model.full_clean()
         invoice_model.save()
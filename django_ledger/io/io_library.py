@@ -12,10 +12,11 @@ from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import Decimal
 from itertools import chain
-from typing import Union, Dict, Callable, Optional, List
+from typing import Union, Dict, Callable, Optional, List, Iterable
 from uuid import UUID
 
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
@@ -93,8 +94,10 @@ class IOCursor:
         self.COA_MODEL = coa_model
         self.__COMMITTED: bool = False
         self.blueprints = defaultdict(list)
+        self.blueprint_funcs: Dict[str, Callable] = dict()
+        self.validated_ledger_uuids = set()
         self.ledger_model_qs: Optional[LedgerModelQuerySet] = None
-        self.account_model_qs: Optional[AccountModelQuerySet] = None
+        self.account_model_qs: Optional[List[AccountModel]] = None
         self.ledger_map = dict()
         self.commit_plan = dict()
         self.instructions = None
@@ -124,9 +127,10 @@ class IOCursor:
             coa_model=self.COA_MODEL
         )
 
-    def resolve_account_model_qs(self, codes: List[str]) -> AccountModelQuerySet:
+    def resolve_account_model_qs(self, codes: List[str]) -> List[AccountModel]:
         """
-        Resolves the final AccountModelQuerySet associated with the given account codes used by the blueprint.
+        Resolves the final list of AccountModels associated with the given account codes used by the blueprint.
+        Accounts are looked up in the EntityModel AccountIndex of the Chart of Accounts specified.
 
         Parameters
         ----------
@@ -136,13 +140,12 @@ class IOCursor:
 
         Returns
         -------
-        AccountModelQuerySet
-            The resolved AccountModelQuerySet associated with the given codes.
+        list
+            The resolved list of active AccountModels associated with the given codes.
         """
         if self.account_model_qs is None:
-            qs = self.get_account_model_qs()
-            qs = qs.filter(code__in=codes)
-            self.account_model_qs = qs
+            account_index = self.ENTITY_MODEL.get_account_index(coa_model=self.COA_MODEL)
+            self.account_model_qs = account_index.get_accounts(codes=codes, order_by=None)
         return self.account_model_qs
 
     def resolve_ledger_model_qs(self) -> LedgerModelQuerySet:
@@ -164,6 +167,46 @@ class IOCursor:
             )
         return self.ledger_model_qs
 
+    def get_blueprint_func(self, name: str) -> Callable:
+        """
+        Retrieves the blueprint function registered under the given name. The function is resolved from the IOLibrary
+        once per cursor and reused on every subsequent dispatch.
+
+        Parameters
+        ----------
+        name: str
+            The registered blueprint name.
+
+        Returns
+        -------
+        Callable
+        """
+        try:
+            return self.blueprint_funcs[name]
+        except KeyError:
+            blueprint_func = self.IO_LIBRARY.get_blueprint(name)
+            self.blueprint_funcs[name] = blueprint_func
+            return blueprint_func
+
+    def validate_ledger_model(self, ledger_model: Optional[Union[str, LedgerModel, UUID]]):
+        """
+        Validates the ledger model identifier of a dispatched blueprint. LedgerModel instances are validated against
+        the cursor EntityModel only once.
+
+        Parameters
+        ----------
+        ledger_model: Optional[Union[str, LedgerModel, UUID]]
+            The ledger model identifier to validate.
+        """
+        if not isinstance(ledger_model, (str, UUID, LedgerModel)):
+            raise IOCursorValidationError(
+                message=_('Ledger Model must be a string or UUID or LedgerModel')
+            )
+
+        if isinstance(ledger_model, LedgerModel) and ledger_model.uuid not in self.validated_ledger_uuids:
+            self.ENTITY_MODEL.validate_ledger_model_for_entity(ledger_model)
+            self.validated_ledger_uuids.add(ledger_model.uuid)
+
     def dispatch(self,
                  name,
                  ledger_model: Optional[Union[str, LedgerModel, UUID]] = None,
@@ -182,18 +225,43 @@ class IOCursor:
         kwargs
             The keyword arguments to be passed to the blueprint function.
         """
+        self.validate_ledger_model(ledger_model)
+        blueprint_func = self.get_blueprint_func(name)
+        blueprint_txs = blueprint_func(**kwargs)
+        self.blueprints[ledger_model].append(blueprint_txs)
 
-        if not isinstance(ledger_model, (str, UUID, LedgerModel)):
-            raise IOCursorValidationError(
-                message=_('Ledger Model must be a string or UUID or LedgerModel')
-            )
+    def dispatch_many(self,
+                      name,
+                      kwargs_iterable: Iterable[Dict],
+                      ledger_model: Optional[Union[str, LedgerModel, UUID]] = None) -> int:
+        """
+        Stages many instances of the same blueprint at once. This method does not commit the transactions
+        into the database.
 
-        if isinstance(ledger_model, LedgerModel):
-            self.ENTITY_MODEL.validate_ledger_model_for_entity(ledger_model)
+        Parameters
+        ----------
+        name: str
+            The registered blueprint name to be staged.
+        kwargs_iterable: Iterable[Dict]
+            The keyword arguments of each blueprint instance. A "ledger_model" key, if present, overrides the
+            ledger_model parameter for that instance.
+        ledger_model: Optional[Union[str, LedgerModel, UUID]]
+            The default ledger model identifier to house the transactions associated with each blueprint instance.
 
-        blueprint_func = self.IO_LIBRARY.get_blueprint(name)
-        blueprint_txs = blueprint_func(**kwargs)
-        self.blueprints[ledger_model].append(blueprint_txs)
+        Returns
+        -------
+        int
+            The number of blueprint instances staged.
+        """
+        blueprint_func = self.get_blueprint_func(name)
+        dispatched = 0
+        for kwargs in kwargs_iterable:
+            kwargs = dict(kwargs)
+            bp_ledger_model = kwargs.pop('ledger_model', ledger_model)
+            self.validate_ledger_model(bp_ledger_model)
+            self.blueprints[bp_ledger_model].append(blueprint_func(**kwargs))
+            dispatched += 1
+        return dispatched
 
     def compile_instructions(self) -> Dict:
         """
@@ -256,7 +324,8 @@ class IOCursor:
         post_journal_entries: bool
             If new journal entries are created, the journal entry models will be posted to the database.
         kwargs
-            Additional keyword arguments passed to the IO commit_txs function.
+            Additional keyword arguments passed to the IO commit_txs_bulk entries. If force_je_retrieval is
+            requested, each journal entry is committed individually through the IO commit_txs function.
         """
         if self.is_committed():
             raise IOCursorValidationError(
@@ -322,25 +391,57 @@ class IOCursor:
         for tx in chain.from_iterable(tr for _, tr in instructions.items()):
             tx.account_model = account_models[tx.account_code]
 
+        je_timestamp = je_timestamp if je_timestamp else get_localtime()
         results = dict()
-        for ledger_model, tr_items in instructions.items():
-            if ledger_model._state.adding:
-                ledger_model.save()
-            je_txs = [t.to_dict() for t in tr_items]
-
-            # where the magic happens...
-            je, txs_models = ledger_model.commit_txs(
-                je_timestamp=je_timestamp if je_timestamp else get_localtime(),
-                je_txs=je_txs,
-                je_posted=post_journal_entries,
-                **kwargs
-            )
 
-            results[ledger_model] = {
-                'journal_entry': je,
-                'txs_models': txs_models,
-                'instructions': tr_items
-            }
+        with transaction.atomic():
+            new_ledger_models = [l for l in instructions.keys() if l._state.adding]
+            if new_ledger_models:
+                LedgerModel.objects.bulk_create(new_ledger_models)
+
+            if kwargs.get('force_je_retrieval'):
+                for ledger_model, tr_items in instructions.items():
+                    je_txs = [t.to_dict() for t in tr_items]
+
+                    # where the magic happens...
+                    je, txs_models = ledger_model.commit_txs(
+                        je_timestamp=je_timestamp,
+                        je_txs=je_txs,
+                        je_posted=post_journal_entries,
+                        **kwargs
+                    )
+
+                    results[ledger_model] = {
+                        'journal_entry': je,
+                        'txs_models': txs_models,
+                        'instructions': tr_items
+                    }
+            else:
+                commit_plan = list(instructions.items())
+                bulk_result = self.ENTITY_MODEL.commit_txs_bulk(
+                    entries=[
+                        {
+                            **kwargs,
+                            'je_timestamp': je_timestamp,
+                            'je_txs': [t.to_dict() for t in tr_items],
+                            'je_posted': post_journal_entries,
+                            'je_ledger_model': ledger_model
+                        } for ledger_model, tr_items in commit_plan
+                    ])
+
+                if bulk_result.has_errors():
+                    i, error = next(iter(bulk_result.errors.items()))
+                    raise IOCursorValidationError(
+                        message=_(f'Unable to commit transactions for ledger {commit_plan[i][0]}: {error}')
+                    )
+
+                for i, (ledger_model, tr_items) in enumerate(commit_plan):
+                    results[ledger_model] = {
+                        'journal_entry': bulk_result.je_models[i],
+                        'txs_models': bulk_result.txs_models[i],
+                        'instructions': tr_items
+                    }
+
         results['account_model_qs'] = self.account_model_qs
         self.__COMMITTED = True
         return results
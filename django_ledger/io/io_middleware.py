@@ -60,26 +60,27 @@ class AccountRoleIOMiddleware:
         return self.DIGEST
 
     def process_roles(self):
+        """
+        Aggregates the accounts by role in a single pass. Balances by period and by unit are accumulated along the way.
+        """
+        for r in roles_module.ROLES_DIRECTORY_INDEX.values():
+            self.ROLES_ACCOUNTS[r] = list()
+            self.ROLES_BALANCES[r] = 0
 
-        for c, l in roles_module.ROLES_DIRECTORY.items():
-            for r in l:
-                acc_list = list(acc for acc in self.ACCOUNTS if acc['role'] == getattr(roles_module, r))
+        for acc in self.ACCOUNTS:
+            r = roles_module.ROLES_DIRECTORY_INDEX.get(acc['role'])
+            if r is None:
+                continue
 
-                self.ROLES_ACCOUNTS[r] = acc_list
-                self.ROLES_BALANCES[r] = sum(acc['balance'] for acc in acc_list)
+            self.ROLES_ACCOUNTS[r].append(acc)
+            self.ROLES_BALANCES[r] += acc['balance']
 
-                if self.BY_PERIOD or self.BY_UNIT:
-                    for acc in acc_list:
-                        if self.BY_PERIOD:
-                            key = (acc['period_year'], acc['period_month'])
-                            self.ROLES_BALANCES_BY_PERIOD[key][r] = sum(acc['balance'] for acc in acc_list if all([
-                                acc['period_year'] == key[0],
-                                acc['period_month'] == key[1]]
-                            ))
-                        if self.BY_UNIT:
-                            key = (acc['unit_uuid'], acc['unit_name'])
-                            self.ROLES_BALANCES_BY_UNIT[key][r] = sum(
-                                acc['balance'] for acc in acc_list if acc['unit_uuid'] == key[0])
+            if self.BY_PERIOD:
+                period_balances = self.ROLES_BALANCES_BY_PERIOD[(acc['period_year'], acc['period_month'])]
+                period_balances[r] = period_balances.get(r, 0) + acc['balance']
+            if self.BY_UNIT:
+                unit_balances = self.ROLES_BALANCES_BY_UNIT[(acc['unit_uuid'], acc['unit_name'])]
+                unit_balances[r] = unit_balances.get(r, 0) + acc['balance']
 
 
 class AccountGroupIOMiddleware:
@@ -134,25 +135,30 @@ class AccountGroupIOMiddleware:
         return (acc for acc in self.DIGEST_ACCOUNTS if acc['role'] in getattr(mod, g))
 
     def process_groups(self):
+        """
+        Aggregates the accounts by group in a single pass. An account is added to every group its role belongs to.
+        """
         for g in roles_module.ROLES_GROUPS:
-            acc_list = list(self.get_accounts_generator(roles_module, g))
-            self.GROUPS_ACCOUNTS[g] = acc_list
-            self.GROUPS_BALANCES[g] = sum(acc['balance'] for acc in acc_list)
-
-            if self.BY_PERIOD or self.BY_UNIT:
-                for acc in acc_list:
-                    if self.BY_PERIOD:
-                        key = (acc['period_year'], acc['period_month'])
-                        self.GROUPS_BALANCES_BY_PERIOD[key][g] = sum(
-                            acc['balance'] for acc in acc_list if all([
-                                acc['period_year'] == key[0],
-                                acc['period_month'] == key[1]]
-                            ))
-                    if self.BY_UNIT:
-                        key = (acc['unit_uuid'], acc['unit_name'])
-                        self.GROUPS_BALANCES_BY_UNIT[key][g] = sum(
-                            acc['balance'] for acc in acc_list if acc['unit_uuid'] == key[0]
-                        )
+            self.GROUPS_ACCOUNTS[g] = list()
+            self.GROUPS_BALANCES[g] = 0
+
+        for acc in self.DIGEST_ACCOUNTS:
+            acc_groups = roles_module.ROLES_GROUPS_INDEX.get(acc['role'])
+            if not acc_groups:
+                continue
+
+            if self.BY_PERIOD:
+                period_balances = self.GROUPS_BALANCES_BY_PERIOD[(acc['period_year'], acc['period_month'])]
+            if self.BY_UNIT:
+                unit_balances = self.GROUPS_BALANCES_BY_UNIT[(acc['unit_uuid'], acc['unit_name'])]
+
+            for g in acc_groups:
+                self.GROUPS_ACCOUNTS[g].append(acc)
+                self.GROUPS_BALANCES[g] += acc['balance']
+                if self.BY_PERIOD:
+                    period_balances[g] = period_balances.get(g, 0) + acc['balance']
+                if self.BY_UNIT:
+                    unit_balances[g] = unit_balances.get(g, 0) + acc['balance']
 
 
 class JEActivityIOMiddleware:
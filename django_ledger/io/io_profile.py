@@ -0,0 +1,151 @@
+"""
+Django Ledger created by Miguel Sanda <msanda@arrobalytics.com>.
+Copyright© EDMA Group Inc licensed under the GPLv3 Agreement.
+
+Contributions to this module:
+    * Miguel Sanda <msanda@arrobalytics.com>
+
+This module provides an opt-in instrumentation mode for the IO digest. When enabled, every stage of the digest records
+its wall time, SQL query count, SQL time and row count on the IOResult.profile attribute. Once the digest completes,
+the profile is sent through the io_digest_profiled signal and to the DJANGO_LEDGER_DIGEST_PROFILE_HOOK callable, if
+configured, so it can be forwarded to a metrics system.
+"""
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from django.db import connection
+from django.dispatch import Signal
+from django.utils.module_loading import import_string
+
+from django_ledger.settings import DJANGO_LEDGER_DIGEST_PROFILE_HOOK
+
+io_digest_profiled = Signal()
+
+IO_PROFILE_STAGE_DATABASE_DIGEST = 'database_digest'
+IO_PROFILE_STAGE_AGGREGATION = 'aggregation'
+IO_PROFILE_STAGE_PYTHON_DIGEST = 'python_digest'
+IO_PROFILE_STAGE_REGISTRY = 'registry'
+IO_PROFILE_STAGE_ROLES = 'roles'
+IO_PROFILE_STAGE_GROUPS = 'groups'
+IO_PROFILE_STAGE_RATIOS = 'ratios'
+IO_PROFILE_STAGE_ACTIVITY = 'activity'
+IO_PROFILE_STAGE_BALANCE_SHEET = 'balance_sheet'
+IO_PROFILE_STAGE_INCOME_STATEMENT = 'income_statement'
+IO_PROFILE_STAGE_CASH_FLOW_STATEMENT = 'cash_flow_statement'
+
+
+@dataclass
+class IOProfileStage:
+    """
+    The measurements of a single digest stage. Times are in seconds.
+    """
+    name: str
+    wall_time: float = 0.0
+    query_count: int = 0
+    query_time: float = 0.0
+    rows: Optional[int] = None
+
+    @property
+    def python_time(self) -> float:
+        return max(self.wall_time - self.query_time, 0.0)
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'wall_time': self.wall_time,
+            'query_count': self.query_count,
+            'query_time': self.query_time,
+            'python_time': self.python_time,
+            'rows': self.rows
+        }
+
+
+@dataclass
+class IODigestProfile:
+    """
+    Collects the stages of a digest call.
+    """
+    stages: List[IOProfileStage] = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measures the enclosed block as a digest stage.
+
+        Parameters
+        ----------
+        name: str
+            The stage name.
+
+        Yields
+        ------
+        IOProfileStage
+            The stage being measured. Rows may be set by the caller.
+        """
+        io_stage = IOProfileStage(name=name)
+
+        def query_wrapper(execute, sql, params, many, context):
+            start = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                io_stage.query_count += 1
+                io_stage.query_time += perf_counter() - start
+
+        start = perf_counter()
+        try:
+            with connection.execute_wrapper(query_wrapper):
+                yield io_stage
+        finally:
+            io_stage.wall_time = perf_counter() - start
+            self.stages.append(io_stage)
+
+    def get_stage(self, name: str) -> Optional[IOProfileStage]:
+        return next((s for s in self.stages if s.name == name), None)
+
+    @property
+    def wall_time(self) -> float:
+        return sum(s.wall_time for s in self.stages)
+
+    @property
+    def query_count(self) -> int:
+        return sum(s.query_count for s in self.stages)
+
+    @property
+    def query_time(self) -> float:
+        return sum(s.query_time for s in self.stages)
+
+    def to_dict(self) -> Dict:
+        return {
+            'wall_time': self.wall_time,
+            'query_count': self.query_count,
+            'query_time': self.query_time,
+            'stages': [s.to_dict() for s in self.stages]
+        }
+
+    def send(self, io_model, io_result):
+        """
+        Sends the profile through the io_digest_profiled signal and the DJANGO_LEDGER_DIGEST_PROFILE_HOOK callable.
+        """
+        io_digest_profiled.send(sender=io_model.__class__, io_model=io_model, io_result=io_result, profile=self)
+        if DJANGO_LEDGER_DIGEST_PROFILE_HOOK:
+            profile_hook = import_string(DJANGO_LEDGER_DIGEST_PROFILE_HOOK)
+            profile_hook(io_model=io_model, io_result=io_result, profile=self)
+
+
+def profile_stage(profile: Optional[IODigestProfile], name: str):
+    """
+    Measures a digest stage if profiling is active, otherwise does nothing.
+
+    Parameters
+    ----------
+    profile: IODigestProfile
+        The active profile, if any.
+    name: str
+        The stage name.
+    """
+    if profile is None:
+        return nullcontext()
+    return profile.stage(name)
@@ -0,0 +1,204 @@
+"""
+Django Ledger created by Miguel Sanda <msanda@arrobalytics.com>.
+Copyright© EDMA Group Inc licensed under the GPLv3 Agreement.
+
+Contributions to this module:
+    * Miguel Sanda <msanda@arrobalytics.com>
+
+This module provides a request-scoped registry of IO digest results. While a registry is active, every database
+aggregation performed by IOMixIn.digest is registered, and later digest requests over the same date window are
+served from a registered result whenever possible. A narrower request (i.e. an equity only digest, or a digest without
+period breakdown) is derived from a wider result by filtering roles and collapsing the grouping dimensions in memory.
+
+The registry is activated per request by the IODigestRegistryMiddleware or explicitly with io_digest_registry().
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import replace
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+
+IO_DIGEST_REGISTRY_GROUPING = ('by_unit', 'by_period', 'by_activity', 'by_tx_type')
+
+_io_digest_registry: ContextVar[Optional['IODigestRegistry']] = ContextVar('django_ledger_io_digest_registry',
+                                                                           default=None)
+
+
+class IODigestRegistry:
+    """
+    Holds the IOResults aggregated during the current scope.
+    Results are grouped by scope key, which contains all the digest parameters that must match exactly for a result
+    to be shared, such as the date window, entity, unit and user.
+    """
+
+    def __init__(self):
+        self.RESULTS: Dict[tuple, List[Tuple[Dict, Optional[Set[str]], object]]] = dict()
+        self.HITS = 0
+        self.MISSES = 0
+
+    @staticmethod
+    def serialize_param(value):
+        if isinstance(value, (set, frozenset, list, tuple)):
+            return tuple(sorted(str(v) for v in value))
+        elif isinstance(value, date):
+            return value.isoformat()
+        elif hasattr(value, 'pk'):
+            return f'{value.__class__.__name__}:{value.pk}'
+        return repr(value)
+
+    def get_scope_key(self, io_model, user_model=None, **params) -> tuple:
+        """
+        Generates the key that identifies results which may be shared.
+
+        Parameters
+        ----------
+        io_model: IOMixIn
+            The model instance the digest is called from.
+        user_model: UserModel
+            The UserModel requesting the digest.
+        params: dict
+            The digest parameters that must match exactly. Grouping and role parameters must not be included.
+
+        Returns
+        -------
+        tuple
+            The scope key.
+        """
+        return (
+            io_model.__class__.__name__,
+            io_model.pk,
+            getattr(user_model, 'pk', None),
+            *((k, self.serialize_param(v)) for k, v in sorted(params.items()))
+        )
+
+    def register(self, scope_key: tuple, grouping: Dict, role: Optional[Set[str]], io_result):
+        self.RESULTS.setdefault(scope_key, list()).append((grouping, role, io_result))
+
+    def lookup(self, scope_key: tuple, grouping: Dict, role: Optional[Set[str]]):
+        """
+        Finds a registered result able to serve the requested digest. A registered result qualifies if it is grouped
+        by every requested dimension and its role filter, if any, includes all requested roles.
+
+        Parameters
+        ----------
+        scope_key: tuple
+            The scope key of the request.
+        grouping: dict
+            The requested grouping dimensions, by_unit, by_period, by_activity & by_tx_type.
+        role: set
+            The requested roles, if any.
+
+        Returns
+        -------
+        IOResult
+            The derived IOResult or None if no registered result qualifies.
+        """
+        for reg_grouping, reg_role, reg_io_result in self.RESULTS.get(scope_key, list()):
+            if not all(reg_grouping[g] for g in IO_DIGEST_REGISTRY_GROUPING if grouping[g]):
+                continue
+            if reg_role is not None and (role is None or not role.issubset(reg_role)):
+                continue
+            self.HITS += 1
+            return self.derive(
+                io_result=reg_io_result,
+                role=role if role != reg_role else None,
+                grouping={g: grouping[g] for g in IO_DIGEST_REGISTRY_GROUPING if reg_grouping[g] != grouping[g]}
+            )
+        self.MISSES += 1
+
+    @staticmethod
+    def derive(io_result, role: Optional[Set[str]] = None, grouping: Optional[Dict] = None):
+        """
+        Derives a narrower IOResult from a registered one.
+
+        Parameters
+        ----------
+        io_result: IOResult
+            The registered IOResult.
+        role: set
+            Roles to keep, if any.
+        grouping: dict
+            The grouping dimensions to be collapsed, if any.
+
+        Returns
+        -------
+        IOResult
+            A new IOResult with its own accounts digest.
+        """
+        grouping = grouping or dict()
+        by_unit = grouping.get('by_unit', True)
+        by_period = grouping.get('by_period', True)
+        by_activity = grouping.get('by_activity', True)
+        by_tx_type = grouping.get('by_tx_type', True)
+
+        accounts_digest = dict()
+        for acc in io_result.accounts_digest:
+            if role and acc['role'] not in role:
+                continue
+
+            key = (
+                acc['account_uuid'],
+                acc['unit_uuid'] if by_unit else None,
+                acc['period_year'] if by_period else None,
+                acc['period_month'] if by_period else None,
+                acc['activity'] if by_activity else None,
+                acc['tx_type'] if by_tx_type else None,
+            )
+
+            derived_acc = accounts_digest.get(key)
+            if derived_acc is None:
+                accounts_digest[key] = {
+                    **acc,
+                    'unit_uuid': key[1],
+                    'unit_name': acc['unit_name'] if by_unit else None,
+                    'period_year': key[2],
+                    'period_month': key[3],
+                    'activity': key[4],
+                    'tx_type': key[5],
+                }
+            else:
+                derived_acc['balance'] += acc['balance']
+
+        for acc in accounts_digest.values():
+            acc['balance_abs'] = abs(acc['balance'])
+
+        derived_io_result = replace(io_result, accounts_digest=list(accounts_digest.values()), profile=None)
+        derived_io_result.txs_queryset = io_result.txs_queryset
+        return derived_io_result
+
+    def clear(self):
+        self.RESULTS.clear()
+
+
+def get_io_digest_registry() -> Optional[IODigestRegistry]:
+    """
+    The IODigestRegistry active in the current context, if any.
+
+    Returns
+    -------
+    IODigestRegistry
+    """
+    return _io_digest_registry.get()
+
+
+@contextmanager
+def io_digest_registry():
+    """
+    Activates a new IODigestRegistry for the duration of the context. If a registry is already active, it is reused.
+
+    Examples
+    ________
+        >>> with io_digest_registry():
+        ...     bs_digest = entity_model.digest_balance_sheet(to_date=to_date)
+        ...     ic_digest = entity_model.digest_income_statement(from_date=from_date, to_date=to_date)
+    """
+    registry = _io_digest_registry.get()
+    if registry is not None:
+        yield registry
+        return
+
+    token = _io_digest_registry.set(IODigestRegistry())
+    try:
+        yield _io_digest_registry.get()
+    finally:
+        _io_digest_registry.reset(token)
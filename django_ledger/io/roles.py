@@ -643,6 +643,15 @@ GROUPS_DIRECTORY = dict()
 for group in ROLES_GROUPS:
     GROUPS_DIRECTORY[group] = getattr(mod, group)
 
+# precomputed indexes for single-pass digest aggregation...
+ROLES_DIRECTORY_INDEX = {getattr(mod, r): r for r in chain.from_iterable(ROLES_DIRECTORY.values())}
+ROLES_GROUPS_INDEX = dict()
+for group in ROLES_GROUPS:
+    for role in dict.fromkeys(GROUPS_DIRECTORY[group]):
+        ROLES_GROUPS_INDEX.setdefault(role, list()).append(group)
+
+ROLES_ORDER_RANK = {r: i for i, r in enumerate(ROLES_ORDER_ALL)}
+
 
 def validate_roles(roles: Union[str, List[str]], raise_exception: bool = True) -> Set[str]:
     """
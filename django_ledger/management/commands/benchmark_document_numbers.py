@@ -0,0 +1,207 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from math import ceil
+from multiprocessing import get_context
+from time import perf_counter, sleep
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction, OperationalError
+
+from django_ledger.io.io_core import get_localtime, get_localdate
+from django_ledger.models import (EntityModel, EntityStateModel, LedgerModel, JournalEntryModel, BillModel,
+                                  InvoiceModel, PurchaseOrderModel, EstimateModel, VendorModel, CustomerModel,
+                                  ItemModel)
+
+DOCUMENT_KEYS = [
+    EntityStateModel.KEY_JOURNAL_ENTRY,
+    EntityStateModel.KEY_BILL,
+    EntityStateModel.KEY_INVOICE,
+    EntityStateModel.KEY_PURCHASE_ORDER,
+    EntityStateModel.KEY_ESTIMATE,
+    EntityStateModel.KEY_VENDOR,
+    EntityStateModel.KEY_CUSTOMER,
+    EntityStateModel.KEY_ITEM,
+]
+
+# a lock that never clears or an unavailable database must not hang the benchmark...
+LOCK_MAX_RETRIES = 10
+LOCK_BACKOFF_BASE = 0.01
+LOCK_BACKOFF_MAX = 1.0
+
+
+def get_document_model(key: str, entity_model: EntityModel, ledger_model: LedgerModel):
+    """
+    An unsaved document model of the given key, able to draw its next number from the EntityStateModel.
+    """
+    if key == EntityStateModel.KEY_JOURNAL_ENTRY:
+        return JournalEntryModel(ledger=ledger_model, timestamp=get_localtime())
+    elif key == EntityStateModel.KEY_BILL:
+        return BillModel(ledger=ledger_model, date_draft=get_localdate())
+    elif key == EntityStateModel.KEY_INVOICE:
+        return InvoiceModel(ledger=ledger_model, date_draft=get_localdate())
+    elif key == EntityStateModel.KEY_PURCHASE_ORDER:
+        return PurchaseOrderModel(entity=entity_model, date_draft=get_localdate())
+    elif key == EntityStateModel.KEY_ESTIMATE:
+        return EstimateModel(entity=entity_model, date_draft=get_localdate())
+    elif key == EntityStateModel.KEY_VENDOR:
+        return VendorModel(entity_model=entity_model)
+    elif key == EntityStateModel.KEY_CUSTOMER:
+        return CustomerModel(entity_model=entity_model)
+    elif key == EntityStateModel.KEY_ITEM:
+        return ItemModel(entity=entity_model)
+    raise CommandError(f'Invalid document key {key}.')
+
+
+def benchmark_worker(entity_slug: str, key: str, n_documents: int):
+    """
+    Allocates n_documents numbers of the given key, the same way the models generate their document numbers.
+    Locked allocations are retried with an exponential backoff, up to LOCK_MAX_RETRIES times, after which the
+    document is counted as failed.
+    """
+    entity_model = EntityModel.objects.get(slug__exact=entity_slug)
+    ledger_model = LedgerModel(entity=entity_model)
+    stats = {
+        'latencies': list(),
+        'sequences': list(),
+        'lock_wait': 0.0,
+        'retries': 0,
+        'failed': 0,
+        'reserve_retries': EntityStateModel.objects.RESERVE_RETRIES
+    }
+
+    def lock_wrapper(execute, sql, params, many, context):
+        if 'FOR UPDATE' not in sql:
+            return execute(sql, params, many, context)
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats['lock_wait'] += perf_counter() - start
+
+    try:
+        with connection.execute_wrapper(lock_wrapper):
+            for _ in range(n_documents):
+                document_model = get_document_model(key, entity_model, ledger_model)
+                start = perf_counter()
+                state_model = None
+                for attempt in range(LOCK_MAX_RETRIES + 1):
+                    try:
+                        with transaction.atomic(durable=True):
+                            state_model = document_model._get_next_state_model(raise_exception=False)
+                        break
+                    except OperationalError:
+                        # i.e. SQLite database is locked...
+                        if attempt == LOCK_MAX_RETRIES:
+                            break
+                        stats['retries'] += 1
+                        sleep(min(LOCK_BACKOFF_BASE * 2 ** attempt, LOCK_BACKOFF_MAX))
+                if state_model is None:
+                    stats['failed'] += 1
+                    continue
+                stats['latencies'].append(perf_counter() - start)
+                stats['sequences'].append((state_model.fiscal_year, state_model.entity_unit_id, state_model.sequence))
+    finally:
+        connection.close()
+
+    stats['reserve_retries'] = EntityStateModel.objects.RESERVE_RETRIES - stats['reserve_retries']
+    return stats
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks concurrent document number generation of every numbered model against the configured '
+            'database. Use a file backed SQLite or a PostgreSQL database. No other process should generate document '
+            'numbers for the EntityModel while the benchmark runs, otherwise gapless checks will fail.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entity', type=str, required=True, dest='entity_slug',
+                            help='EntityModel slug to generate document numbers for.')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Number of concurrent workers. Defaults to 8.')
+        parser.add_argument('--documents', type=int, default=200,
+                            help='Number of document numbers generated per key. Defaults to 200.')
+        parser.add_argument('--key', type=str, action='append', dest='keys', choices=DOCUMENT_KEYS,
+                            help='Document key to benchmark. May be used multiple times. Defaults to all.')
+        parser.add_argument('--processes', action='store_true', default=False,
+                            help='Uses worker processes instead of threads.')
+
+    def get_executor(self, workers: int, use_processes: bool):
+        if use_processes:
+            # forked workers must open their own database connections...
+            connections.close_all()
+            return ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=get_context('fork'),
+                                       initializer=connections.close_all)
+        return ThreadPoolExecutor(max_workers=workers)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite' and connection.settings_dict['NAME'] in ('', ':memory:'):
+            raise CommandError('In-memory SQLite databases cannot be shared across workers.')
+        if not EntityModel.objects.filter(slug__exact=options['entity_slug']).exists():
+            raise CommandError(f'EntityModel {options["entity_slug"]} not found.')
+
+        workers = max(options['workers'], 1)
+        n_documents = max(options['documents'], workers)
+        keys = options['keys'] or DOCUMENT_KEYS
+
+        self.stdout.write(
+            f'{"key":>10} {"block":>6} {"docs":>6} {"docs/s":>9} {"p50 ms":>8} {"p99 ms":>8} '
+            f'{"lock s":>8} {"retries":>8} {"failed":>7} {"unique":>7} {"gapless":>8}'
+        )
+
+        failures = list()
+        for key in keys:
+            EntityStateModel.objects.clear_sequence_blocks()
+            reserve_retries = EntityStateModel.objects.RESERVE_RETRIES
+            per_worker = [n_documents // workers + (1 if i < n_documents % workers else 0) for i in range(workers)]
+
+            start = perf_counter()
+            if workers == 1 and not options['processes']:
+                results = [benchmark_worker(options['entity_slug'], key, n_documents)]
+            else:
+                with self.get_executor(workers, options['processes']) as executor:
+                    results = list(executor.map(benchmark_worker,
+                                                [options['entity_slug']] * workers,
+                                                [key] * workers,
+                                                per_worker))
+            wall_time = perf_counter() - start
+
+            latencies = sorted(l for r in results for l in r['latencies'])
+            sequences = [s for r in results for s in r['sequences']]
+            lock_wait = sum(r['lock_wait'] for r in results)
+            retries = sum(r['retries'] for r in results)
+            failed = sum(r['failed'] for r in results)
+            if options['processes']:
+                retries += sum(r['reserve_retries'] for r in results)
+            else:
+                retries += EntityStateModel.objects.RESERVE_RETRIES - reserve_retries
+
+            block_size = EntityStateModel.objects.get_block_size(key)
+            is_unique = len(set(sequences)) == len(sequences)
+
+            is_gapless = None
+            if block_size == 1:
+                sequence_groups = dict()
+                for fiscal_year, entity_unit_id, seq in sequences:
+                    sequence_groups.setdefault((fiscal_year, entity_unit_id), list()).append(seq)
+                is_gapless = all(
+                    sorted(seqs) == list(range(min(seqs), min(seqs) + len(seqs)))
+                    for seqs in sequence_groups.values()
+                )
+
+            p50 = latencies[ceil(0.50 * len(latencies)) - 1] * 1000 if latencies else 0.0
+            p99 = latencies[ceil(0.99 * len(latencies)) - 1] * 1000 if latencies else 0.0
+            self.stdout.write(
+                f'{key:>10} {block_size:>6} {len(sequences):>6} {len(sequences) / wall_time:>9.1f} {p50:>8.2f} '
+                f'{p99:>8.2f} {lock_wait:>8.3f} {retries:>8} {failed:>7} {str(is_unique):>7} '
+                f'{"n/a" if is_gapless is None else str(is_gapless):>8}'
+            )
+
+            if failed:
+                failures.append(f'{key}: {failed} document numbers not allocated after {LOCK_MAX_RETRIES} retries.')
+
+            if not is_unique:
+                failures.append(f'{key}: duplicated document numbers.')
+            if is_gapless is False:
+                failures.append(f'{key}: gaps found in a gapless sequence.')
+
+        if failures:
+            raise CommandError(' '.join(failures))
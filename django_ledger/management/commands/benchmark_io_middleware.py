@@ -0,0 +1,74 @@
+from decimal import Decimal
+from random import choice, randint, seed
+from time import perf_counter
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand
+
+from django_ledger.io import roles as roles_module
+from django_ledger.io.io_middleware import AccountRoleIOMiddleware, AccountGroupIOMiddleware
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the role & group IO middlewares against synthetic account digests of increasing size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=5000,
+                            help='Number of accounts of the largest digest. Defaults to 5000.')
+        parser.add_argument('--periods', type=int, default=36,
+                            help='Number of monthly periods per account. Defaults to 36.')
+        parser.add_argument('--units', type=int, default=4,
+                            help='Number of entity units. Defaults to 4.')
+        parser.add_argument('--steps', type=int, default=4,
+                            help='Number of digest sizes to benchmark, up to --accounts. Defaults to 4.')
+
+    def get_accounts_digest(self, n_accounts: int, n_periods: int, n_units: int):
+        seed(n_accounts)
+        roles = list(roles_module.ROLES_DIRECTORY_INDEX.keys())
+        units = [(uuid4(), f'Unit {i}') for i in range(n_units)]
+        accounts_digest = list()
+        for _ in range(n_accounts):
+            account_uuid = uuid4()
+            role = choice(roles)
+            unit_uuid, unit_name = choice(units)
+            for p in range(n_periods):
+                accounts_digest.append({
+                    'account_uuid': account_uuid,
+                    'unit_uuid': unit_uuid,
+                    'unit_name': unit_name,
+                    'period_year': 2020 + p // 12,
+                    'period_month': p % 12 + 1,
+                    'role': role,
+                    'balance': Decimal(randint(-100000, 100000)).scaleb(-2)
+                })
+        return accounts_digest
+
+    def handle(self, *args, **options):
+        steps = max(options['steps'], 1)
+        self.stdout.write(f'{"accounts":>10} {"rows":>10} {"roles (s)":>12} {"groups (s)":>12} {"us/row":>8}')
+
+        for i in range(1, steps + 1):
+            n_accounts = options['accounts'] * i // steps
+            accounts_digest = self.get_accounts_digest(n_accounts, options['periods'], options['units'])
+
+            start = perf_counter()
+            AccountRoleIOMiddleware(
+                io_data={'accounts': accounts_digest},
+                by_period=True,
+                by_unit=True
+            ).digest()
+            roles_time = perf_counter() - start
+
+            start = perf_counter()
+            AccountGroupIOMiddleware(
+                io_data={'accounts': accounts_digest},
+                by_period=True,
+                by_unit=True
+            ).digest()
+            groups_time = perf_counter() - start
+
+            n_rows = len(accounts_digest)
+            us_per_row = (roles_time + groups_time) * 1e6 / n_rows if n_rows else 0.0
+            self.stdout.write(
+                f'{n_accounts:>10} {n_rows:>10} {roles_time:>12.4f} {groups_time:>12.4f} {us_per_row:>8.2f}'
+            )
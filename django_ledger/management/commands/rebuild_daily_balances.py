@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django_ledger.models import EntityModel, AccountDailyBalanceModel
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds or verifies the AccountDailyBalanceModel table from the posted TransactionModels'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entity', type=str, action='append', dest='entity_slugs',
+                            help='EntityModel slug to process. May be used multiple times. Defaults to all.')
+        parser.add_argument('--verify', action='store_true', default=False,
+                            help='Only verifies the table against the posted transactions. Nothing is written.')
+
+    def handle(self, *args, **options):
+        entity_model_qs = EntityModel.objects.all().only('uuid', 'slug')
+        if options['entity_slugs']:
+            entity_model_qs = entity_model_qs.filter(slug__in=options['entity_slugs'])
+            if len(entity_model_qs) != len(set(options['entity_slugs'])):
+                raise CommandError('One or more entities were not found.')
+
+        mismatch_count = 0
+        for entity_model in entity_model_qs:
+            if options['verify']:
+                mismatches = AccountDailyBalanceModel.objects.verify(entity_model=entity_model)
+                mismatch_count += len(mismatches)
+                if mismatches:
+                    self.stdout.write(self.style.ERROR(f'{entity_model.slug}: {len(mismatches)} mismatches found.'))
+                    for key, (expected, actual) in mismatches.items():
+                        self.stdout.write(f'    {key}: expected {expected}, found {actual}')
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{entity_model.slug}: OK'))
+            else:
+                daily_balances = AccountDailyBalanceModel.objects.rebuild(entity_model=entity_model)
+                self.stdout.write(
+                    self.style.SUCCESS(f'{entity_model.slug}: {len(daily_balances)} daily balances created.')
+                )
+
+        if mismatch_count:
+            raise CommandError(f'{mismatch_count} daily balance mismatches found.')
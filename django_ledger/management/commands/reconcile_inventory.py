@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django_ledger.models import EntityModel
+
+
+class Command(BaseCommand):
+    help = 'Reconciles the perpetual inventory of each ItemModel against a full inventory recount'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entity', type=str, action='append', dest='entity_slugs',
+                            help='EntityModel slug to process. May be used multiple times. Defaults to all.')
+        parser.add_argument('--commit', action='store_true', default=False,
+                            help='Rebuilds the perpetual inventory of the entities with mismatches.')
+
+    def handle(self, *args, **options):
+        entity_model_qs = EntityModel.objects.all().only('uuid', 'slug')
+        if options['entity_slugs']:
+            entity_model_qs = entity_model_qs.filter(slug__in=options['entity_slugs'])
+            if len(entity_model_qs) != len(set(options['entity_slugs'])):
+                raise CommandError('One or more entities were not found.')
+
+        mismatch_count = 0
+        for entity_model in entity_model_qs:
+            mismatches = entity_model.reconcile_inventory(commit=options['commit'])
+            if mismatches:
+                mismatch_count += len(mismatches)
+                self.stdout.write(self.style.ERROR(f'{entity_model.slug}: {len(mismatches)} mismatches found.'))
+                for (uuid, name, uom), adj in mismatches.items():
+                    self.stdout.write(f'    {name} ({uom}): counted {adj["counted"]} / {adj["counted_value"]}, '
+                                      f'recorded {adj["recorded"]} / {adj["recorded_value"]}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{entity_model.slug}: OK'))
+
+        if mismatch_count and not options['commit']:
+            raise CommandError(f'{mismatch_count} inventory mismatches found.')
+        elif mismatch_count:
+            self.stdout.write(self.style.SUCCESS(f'{mismatch_count} inventory mismatches rebuilt.'))
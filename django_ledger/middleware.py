@@ -0,0 +1,39 @@
+"""
+Django Ledger created by Miguel Sanda <msanda@arrobalytics.com>.
+Copyright© EDMA Group Inc licensed under the GPLv3 Agreement.
+
+Contributions to this module:
+    * Miguel Sanda <msanda@arrobalytics.com>
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django_ledger.io.io_registry import io_digest_registry
+
+
+class IODigestRegistryMiddleware:
+    """
+    Activates a request-scoped IODigestRegistry, so overlapping digests performed by views and template tags while
+    rendering a page share their database aggregations. Only safe (read-only) requests are registered.
+    """
+    sync_capable = True
+    async_capable = True
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method not in self.SAFE_METHODS:
+            return self.get_response(request)
+        with io_digest_registry():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.method not in self.SAFE_METHODS:
+            return await self.get_response(request)
+        with io_digest_registry():
+            return await self.get_response(request)
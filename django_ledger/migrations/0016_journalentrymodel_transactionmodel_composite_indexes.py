@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ledger', '0015_remove_chartofaccountmodel_locked_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journalentrymodel',
+            index=models.Index(fields=['ledger', 'posted', 'is_closing_entry', 'timestamp'], name='django_ledg_ledger__1db9fd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactionmodel',
+            index=models.Index(fields=['journal_entry', 'account'], name='django_ledg_journal_3db094_idx'),
+        ),
+    ]
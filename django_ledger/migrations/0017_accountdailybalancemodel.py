@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:25
+
+from decimal import Decimal
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ledger', '0016_journalentrymodel_transactionmodel_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDailyBalanceModel',
+            fields=[
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True, null=True)),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('activity', models.CharField(blank=True, choices=[('Operating', (('op', 'Operating'),)), ('Investing', (('inv_ppe', 'Purchase/Disposition of PPE'), ('inv_securities', 'Purchase/Disposition of Securities'), ('inv', 'Investing Activity Other'))), ('Financing', (('fin_std', 'Payoff of Short Term Debt'), ('fin_ltd', 'Payoff of Long Term Debt'), ('fin_equity', 'Issuance of Common Stock, Preferred Stock or Capital Contribution'), ('fin_dividends', 'Dividends or Distributions to Shareholders'), ('fin', 'Financing Activity Other')))], max_length=20, null=True, verbose_name='Activity')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('tx_type', models.CharField(choices=[('credit', 'Credit'), ('debit', 'Debit')], max_length=10, verbose_name='Transaction Type')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=20, validators=[django.core.validators.MinValueValidator(limit_value=Decimal('0.00'))], verbose_name='Daily Balance')),
+                ('account_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='django_ledger.accountmodel', verbose_name='Account Model')),
+                ('entity_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='django_ledger.entitymodel', verbose_name='Entity Model')),
+                ('unit_model', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='django_ledger.entityunitmodel', verbose_name='Entity Unit Model')),
+            ],
+            options={
+                'verbose_name': 'Account Daily Balance',
+                'verbose_name_plural': 'Account Daily Balances',
+                'ordering': ['-date'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['entity_model', 'date'], name='django_ledg_entity__93f79d_idx'), models.Index(fields=['entity_model', 'account_model', 'date'], name='django_ledg_entity__730789_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ledger', '0017_accountdailybalancemodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entitymodel',
+            name='data_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Data Version'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ledger', '0018_entitymodel_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entitymodel',
+            name='accounts_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Accounts Version'),
+        ),
+    ]
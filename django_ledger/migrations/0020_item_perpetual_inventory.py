@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ledger', '0019_entitymodel_accounts_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemmodel',
+            name='inventory_cost_received',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=20, verbose_name='Perpetual inventory cost received.'),
+        ),
+        migrations.AddField(
+            model_name='itemmodel',
+            name='inventory_quantity_invoiced',
+            field=models.DecimalField(decimal_places=3, default=0, editable=False, max_digits=20, verbose_name='Perpetual inventory quantity invoiced.'),
+        ),
+        migrations.AddField(
+            model_name='itemmodel',
+            name='inventory_quantity_received',
+            field=models.DecimalField(decimal_places=3, default=0, editable=False, max_digits=20, verbose_name='Perpetual inventory quantity received.'),
+        ),
+        migrations.AddField(
+            model_name='itemmodel',
+            name='inventory_unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, max_digits=20, null=True, verbose_name='Perpetual inventory average unit cost.'),
+        ),
+        migrations.AddField(
+            model_name='itemtransactionmodel',
+            name='inventory_posted_quantity',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, help_text='Quantity posted to the perpetual inventory. Positive if received, negative if invoiced.', max_digits=20, null=True, verbose_name='Inventory Quantity Posted'),
+        ),
+        migrations.AddField(
+            model_name='itemtransactionmodel',
+            name='inventory_posted_value',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='Received cost posted to the perpetual inventory.', max_digits=20, null=True, verbose_name='Inventory Cost Posted'),
+        ),
+    ]
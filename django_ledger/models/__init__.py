@@ -14,5 +14,6 @@ from django_ledger.models.vendor import *
 from django_ledger.models.unit import *
 from django_ledger.models.purchase_order import *
 from django_ledger.models.closing_entry import *
+from django_ledger.models.daily_balance import *
 from django_ledger.models.entity import *
 from django_ledger.models.data_import import *
\ No newline at end of file
@@ -33,11 +33,12 @@ from uuid import uuid4
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import Q
-from django.db.models.signals import pre_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from treebeard.mp_tree import MP_Node, MP_NodeManager, MP_NodeQuerySet
 
+from django_ledger.io.io_account_index import invalidate_account_index
 from django_ledger.io.io_core import get_localdate
 from django_ledger.io.roles import (ACCOUNT_ROLE_CHOICES, BS_ROLES, GROUP_INVOICE, GROUP_BILL, validate_roles,
                                     GROUP_ASSETS,
@@ -45,7 +46,7 @@ from django_ledger.io.roles import (ACCOUNT_ROLE_CHOICES, BS_ROLES, GROUP_INVOIC
                                     ROOT_GROUP, BS_BUCKETS, ROOT_ASSETS, ROOT_LIABILITIES,
                                     ROOT_CAPITAL, ROOT_INCOME, ROOT_EXPENSES, ROOT_COA)
 from django_ledger.models.mixins import CreateUpdateMixIn
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 from django_ledger.settings import DJANGO_LEDGER_ACCOUNT_CODE_GENERATE, DJANGO_LEDGER_ACCOUNT_CODE_USE_PREFIX
 
 DEBIT = 'debit'
@@ -122,17 +123,11 @@ class AccountModelQuerySet(MP_NodeQuerySet):
         if isinstance(self, lazy_loader.get_entity_model()):
             return self.filter(
                 Q(coa_model__entity=entity_slug) &
-                (
-                        Q(coa_model__entity__admin=user_model) |
-                        Q(coa_model__entity__managers__in=[user_model])
-                )
+                get_entity_access_q(user_model, 'coa_model__entity')
             ).order_by('code')
         return self.filter(
             Q(coa_model__entity__slug__exact=entity_slug) &
-            (
-                    Q(coa_model__entity__admin=user_model) |
-                    Q(coa_model__entity__managers__in=[user_model])
-            )
+            get_entity_access_q(user_model, 'coa_model__entity')
         ).order_by('code')
 
     def gb_bs_role(self):
@@ -165,8 +160,7 @@ class AccountModelManager(MP_NodeManager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(coa_model__entity__admin=user_model) |
-            Q(coa_model__entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'coa_model__entity')
         )
 
     # todo: search for uses and pass EntityModel whenever possible.
@@ -738,3 +732,15 @@ def accountmodel_presave(instance: AccountModel, **kwargs):
 
 
 pre_save.connect(receiver=accountmodel_presave, sender=AccountModel)
+
+
+def accountmodel_postsave(instance: AccountModel, **kwargs):
+    invalidate_account_index(coa_model_id=instance.coa_model_id)
+
+
+def accountmodel_postdelete(instance: AccountModel, **kwargs):
+    invalidate_account_index(coa_model_id=instance.coa_model_id)
+
+
+post_save.connect(receiver=accountmodel_postsave, sender=AccountModel)
+post_delete.connect(receiver=accountmodel_postdelete, sender=AccountModel)
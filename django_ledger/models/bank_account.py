@@ -21,7 +21,7 @@ from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 
 from django_ledger.models import CreateUpdateMixIn, BankAccountInfoMixIn
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 
 UserModel = get_user_model()
 
@@ -69,8 +69,7 @@ class BankAccountModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(entity_model__admin=user_model) |
-            Q(entity_model__managers__in=[user_model])
+            get_entity_access_q(user_model, 'entity_model')
         )
 
     def for_entity(self, entity_slug, user_model) -> BankAccountModelQuerySet:
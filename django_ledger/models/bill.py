@@ -25,9 +25,9 @@ from typing import Union, Optional, Tuple, Dict, List
 from uuid import uuid4
 
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError, ObjectDoesNotExist
-from django.db import models, transaction, IntegrityError
-from django.db.models import Q, Sum, F, Count
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q, Sum, Count
 from django.db.models.signals import pre_save
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
@@ -39,7 +39,7 @@ from django_ledger.models.entity import EntityModel
 from django_ledger.models.items import ItemTransactionModelQuerySet, ItemTransactionModel, ItemModel, ItemModelQuerySet
 from django_ledger.models.mixins import (CreateUpdateMixIn, AccrualMixIn, MarkdownNotesMixIn,
                                          PaymentTermsMixIn, ItemizeMixIn)
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 from django_ledger.settings import (DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING, DJANGO_LEDGER_BILL_NUMBER_PREFIX)
 
 UserModel = get_user_model()
@@ -208,8 +208,7 @@ class BillModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(ledger__entity__admin=user_model) |
-            Q(ledger__entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'ledger__entity')
         )
 
     def for_entity(self, entity_slug, user_model) -> BillModelQuerySet:
@@ -245,6 +244,31 @@ class BillModelManager(models.Manager):
                 Q(ledger__entity__slug__exact=entity_slug)
             )
 
+    def pay_many(self,
+                 bill_models,
+                 payment_date: Optional[Union[datetime, date]] = None,
+                 cash_account=None,
+                 payment_amounts: Optional[Dict] = None):
+        """
+        Pays many BillModels at once in a single payment run. See AccrualMixIn.make_payment_many.
+
+        Examples
+        ________
+            >>> bill_model_qs = BillModel.objects.for_entity(user_model=request_user, entity_slug=slug).approved()
+            >>> paid_bills, errors = BillModel.objects.pay_many(bill_models=bill_model_qs, payment_date=payment_date)
+
+        Returns
+        _______
+        tuple
+            The paid BillModels and the errors of the bills that could not be paid, by BillModel UUID.
+        """
+        return self.model.make_payment_many(
+            models_list=bill_models,
+            payment_date=payment_date,
+            cash_account=cash_account,
+            payment_amounts=payment_amounts
+        )
+
 
 class BillModelAbstract(
     AccrualMixIn,
@@ -597,6 +621,20 @@ class BillModelAbstract(
         else:
             self.validate_itemtxs_qs(queryset)
 
+        return self.get_migration_data_values(queryset=queryset)
+
+    @staticmethod
+    def get_migration_data_values(queryset: ItemTransactionModelQuerySet, *fields) -> ItemTransactionModelQuerySet:
+        """
+        Aggregates the item transaction data needed to perform a migration into the LedgerModel.
+
+        Parameters
+        ----------
+        queryset: ItemTransactionModelQuerySet
+            The ItemTransactionModelQuerySet to aggregate.
+        fields
+            Additional fields to group by, if any.
+        """
         return queryset.order_by('item_model__expense_account__uuid',
                                  'entity_unit__uuid',
                                  'item_model__expense_account__balance_type').values(
@@ -606,7 +644,8 @@ class BillModelAbstract(
             'item_model__inventory_account__balance_type',
             'entity_unit__slug',
             'entity_unit__uuid',
-            'total_amount').annotate(
+            'total_amount',
+            *fields).annotate(
             account_unit_total=Sum('total_amount')
         )
 
@@ -1392,6 +1431,7 @@ class BillModelAbstract(
             itemtxs_qs.filter(
                 po_model_id__isnull=False
             ).update(po_item_status=ItemTransactionModel.STATUS_ORDERED)
+            self.update_perpetual_inventory()
 
             if not entity_slug:
                 entity_slug = self.ledger.entity.slug
@@ -1779,39 +1819,12 @@ class BillModelAbstract(
         EntityModel = lazy_loader.get_entity_model()
         entity_model = EntityModel.objects.get(uuid__exact=self.ledger.entity_id)
         fy_key = entity_model.get_fy_for_date(dt=self.date_draft)
-
-        try:
-            LOOKUP = {
-                'entity_model_id__exact': self.ledger.entity_id,
-                'entity_unit_id__exact': None,
-                'fiscal_year': fy_key,
-                'key__exact': EntityStateModel.KEY_BILL
-            }
-
-            state_model_qs = EntityStateModel.objects.filter(**LOOKUP).select_related(
-                'entity_model').select_for_update()
-            state_model = state_model_qs.get()
-            state_model.sequence = F('sequence') + 1
-            state_model.save(update_fields=['sequence'])
-            state_model.refresh_from_db()
-            return state_model
-        except ObjectDoesNotExist:
-            EntityModel = lazy_loader.get_entity_model()
-            entity_model = EntityModel.objects.get(uuid__exact=self.ledger.entity_id)
-            fy_key = entity_model.get_fy_for_date(dt=self.date_draft)
-
-            LOOKUP = {
-                'entity_model_id': entity_model.uuid,
-                'entity_unit_id': None,
-                'fiscal_year': fy_key,
-                'key': EntityStateModel.KEY_BILL,
-                'sequence': 1
-            }
-            state_model = EntityStateModel.objects.create(**LOOKUP)
-            return state_model
-        except IntegrityError as e:
-            if raise_exception:
-                raise e
+        return EntityStateModel.objects.get_next_state_model(
+            entity_model_id=self.ledger.entity_id,
+            entity_unit_id=None,
+            fiscal_year=fy_key,
+            key=EntityStateModel.KEY_BILL
+        )
 
     def generate_bill_number(self, commit: bool = False) -> str:
         """
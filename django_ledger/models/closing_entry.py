@@ -13,11 +13,12 @@ from django.urls import reverse
 from django.utils.timezone import make_aware
 from django.utils.translation import gettext_lazy as _
 
-from django_ledger.models.journal_entry import JournalEntryModel
+from django_ledger.models.journal_entry import JournalEntryModel, JournalEntryVerificationContext
 from django_ledger.models.ledger import LedgerModel
 from django_ledger.models.mixins import CreateUpdateMixIn, MarkdownNotesMixIn
 from django_ledger.models.transactions import TransactionModel
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
+from django_ledger.settings import DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE
 
 
 class ClosingEntryValidationError(ValidationError):
@@ -40,8 +41,7 @@ class ClosingEntryModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(entity_model__admin=user_model) |
-            Q(entity_model__managers__in=[user_model])
+            get_entity_access_q(user_model, 'entity_model')
         )
 
     def for_entity(self, entity_slug, user_model):
@@ -156,8 +156,11 @@ class ClosingEntryModelAbstract(CreateUpdateMixIn, MarkdownNotesMixIn):
         JournalEntryModel.objects.bulk_create(objs=chain([l for _, l in ce_txs_journal_entries.items()]))
         TransactionModel.objects.bulk_create(objs=chain.from_iterable([l for _, l in ce_je_txs.items()]))
 
+        verification_context = JournalEntryVerificationContext(
+            txs_models=chain.from_iterable([l for _, l in ce_je_txs.items()])
+        )
         for k, je_model in ce_txs_journal_entries.items():
-            je_model.save(verify=True)
+            je_model.save(verify=True, verification_context=verification_context)
 
         return ce_txs_journal_entries, ce_je_txs
 
@@ -199,6 +202,10 @@ class ClosingEntryModelAbstract(CreateUpdateMixIn, MarkdownNotesMixIn):
                     'ledger_model',
                     'updated'
                 ])
+            EntityModel = lazy_loader.get_entity_model()
+            EntityModel.increment_data_version(entity_uuid=self.entity_model_id)
+            if DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE:
+                EntityModel.delete_closing_entry_cache(entity_uuid=self.entity_model_id, closing_date=self.closing_date)
             if update_entity_meta:
                 self.entity_model.save_closing_entry_dates_meta(commit=True)
 
@@ -239,6 +246,10 @@ class ClosingEntryModelAbstract(CreateUpdateMixIn, MarkdownNotesMixIn):
                     'ledger_model',
                     'updated'
                 ])
+            EntityModel = lazy_loader.get_entity_model()
+            EntityModel.increment_data_version(entity_uuid=self.entity_model_id)
+            if DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE:
+                EntityModel.delete_closing_entry_cache(entity_uuid=self.entity_model_id, closing_date=self.closing_date)
             if update_entity_meta:
                 self.entity_model.save_closing_entry_dates_meta(commit=True)
 
@@ -30,16 +30,17 @@ from uuid import uuid4
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Q
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from django_ledger.io import (ROOT_COA, ROOT_GROUP_LEVEL_2, ROOT_GROUP_META, ROOT_ASSETS,
                               ROOT_LIABILITIES, ROOT_CAPITAL,
                               ROOT_INCOME, ROOT_COGS, ROOT_EXPENSES)
+from django_ledger.io.io_account_index import defer_account_index_invalidation
 from django_ledger.models import lazy_loader
 from django_ledger.models.accounts import AccountModel, AccountModelQuerySet
 from django_ledger.models.mixins import CreateUpdateMixIn, SlugNameMixIn
+from django_ledger.models.utils import get_entity_access_q
 
 UserModel = get_user_model()
 
@@ -86,10 +87,7 @@ class ChartOfAccountModelManager(models.Manager):
         """
         qs = self.get_queryset()
         return qs.filter(
-            (
-                    Q(entity__admin=user_model) |
-                    Q(entity__managers__in=[user_model])
-            )
+            get_entity_access_q(user_model, 'entity')
         ).select_related('entity')
 
     def for_entity(self, entity_slug, user_model) -> ChartOfAccountModelQuerySet:
@@ -237,41 +235,43 @@ class ChartOfAccountModelAbstract(SlugNameMixIn, CreateUpdateMixIn):
             return
 
         if ROOT_COA not in existing_root_roles:
-            # add coa root...
-            role_meta = ROOT_GROUP_META[ROOT_COA]
-            account_pk = uuid4()
-            root_account = AccountModel(
-                uuid=account_pk,
-                code=role_meta['code'],
-                name=role_meta['title'],
-                coa_model=self,
-                role=ROOT_COA,
-                role_default=True,
-                active=False,
-                locked=True,
-                balance_type=role_meta['balance_type']
-            )
-            AccountModel.add_root(instance=root_account)
-
-            # must retrieve root model after added pero django-treebeard documentation...
-            coa_root_account_model = AccountModel.objects.get(uuid__exact=account_pk)
-
-            for root_role in ROOT_GROUP_LEVEL_2:
-                if root_role not in existing_root_roles:
-                    account_pk = uuid4()
-                    role_meta = ROOT_GROUP_META[root_role]
-                    coa_root_account_model.add_child(
-                        instance=AccountModel(
-                            uuid=account_pk,
-                            code=role_meta['code'],
-                            name=role_meta['title'],
-                            coa_model=self,
-                            role=root_role,
-                            role_default=True,
-                            active=False,
-                            locked=True,
-                            balance_type=role_meta['balance_type']
-                        ))
+            # root accounts are saved one by one, the accounts version is incremented once...
+            with defer_account_index_invalidation():
+                # add coa root...
+                role_meta = ROOT_GROUP_META[ROOT_COA]
+                account_pk = uuid4()
+                root_account = AccountModel(
+                    uuid=account_pk,
+                    code=role_meta['code'],
+                    name=role_meta['title'],
+                    coa_model=self,
+                    role=ROOT_COA,
+                    role_default=True,
+                    active=False,
+                    locked=True,
+                    balance_type=role_meta['balance_type']
+                )
+                AccountModel.add_root(instance=root_account)
+
+                # must retrieve root model after added pero django-treebeard documentation...
+                coa_root_account_model = AccountModel.objects.get(uuid__exact=account_pk)
+
+                for root_role in ROOT_GROUP_LEVEL_2:
+                    if root_role not in existing_root_roles:
+                        account_pk = uuid4()
+                        role_meta = ROOT_GROUP_META[root_role]
+                        coa_root_account_model.add_child(
+                            instance=AccountModel(
+                                uuid=account_pk,
+                                code=role_meta['code'],
+                                name=role_meta['title'],
+                                coa_model=self,
+                                role=root_role,
+                                role_default=True,
+                                active=False,
+                                locked=True,
+                                balance_type=role_meta['balance_type']
+                            ))
 
     def is_default(self) -> bool:
         if not self.entity_id:
@@ -363,11 +363,15 @@ class ChartOfAccountModelAbstract(SlugNameMixIn, CreateUpdateMixIn):
     def lock_all_accounts(self) -> AccountModelQuerySet:
         non_root_accounts_qs = self.get_non_root_coa_accounts_qs()
         non_root_accounts_qs.update(locked=True)
+        EntityModel = lazy_loader.get_entity_model()
+        EntityModel.increment_accounts_version(entity_uuid=self.entity_id)
         return non_root_accounts_qs
 
     def unlock_all_accounts(self) -> AccountModelQuerySet:
         non_root_accounts_qs = self.get_non_root_coa_accounts_qs()
         non_root_accounts_qs.update(locked=False)
+        EntityModel = lazy_loader.get_entity_model()
+        EntityModel.increment_accounts_version(entity_uuid=self.entity_id)
         return non_root_accounts_qs
 
     def mark_as_default(self, commit: bool = False, raise_exception: bool = False, **kwargs):
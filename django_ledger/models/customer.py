@@ -12,13 +12,12 @@ created before it can be assigned to the InvoiceModel. Only customers who are ac
 
 from uuid import uuid4
 
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import models, transaction, IntegrityError
-from django.db.models import Q, F, QuerySet
+from django.db import models, transaction
+from django.db.models import Q, QuerySet
 from django.utils.translation import gettext_lazy as _
 
 from django_ledger.models.mixins import ContactInfoMixIn, CreateUpdateMixIn, TaxCollectionMixIn
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 from django_ledger.settings import DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING, DJANGO_LEDGER_CUSTOMER_NUMBER_PREFIX
 
 
@@ -110,8 +109,7 @@ class CustomerModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(entity__admin=user_model) |
-            Q(entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'entity')
         )
 
     def for_entity(self, entity_slug, user_model) -> CustomerModelQueryset:
@@ -248,34 +246,10 @@ class CustomerModelAbstract(ContactInfoMixIn, TaxCollectionMixIn, CreateUpdateMi
             The EntityStateModel associated with the CustomerModel number sequence.
         """
         EntityStateModel = lazy_loader.get_entity_state_model()
-
-        try:
-            LOOKUP = {
-                'entity_model_id__exact': self.entity_model_id,
-                'key__exact': EntityStateModel.KEY_CUSTOMER
-            }
-
-            state_model_qs = EntityStateModel.objects.filter(**LOOKUP).select_for_update()
-            state_model = state_model_qs.get()
-            state_model.sequence = F('sequence') + 1
-            state_model.save()
-            state_model.refresh_from_db()
-
-            return state_model
-        except ObjectDoesNotExist:
-
-            LOOKUP = {
-                'entity_model_id': self.entity_model_id,
-                'entity_unit_id': None,
-                'fiscal_year': None,
-                'key': EntityStateModel.KEY_CUSTOMER,
-                'sequence': 1
-            }
-            state_model = EntityStateModel.objects.create(**LOOKUP)
-            return state_model
-        except IntegrityError as e:
-            if raise_exception:
-                raise e
+        return EntityStateModel.objects.get_next_state_model(
+            entity_model_id=self.entity_model_id,
+            key=EntityStateModel.KEY_CUSTOMER
+        )
 
     def generate_customer_number(self, commit: bool = False) -> str:
         """
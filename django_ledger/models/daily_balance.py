@@ -0,0 +1,362 @@
+"""
+Django Ledger created by Miguel Sanda <msanda@arrobalytics.com>.
+Copyright© EDMA Group Inc licensed under the GPLv3 Agreement.
+
+Contributions to this module:
+    * Miguel Sanda <msanda@arrobalytics.com>
+
+The AccountDailyBalanceModel is a materialized aggregation of the posted TransactionModels of an EntityModel.
+Each record holds the total DEBIT or CREDIT amount recorded on a given day for a specific AccountModel, EntityUnitModel
+and activity. The IOMixIn may aggregate this table instead of the raw TransactionModels in order to produce financial
+statements, which reduces the cost of a query to the number of accounts and days involved instead of the number of
+transactions.
+
+The table is kept up to date every time a JournalEntryModel or a LedgerModel changes its posted or locked state.
+The rebuild_daily_balances management command may be used to rebuild or verify the table from scratch.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Optional, List, Dict, Iterable
+from uuid import uuid4, UUID
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
+from django.db import models, transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils.translation import gettext_lazy as _
+
+from django_ledger.io.io_core import get_timestamp_range
+from django_ledger.models.journal_entry import JournalEntryModel
+from django_ledger.models.mixins import CreateUpdateMixIn
+from django_ledger.models.transactions import TransactionModel
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
+from django_ledger.settings import DJANGO_LEDGER_DAILY_BALANCES_BATCH_SIZE
+
+UserModel = get_user_model()
+
+
+class AccountDailyBalanceValidationError(ValidationError):
+    pass
+
+
+class AccountDailyBalanceModelQuerySet(models.QuerySet):
+
+    def from_date(self, from_date: date):
+        return self.filter(date__gte=from_date)
+
+    def to_date(self, to_date: date):
+        return self.filter(date__lte=to_date)
+
+    def for_unit(self, unit_slug):
+        if isinstance(unit_slug, lazy_loader.get_unit_model()):
+            return self.filter(unit_model=unit_slug)
+        return self.filter(unit_model__slug__exact=unit_slug)
+
+
+class AccountDailyBalanceModelManager(models.Manager):
+
+    def for_user(self, user_model):
+        qs = self.get_queryset()
+        if user_model.is_superuser:
+            return qs
+        return qs.filter(
+            get_entity_access_q(user_model, 'entity_model')
+        )
+
+    def for_entity(self, entity_slug, user_model: Optional[UserModel] = None):
+        if user_model:
+            qs = self.for_user(user_model)
+        else:
+            qs = self.get_queryset()
+
+        if isinstance(entity_slug, lazy_loader.get_entity_model()):
+            return qs.filter(entity_model=entity_slug)
+        elif isinstance(entity_slug, UUID):
+            return qs.filter(entity_model_id=entity_slug)
+        return qs.filter(entity_model__slug__exact=entity_slug)
+
+    def get_entity_uuid(self, entity_model) -> UUID:
+        if isinstance(entity_model, lazy_loader.get_entity_model()):
+            return entity_model.uuid
+        elif isinstance(entity_model, UUID):
+            return entity_model
+        return lazy_loader.get_entity_model().objects.only('uuid').get(slug__exact=entity_model).uuid
+
+    def aggregate_transactions(self, entity_model, dates: Optional[Iterable[date]] = None) -> List:
+        """
+        Aggregates the posted TransactionModels of an EntityModel into AccountDailyBalanceModel instances.
+        Closing entries are excluded.
+
+        Parameters
+        ----------
+        entity_model: EntityModel or UUID or str
+            The EntityModel to aggregate.
+        dates: iterable of dates
+            Optional dates to aggregate. If None, all dates are aggregated.
+
+        Returns
+        -------
+        list
+            A list of unsaved AccountDailyBalanceModel instances.
+        """
+        entity_uuid = self.get_entity_uuid(entity_model)
+        txs_qs = TransactionModel.objects.for_entity(entity_slug=entity_uuid).posted().not_closing_entry()
+
+        if dates is not None:
+            dates = sorted(set(dates))
+            if not dates:
+                return list()
+            start_dt = get_timestamp_range(dates[0])[0]
+            end_dt = get_timestamp_range(dates[-1])[1]
+            txs_qs = txs_qs.filter(
+                journal_entry__timestamp__gte=start_dt,
+                journal_entry__timestamp__lt=end_dt
+            )
+
+        txs_qs = txs_qs.annotate(
+            tx_date=TruncDate('journal_entry__timestamp')
+        )
+
+        if dates is not None:
+            txs_qs = txs_qs.filter(tx_date__in=dates)
+
+        txs_agg = txs_qs.values(
+            'account_id',
+            'journal_entry__entity_unit_id',
+            'journal_entry__activity',
+            'tx_date',
+            'tx_type'
+        ).annotate(
+            balance=Sum('amount')
+        ).order_by()
+
+        return [
+            self.model(
+                entity_model_id=entity_uuid,
+                account_model_id=r['account_id'],
+                unit_model_id=r['journal_entry__entity_unit_id'],
+                activity=r['journal_entry__activity'],
+                date=r['tx_date'],
+                tx_type=r['tx_type'],
+                balance=r['balance']
+            ) for r in txs_agg
+        ]
+
+    def refresh_for_dates(self, entity_model, dates: Iterable[date]) -> List:
+        """
+        Recomputes the AccountDailyBalanceModel records of an EntityModel for the provided dates.
+
+        Parameters
+        ----------
+        entity_model: EntityModel or UUID or str
+            The EntityModel to refresh.
+        dates: iterable of dates
+            The dates to refresh.
+
+        Returns
+        -------
+        list
+            The newly created AccountDailyBalanceModel instances.
+        """
+        entity_uuid = self.get_entity_uuid(entity_model)
+        dates = sorted(set(dates))
+        daily_balances = list()
+        batch_size = DJANGO_LEDGER_DAILY_BALANCES_BATCH_SIZE
+
+        with transaction.atomic():
+            for i in range(0, len(dates), batch_size):
+                dates_batch = dates[i:i + batch_size]
+                self.filter(entity_model_id=entity_uuid, date__in=dates_batch).delete()
+                daily_balances_batch = self.aggregate_transactions(entity_model=entity_uuid, dates=dates_batch)
+                daily_balances += self.bulk_create(daily_balances_batch, batch_size=batch_size)
+        return daily_balances
+
+    def refresh_for_journal_entries(self, je_models: Iterable[JournalEntryModel], entity_model=None) -> List:
+        """
+        Recomputes the AccountDailyBalanceModel records affected by the provided JournalEntryModels.
+
+        Parameters
+        ----------
+        je_models: iterable of JournalEntryModel
+            The JournalEntryModels which posted or locked state changed.
+        entity_model: EntityModel or UUID
+            Optional EntityModel of the JournalEntryModels. Will be fetched from the LedgerModel if not provided.
+
+        Returns
+        -------
+        list
+            The newly created AccountDailyBalanceModel instances.
+        """
+        je_models = list(je_models)
+        if not je_models:
+            return list()
+
+        if not entity_model:
+            entity_model = je_models[0].ledger.entity_id
+
+        dates = set()
+        for je_model in je_models:
+            dates.add(get_timestamp_range(je_model.timestamp)[0].date())
+            prev_timestamp = getattr(je_model, '_timestamp_init', None)
+            if prev_timestamp:
+                dates.add(get_timestamp_range(prev_timestamp)[0].date())
+
+        return self.refresh_for_dates(entity_model=entity_model, dates=dates)
+
+    def refresh_for_ledger(self, ledger_model) -> List:
+        """
+        Recomputes all AccountDailyBalanceModel records affected by the JournalEntryModels of a LedgerModel.
+
+        Parameters
+        ----------
+        ledger_model: LedgerModel
+            The LedgerModel which posted or locked state changed.
+
+        Returns
+        -------
+        list
+            The newly created AccountDailyBalanceModel instances.
+        """
+        dates = ledger_model.journal_entries.annotate(
+            je_date=TruncDate('timestamp')
+        ).values_list('je_date', flat=True).order_by().distinct()
+        return self.refresh_for_dates(entity_model=ledger_model.entity_id, dates=dates)
+
+    def rebuild(self, entity_model) -> List:
+        """
+        Rebuilds all AccountDailyBalanceModel records of an EntityModel from scratch.
+
+        Parameters
+        ----------
+        entity_model: EntityModel or UUID or str
+            The EntityModel to rebuild.
+
+        Returns
+        -------
+        list
+            The newly created AccountDailyBalanceModel instances.
+        """
+        entity_uuid = self.get_entity_uuid(entity_model)
+        with transaction.atomic():
+            self.filter(entity_model_id=entity_uuid).delete()
+            daily_balances = self.aggregate_transactions(entity_model=entity_uuid)
+            return self.bulk_create(daily_balances, batch_size=DJANGO_LEDGER_DAILY_BALANCES_BATCH_SIZE)
+
+    def verify(self, entity_model) -> Dict:
+        """
+        Compares the AccountDailyBalanceModel records of an EntityModel against the posted TransactionModels.
+
+        Parameters
+        ----------
+        entity_model: EntityModel or UUID or str
+            The EntityModel to verify.
+
+        Returns
+        -------
+        dict
+            A dictionary of mismatched keys (account, unit, activity, date, tx_type) and their (expected, actual)
+            balance. An empty dictionary means the table is consistent.
+        """
+        entity_uuid = self.get_entity_uuid(entity_model)
+
+        expected = {
+            db.get_key(): db.balance for db in self.aggregate_transactions(entity_model=entity_uuid)
+        }
+        actual = {
+            db.get_key(): db.balance for db in self.filter(entity_model_id=entity_uuid)
+        }
+
+        return {
+            k: (expected.get(k, Decimal('0.00')), actual.get(k, Decimal('0.00')))
+            for k in set(expected) | set(actual)
+            if expected.get(k, Decimal('0.00')) != actual.get(k, Decimal('0.00'))
+        }
+
+
+class AccountDailyBalanceModelAbstract(CreateUpdateMixIn):
+    """
+    Abstract AccountDailyBalanceModel. Holds the total DEBIT or CREDIT amount posted to an AccountModel on a given day.
+
+    Attributes
+    ----------
+    uuid : UUID
+        This is a unique primary key generated for the table. The default value of this field is uuid4().
+
+    entity_model: EntityModel
+        The EntityModel associated with the record.
+
+    account_model: AccountModel
+        The AccountModel associated with the record.
+
+    unit_model: EntityUnitModel
+        The EntityUnitModel of the aggregated JournalEntryModels, if any.
+
+    activity: str
+        The activity of the aggregated JournalEntryModels, if any.
+
+    date: date
+        The local date of the aggregated JournalEntryModels.
+
+    tx_type: str
+        The transaction type. Either DEBIT or CREDIT.
+
+    balance: Decimal
+        The total amount of the aggregated TransactionModels.
+    """
+    uuid = models.UUIDField(default=uuid4, editable=False, primary_key=True)
+    entity_model = models.ForeignKey('django_ledger.EntityModel',
+                                     on_delete=models.CASCADE,
+                                     verbose_name=_('Entity Model'))
+    account_model = models.ForeignKey('django_ledger.AccountModel',
+                                      on_delete=models.CASCADE,
+                                      verbose_name=_('Account Model'))
+    unit_model = models.ForeignKey('django_ledger.EntityUnitModel',
+                                   null=True,
+                                   blank=True,
+                                   on_delete=models.CASCADE,
+                                   verbose_name=_('Entity Unit Model'))
+    activity = models.CharField(max_length=20,
+                                choices=JournalEntryModel.ACTIVITIES,
+                                null=True,
+                                blank=True,
+                                verbose_name=_('Activity'))
+    date = models.DateField(verbose_name=_('Date'))
+    tx_type = models.CharField(choices=TransactionModel.TX_TYPE,
+                               max_length=10,
+                               verbose_name=_('Transaction Type'))
+    balance = models.DecimalField(verbose_name=_('Daily Balance'),
+                                  max_digits=20,
+                                  decimal_places=2,
+                                  validators=[MinValueValidator(limit_value=Decimal('0.00'))])
+
+    objects = AccountDailyBalanceModelManager.from_queryset(queryset_class=AccountDailyBalanceModelQuerySet)()
+
+    class Meta:
+        abstract = True
+        ordering = ['-date']
+        verbose_name = _('Account Daily Balance')
+        verbose_name_plural = _('Account Daily Balances')
+        indexes = [
+            models.Index(fields=['entity_model', 'date']),
+            models.Index(fields=['entity_model', 'account_model', 'date']),
+        ]
+
+    def __str__(self):
+        return f'{self.__class__.__name__}: {self.date} | {self.account_model_id} | {self.tx_type}: {self.balance}'
+
+    def get_key(self) -> tuple:
+        return (
+            self.account_model_id,
+            self.unit_model_id,
+            self.activity,
+            self.date,
+            self.tx_type
+        )
+
+
+class AccountDailyBalanceModel(AccountDailyBalanceModelAbstract):
+    """
+    Base AccountDailyBalanceModel Class
+    """
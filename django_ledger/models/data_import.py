@@ -19,7 +19,7 @@ from django.utils.translation import gettext_lazy as _
 
 from django_ledger.io import ASSET_CA_CASH, CREDIT, DEBIT
 from django_ledger.models.mixins import CreateUpdateMixIn
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 
 from django_ledger.models import JournalEntryModel
 
@@ -47,13 +47,15 @@ class ImportJobModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(bank_account_model__entity_model__admin=user_model) |
-            Q(bank_account_model__entity_model__managers__in=[user_model])
-
+            get_entity_access_q(user_model, 'bank_account_model__entity_model')
         )
 
-    def for_entity(self, entity_slug: str, user_model):
+    def for_entity(self, entity_slug, user_model):
         qs = self.for_user(user_model)
+        if isinstance(entity_slug, lazy_loader.get_entity_model()):
+            return qs.filter(
+                Q(bank_account_model__entity_model=entity_slug)
+            )
         return qs.filter(
             Q(bank_account_model__entity_model__slug__exact=entity_slug)
         )
@@ -190,11 +192,8 @@ class StagedTransactionModelManager(models.Manager):
     def for_job(self, entity_slug: str, user_model, job_pk):
         qs = self.get_queryset()
         return qs.filter(
-            Q(import_job__bank_account_model__entity__slug__exact=entity_slug) &
-            (
-                    Q(import_job__bank_account_model__entity__admin=user_model) |
-                    Q(import_job__bank_account_model__entity__managers__in=[user_model])
-            ) &
+            Q(import_job__bank_account_model__entity_model__slug__exact=entity_slug) &
+            get_entity_access_q(user_model, 'import_job__bank_account_model__entity_model') &
             Q(import_job__uuid__exact=job_pk)
         ).prefetch_related('split_transaction_set')
 
@@ -20,31 +20,36 @@ EntityModels may also have different financial reporting periods, (also known as
 specified at the time of creation. All key functionality around the Fiscal Year is encapsulated in the
 EntityReportMixIn.
 """
+from bisect import bisect_left, bisect_right
 from calendar import monthrange
 from collections import defaultdict
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from itertools import zip_longest
+from os import getpid
 from random import choices
 from string import ascii_lowercase, digits
-from typing import Tuple, Union, Optional, List, Dict, Set
+from threading import Lock
+from typing import Tuple, Union, Optional, List, Dict, Set, Iterable
 from uuid import uuid4, UUID
+from weakref import WeakKeyDictionary
 
 from django.contrib.auth import get_user_model
-from django.core import serializers
 from django.core.cache import caches
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
 from django.core.validators import MinValueValidator
-from django.db import models
-from django.db.models import Q
-from django.db.models.signals import pre_save
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
 from django.urls import reverse
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from treebeard.mp_tree import MP_Node, MP_NodeManager, MP_NodeQuerySet
 
 from django_ledger.io import roles as roles_module, validate_roles, IODigestContextManager
+from django_ledger.io.io_account_index import AccountIndex, AccountIndexCache, defer_account_index_invalidation
+from django_ledger.io.io_closing_entry_cache import ClosingEntryCacheData, ClosingEntryCacheError
 from django_ledger.io.io_core import IOMixIn, get_localtime, get_localdate
+from django_ledger.io.io_registry import get_io_digest_registry
 from django_ledger.models.accounts import AccountModel, AccountModelQuerySet, DEBIT, CREDIT
 from django_ledger.models.bank_account import BankAccountModelQuerySet, BankAccountModel
 from django_ledger.models.coa import ChartOfAccountModel, ChartOfAccountModelQuerySet
@@ -55,9 +60,15 @@ from django_ledger.models.items import (ItemModelQuerySet, ItemTransactionModelQ
 from django_ledger.models.ledger import LedgerModel
 from django_ledger.models.mixins import CreateUpdateMixIn, SlugNameMixIn, ContactInfoMixIn, LoggingMixIn
 from django_ledger.models.unit import EntityUnitModel
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 from django_ledger.models.vendor import VendorModelQuerySet, VendorModel
-from django_ledger.settings import DJANGO_LEDGER_DEFAULT_CLOSING_ENTRY_CACHE_TIMEOUT
+from django_ledger.settings import (DJANGO_LEDGER_DEFAULT_CLOSING_ENTRY_CACHE_TIMEOUT,
+                                    DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE,
+                                    DJANGO_LEDGER_CLOSING_ENTRY_CACHE_NAME,
+                                    DJANGO_LEDGER_DOCUMENT_NUMBER_BLOCK_SIZES,
+                                    DJANGO_LEDGER_USE_AUTHORIZATION_CACHE,
+                                    DJANGO_LEDGER_AUTHORIZATION_CACHE_NAME,
+                                    DJANGO_LEDGER_AUTHORIZATION_CACHE_TIMEOUT)
 
 UserModel = get_user_model()
 
@@ -137,8 +148,7 @@ class EntityModelManager(MP_NodeManager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(admin=user_model) |
-            Q(managers__in=[user_model])
+            get_entity_access_q(user_model)
         )
 
 
@@ -451,6 +461,9 @@ class EntityModelClosingEntryMixIn:
         else:
             self.validate_closing_entry_model(closing_entry_model, closing_date=to_date)
 
+        # closing entries being replaced may still be checkpoints, so balances are aggregated from transactions...
+        kwargs.setdefault('use_closing_entry', False)
+
         io_digest: IODigestContextManager = self.digest(
             user_model=user_model,
             to_date=to_date,
@@ -536,6 +549,9 @@ class EntityModelClosingEntryMixIn:
         else:
             closing_entry_model.closingentrytransactionmodel_set.all().delete()
 
+        if DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE:
+            self.delete_closing_entry_cache(entity_uuid=self.uuid, closing_date=closing_date)
+
         closing_entry_model, ce_txs_list = self.get_closing_entry_digest_for_date(
             closing_date=closing_date,
             closing_entry_model=closing_entry_model
@@ -560,11 +576,14 @@ class EntityModelClosingEntryMixIn:
         return self.create_closing_entry_for_date(closing_date=closing_date)
 
     # ---> Closing Entry Cache Keys <----
-    def get_closing_entry_cache_key_for_date(self, closing_date: date) -> str:
+    @staticmethod
+    def get_closing_entry_cache_key(entity_uuid: UUID, closing_date: date) -> str:
         closing_date = closing_date.strftime('%Y%m%d')
-        entity_uuid = getattr(self, 'uuid')
         return f'closing_entry_{closing_date}_{entity_uuid}'
 
+    def get_closing_entry_cache_key_for_date(self, closing_date: date) -> str:
+        return self.get_closing_entry_cache_key(entity_uuid=getattr(self, 'uuid'), closing_date=closing_date)
+
     def get_closing_entry_cache_key_for_month(self, year: int, month: int) -> str:
         _, day = monthrange(year, month)
         end_dt = date(year=year, month=month, day=day)
@@ -590,9 +609,12 @@ class EntityModelClosingEntryMixIn:
             ce_ser = cache_system.get(ce_cache_key)
 
             # if closing entry is in cache...
+            # payloads written with a different schema version are treated as a cache miss...
             if ce_ser:
-                ce_qs_serde_gen = serializers.deserialize(format='json', stream_or_string=ce_ser)
-                return list(ce.object for ce in ce_qs_serde_gen)
+                try:
+                    return ClosingEntryCacheData.from_bytes(ce_ser)
+                except ClosingEntryCacheError:
+                    pass
             return
 
         return self.save_closing_entry_cache_for_date(
@@ -643,13 +665,34 @@ class EntityModelClosingEntryMixIn:
         cache_system = caches[cache_name]
         ce_qs = self.get_closing_entry_queryset_for_date(closing_date=closing_date)
         ce_cache_key = self.get_closing_entry_cache_key_for_date(closing_date=closing_date)
-        ce_ser = serializers.serialize(format='json', queryset=ce_qs)
+        ce_data = ClosingEntryCacheData.from_values(
+            closing_date=closing_date,
+            ce_values=ce_qs.values(*ClosingEntryCacheData.get_values_fields()).order_by()
+        )
 
         if not cache_timeout:
             cache_timeout = DJANGO_LEDGER_DEFAULT_CLOSING_ENTRY_CACHE_TIMEOUT
 
-        cache_system.set(ce_cache_key, ce_ser, cache_timeout, **kwargs)
-        return list(ce_qs)
+        cache_system.set(ce_cache_key, ce_data.to_bytes(), cache_timeout, **kwargs)
+        return ce_data
+
+    @classmethod
+    def delete_closing_entry_cache(cls, entity_uuid: UUID, closing_date: date, cache_name: Optional[str] = None):
+        """
+        Removes the cached balances of a closing entry. Must be called every time the closing entry transactions
+        change, so the digest never combines stale closing balances.
+
+        Parameters
+        ----------
+        entity_uuid: UUID
+            The EntityModel UUID.
+        closing_date: date
+            The closing date.
+        cache_name: str
+            The cache to use. Defaults to DJANGO_LEDGER_CLOSING_ENTRY_CACHE_NAME setting.
+        """
+        cache_system = caches[cache_name or DJANGO_LEDGER_CLOSING_ENTRY_CACHE_NAME]
+        cache_system.delete(cls.get_closing_entry_cache_key(entity_uuid=entity_uuid, closing_date=closing_date))
 
     def save_closing_entry_cache_for_month(self,
                                            year: int,
@@ -756,6 +799,7 @@ class EntityModelAbstract(MP_Node,
     LOGGER_NAME_ATTRIBUTE = 'slug'
 
     META_KEY_CLOSING_ENTRY_DATES = 'closing_entries'
+    AUTHORIZATION_ROLE_ADMIN = 'admin'
 
     uuid = models.UUIDField(default=uuid4, editable=False, primary_key=True)
     name = models.CharField(max_length=150, verbose_name=_('Entity Name'))
@@ -779,6 +823,8 @@ class EntityModelAbstract(MP_Node,
     last_closing_date = models.DateField(null=True, blank=True, verbose_name=_('Last Closing Entry Date'))
     picture = models.ImageField(blank=True, null=True)
     meta = models.JSONField(default=dict, null=True, blank=True)
+    data_version = models.PositiveBigIntegerField(default=0, editable=False, verbose_name=_('Data Version'))
+    accounts_version = models.PositiveBigIntegerField(default=0, editable=False, verbose_name=_('Accounts Version'))
     objects = EntityModelManager.from_queryset(queryset_class=EntityModelQuerySet)()
 
     node_order_by = ['uuid']
@@ -798,11 +844,160 @@ class EntityModelAbstract(MP_Node,
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._CLOSING_ENTRY_DATES: Optional[List[date]] = None
+        self._CLOSING_ENTRY_DATES_INDEX: Optional[List[date]] = None
+        self._AUTHORIZATION_ADMIN_ID = self.__dict__.get('admin_id')
+
+    def save(self, *args, **kwargs):
+        # versions are only incremented atomically in the database and must not be overwritten by a stale instance...
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred_fields = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in deferred_fields and
+                   f.name not in ('data_version', 'accounts_version')
+            ]
+        super().save(*args, **kwargs)
 
     # ## Logging ###
     def get_logger_name(self):
         return f'EntityModel {self.uuid}'
 
+    # ## DATA VERSION ###
+    @classmethod
+    def increment_data_version(cls, entity_uuid: UUID):
+        """
+        Atomically increments the data version of an EntityModel. The data version changes every time the posted
+        or locked state of the EntityModel financial data changes, and is used to invalidate cached digests.
+
+        Parameters
+        ----------
+        entity_uuid: UUID
+            The EntityModel UUID.
+        """
+        cls.objects.filter(uuid__exact=entity_uuid).update(data_version=F('data_version') + 1)
+
+        # digests registered in the current scope are no longer valid...
+        io_registry = get_io_digest_registry()
+        if io_registry is not None:
+            io_registry.clear()
+
+    def get_data_version(self) -> int:
+        """
+        Fetches the current data version of the EntityModel from the database.
+
+        Returns
+        -------
+        int
+            The current data version.
+        """
+        self.data_version = self.__class__.objects.filter(
+            uuid__exact=self.uuid
+        ).values_list('data_version', flat=True).get()
+        return self.data_version
+
+    # ## AUTHORIZATION ###
+    @staticmethod
+    def get_authorization_map_cache_key(user_id) -> str:
+        return f'djl-entity-authorization-{user_id}'
+
+    @classmethod
+    def get_authorization_map(cls, user_model, force_update: bool = False) -> Dict[str, Tuple[UUID, str]]:
+        """
+        Gets the map of EntityModels the user has access to, from the cache set by the
+        DJANGO_LEDGER_AUTHORIZATION_CACHE_NAME setting. The map is built and cached if not present.
+        A user has access to an EntityModel if is the administrator or a manager, same as EntityModelQuerySet.for_user.
+        The map is invalidated every time the user EntityManagementModels change or an EntityModel admin changes.
+
+        Parameters
+        ----------
+        user_model
+            The Django UserModel.
+        force_update: bool
+            Rebuilds the map from the database. Defaults to False.
+
+        Returns
+        -------
+        dict
+            The EntityModel UUID and user role, by EntityModel slug. The role is either "admin" or the
+            EntityManagementModel permission level.
+        """
+        cache_system = caches[DJANGO_LEDGER_AUTHORIZATION_CACHE_NAME]
+        cache_key = cls.get_authorization_map_cache_key(user_id=user_model.pk)
+
+        if not force_update:
+            authorization_map = cache_system.get(cache_key)
+            if authorization_map is not None:
+                return authorization_map
+
+        authorization_map = {
+            entity_slug: (entity_uuid, permission_level) for entity_slug, entity_uuid, permission_level in
+            EntityManagementModel.objects.filter(
+                user_id__exact=user_model.pk
+            ).values_list('entity__slug', 'entity_id', 'permission_level')
+        }
+        authorization_map.update({
+            entity_slug: (entity_uuid, cls.AUTHORIZATION_ROLE_ADMIN) for entity_slug, entity_uuid in
+            cls.objects.filter(admin_id__exact=user_model.pk).values_list('slug', 'uuid')
+        })
+
+        cache_system.set(cache_key, authorization_map, DJANGO_LEDGER_AUTHORIZATION_CACHE_TIMEOUT)
+        return authorization_map
+
+    @classmethod
+    def delete_authorization_map(cls, user_ids: Iterable):
+        """
+        Deletes the cached authorization maps of the given users.
+
+        Parameters
+        ----------
+        user_ids: list
+            The Django UserModel primary keys.
+        """
+        cache_keys = [cls.get_authorization_map_cache_key(user_id=u) for u in set(user_ids) if u is not None]
+        if cache_keys:
+            cache_system = caches[DJANGO_LEDGER_AUTHORIZATION_CACHE_NAME]
+            cache_system.delete_many(cache_keys)
+
+    # ## ACCOUNTS VERSION ###
+    @classmethod
+    def increment_accounts_version(cls,
+                                   entity_uuid: Optional[UUID] = None,
+                                   coa_model_uuids: Optional[Iterable[UUID]] = None):
+        """
+        Atomically increments the accounts version of an EntityModel. The accounts version changes every time an
+        AccountModel of the EntityModel is created, updated, activated, locked or deleted, and is used to invalidate
+        cached account indexes. See get_account_index().
+
+        Parameters
+        ----------
+        entity_uuid: UUID
+            The EntityModel UUID.
+        coa_model_uuids: list
+            Alternatively, the UUIDs of the ChartOfAccountModels which accounts changed.
+        """
+        if entity_uuid:
+            entity_model_qs = cls.objects.filter(uuid__exact=entity_uuid)
+        elif coa_model_uuids:
+            entity_model_qs = cls.objects.filter(chartofaccountmodel__uuid__in=list(coa_model_uuids))
+        else:
+            raise EntityModelValidationError('Must provide entity_uuid or coa_model_uuids.')
+
+        entity_model_qs.update(accounts_version=F('accounts_version') + 1)
+
+    def get_accounts_version(self) -> int:
+        """
+        Fetches the current accounts version of the EntityModel from the database.
+
+        Returns
+        -------
+        int
+            The current accounts version.
+        """
+        self.accounts_version = self.__class__.objects.filter(
+            uuid__exact=self.uuid
+        ).values_list('accounts_version', flat=True).get()
+        return self.accounts_version
+
     # ## ENTITY CREATION ###
     @classmethod
     def create_entity(cls,
@@ -1104,18 +1299,22 @@ class EntityModelAbstract(MP_Node,
                     ) for a in v] for k, v in CHART_OF_ACCOUNTS_ROOT_MAP.items()
             }
 
-            for root_acc, acc_model_list in root_maps.items():
-                roles_set = set(account_model.role for account_model in acc_model_list)
-                for i, account_model in enumerate(acc_model_list):
-                    account_model.role_default = True if account_model.role in roles_set else False
+            with defer_account_index_invalidation():
+                for root_acc, acc_model_list in root_maps.items():
+                    roles_set = set(account_model.role for account_model in acc_model_list)
+                    for i, account_model in enumerate(acc_model_list):
+                        account_model.role_default = True if account_model.role in roles_set else False
 
-                    try:
-                        roles_set.remove(account_model.role)
-                    except KeyError:
-                        pass
+                        try:
+                            roles_set.remove(account_model.role)
+                        except KeyError:
+                            pass
+
+                        account_model.clean()
+                        coa_model.allocate_account(account_model, root_account_qs=root_account_qs)
 
-                    account_model.clean()
-                    coa_model.allocate_account(account_model, root_account_qs=root_account_qs)
+            if not self._state.adding:
+                self.get_accounts_version()
 
         else:
             if not ignore_if_default_coa:
@@ -1383,13 +1582,57 @@ class EntityModelAbstract(MP_Node,
             The default account model for the specified CoA role.
         """
         validate_roles(role, raise_exception=True)
+        account_index = self.get_account_index(coa_model=coa_model)
+        return account_index.get_default_account_for_role(role=role)
+
+    def get_account_index(self,
+                          coa_model: Optional[ChartOfAccountModel] = None,
+                          refresh: bool = False) -> AccountIndex:
+        """
+        Gets the immutable in-memory AccountIndex of the provided CoA, which may be used to look up AccountModels by
+        code, role, UUID, role default or tree path without further queries. Indexes are cached per process and,
+        if DJANGO_LEDGER_USE_ACCOUNT_INDEX_CACHE is enabled, in the Django cache. See AccountIndexCache.
+
+        The index is fetched for the accounts version the EntityModel instance was loaded with. Account changes made
+        through the EntityModel instance refresh the version automatically. Use refresh=True to pick up account
+        changes made elsewhere after the instance was loaded.
+
+        Parameters
+        ----------
+        coa_model: ChartOfAccountModel
+            The CoA Model to index. If not provided, will use EntityModel default CoA.
+        refresh: bool
+            Fetches the current accounts version from the database before getting the index. Defaults to False.
+
+        Returns
+        -------
+        AccountIndex
+            The AccountIndex of the CoA.
+        """
         if not coa_model:
+            if not self.default_coa_id:
+                raise EntityModelValidationError(message=_('No default_coa found.'))
             coa_model = self.default_coa
         else:
-            self.validate_chart_of_accounts_for_entity(coa_model)
+            self.validate_chart_of_accounts_for_entity(coa_model=coa_model)
+
+        if refresh:
+            self.get_accounts_version()
+
+        # indexes are kept by the instance too, since indexes built within a transaction are only cached on commit...
+        account_index_map = self.__dict__.setdefault('_account_index_map', dict())
+        account_index = account_index_map.get(coa_model.uuid)
+        if account_index is None or account_index.ACCOUNTS_VERSION != self.accounts_version:
+            account_index = AccountIndexCache.get_index(
+                entity_uuid=self.uuid,
+                coa_model_id=coa_model.uuid,
+                accounts_version=self.accounts_version
+            )
+            account_index_map[coa_model.uuid] = account_index
 
-        account_model_qs = coa_model.accountmodel_set.all().is_role_default()
-        return account_model_qs.get(role__exact=role)
+        if not ChartOfAccountModel.entity.is_cached(coa_model):
+            coa_model.entity = self
+        return account_index.bind(coa_model=coa_model)
 
     def create_account(self,
                        code: str,
@@ -1438,13 +1681,15 @@ class EntityModelAbstract(MP_Node,
         else:
             coa_model = self.default_coa
 
-        return coa_model.create_account(
+        account_model = coa_model.create_account(
             code=code,
             role=role,
             name=name,
             balance_type=balance_type,
             active=active
         )
+        self.get_accounts_version()
+        return account_model
 
     def create_account_by_kwargs(self,
                                  account_model_kwargs: Dict,
@@ -1485,7 +1730,9 @@ class EntityModelAbstract(MP_Node,
 
         # account_model = AccountModel(**account_model_kwargs)
         # account_model.clean()
-        return coa_model, coa_model.create_account(**account_model_kwargs)
+        account_model = coa_model.create_account(**account_model_kwargs)
+        self.get_accounts_version()
+        return coa_model, account_model
 
     # ### LEDGER MANAGEMENT ####
     def get_ledgers(self, posted: bool = True):
@@ -1683,28 +1930,21 @@ class EntityModelAbstract(MP_Node,
         else:
             raise EntityModelValidationError('VendorModel must be an instance of VendorModel, UUID or str.')
 
-        account_model_qs = self.get_coa_accounts(coa_model=coa_model, active=True)
-
-        account_model_qs = account_model_qs.with_roles(roles=[
-            roles_module.ASSET_CA_CASH,
-            roles_module.ASSET_CA_PREPAID,
-            roles_module.LIABILITY_CL_ACC_PAYABLE
-        ]).is_role_default()
-
-        # evaluates the queryset...
-        len(account_model_qs)
+        account_index = self.get_account_index(coa_model=coa_model)
 
         bill_model = BillModel(
             xref=xref,
             vendor=vendor_model,
             terms=terms,
             additional_info=additional_info,
-            cash_account=account_model_qs.get(role=roles_module.ASSET_CA_CASH) if not cash_account else cash_account,
-            prepaid_account=account_model_qs.get(
-                role=roles_module.ASSET_CA_PREPAID
+            cash_account=account_index.get_default_account_for_role(
+                role=roles_module.ASSET_CA_CASH, active=True
+            ) if not cash_account else cash_account,
+            prepaid_account=account_index.get_default_account_for_role(
+                role=roles_module.ASSET_CA_PREPAID, active=True
             ) if not prepaid_account else prepaid_account,
-            unearned_account=account_model_qs.get(
-                role=roles_module.LIABILITY_CL_ACC_PAYABLE
+            unearned_account=account_index.get_default_account_for_role(
+                role=roles_module.LIABILITY_CL_ACC_PAYABLE, active=True
             ) if not payable_account else payable_account
         )
 
@@ -1793,26 +2033,20 @@ class EntityModelAbstract(MP_Node,
         else:
             raise EntityModelValidationError('CustomerModel must be an instance of CustomerModel, UUID or str.')
 
-        account_model_qs = self.get_coa_accounts(coa_model=coa_model, active=True)
-        account_model_qs = account_model_qs.with_roles(roles=[
-            roles_module.ASSET_CA_CASH,
-            roles_module.ASSET_CA_RECEIVABLES,
-            roles_module.LIABILITY_CL_DEFERRED_REVENUE
-        ]).is_role_default()
-
-        # evaluates the queryset...
-        len(account_model_qs)
+        account_index = self.get_account_index(coa_model=coa_model)
 
         invoice_model = InvoiceModel(
             customer=customer_model,
             additional_info=additional_info,
             terms=terms,
-            cash_account=account_model_qs.get(role=roles_module.ASSET_CA_CASH) if not cash_account else cash_account,
-            prepaid_account=account_model_qs.get(
-                role=roles_module.ASSET_CA_RECEIVABLES
+            cash_account=account_index.get_default_account_for_role(
+                role=roles_module.ASSET_CA_CASH, active=True
+            ) if not cash_account else cash_account,
+            prepaid_account=account_index.get_default_account_for_role(
+                role=roles_module.ASSET_CA_RECEIVABLES, active=True
             ) if not prepaid_account else prepaid_account,
-            unearned_account=account_model_qs.get(
-                role=roles_module.LIABILITY_CL_DEFERRED_REVENUE
+            unearned_account=account_index.get_default_account_for_role(
+                role=roles_module.LIABILITY_CL_DEFERRED_REVENUE, active=True
             ) if not payable_account else payable_account
         )
 
@@ -1988,14 +2222,15 @@ class EntityModelAbstract(MP_Node,
         if account_type not in BankAccountModel.VALID_ACCOUNT_TYPES:
             raise EntityModelValidationError(
                 _(f'Invalid Account Type: choices are {BankAccountModel.VALID_ACCOUNT_TYPES}'))
-        account_model_qs = self.get_coa_accounts(coa_model=coa_model, active=True)
-        account_model_qs = account_model_qs.with_roles(roles=roles_module.ASSET_CA_CASH).is_role_default()
+        if not cash_account:
+            account_index = self.get_account_index(coa_model=coa_model)
+            cash_account = account_index.get_default_account_for_role(role=roles_module.ASSET_CA_CASH, active=True)
         bank_account_model = BankAccountModel(
             name=name,
             entity_model=self,
             account_type=account_type,
             active=active,
-            cash_account=account_model_qs.get() if not cash_account else cash_account,
+            cash_account=cash_account,
             **bank_account_model_kwargs
         )
         bank_account_model.clean()
@@ -2144,15 +2379,7 @@ class EntityModelAbstract(MP_Node,
             if uom_model.entity_id != self.uuid:
                 raise EntityModelValidationError(f'Invalid UnitOfMeasureModel for entity {self.slug}...')
 
-        account_model_qs = self.get_coa_accounts(coa_model=coa_model, active=True)
-        account_model_qs = account_model_qs.with_roles(roles=[
-            roles_module.ASSET_CA_INVENTORY,
-            roles_module.COGS,
-            roles_module.INCOME_OPERATIONAL
-        ]).is_role_default()
-
-        # evaluates the queryset...
-        len(account_model_qs)
+        account_index = self.get_account_index(coa_model=coa_model)
 
         product_model = ItemModel(
             entity=self,
@@ -2160,9 +2387,13 @@ class EntityModelAbstract(MP_Node,
             uom=uom_model,
             item_role=ItemModel.ITEM_ROLE_PRODUCT,
             item_type=item_type,
-            inventory_account=account_model_qs.filter(role=roles_module.ASSET_CA_INVENTORY).get(),
-            earnings_account=account_model_qs.filter(role=roles_module.INCOME_OPERATIONAL).get(),
-            cogs_account=account_model_qs.filter(role=roles_module.COGS).get()
+            inventory_account=account_index.get_default_account_for_role(
+                role=roles_module.ASSET_CA_INVENTORY, active=True
+            ),
+            earnings_account=account_index.get_default_account_for_role(
+                role=roles_module.INCOME_OPERATIONAL, active=True
+            ),
+            cogs_account=account_index.get_default_account_for_role(role=roles_module.COGS, active=True)
         )
         product_model.clean()
         product_model.clean_fields()
@@ -2219,14 +2450,7 @@ class EntityModelAbstract(MP_Node,
             if uom_model.entity_id != self.uuid:
                 raise EntityModelValidationError(f'Invalid UnitOfMeasureModel for entity {self.slug}...')
 
-        account_model_qs = self.get_coa_accounts(coa_model=coa_model, active=True)
-        account_model_qs = account_model_qs.with_roles(roles=[
-            roles_module.COGS,
-            roles_module.INCOME_OPERATIONAL
-        ]).is_role_default()
-
-        # evaluates the queryset...
-        len(account_model_qs)
+        account_index = self.get_account_index(coa_model=coa_model)
 
         service_model = ItemModel(
             entity=self,
@@ -2234,8 +2458,10 @@ class EntityModelAbstract(MP_Node,
             uom=uom_model,
             item_role=ItemModel.ITEM_ROLE_SERVICE,
             item_type=ItemModel.ITEM_TYPE_LABOR,
-            earnings_account=account_model_qs.filter(role=roles_module.INCOME_OPERATIONAL).get(),
-            cogs_account=account_model_qs.filter(role=roles_module.COGS).get()
+            earnings_account=account_index.get_default_account_for_role(
+                role=roles_module.INCOME_OPERATIONAL, active=True
+            ),
+            cogs_account=account_index.get_default_account_for_role(role=roles_module.COGS, active=True)
         )
         service_model.clean()
         service_model.clean_fields()
@@ -2298,12 +2524,15 @@ class EntityModelAbstract(MP_Node,
             if uom_model.entity_id != self.uuid:
                 raise EntityModelValidationError(f'Invalid UnitOfMeasureModel for entity {self.slug}...')
 
-        account_model_qs = self.get_coa_accounts(coa_model=coa_model, active=True)
-        account_model_qs = account_model_qs.with_roles(roles=roles_module.EXPENSE_OPERATIONAL)
+        account_index = self.get_account_index(coa_model=coa_model)
         if not expense_account:
-            expense_account = account_model_qs.is_role_default().get()
+            expense_account = account_index.get_default_account_for_role(
+                role=roles_module.EXPENSE_OPERATIONAL, active=True
+            )
         elif isinstance(expense_account, UUID):
-            expense_account = account_model_qs.get(uuid__exact=expense_account)
+            expense_account = account_index.get_account_by_uuid(account_uuid=expense_account, active=True)
+            if expense_account.role != roles_module.EXPENSE_OPERATIONAL:
+                raise AccountModel.DoesNotExist(f'Account {expense_account.uuid} is not an operational expense account.')
         elif isinstance(expense_account, AccountModel):
             if expense_account.coa_model.entity_id != self.uuid:
                 raise EntityModelValidationError(f'Invalid account for entity {self.slug}...')
@@ -2397,12 +2626,15 @@ class EntityModelAbstract(MP_Node,
             if uom_model.entity_id != self.uuid:
                 raise EntityModelValidationError(f'Invalid UnitOfMeasureModel for entity {self.slug}...')
 
-        account_model_qs = self.get_coa_accounts(coa_model=coa_model, active=True)
-        account_model_qs = account_model_qs.with_roles(roles=roles_module.ASSET_CA_INVENTORY)
+        account_index = self.get_account_index(coa_model=coa_model)
         if not inventory_account:
-            inventory_account = account_model_qs.is_role_default().get()
+            inventory_account = account_index.get_default_account_for_role(
+                role=roles_module.ASSET_CA_INVENTORY, active=True
+            )
         elif isinstance(inventory_account, UUID):
-            inventory_account = account_model_qs.get(uuid__exact=inventory_account)
+            inventory_account = account_index.get_account_by_uuid(account_uuid=inventory_account, active=True)
+            if inventory_account.role != roles_module.ASSET_CA_INVENTORY:
+                raise AccountModel.DoesNotExist(f'Account {inventory_account.uuid} is not an inventory account.')
         elif isinstance(inventory_account, AccountModel):
             if inventory_account.coa_model.entity_id != self.uuid:
                 raise EntityModelValidationError(f'Invalid account for entity {self.slug}...')
@@ -2559,6 +2791,68 @@ class EntityModelAbstract(MP_Node,
 
         return adj, counted_qs, recorded_qs
 
+    def reconcile_inventory(self, commit: bool = False) -> Dict:
+        """
+        Compares the perpetual inventory of each ItemModel against a full inventory recount.
+        See :func:`update_inventory <django_ledger.models.entity.EntityModelAbstract.update_inventory>`.
+
+        Parameters
+        ----------
+        commit: bool
+            If True and any mismatches are found, the perpetual inventory is rebuilt from all the EntityModel
+            ItemTransactionModels.
+
+        Returns
+        -------
+        dict
+            The mismatched items, in the same format as :func:`inventory_adjustment
+            <django_ledger.models.entity.EntityModelAbstract.inventory_adjustment>`. Empty if the perpetual inventory
+            matches the recount.
+        """
+        ItemTransactionModel = lazy_loader.get_item_transaction_model()
+
+        counted_qs = ItemTransactionModel.objects.inventory_count(entity_slug=self.slug)
+        perpetual_qs = self.itemmodel_set.filter(for_inventory=True).values(
+            'uuid', 'name', 'uom__name', 'inventory_quantity_received', 'inventory_cost_received',
+            'inventory_quantity_invoiced')
+        perpetual_values = [
+            {
+                'uuid': i['uuid'],
+                'name': i['name'],
+                'uom__name': i['uom__name'],
+                'inventory_received': i['inventory_quantity_received'] - i['inventory_quantity_invoiced'],
+                'inventory_received_value': round(
+                    (i['inventory_quantity_received'] - i['inventory_quantity_invoiced']) *
+                    i['inventory_cost_received'] / i['inventory_quantity_received'], 2
+                ) if i['inventory_quantity_received'] else Decimal('0.00')
+            } for i in perpetual_qs
+        ]
+        adj = self.inventory_adjustment(counted_qs, perpetual_values)
+
+        # the recount average cost is computed by the database, values may differ by rounding...
+        mismatches = {
+            k: v for k, v in adj.items() if any([
+                abs(v['count_diff']) >= Decimal('0.001'),
+                abs(v['value_diff']) > Decimal('0.01')
+            ])
+        }
+
+        if commit and mismatches:
+            with transaction.atomic():
+                self.itemmodel_set.all().update(
+                    inventory_quantity_received=Decimal('0.000'),
+                    inventory_cost_received=Decimal('0.00'),
+                    inventory_quantity_invoiced=Decimal('0.000'),
+                    inventory_unit_cost=None,
+                    inventory_received=Decimal('0.000'),
+                    inventory_received_value=Decimal('0.00')
+                )
+                itemtxs_qs = ItemTransactionModel.objects.for_entity_inventory(entity_slug=self.slug)
+                itemtxs_qs.update(inventory_posted_quantity=None, inventory_posted_value=None)
+                ItemTransactionModel.objects.post_inventory(itemtxs_qs=itemtxs_qs)
+
+        return mismatches
+
     def recorded_inventory(self,
                            item_qs: Optional[ItemModelQuerySet] = None,
                            as_values: bool = True) -> ItemModelQuerySet:
@@ -2610,19 +2904,7 @@ class EntityModelAbstract(MP_Node,
         else:
             coa_model = self.get_default_coa()
 
-        ROLES_NEEDED = list()
-        if not cash_account:
-            ROLES_NEEDED.append(roles_module.ASSET_CA_CASH)
-
-        if not capital_account:
-            ROLES_NEEDED.append(roles_module.EQUITY_CAPITAL)
-
-        account_model_qs = self.get_coa_accounts(coa_model=coa_model)
-        account_model_qs = account_model_qs.with_roles(roles=ROLES_NEEDED).is_role_default()
-
-        if not cash_account or not capital_account:
-            if cash_account or capital_account:
-                len(account_model_qs)
+        account_index = self.get_account_index(coa_model=coa_model)
 
         if cash_account:
             if isinstance(cash_account, BankAccountModel):
@@ -2630,13 +2912,13 @@ class EntityModelAbstract(MP_Node,
             self.validate_account_model_for_coa(account_model=cash_account, coa_model=coa_model)
             self.validate_account_model_for_role(cash_account, roles_module.ASSET_CA_CASH)
         else:
-            cash_account = account_model_qs.filter(role__exact=roles_module.ASSET_CA_CASH).get()
+            cash_account = account_index.get_default_account_for_role(role=roles_module.ASSET_CA_CASH, active=True)
 
         if capital_account:
             self.validate_account_model_for_coa(account_model=capital_account, coa_model=coa_model)
             self.validate_account_model_for_role(capital_account, roles_module.EQUITY_CAPITAL)
         else:
-            capital_account = account_model_qs.filter(role__exact=roles_module.EQUITY_CAPITAL).get()
+            capital_account = account_index.get_default_account_for_role(role=roles_module.EQUITY_CAPITAL, active=True)
 
         if not je_timestamp:
             je_timestamp = get_localtime()
@@ -2707,6 +2989,8 @@ class EntityModelAbstract(MP_Node,
             self.last_closing_date = None
 
         self.meta[self.META_KEY_CLOSING_ENTRY_DATES] = [d.isoformat() for d in date_list]
+        self._CLOSING_ENTRY_DATES = None
+        self._CLOSING_ENTRY_DATES_INDEX = None
         if commit:
             self.save(
                 update_fields=[
@@ -2726,41 +3010,62 @@ class EntityModelAbstract(MP_Node,
             return self._CLOSING_ENTRY_DATES
         return date_list
 
-    def get_closing_entry_for_date(self, io_date: Union[date, datetime], inclusive: bool = True) -> Optional[date]:
+    def get_closing_entry_dates_index(self) -> List[date]:
+        """
+        The posted closing entry dates of the EntityModel, sorted in ascending order so they can be bisected.
+
+        Returns
+        -------
+        list
+            The sorted list of closing dates.
+        """
+        if self._CLOSING_ENTRY_DATES_INDEX is None:
+            self._CLOSING_ENTRY_DATES_INDEX = sorted(self.fetch_closing_entry_dates_meta())
+        return self._CLOSING_ENTRY_DATES_INDEX
+
+    def get_closing_entry_checkpoint(self, io_date: Union[date, datetime], inclusive: bool = True) -> Optional[date]:
+        """
+        Finds the nearest closing entry date at or before the provided date.
+
+        Parameters
+        ----------
+        io_date: date or datetime
+            The date to look up.
+        inclusive: bool
+            If False, the closing entry must be strictly before the provided date. Defaults to True.
+
+        Returns
+        -------
+        date
+            The closing entry date or None if no closing entry is available.
+        """
         if io_date is None:
             return
-        ce_date_list = self.fetch_closing_entry_dates_meta()
 
-        if not ce_date_list:
+        ce_date_index = self.get_closing_entry_dates_index()
+        if not ce_date_index:
             return
 
         if isinstance(io_date, datetime):
             io_date = io_date.date()
 
-        ce_lookup = io_date - timedelta(days=1) if not inclusive else io_date
-        if ce_lookup in ce_date_list:
-            return ce_lookup
+        idx = bisect_right(ce_date_index, io_date) if inclusive else bisect_left(ce_date_index, io_date)
+        if idx:
+            return ce_date_index[idx - 1]
 
-    def get_nearest_next_closing_entry(self, io_date: Union[date, datetime]) -> Optional[date]:
+    def get_closing_entry_for_date(self, io_date: Union[date, datetime], inclusive: bool = True) -> Optional[date]:
         if io_date is None:
             return
 
-        ce_date_list = self.fetch_closing_entry_dates_meta()
-        if not len(ce_date_list):
-            return
-
-        if all([
-            isinstance(io_date, date),
-            isinstance(io_date, datetime),
-        ]):
+        if isinstance(io_date, datetime):
             io_date = io_date.date()
 
-        if io_date > ce_date_list[0]:
-            return ce_date_list[0]
+        ce_lookup = io_date - timedelta(days=1) if not inclusive else io_date
+        if self.get_closing_entry_checkpoint(io_date=ce_lookup) == ce_lookup:
+            return ce_lookup
 
-        for f, p in zip_longest(ce_date_list, ce_date_list[1:]):
-            if p and p <= io_date < f:
-                return p
+    def get_nearest_next_closing_entry(self, io_date: Union[date, datetime]) -> Optional[date]:
+        return self.get_closing_entry_checkpoint(io_date=io_date)
 
     def close_entity_books(self,
                            closing_date: Optional[date] = None,
@@ -2827,6 +3132,196 @@ class EntityModelAbstract(MP_Node,
         return self.close_entity_books(closing_date=closing_dt, force_update=force_update,
                                        post_closing_entry=post_closing_entry)
 
+    def get_closing_dates_for_range(self, start_date: date, end_date: date, frequency: str = 'month') -> List[date]:
+        """
+        The closing dates of every period ending within the provided date range.
+
+        Parameters
+        ----------
+        start_date: date
+            The start date of the range, inclusive.
+        end_date: date
+            The end date of the range, inclusive.
+        frequency: str
+            The closing frequency. Must be one of "month" or "fiscal_year". Defaults to "month".
+
+        Returns
+        -------
+        list
+            The sorted list of closing dates.
+        """
+        if start_date > end_date:
+            raise EntityModelValidationError(
+                message=_(f'Start date {start_date} must be before end date {end_date}.')
+            )
+
+        if frequency == 'month':
+            closing_dates = list()
+            year, month = start_date.year, start_date.month
+            while (year, month) <= (end_date.year, end_date.month):
+                closing_dates.append(date(year, month, monthrange(year, month)[1]))
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        elif frequency == 'fiscal_year':
+            closing_dates = [self.get_fy_end(year=y) for y in range(start_date.year - 1, end_date.year + 2)]
+        else:
+            raise EntityModelValidationError(
+                message=_(f'Invalid closing frequency {frequency}. Must be one of "month" or "fiscal_year".')
+            )
+
+        return sorted(d for d in closing_dates if start_date <= d <= end_date)
+
+    def close_books_for_range(self,
+                              start_date: date,
+                              end_date: date,
+                              frequency: str = 'month',
+                              force_update: bool = False,
+                              post_closing_entry: bool = True) -> List[Tuple]:
+        """
+        Closes the books for every period ending within the provided date range.
+        Each closing entry is chained from the previous one, so only the transactions of each period are aggregated,
+        starting from the nearest posted closing entry before the range, if any.
+        All ClosingEntryTransactionModels are created in bulk and the closing entry dates meta is updated once.
+
+        Parameters
+        ----------
+        start_date: date
+            The start date of the range, inclusive.
+        end_date: date
+            The end date of the range, inclusive.
+        frequency: str
+            The closing frequency. Must be one of "month" or "fiscal_year". Defaults to "month".
+        force_update: bool
+            Unposts and recomputes any existing closing entries within the range. Defaults to False.
+        post_closing_entry: bool
+            Posts the newly created closing entries. Defaults to True.
+
+        Returns
+        -------
+        list
+            A list of tuples of the ClosingEntryModel and its ClosingEntryTransactionModels, by closing date.
+        """
+        closing_dates = self.get_closing_dates_for_range(
+            start_date=start_date,
+            end_date=end_date,
+            frequency=frequency
+        )
+
+        if not closing_dates:
+            return list()
+
+        if closing_dates[-1] > get_localdate():
+            raise EntityModelValidationError(
+                message=_(f'Cannot create closing entry with a future date {closing_dates[-1]}.')
+            )
+
+        ClosingEntryModel = lazy_loader.get_closing_entry_model()
+        ClosingEntryTransactionModel = lazy_loader.get_closing_entry_transaction_model()
+
+        with transaction.atomic():
+            closing_entry_qs = self.closingentrymodel_set.filter(
+                closing_date__in=closing_dates
+            ).select_related('ledger_model')
+            closing_entry_map = {ce_model.closing_date: ce_model for ce_model in closing_entry_qs}
+            if closing_entry_map:
+                if not force_update:
+                    raise EntityModelValidationError(
+                        message=f'Closing Entries for range {closing_dates[0]} - {closing_dates[-1]} already exist.'
+                    )
+                # existing closing entries are unposted and reused, so their ledger journal entries & transactions
+                # are removed and the range is never closed twice...
+                for closing_entry_model in closing_entry_map.values():
+                    if closing_entry_model.can_unpost():
+                        closing_entry_model.mark_as_unposted(commit=True)
+                    closing_entry_model.closingentrytransactionmodel_set.all().delete()
+                if DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE:
+                    for closing_date in closing_dates:
+                        self.delete_closing_entry_cache(entity_uuid=self.uuid, closing_date=closing_date)
+
+            # balances by account, unit & activity, chained from one closing date to the next...
+            ce_balances = dict()
+            from_date = None
+
+            ce_checkpoint_model = self.closingentrymodel_set.posted().filter(
+                closing_date__lt=closing_dates[0]
+            ).order_by('-closing_date').first()
+
+            if ce_checkpoint_model:
+                from_date = ce_checkpoint_model.closing_date + timedelta(days=1)
+                ce_checkpoint_txs = ce_checkpoint_model.closingentrytransactionmodel_set.values(
+                    'account_model_id',
+                    'account_model__balance_type',
+                    'unit_model_id',
+                    'activity',
+                    'tx_type',
+                    'balance'
+                )
+                for ce in ce_checkpoint_txs:
+                    balance_type = ce['account_model__balance_type']
+                    ce_balances[(ce['account_model_id'], ce['unit_model_id'], ce['activity'])] = {
+                        'balance_type': balance_type,
+                        'balance': ce['balance'] if ce['tx_type'] == balance_type else -ce['balance']
+                    }
+
+            ce_results = list()
+            for closing_date in closing_dates:
+                io_digest = self.digest(
+                    to_date=closing_date,
+                    from_date=from_date,
+                    by_unit=True,
+                    by_activity=True,
+                    signs=False,
+                    use_closing_entry=False
+                )
+
+                for ce in io_digest.get_closing_entry_data():
+                    ce_key = (ce['account_uuid'], ce['unit_uuid'], ce['activity'])
+                    if ce_key in ce_balances:
+                        ce_balances[ce_key]['balance'] += ce['balance']
+                    else:
+                        ce_balances[ce_key] = {
+                            'balance_type': ce['balance_type'],
+                            'balance': ce['balance']
+                        }
+
+                closing_entry_model = closing_entry_map.get(closing_date)
+                if closing_entry_model is None:
+                    closing_entry_model = ClosingEntryModel(
+                        entity_model=self,
+                        closing_date=closing_date
+                    )
+                closing_entry_model.clean()
+                closing_entry_model.save()
+
+                ce_txs_list = [
+                    ClosingEntryTransactionModel(
+                        closing_entry_model=closing_entry_model,
+                        account_model_id=account_uuid,
+                        unit_model_id=unit_uuid,
+                        tx_type=ce['balance_type'],
+                        activity=activity,
+                        balance=ce['balance']
+                    ) for (account_uuid, unit_uuid, activity), ce in ce_balances.items()
+                ]
+
+                for ce in ce_txs_list:
+                    ce.clean()
+
+                ce_results.append((closing_entry_model, ce_txs_list))
+                from_date = closing_date + timedelta(days=1)
+
+            ClosingEntryTransactionModel.objects.bulk_create(
+                objs=[ce for ce_model, ce_txs_list in ce_results for ce in ce_txs_list],
+                batch_size=100
+            )
+
+            if post_closing_entry:
+                for closing_entry_model, ce_txs_list in ce_results:
+                    closing_entry_model.mark_as_posted(commit=True)
+            if post_closing_entry or closing_entry_map:
+                self.save_closing_entry_dates_meta(commit=True)
+
+        return ce_results
+
     # ### RANDOM DATA GENERATION ####
 
     def populate_random_data(self, start_date: date, days_forward=180, tx_quantity: int = 25):
@@ -3065,6 +3560,201 @@ class EntityModel(EntityModelAbstract):
 
 
 # ## ENTITY STATE....
+class EntityStateModelManager(models.Manager):
+    """
+    Allocates the document number sequences of the EntityModel (i.e. Journal Entries, Bills, Invoices, Purchase Orders,
+    Estimates, Vendors, Customers & Items).
+
+    By default, every number is allocated with a row lock on the corresponding EntityStateModel, which guarantees
+    gapless sequences but serializes all writers of the same EntityModel, EntityUnitModel, fiscal year and key.
+    A block size greater than 1 can be configured per key with the DJANGO_LEDGER_DOCUMENT_NUMBER_BLOCK_SIZES setting
+    (i.e. {'je': 100, 'item': 50}). For those keys, each worker process reserves a block of numbers with a single
+    locked update and allocates from the block in memory until it is exhausted (hi/lo allocation).
+
+    Gap policy for block allocated keys:
+        * Numbers are unique but not gapless. The unused numbers of a block are lost when the process exits.
+        * Numbers are not monotonic across processes. A document created later may get a lower number.
+        * A block reserved within a transaction is used by further allocations of the same transaction, and only
+          made available to other transactions once it commits. If the transaction, or the savepoint the block was
+          reserved in, is rolled back, the remainder of the block is discarded.
+
+    Keys not present in the setting keep the strict gapless behavior.
+    """
+
+    SEQUENCE_BLOCKS: Dict[tuple, List[int]] = dict()
+    SEQUENCE_BLOCKS_PID: Optional[int] = None
+    SEQUENCE_BLOCKS_LOCK = Lock()
+    TRANSACTION_SEQUENCE_BLOCKS: 'WeakKeyDictionary' = WeakKeyDictionary()
+    RESERVE_RETRIES = 0
+
+    @staticmethod
+    def get_block_size(key: str) -> int:
+        return max(int(DJANGO_LEDGER_DOCUMENT_NUMBER_BLOCK_SIZES.get(key, 1)), 1)
+
+    @classmethod
+    def get_sequence_blocks(cls) -> Dict[tuple, List[int]]:
+        # blocks inherited from a parent process must not be shared by forked workers...
+        if cls.SEQUENCE_BLOCKS_PID != getpid():
+            cls.SEQUENCE_BLOCKS = dict()
+            cls.SEQUENCE_BLOCKS_PID = getpid()
+        return cls.SEQUENCE_BLOCKS
+
+    @classmethod
+    def clear_sequence_blocks(cls):
+        with cls.SEQUENCE_BLOCKS_LOCK:
+            cls.get_sequence_blocks().clear()
+
+    def reserve_sequence_block(self,
+                               entity_model_id: UUID,
+                               key: str,
+                               fiscal_year: Optional[int] = None,
+                               entity_unit_id: Optional[UUID] = None,
+                               size: int = 1):
+        """
+        Atomic Transaction. Increments the EntityStateModel sequence by the block size with a single locked update.
+        The EntityStateModel is created if not present.
+
+        Parameters
+        ----------
+        entity_model_id: UUID
+            The EntityModel UUID.
+        key: str
+            The EntityStateModel key.
+        fiscal_year: int
+            The fiscal year of the sequence, if any.
+        entity_unit_id: UUID
+            The EntityUnitModel UUID of the sequence, if any.
+        size: int
+            The number of sequence numbers to reserve. Defaults to 1.
+
+        Returns
+        -------
+        EntityStateModel
+            The updated EntityStateModel. Its sequence is the last number of the reserved block.
+        """
+        LOOKUP = {
+            'entity_model_id': entity_model_id,
+            'entity_unit_id': entity_unit_id,
+            'fiscal_year': fiscal_year,
+            'key': key
+        }
+
+        with transaction.atomic(using=self.db):
+            state_model = None
+            while not state_model:
+                try:
+                    state_model = self.select_for_update().get(**LOOKUP)
+                    state_model.sequence = F('sequence') + size
+                    state_model.save(update_fields=['sequence'])
+                    state_model.refresh_from_db(fields=['sequence'])
+                except ObjectDoesNotExist:
+                    try:
+                        with transaction.atomic(using=self.db):
+                            state_model = self.create(**LOOKUP, sequence=size)
+                    except IntegrityError:
+                        # created concurrently, next iteration locks the new row...
+                        state_model = None
+                        with self.SEQUENCE_BLOCKS_LOCK:
+                            EntityStateModelManager.RESERVE_RETRIES += 1
+        return state_model
+
+    def get_next_state_model(self,
+                             entity_model_id: UUID,
+                             key: str,
+                             fiscal_year: Optional[int] = None,
+                             entity_unit_id: Optional[UUID] = None):
+        """
+        Allocates the next sequence number of the given key, according to the key block size.
+
+        Parameters
+        ----------
+        entity_model_id: UUID
+            The EntityModel UUID.
+        key: str
+            The EntityStateModel key.
+        fiscal_year: int
+            The fiscal year of the sequence, if any.
+        entity_unit_id: UUID
+            The EntityUnitModel UUID of the sequence, if any.
+
+        Returns
+        -------
+        EntityStateModel
+            The EntityStateModel of the sequence. Its sequence attribute holds the allocated number, which may differ
+            from the value stored in the database for block allocated keys. The instance must not be saved.
+        """
+        block_size = self.get_block_size(key)
+        if block_size == 1:
+            return self.reserve_sequence_block(
+                entity_model_id=entity_model_id,
+                key=key,
+                fiscal_year=fiscal_year,
+                entity_unit_id=entity_unit_id
+            )
+
+        block_key = (self.db, str(entity_model_id), str(entity_unit_id) if entity_unit_id else None, fiscal_year, key)
+        connection = transaction.get_connection(using=self.db)
+
+        # a connection is only used by one thread, so blocks of the current transaction need no lock...
+        tx_blocks = None
+        if connection.in_atomic_block:
+            tx_blocks = self.TRANSACTION_SEQUENCE_BLOCKS.setdefault(connection, dict())
+            tx_block = tx_blocks.get(block_key)
+            if tx_block:
+                block, publish_block, on_commit_idx = tx_block
+                # the block is alive while its publish callback is still pending, since Django discards the
+                # callbacks of rolled back savepoints & transactions...
+                run_on_commit = connection.run_on_commit
+                if (block[0] <= block[1] and on_commit_idx < len(run_on_commit) and
+                        run_on_commit[on_commit_idx][1] is publish_block):
+                    sequence = block[0]
+                    block[0] += 1
+                    return self.model(
+                        entity_model_id=entity_model_id,
+                        entity_unit_id=entity_unit_id,
+                        fiscal_year=fiscal_year,
+                        key=key,
+                        sequence=sequence
+                    )
+                del tx_blocks[block_key]
+
+        with self.SEQUENCE_BLOCKS_LOCK:
+            block = self.get_sequence_blocks().get(block_key)
+            if block and block[0] <= block[1]:
+                sequence = block[0]
+                block[0] += 1
+                return self.model(
+                    entity_model_id=entity_model_id,
+                    entity_unit_id=entity_unit_id,
+                    fiscal_year=fiscal_year,
+                    key=key,
+                    sequence=sequence
+                )
+
+        state_model = self.reserve_sequence_block(
+            entity_model_id=entity_model_id,
+            key=key,
+            fiscal_year=fiscal_year,
+            entity_unit_id=entity_unit_id,
+            size=block_size
+        )
+        block_lo = state_model.sequence - block_size + 1
+        block = [block_lo + 1, state_model.sequence]
+
+        def publish_block():
+            if tx_blocks is not None:
+                tx_blocks.pop(block_key, None)
+            if block[0] <= block[1]:
+                with self.SEQUENCE_BLOCKS_LOCK:
+                    self.get_sequence_blocks()[block_key] = block
+
+        if tx_blocks is not None:
+            tx_blocks[block_key] = (block, publish_block, len(connection.run_on_commit))
+        transaction.on_commit(publish_block, using=self.db)
+        state_model.sequence = block_lo
+        return state_model
+
+
 class EntityStateModelAbstract(models.Model):
     KEY_JOURNAL_ENTRY = 'je'
     KEY_PURCHASE_ORDER = 'po'
@@ -3101,6 +3791,8 @@ class EntityStateModelAbstract(models.Model):
     key = models.CharField(choices=KEY_CHOICES, max_length=10)
     sequence = models.BigIntegerField(default=0, validators=[MinValueValidator(limit_value=0)])
 
+    objects = EntityStateModelManager()
+
     class Meta:
         abstract = True
         indexes = [
@@ -3176,3 +3868,39 @@ def entitymodel_presave(instance: EntityModel, **kwargs):
 
 
 pre_save.connect(receiver=entitymodel_presave, sender=EntityModel)
+
+
+def entitymodel_postsave(instance: EntityModel, update_fields=None, **kwargs):
+    if DJANGO_LEDGER_USE_AUTHORIZATION_CACHE:
+        if update_fields is None or {'admin', 'slug'}.intersection(update_fields):
+            # the previous admin may no longer have access...
+            EntityModel.delete_authorization_map(user_ids=[instance.admin_id, instance._AUTHORIZATION_ADMIN_ID])
+    instance._AUTHORIZATION_ADMIN_ID = instance.__dict__.get('admin_id')
+
+
+def entitymodel_postdelete(instance: EntityModel, **kwargs):
+    if DJANGO_LEDGER_USE_AUTHORIZATION_CACHE:
+        EntityModel.delete_authorization_map(user_ids=[instance.__dict__.get('admin_id')])
+
+
+def entitymanagementmodel_postchange(instance: EntityManagementModel, **kwargs):
+    if DJANGO_LEDGER_USE_AUTHORIZATION_CACHE:
+        EntityModel.delete_authorization_map(user_ids=[instance.user_id])
+
+
+def entitymodel_managers_changed(instance, action: str, reverse: bool, pk_set=None, **kwargs):
+    if DJANGO_LEDGER_USE_AUTHORIZATION_CACHE and action in ('post_add', 'post_remove', 'pre_clear'):
+        if reverse:
+            user_ids = [instance.pk]
+        elif action == 'pre_clear':
+            user_ids = instance.managers.values_list('pk', flat=True)
+        else:
+            user_ids = pk_set
+        EntityModel.delete_authorization_map(user_ids=user_ids)
+
+
+post_save.connect(receiver=entitymodel_postsave, sender=EntityModel)
+post_delete.connect(receiver=entitymodel_postdelete, sender=EntityModel)
+post_save.connect(receiver=entitymanagementmodel_postchange, sender=EntityManagementModel)
+post_delete.connect(receiver=entitymanagementmodel_postchange, sender=EntityManagementModel)
+m2m_changed.connect(receiver=entitymodel_managers_changed, sender=EntityModel.managers.through)
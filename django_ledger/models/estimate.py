@@ -20,10 +20,10 @@ from typing import Union, Optional, List, Dict
 from uuid import uuid4, UUID
 
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError, ObjectDoesNotExist
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MinLengthValidator
-from django.db import models, transaction, IntegrityError
-from django.db.models import Q, Sum, ExpressionWrapper, FloatField, F
+from django.db import models, transaction
+from django.db.models import Q, Sum, ExpressionWrapper, FloatField
 from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
@@ -36,6 +36,7 @@ from django_ledger.models.entity import EntityModel, EntityStateModel
 from django_ledger.models.items import ItemTransactionModelQuerySet, ItemTransactionModel, ItemModelQuerySet, ItemModel
 from django_ledger.models.mixins import CreateUpdateMixIn, MarkdownNotesMixIn, ItemizeMixIn
 from django_ledger.models.purchase_order import PurchaseOrderModelQuerySet
+from django_ledger.models.utils import get_entity_access_q
 from django_ledger.settings import DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING, DJANGO_LEDGER_ESTIMATE_NUMBER_PREFIX
 
 ESTIMATE_NUMBER_CHARS = ascii_uppercase + digits
@@ -116,8 +117,7 @@ class EstimateModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(entity__admin=user_model) |
-            Q(entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'entity')
         )
 
     def for_entity(self, entity_slug: Union[EntityModel, str], user_model):
@@ -1453,41 +1453,14 @@ class EstimateModelAbstract(CreateUpdateMixIn,
         EntityStateModel
             An instance of EntityStateModel
         """
-        # entity_model = EntityModel.objects.get(uuid__exact=self.entity_id)
         entity_model: EntityModel = self.entity
         fy_key = entity_model.get_fy_for_date(dt=self.date_draft)
-        try:
-            LOOKUP = {
-                'entity_model_id__exact': self.entity_id,
-                'entity_unit_id': None,
-                'fiscal_year': fy_key,
-                'key__exact': EntityStateModel.KEY_ESTIMATE
-            }
-
-            state_model_qs = EntityStateModel.objects.filter(**LOOKUP).select_related(
-                'entity_model').select_for_update()
-            state_model = state_model_qs.get()
-            state_model.sequence = F('sequence') + 1
-            state_model.save()
-            state_model.refresh_from_db()
-            return state_model
-        except ObjectDoesNotExist:
-            entity_model = EntityModel.objects.get(uuid__exact=self.entity_id)
-            fy_key = entity_model.get_fy_for_date(dt=self.date_draft)
-
-            LOOKUP = {
-                'entity_model_id': entity_model.uuid,
-                'entity_unit_id': None,
-                'fiscal_year': fy_key,
-                'key': EntityStateModel.KEY_ESTIMATE,
-                'sequence': 1
-            }
-
-            state_model = EntityStateModel.objects.create(**LOOKUP)
-            return state_model
-        except IntegrityError as e:
-            if raise_exception:
-                raise e
+        return EntityStateModel.objects.get_next_state_model(
+            entity_model_id=self.entity_id,
+            entity_unit_id=None,
+            fiscal_year=fy_key,
+            key=EntityStateModel.KEY_ESTIMATE
+        )
 
     def generate_estimate_number(self, commit: bool = False) -> str:
         """
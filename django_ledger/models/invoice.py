@@ -26,9 +26,9 @@ from typing import Union, Optional, Tuple, Dict
 from uuid import uuid4
 
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError, ObjectDoesNotExist
-from django.db import models, transaction, IntegrityError
-from django.db.models import Q, Sum, F, Count
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q, Sum, Count
 from django.db.models.signals import pre_save
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
@@ -40,6 +40,7 @@ from django_ledger.models import lazy_loader, ItemTransactionModelQuerySet, Item
 from django_ledger.models.entity import EntityModel
 from django_ledger.models.mixins import CreateUpdateMixIn, AccrualMixIn, MarkdownNotesMixIn, PaymentTermsMixIn, \
     ItemizeMixIn
+from django_ledger.models.utils import get_entity_access_q
 from django_ledger.settings import DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING, DJANGO_LEDGER_INVOICE_NUMBER_PREFIX
 
 UserModel = get_user_model()
@@ -184,8 +185,7 @@ class InvoiceModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(ledger__entity__admin=user_model) |
-            Q(ledger__entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'ledger__entity')
         )
 
     def for_entity(self, entity_slug, user_model) -> InvoiceModelQuerySet:
@@ -215,6 +215,31 @@ class InvoiceModelManager(models.Manager):
         qs = self.for_entity(entity_slug=entity_slug, user_model=user_model)
         return qs.approved()
 
+    def receive_many(self,
+                     invoice_models,
+                     payment_date: Optional[Union[datetime, date]] = None,
+                     cash_account=None,
+                     payment_amounts: Optional[Dict] = None):
+        """
+        Receives payment for many InvoiceModels at once. See AccrualMixIn.make_payment_many.
+
+        Examples
+        ________
+            >>> invoice_model_qs = InvoiceModel.objects.for_entity_unpaid(user_model=request_user, entity_slug=slug)
+            >>> paid_invoices, errors = InvoiceModel.objects.receive_many(invoice_models=invoice_model_qs)
+
+        Returns
+        _______
+        tuple
+            The paid InvoiceModels and the errors of the invoices that could not be paid, by InvoiceModel UUID.
+        """
+        return self.model.make_payment_many(
+            models_list=invoice_models,
+            payment_date=payment_date,
+            cash_account=cash_account,
+            payment_amounts=payment_amounts
+        )
+
 
 class InvoiceModelAbstract(
     AccrualMixIn,
@@ -561,6 +586,20 @@ class InvoiceModelAbstract(
         else:
             self.validate_itemtxs_qs(queryset)
 
+        return self.get_migration_data_values(queryset=queryset)
+
+    @staticmethod
+    def get_migration_data_values(queryset: ItemTransactionModelQuerySet, *fields) -> ItemTransactionModelQuerySet:
+        """
+        Aggregates the item transaction data needed to perform a migration into the LedgerModel.
+
+        Parameters
+        ----------
+        queryset: ItemTransactionModelQuerySet
+            The ItemTransactionModelQuerySet to aggregate.
+        fields
+            Additional fields to group by, if any.
+        """
         return queryset.select_related('item_model').order_by('item_model__earnings_account__uuid',
                                                               'entity_unit__uuid',
                                                               'item_model__earnings_account__balance_type').values(
@@ -572,10 +611,12 @@ class InvoiceModelAbstract(
             'item_model__inventory_account__balance_type',
             'item_model__inventory_received',
             'item_model__inventory_received_value',
+            'item_model__inventory_unit_cost',
             'entity_unit__slug',
             'entity_unit__uuid',
             'quantity',
-            'total_amount').annotate(
+            'total_amount',
+            *fields).annotate(
             account_unit_total=Sum('total_amount'))
 
     def update_amount_due(self,
@@ -1179,6 +1220,7 @@ class InvoiceModelAbstract(
         self.clean()
         if commit:
             self.save()
+            self.update_perpetual_inventory()
             if force_migrate or self.accrue:
                 # normally no transactions will be present when marked as approved...
                 self.migrate_state(
@@ -1670,39 +1712,12 @@ class InvoiceModelAbstract(
         EntityModel = lazy_loader.get_entity_model()
         entity_model = EntityModel.objects.get(uuid__exact=self.ledger.entity_id)
         fy_key = entity_model.get_fy_for_date(dt=self.date_draft)
-        try:
-            LOOKUP = {
-                'entity_model_id__exact': self.ledger.entity_id,
-                'entity_unit_id__exact': None,
-                'fiscal_year': fy_key,
-                'key__exact': EntityStateModel.KEY_INVOICE
-            }
-
-            state_model_qs = EntityStateModel.objects.filter(**LOOKUP).select_related(
-                'entity_model').select_for_update()
-            state_model = state_model_qs.get()
-            state_model.sequence = F('sequence') + 1
-            state_model.save()
-            state_model.refresh_from_db()
-            return state_model
-        except ObjectDoesNotExist:
-            EntityModel = lazy_loader.get_entity_model()
-            entity_model = EntityModel.objects.get(uuid__exact=self.ledger.entity_id)
-            fy_key = entity_model.get_fy_for_date(dt=self.date_draft)
-
-            LOOKUP = {
-                'entity_model_id': entity_model.uuid,
-                'entity_unit_id': None,
-                'fiscal_year': fy_key,
-                'key': EntityStateModel.KEY_INVOICE,
-                'sequence': 1
-            }
-
-            state_model = EntityStateModel.objects.create(**LOOKUP)
-            return state_model
-        except IntegrityError as e:
-            if raise_exception:
-                raise e
+        return EntityStateModel.objects.get_next_state_model(
+            entity_model_id=self.ledger.entity_id,
+            entity_unit_id=None,
+            fiscal_year=fy_key,
+            key=EntityStateModel.KEY_INVOICE
+        )
 
     def generate_invoice_number(self, commit: bool = False) -> str:
         """
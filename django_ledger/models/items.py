@@ -22,19 +22,23 @@ ItemsTransactionModels constitute the way multiple items and used resources are
 Purchase Orders and Estimates. Each transaction will record the unit of measure and quantity of each resource.
 Totals will be calculated and associated with the containing model at the time of update.
 """
+from collections import defaultdict
 from decimal import Decimal
 from string import ascii_lowercase, digits
+from typing import Dict, List, Tuple
 from uuid import uuid4, UUID
 
-from django.core.exceptions import ValidationError, ObjectDoesNotExist
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models, transaction, IntegrityError
+from django.db import models, transaction
 from django.db.models import Q, Sum, F, ExpressionWrapper, DecimalField, Value, Case, When, QuerySet
 from django.db.models.functions import Coalesce
+from django.db.models.signals import pre_delete
 from django.utils.translation import gettext_lazy as _
 
+from django_ledger import settings
 from django_ledger.models.mixins import CreateUpdateMixIn
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 from django_ledger.settings import (DJANGO_LEDGER_TRANSACTION_MAX_TOLERANCE, DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING,
                                     DJANGO_LEDGER_EXPENSE_NUMBER_PREFIX, DJANGO_LEDGER_INVENTORY_NUMBER_PREFIX,
                                     DJANGO_LEDGER_PRODUCT_NUMBER_PREFIX)
@@ -76,17 +80,11 @@ class UnitOfMeasureModelManager(models.Manager):
         if isinstance(entity_slug, lazy_loader.get_entity_model()):
             return qs.filter(
                 Q(entity=entity_slug) &
-                (
-                        Q(entity__admin=user_model) |
-                        Q(entity__managers__in=[user_model])
-                )
+                get_entity_access_q(user_model, 'entity')
             )
         return qs.filter(
             Q(entity__slug__exact=entity_slug) &
-            (
-                    Q(entity__admin=user_model) |
-                    Q(entity__managers__in=[user_model])
-            )
+            get_entity_access_q(user_model, 'entity')
         )
 
     def for_entity_active(self, entity_slug: str, user_model):
@@ -317,17 +315,11 @@ class ItemModelManager(models.Manager):
         if isinstance(entity_slug, lazy_loader.get_entity_model()):
             return qs.filter(
                 Q(entity=entity_slug) &
-                (
-                        Q(entity__managers__in=[user_model]) |
-                        Q(entity__admin=user_model)
-                )
+                get_entity_access_q(user_model, 'entity')
             ).select_related('uom')
         return qs.filter(
             Q(entity__slug__exact=entity_slug) &
-            (
-                    Q(entity__managers__in=[user_model]) |
-                    Q(entity__admin=user_model)
-            )
+            get_entity_access_q(user_model, 'entity')
         ).select_related('uom')
 
     def for_entity_active(self, entity_slug, user_model):
@@ -485,6 +477,14 @@ class ItemModelAbstract(CreateUpdateMixIn):
         Holds the total quantity of the inventory received for the whole EntityModel instance.
     inventory_received_value: Decimal
         Holds the total monetary value of the inventory received for the whole EntityModel instance.
+    inventory_quantity_received: Decimal
+        Perpetual inventory. Total quantity received from Purchase Orders for the whole EntityModel instance.
+    inventory_cost_received: Decimal
+        Perpetual inventory. Total cost of the quantity received from Purchase Orders.
+    inventory_quantity_invoiced: Decimal
+        Perpetual inventory. Total quantity invoiced to customers.
+    inventory_unit_cost: Decimal
+        Perpetual inventory. Current average cost per unit. Used to determine the COGS of invoiced inventory.
     cogs_account: AccountModel
         COGS account associated with the ItemModel instance. Enforced if ItemModel instance is_inventory() is True.
     earnings_account: AccountModel
@@ -578,6 +578,31 @@ class ItemModelAbstract(CreateUpdateMixIn):
         decimal_places=2,
         max_digits=20,
         verbose_name=_('Total value of inventory received.'))
+    inventory_quantity_received = models.DecimalField(
+        default=0,
+        editable=False,
+        decimal_places=3,
+        max_digits=20,
+        verbose_name=_('Perpetual inventory quantity received.'))
+    inventory_cost_received = models.DecimalField(
+        default=0,
+        editable=False,
+        decimal_places=2,
+        max_digits=20,
+        verbose_name=_('Perpetual inventory cost received.'))
+    inventory_quantity_invoiced = models.DecimalField(
+        default=0,
+        editable=False,
+        decimal_places=3,
+        max_digits=20,
+        verbose_name=_('Perpetual inventory quantity invoiced.'))
+    inventory_unit_cost = models.DecimalField(
+        null=True,
+        blank=True,
+        editable=False,
+        decimal_places=6,
+        max_digits=20,
+        verbose_name=_('Perpetual inventory average unit cost.'))
     cogs_account = models.ForeignKey(
         'django_ledger.AccountModel',
         null=True,
@@ -720,6 +745,40 @@ class ItemModelAbstract(CreateUpdateMixIn):
                 pass
         return Decimal('0.00')
 
+    def post_inventory(self,
+                       quantity_received: Decimal = Decimal('0.000'),
+                       cost_received: Decimal = Decimal('0.00'),
+                       quantity_invoiced: Decimal = Decimal('0.000')):
+        """
+        Applies a change to the perpetual inventory of the ItemModel and updates the quantity, value and average
+        cost on hand. The average cost is the total cost received over the total quantity received, same as
+        :func:`ItemTransactionModelManager.inventory_count
+        <django_ledger.models.items.ItemTransactionModelManager.inventory_count>`.
+        Changes are not committed into the database.
+
+        Parameters
+        ----------
+        quantity_received: Decimal
+            The change in quantity received. May be negative.
+        cost_received: Decimal
+            The change in cost received. May be negative.
+        quantity_invoiced: Decimal
+            The change in quantity invoiced. May be negative.
+        """
+        self.inventory_quantity_received += quantity_received
+        self.inventory_cost_received += cost_received
+        self.inventory_quantity_invoiced += quantity_invoiced
+
+        if self.inventory_quantity_received:
+            self.inventory_unit_cost = round(self.inventory_cost_received / self.inventory_quantity_received, 6)
+        else:
+            self.inventory_unit_cost = Decimal('0.000000')
+
+        self.inventory_received = self.inventory_quantity_received - self.inventory_quantity_invoiced
+        self.inventory_received_value = round(
+            self.inventory_received * self.inventory_cost_received / self.inventory_quantity_received, 2
+        ) if self.inventory_quantity_received else Decimal('0.00')
+
     def get_item_number_prefix(self):
         if self.is_expense():
             return DJANGO_LEDGER_EXPENSE_NUMBER_PREFIX
@@ -741,34 +800,10 @@ class ItemModelAbstract(CreateUpdateMixIn):
 
     def _get_next_state_model(self, raise_exception: bool = True):
         EntityStateModel = lazy_loader.get_entity_state_model()
-
-        try:
-            LOOKUP = {
-                'entity_model_id__exact': self.entity_id,
-                'key__exact': EntityStateModel.KEY_ITEM
-            }
-
-            state_model_qs = EntityStateModel.objects.filter(**LOOKUP).select_for_update()
-            state_model = state_model_qs.get()
-            state_model.sequence = F('sequence') + 1
-            state_model.save()
-            state_model.refresh_from_db()
-
-            return state_model
-        except ObjectDoesNotExist:
-
-            LOOKUP = {
-                'entity_model_id': self.entity_id,
-                'entity_unit_id': None,
-                'fiscal_year': None,
-                'key': EntityStateModel.KEY_ITEM,
-                'sequence': 1
-            }
-            state_model = EntityStateModel.objects.create(**LOOKUP)
-            return state_model
-        except IntegrityError as e:
-            if raise_exception:
-                raise e
+        return EntityStateModel.objects.get_next_state_model(
+            entity_model_id=self.entity_id,
+            key=EntityStateModel.KEY_ITEM
+        )
 
     def generate_item_number(self, commit: bool = False) -> str:
         """
@@ -884,12 +919,15 @@ class ItemTransactionModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(item_model__entity__admin=user_model) |
-            Q(item_model__entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'item_model__entity')
         )
 
     def for_entity(self, user_model, entity_slug):
         qs = self.for_user(user_model)
+        if isinstance(entity_slug, lazy_loader.get_entity_model()):
+            return qs.filter(
+                Q(item_model__entity=entity_slug)
+            )
         return qs.filter(
             Q(item_model__entity__slug__exact=entity_slug)
         )
@@ -944,7 +982,10 @@ class ItemTransactionModelManager(models.Manager):
                 # received inventory...
                     (
                             Q(bill_model__isnull=False) &
-                            Q(po_model__po_status=PurchaseOrderModel.PO_STATUS_APPROVED) &
+                            Q(po_model__po_status__in=[
+                                PurchaseOrderModel.PO_STATUS_APPROVED,
+                                PurchaseOrderModel.PO_STATUS_FULFILLED
+                            ]) &
                             Q(po_item_status__exact=ItemTransactionModel.STATUS_RECEIVED)
                     ) |
 
@@ -1024,6 +1065,131 @@ class ItemTransactionModelManager(models.Manager):
             Q(invoice_model__isnull=False)
         )
 
+    # PERPETUAL INVENTORY METHODS....
+    def get_inventory_posting(self, itemtxs_values: Dict, void: bool = False) -> Tuple[Decimal, Decimal]:
+        """
+        Determines the quantity and cost an ItemTransactionModel contributes to the perpetual inventory of its
+        ItemModel. Follows the same rules as :func:`inventory_count
+        <django_ledger.models.items.ItemTransactionModelManager.inventory_count>`.
+
+        Parameters
+        ----------
+        itemtxs_values: dict
+            The ItemTransactionModel values, as fetched by post_inventory.
+        void: bool
+            If True, the ItemTransactionModel contributes nothing.
+
+        Returns
+        -------
+        tuple
+            The quantity, positive if received or negative if invoiced, and the cost received.
+        """
+        PurchaseOrderModel = lazy_loader.get_purchase_order_model()
+
+        if void or not itemtxs_values['item_model__for_inventory']:
+            return Decimal('0.000'), Decimal('0.00')
+
+        quantity = Decimal.from_float(itemtxs_values['quantity'] or 0.0).quantize(Decimal('0.001'))
+
+        # invoiced inventory...
+        if itemtxs_values['invoice_model_id'] and not itemtxs_values['bill_model_id']:
+            return -quantity, Decimal('0.00')
+
+        # received inventory...
+        if all([
+            itemtxs_values['bill_model_id'],
+            not itemtxs_values['invoice_model_id'],
+            itemtxs_values['po_item_status'] == ItemTransactionModel.STATUS_RECEIVED,
+            itemtxs_values['po_model__po_status'] in [
+                PurchaseOrderModel.PO_STATUS_APPROVED,
+                PurchaseOrderModel.PO_STATUS_FULFILLED
+            ]
+        ]):
+            return quantity, itemtxs_values['total_amount'] or Decimal('0.00')
+
+        return Decimal('0.000'), Decimal('0.00')
+
+    def post_inventory(self, itemtxs_qs: ItemTransactionModelQuerySet, void: bool = False) -> List:
+        """
+        Posts the provided ItemTransactionModels to the perpetual inventory of their ItemModels.
+        Each ItemTransactionModel keeps track of what it already posted, so only the difference is applied to the
+        ItemModel and posting the same ItemTransactionModels more than once is safe.
+
+        Parameters
+        ----------
+        itemtxs_qs: ItemTransactionModelQuerySet
+            The ItemTransactionModels to post.
+        void: bool
+            Reverses everything posted by the ItemTransactionModels. Used before they are deleted.
+
+        Returns
+        -------
+        list
+            The updated ItemModels.
+        """
+        ItemModel = lazy_loader.get_item_model()
+
+        with transaction.atomic():
+            itemtxs_values = itemtxs_qs.select_for_update(of=('self',)).values(
+                'uuid',
+                'item_model_id',
+                'item_model__for_inventory',
+                'bill_model_id',
+                'invoice_model_id',
+                'po_model__po_status',
+                'po_item_status',
+                'quantity',
+                'total_amount',
+                'inventory_posted_quantity',
+                'inventory_posted_value'
+            )
+
+            postings = dict()
+            # item_model_id -> [quantity received, cost received, quantity invoiced]...
+            item_changes = defaultdict(lambda: [Decimal('0.000'), Decimal('0.00'), Decimal('0.000')])
+
+            for itx in itemtxs_values:
+                quantity, value = self.get_inventory_posting(itx, void=void)
+                posted_quantity = itx['inventory_posted_quantity'] or Decimal('0.000')
+                posted_value = itx['inventory_posted_value'] or Decimal('0.00')
+
+                if quantity == posted_quantity and value == posted_value:
+                    continue
+
+                changes = item_changes[itx['item_model_id']]
+                for q, v, sign in [(quantity, value, 1), (posted_quantity, posted_value, -1)]:
+                    if q > 0:
+                        changes[0] += q * sign
+                        changes[1] += v * sign
+                    elif q < 0:
+                        changes[2] -= q * sign
+
+                postings[itx['uuid']] = (quantity, value)
+
+            if not postings:
+                return list()
+
+            item_models = list(ItemModel.objects.select_for_update().filter(uuid__in=item_changes.keys()))
+            for item_model in item_models:
+                item_model.post_inventory(*item_changes[item_model.uuid])
+
+            ItemModel.objects.bulk_update(item_models, fields=[
+                'inventory_quantity_received',
+                'inventory_cost_received',
+                'inventory_quantity_invoiced',
+                'inventory_unit_cost',
+                'inventory_received',
+                'inventory_received_value'
+            ])
+            self.bulk_update([
+                self.model(uuid=uuid, inventory_posted_quantity=quantity, inventory_posted_value=value)
+                for uuid, (quantity, value) in postings.items()
+            ], fields=[
+                'inventory_posted_quantity',
+                'inventory_posted_value'
+            ])
+        return item_models
+
 
 class ItemTransactionModelAbstract(CreateUpdateMixIn):
     DECIMAL_PLACES = 2
@@ -1142,6 +1308,23 @@ class ItemTransactionModelAbstract(CreateUpdateMixIn):
                                               verbose_name=_('Total Estimate/Contract Revenue.'),
                                               validators=[MinValueValidator(limit_value=0.0)])
     item_notes = models.CharField(max_length=400, null=True, blank=True, verbose_name=_('Description'))
+
+    # Perpetual inventory fields...
+    inventory_posted_quantity = models.DecimalField(max_digits=20,
+                                                    decimal_places=3,
+                                                    null=True,
+                                                    blank=True,
+                                                    editable=False,
+                                                    verbose_name=_('Inventory Quantity Posted'),
+                                                    help_text=_('Quantity posted to the perpetual inventory. '
+                                                                'Positive if received, negative if invoiced.'))
+    inventory_posted_value = models.DecimalField(max_digits=20,
+                                                 decimal_places=DECIMAL_PLACES,
+                                                 null=True,
+                                                 blank=True,
+                                                 editable=False,
+                                                 verbose_name=_('Inventory Cost Posted'),
+                                                 help_text=_('Received cost posted to the perpetual inventory.'))
     objects = ItemTransactionModelManager.from_queryset(queryset_class=ItemTransactionModelQuerySet)()
 
     class Meta:
@@ -1421,3 +1604,15 @@ class ItemModel(ItemModelAbstract):
     """
     Base ItemModel from Abstract.
     """
+
+
+def itemtransactionmodel_predelete(instance: ItemTransactionModel, **kwargs):
+    if settings.DJANGO_LEDGER_USE_PERPETUAL_INVENTORY:
+        if instance.inventory_posted_quantity or instance.inventory_posted_value:
+            ItemTransactionModel.objects.post_inventory(
+                itemtxs_qs=ItemTransactionModel.objects.filter(uuid__exact=instance.uuid),
+                void=True
+            )
+
+
+pre_delete.connect(receiver=itemtransactionmodel_predelete, sender=ItemTransactionModel)
@@ -35,15 +35,16 @@ from itertools import chain
 from typing import Set, Union, Optional, Dict, Tuple, List
 from uuid import uuid4, UUID
 
-from django.core.exceptions import FieldError, ObjectDoesNotExist, ValidationError
-from django.db import models, transaction, IntegrityError
-from django.db.models import Q, Sum, QuerySet, F
+from django.core.exceptions import FieldError, ValidationError
+from django.db import models, transaction
+from django.db.models import Q, Sum, QuerySet
 from django.db.models.functions import Coalesce
 from django.db.models.signals import pre_save
 from django.urls import reverse
 from django.utils.timezone import localtime
 from django.utils.translation import gettext_lazy as _
 
+from django_ledger import settings
 from django_ledger.io.io_core import get_localtime
 from django_ledger.io.roles import (ASSET_CA_CASH, GROUP_CFS_FIN_DIVIDENDS, GROUP_CFS_FIN_ISSUING_EQUITY,
                                     GROUP_CFS_FIN_LT_DEBT_PAYMENTS, GROUP_CFS_FIN_ST_DEBT_PAYMENTS,
@@ -53,7 +54,7 @@ from django_ledger.models.accounts import CREDIT, DEBIT
 from django_ledger.models.entity import EntityStateModel, EntityModel
 from django_ledger.models.mixins import CreateUpdateMixIn
 from django_ledger.models.transactions import TransactionModelQuerySet, TransactionModel
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 from django_ledger.settings import (DJANGO_LEDGER_JE_NUMBER_PREFIX, DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING,
                                     DJANGO_LEDGER_JE_NUMBER_NO_UNIT_PREFIX)
 
@@ -144,8 +145,7 @@ class JournalEntryModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(ledger__entity__admin=user_model) |
-            Q(ledger__entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'ledger__entity')
         )
 
     def for_entity(self, entity_slug, user_model):
@@ -231,6 +231,64 @@ class ActivityEnum(Enum):
     FINANCING = 'fin'
 
 
+class JournalEntryVerificationContext:
+    """
+    Holds the in-memory TransactionModels of one or many JournalEntryModels, so they can be verified right after being
+    created without fetching their transactions, balances and account roles from the database. The AccountModel roles
+    are resolved once for all transactions, from the AccountModels already associated with each TransactionModel and
+    a single query for the remaining ones.
+
+    Parameters
+    ----------
+    txs_models: iterable of TransactionModel
+        The TransactionModels of the JournalEntryModels to verify.
+    account_roles: dict
+        Optional mapping of AccountModel UUID to role, if previously resolved.
+
+    Examples
+    --------
+        >>> verification_context = JournalEntryVerificationContext(txs_models=txs_models)
+        >>> je_model.save(verify=True, verification_context=verification_context)
+    """
+
+    def __init__(self, txs_models, account_roles: Optional[Dict[UUID, str]] = None):
+        self.TXS_MODELS: Dict[UUID, List[TransactionModel]] = dict()
+        self.ACCOUNT_ROLES: Dict[UUID, str] = dict(account_roles) if account_roles else dict()
+
+        for tx_model in txs_models:
+            self.TXS_MODELS.setdefault(tx_model.journal_entry_id, list()).append(tx_model)
+            if tx_model.account_id not in self.ACCOUNT_ROLES and TransactionModel.account.is_cached(tx_model):
+                self.ACCOUNT_ROLES[tx_model.account_id] = tx_model.account.role
+
+        account_uuids = set(
+            tx_model.account_id for je_txs in self.TXS_MODELS.values() for tx_model in je_txs
+            if tx_model.account_id not in self.ACCOUNT_ROLES
+        )
+        if account_uuids:
+            AccountModel = lazy_loader.get_account_model()
+            self.ACCOUNT_ROLES.update(
+                AccountModel.objects.filter(uuid__in=account_uuids).values_list('uuid', 'role')
+            )
+
+    def get_txs_models(self, je_model) -> List[TransactionModel]:
+        return self.TXS_MODELS.get(je_model.uuid, list())
+
+    def get_txs_balances(self, je_model) -> Dict[str, Decimal]:
+        balances = {
+            CREDIT: Decimal('0.00'),
+            DEBIT: Decimal('0.00')
+        }
+        for tx_model in self.get_txs_models(je_model):
+            balances[tx_model.tx_type] += Decimal(tx_model.amount).quantize(Decimal('0.01'))
+        return balances
+
+    def get_txs_roles(self, je_model, exclude_cash_role: bool = False) -> Set[str]:
+        role_set = set(self.ACCOUNT_ROLES[tx_model.account_id] for tx_model in self.get_txs_models(je_model))
+        if exclude_cash_role:
+            role_set.discard(ASSET_CA_CASH)
+        return role_set
+
+
 class JournalEntryModelAbstract(CreateUpdateMixIn):
     """
     The base implementation of the JournalEntryModel.
@@ -342,6 +400,7 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
             models.Index(fields=['posted']),
             models.Index(fields=['je_number']),
             models.Index(fields=['is_closing_entry']),
+            models.Index(fields=['ledger', 'posted', 'is_closing_entry', 'timestamp']),
         ]
 
     def __str__(self):
@@ -363,6 +422,48 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
         super().__init__(*args, **kwargs)
         self._verified = False
         self._last_closing_date: Optional[date] = None
+        self.set_init_state()
+
+    def set_init_state(self):
+        # deferred fields are not loaded into __dict__...
+        self._posted_init = self.__dict__.get('posted')
+        self._locked_init = self.__dict__.get('locked')
+        self._timestamp_init = self.__dict__.get('timestamp')
+
+    def has_state_changed(self) -> bool:
+        """
+        Determines if the posted, locked or timestamp values have changed since the JournalEntryModel was loaded or
+        last saved.
+
+        Returns
+        -------
+        bool
+            True if any value changed, else False.
+        """
+        return any([
+            self._posted_init != self.__dict__.get('posted'),
+            self._locked_init != self.__dict__.get('locked'),
+            self._timestamp_init != self.__dict__.get('timestamp')
+        ])
+
+    def update_daily_balances(self, force_update: bool = False):
+        """
+        Updates the AccountDailyBalanceModel records affected by this JournalEntryModel if the posted, locked
+        or timestamp values changed. Only takes place if DJANGO_LEDGER_USE_DAILY_BALANCES is enabled.
+
+        Parameters
+        ----------
+        force_update: bool
+            Forces the update regardless of the JournalEntryModel state. Defaults to False.
+        """
+        if settings.DJANGO_LEDGER_USE_DAILY_BALANCES:
+            if force_update or all([
+                self.has_state_changed(),
+                any([self._posted_init, self.__dict__.get('posted')])
+            ]):
+                AccountDailyBalanceModel = lazy_loader.get_daily_balance_model()
+                AccountDailyBalanceModel.objects.refresh_for_journal_entries(je_models=[self])
+        self.set_init_state()
 
     def can_post(self, ignore_verify: bool = True) -> bool:
         """
@@ -920,7 +1021,8 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
     def generate_activity(self,
                           txs_qs: Optional[TransactionModelQuerySet] = None,
                           raise_exception: bool = True,
-                          force_update: bool = False) -> Optional[str]:
+                          force_update: bool = False,
+                          role_set: Optional[Set[str]] = None) -> Optional[str]:
 
         if raise_exception and self.is_closing_entry:
             raise_exception = False
@@ -931,6 +1033,16 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
             force_update
         ]):
 
+            # roles already resolved in memory, no need to query transactions...
+            if role_set is not None:
+                if ASSET_CA_CASH not in role_set:
+                    self.activity = None
+                else:
+                    self.activity = self.get_activity_from_roles(
+                        role_set=set(r for r in role_set if r != ASSET_CA_CASH)
+                    )
+                return self.activity
+
             txs_is_valid = True
             if not txs_qs:
                 txs_qs = self.get_transaction_queryset(select_accounts=False)
@@ -953,39 +1065,64 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
     # todo: add entity_model as parameter on all functions...
     # todo: outsource this function to EntityStateModel...?...
     def _get_next_state_model(self, raise_exception: bool = True) -> EntityStateModel:
-
         entity_model = EntityModel.objects.get(uuid__exact=self.ledger.entity_id)
         fy_key = entity_model.get_fy_for_date(dt=self.timestamp)
+        return EntityStateModel.objects.get_next_state_model(
+            entity_model_id=self.ledger.entity_id,
+            entity_unit_id=self.entity_unit_id,
+            fiscal_year=fy_key,
+            key=EntityStateModel.KEY_JOURNAL_ENTRY
+        )
 
-        try:
-            LOOKUP = {
-                'entity_model_id__exact': self.ledger.entity_id,
-                'entity_unit_id__exact': self.entity_unit_id,
-                'fiscal_year': fy_key,
-                'key__exact': EntityStateModel.KEY_JOURNAL_ENTRY
-            }
+    @classmethod
+    def reserve_je_numbers(cls,
+                           entity_model: EntityModel,
+                           fiscal_year: int,
+                           count: int,
+                           entity_unit_model=None) -> List[str]:
+        """
+        Atomic Transaction. Reserves a block of consecutive Journal Entry document numbers for the given fiscal year
+        and EntityUnitModel with a single EntityStateModel update, instead of one locked update per JournalEntryModel.
+        The block is reserved directly from the database, regardless of the DJANGO_LEDGER_DOCUMENT_NUMBER_BLOCK_SIZES
+        setting.
 
-            state_model_qs = EntityStateModel.objects.filter(**LOOKUP).select_related(
-                'entity_model').select_for_update()
-            state_model = state_model_qs.get()
-            state_model.sequence = F('sequence') + 1
-            state_model.save()
-            state_model.refresh_from_db()
-            return state_model
-
-        except ObjectDoesNotExist:
-            LOOKUP = {
-                'entity_model_id': entity_model.uuid,
-                'entity_unit_id': self.entity_unit_id,
-                'fiscal_year': fy_key,
-                'key': EntityStateModel.KEY_JOURNAL_ENTRY,
-                'sequence': 1
-            }
-            state_model = EntityStateModel.objects.create(**LOOKUP)
-            return state_model
-        except IntegrityError as e:
-            if raise_exception:
-                raise e
+        Parameters
+        ----------
+        entity_model: EntityModel
+            The EntityModel the Journal Entries belong to.
+        fiscal_year: int
+            The fiscal year of the Journal Entries.
+        count: int
+            The number of document numbers to reserve.
+        entity_unit_model: EntityUnitModel
+            Optional EntityUnitModel of the Journal Entries.
+
+        Returns
+        -------
+        list
+            The reserved document numbers, in sequence order.
+        """
+        if count <= 0:
+            return list()
+
+        state_model = EntityStateModel.objects.reserve_sequence_block(
+            entity_model_id=entity_model.uuid,
+            entity_unit_id=entity_unit_model.uuid if entity_unit_model else None,
+            fiscal_year=fiscal_year,
+            key=EntityStateModel.KEY_JOURNAL_ENTRY,
+            size=count
+        )
+
+        if entity_unit_model:
+            unit_prefix = entity_unit_model.document_prefix
+        else:
+            unit_prefix = DJANGO_LEDGER_JE_NUMBER_NO_UNIT_PREFIX
+
+        return [
+            f'{DJANGO_LEDGER_JE_NUMBER_PREFIX}-{fiscal_year}-{unit_prefix}-'
+            f'{str(seq).zfill(DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING)}'
+            for seq in range(state_model.sequence - count + 1, state_model.sequence + 1)
+        ]
 
     def can_generate_je_number(self) -> bool:
         """
@@ -1045,6 +1182,7 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
                txs_qs: Optional[TransactionModelQuerySet] = None,
                force_verify: bool = False,
                raise_exception: bool = True,
+               verification_context: Optional[JournalEntryVerificationContext] = None,
                **kwargs) -> Tuple[TransactionModelQuerySet, bool]:
 
         """
@@ -1061,6 +1199,9 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
             If True, forces new verification of JournalEntryModel if previously verified. Defaults to False.
         raise_exception: bool
             If True, will raise JournalEntryValidationError if verification fails.
+        verification_context: JournalEntryVerificationContext
+            In-memory TransactionModels of the JournalEntryModel. If provided, balances, roles and activity are
+            verified without any database query.
         kwargs: dict
             Additional function key-word args.
 
@@ -1072,11 +1213,22 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
         -------
         tuple: TransactionModelQuerySet, bool
             The TransactionModelQuerySet of the JournalEntryModel instance, verification result as True/False.
+            A list of TransactionModels is returned if a verification_context is provided.
         """
 
         if not self.is_verified() or force_verify:
             self._verified = False
 
+            if verification_context is not None:
+                balances = verification_context.get_txs_balances(self)
+                if balances[CREDIT] != balances[DEBIT]:
+                    raise JournalEntryValidationError('Transaction balances are not valid!')
+
+                self.generate_activity(raise_exception=raise_exception,
+                                       role_set=verification_context.get_txs_roles(self))
+                self._verified = True
+                return verification_context.get_txs_models(self), self.is_verified()
+
             # fetches JEModel TXS QuerySet if not provided....
             if not txs_qs:
                 txs_qs = self.get_transaction_queryset()
@@ -1113,7 +1265,9 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
     def clean(self,
               verify: bool = False,
               raise_exception: bool = True,
-              txs_qs: Optional[TransactionModelQuerySet] = None) -> Tuple[TransactionModelQuerySet, bool]:
+              txs_qs: Optional[TransactionModelQuerySet] = None,
+              verification_context: Optional[JournalEntryVerificationContext] = None
+              ) -> Tuple[TransactionModelQuerySet, bool]:
         """
         Customized JournalEntryModel clean method. Generates a JE number if needed. Optional verification hook on clean.
 
@@ -1126,6 +1280,8 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
         txs_qs: TransactionModelQuerySet
             Prefetched TransactionModelQuerySet. If provided avoids additional DB query. Will be verified against
             JournalEntryModel instance.
+        verification_context: JournalEntryVerificationContext
+            In-memory TransactionModels used for verification, if any.
 
         Returns
         -------
@@ -1147,7 +1303,7 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
 
         self.generate_je_number(commit=True)
         if verify:
-            txs_qs, verified = self.verify()
+            txs_qs, verified = self.verify(verification_context=verification_context)
             return txs_qs, self.is_verified()
         return TransactionModel.objects.none(), self.is_verified()
 
@@ -1164,6 +1320,7 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
     def save(self,
              verify: bool = True,
              post_on_verify: bool = False,
+             verification_context: Optional[JournalEntryVerificationContext] = None,
              *args, **kwargs):
         # todo this does not show up on docs...
         """
@@ -1176,6 +1333,9 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
             If True, verifies JournalEntryModel transactions before saving. Defaults to True.
         post_on_verify: bool
             Posts JournalEntryModel if verification is successful and can_post() is True.
+        verification_context: JournalEntryVerificationContext
+            In-memory TransactionModels used for verification, if any. Avoids fetching the transactions of a
+            JournalEntryModel which were just created.
 
         Returns
         -------
@@ -1185,7 +1345,7 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
         try:
             self.generate_je_number(commit=False)
             if verify:
-                txs_qs, is_verified = self.clean(verify=True)
+                txs_qs, is_verified = self.clean(verify=True, verification_context=verification_context)
                 if self.is_verified() and post_on_verify:
                     # commit is False since the super call takes place at the end of save()
                     # self.mark_as_locked(commit=False, raise_exception=True)
@@ -1206,7 +1366,11 @@ class JournalEntryModelAbstract(CreateUpdateMixIn):
         if not self.is_verified() and verify:
             raise JournalEntryValidationError(message='Cannot save an unverified Journal Entry.')
 
-        return super(JournalEntryModelAbstract, self).save(*args, **kwargs)
+        je_model = super(JournalEntryModelAbstract, self).save(*args, **kwargs)
+        if self.has_state_changed():
+            EntityModel.increment_data_version(entity_uuid=self.ledger.entity_id)
+        self.update_daily_balances()
+        return je_model
 
     # URLS Generation...
     def get_absolute_url(self) -> str:
@@ -27,20 +27,23 @@ The Django Ledger core model follows the following structure: \n
 EntityModel -< LedgerModel -< JournalEntryModel -< TransactionModel
 """
 from datetime import date
+from decimal import Decimal
 from string import ascii_lowercase, digits
-from typing import Optional
-from uuid import uuid4
+from typing import Optional, Dict
+from uuid import uuid4, UUID
 
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
-from django.db.models import Q, Min, F, Count
+from django.db.models import Q, Min, Max, F, Count
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+from django_ledger import settings
 from django_ledger.io.io_core import IOMixIn
 from django_ledger.models import lazy_loader
 from django_ledger.models.mixins import CreateUpdateMixIn
+from django_ledger.models.utils import get_entity_access_q
 
 LEDGER_ID_CHARS = ascii_lowercase + digits
 
@@ -129,8 +132,7 @@ class LedgerModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(entity__admin=user_model) |
-            Q(entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'entity')
         )
 
     def for_entity(self, entity_slug, user_model):
@@ -182,6 +184,7 @@ class LedgerModelAbstract(CreateUpdateMixIn, IOMixIn):
         Determines if the LedgerModel is hidden. Defaults to False. Mandatory.
     """
     _WRAPPED_MODEL_KEY = 'wrapped_model'
+    _STATE_SNAPSHOT_KEY = 'state_snapshot'
     uuid = models.UUIDField(default=uuid4, editable=False, primary_key=True)
     ledger_xid = models.SlugField(allow_unicode=True, max_length=150, null=True, blank=True,
                                   verbose_name=_('Ledger Slug'),
@@ -301,6 +304,79 @@ class LedgerModelAbstract(CreateUpdateMixIn, IOMixIn):
             wrapped_model = self.get_wrapped_model_instance()
             return wrapped_model.get_absolute_url()
 
+    def get_state_snapshot_fingerprint(self) -> str:
+        """
+        Identifies the posted state of the LedgerModel with a single query. Posting, unposting, creating or deleting
+        posted JournalEntryModels or their TransactionModels changes the fingerprint.
+
+        Returns
+        -------
+        str
+            The LedgerModel state fingerprint.
+        """
+        je_agg = self.journal_entries.posted().aggregate(
+            je_count=Count('uuid', distinct=True),
+            txs_count=Count('transactionmodel'),
+            je_updated=Max('updated')
+        )
+        je_updated = je_agg['je_updated'].isoformat() if je_agg['je_updated'] else None
+        return f'{self.posted}|{je_agg["je_count"]}|{je_agg["txs_count"]}|{je_updated}'
+
+    def get_state_snapshot(self, fingerprint: str) -> Optional[Dict]:
+        """
+        The balance snapshot of the LedgerModel, if still valid.
+
+        Parameters
+        ----------
+        fingerprint: str
+            The current LedgerModel state fingerprint. See get_state_snapshot_fingerprint.
+
+        Returns
+        -------
+        dict
+            The balances indexed by (account_uuid, unit_uuid, balance_type), or None if there is no snapshot or the
+            snapshot does not match the fingerprint.
+        """
+        if not self.additional_info:
+            return None
+        snapshot = self.additional_info.get(self._STATE_SNAPSHOT_KEY)
+        if not snapshot or snapshot['fingerprint'] != fingerprint:
+            return None
+        return {
+            (UUID(account_uuid), UUID(unit_uuid) if unit_uuid else None, balance_type): Decimal(balance)
+            for account_uuid, unit_uuid, balance_type, balance in snapshot['balances']
+        }
+
+    def set_state_snapshot(self, ledger_state: Dict, fingerprint: str, commit: bool = False):
+        """
+        Stores a balance snapshot of the LedgerModel. Zero balances are not stored.
+
+        Parameters
+        ----------
+        ledger_state: dict
+            The balances indexed by (account_uuid, unit_uuid, balance_type).
+        fingerprint: str
+            The LedgerModel state fingerprint the balances correspond to.
+        commit: bool
+            Commits the snapshot into the database. Defaults to False.
+        """
+        if self.additional_info is None:
+            self.additional_info = dict()
+
+        self.additional_info[self._STATE_SNAPSHOT_KEY] = {
+            'fingerprint': fingerprint,
+            'balances': [
+                [str(account_uuid), str(unit_uuid) if unit_uuid else None, balance_type, str(balance)]
+                for (account_uuid, unit_uuid, balance_type), balance in ledger_state.items() if balance
+            ]
+        }
+
+        if commit:
+            self.save(update_fields=[
+                'additional_info',
+                'updated'
+            ])
+
     def is_posted(self) -> bool:
         """
         Determines if the LedgerModel instance is posted.
@@ -450,6 +526,7 @@ class LedgerModelAbstract(CreateUpdateMixIn, IOMixIn):
                 'posted',
                 'updated'
             ])
+            self.update_entity_data()
 
     def post_journal_entries(self, commit: bool = True, **kwargs):
         je_model_qs = self.journal_entries.unposted()
@@ -457,8 +534,33 @@ class LedgerModelAbstract(CreateUpdateMixIn, IOMixIn):
             je_model.mark_as_posted(raise_exception=False, commit=False)
         if commit:
             je_model_qs.bulk_update(objs=je_model_qs, fields=['posted', 'updated'])
+            self.update_entity_data()
         return je_model_qs
 
+    def update_entity_data(self, daily_balances: bool = True):
+        """
+        Increments the EntityModel data version after a LedgerModel state change, which invalidates any cached
+        digest. Optionally updates the affected AccountDailyBalanceModel records.
+
+        Parameters
+        ----------
+        daily_balances: bool
+            Updates the AccountDailyBalanceModel records. Defaults to True.
+        """
+        EntityModel = lazy_loader.get_entity_model()
+        EntityModel.increment_data_version(entity_uuid=self.entity_id)
+        if daily_balances:
+            self.update_daily_balances()
+
+    def update_daily_balances(self):
+        """
+        Updates the AccountDailyBalanceModel records affected by the LedgerModel JournalEntryModels.
+        Only takes place if DJANGO_LEDGER_USE_DAILY_BALANCES is enabled.
+        """
+        if settings.DJANGO_LEDGER_USE_DAILY_BALANCES:
+            AccountDailyBalanceModel = lazy_loader.get_daily_balance_model()
+            AccountDailyBalanceModel.objects.refresh_for_ledger(ledger_model=self)
+
     def unpost(self, commit: bool = False, raise_exception: bool = True, **kwargs):
         """
         Un-posts the LedgerModel.
@@ -482,6 +584,7 @@ class LedgerModelAbstract(CreateUpdateMixIn, IOMixIn):
                 'posted',
                 'updated'
             ])
+            self.update_entity_data()
 
     def lock(self, commit: bool = False, raise_exception: bool = True, **kwargs):
         """
@@ -507,6 +610,7 @@ class LedgerModelAbstract(CreateUpdateMixIn, IOMixIn):
                 'locked',
                 'updated'
             ])
+            self.update_entity_data(daily_balances=False)
 
     def lock_journal_entries(self, commit: bool = True, **kwargs):
         je_model_qs = self.journal_entries.unlocked()
@@ -514,6 +618,7 @@ class LedgerModelAbstract(CreateUpdateMixIn, IOMixIn):
             je_model.mark_as_locked(raise_exception=False, commit=False)
         if commit:
             je_model_qs.bulk_update(objs=je_model_qs, fields=['locked', 'updated'])
+            self.update_entity_data()
         return je_model_qs
 
     def unlock(self, commit: bool = False, **kwargs):
@@ -532,6 +637,7 @@ class LedgerModelAbstract(CreateUpdateMixIn, IOMixIn):
                     'locked',
                     'updated'
                 ])
+                self.update_entity_data(daily_balances=False)
 
     def hide(self, commit: bool = False, raise_exception: bool = True, **kwargs):
         if not self.can_hide():
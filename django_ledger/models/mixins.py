@@ -13,19 +13,20 @@ from collections import defaultdict
 from datetime import timedelta, date, datetime
 from decimal import Decimal
 from itertools import groupby
-from typing import Optional, Union, Dict
+from typing import Optional, Union, Dict, List, Tuple, Iterable
 from uuid import UUID
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator, MinLengthValidator
 from django.core.validators import int_list_validator
-from django.db import models
-from django.db.models import QuerySet
+from django.db import models, transaction
+from django.db.models import QuerySet, Sum
 from django.utils.encoding import force_str
 from django.utils.translation import gettext_lazy as _
 from markdown import markdown
 
+from django_ledger import settings as ledger_settings
 from django_ledger.io.io_core import validate_io_timestamp, check_tx_balance, get_localtime, get_localdate
 from django_ledger.models.utils import lazy_loader
 
@@ -541,6 +542,401 @@ class AccrualMixIn(models.Model):
                 raise ValidationError(f'Bill ledger {ledger_model.name} is not posted...')
         ledger_model.post(commit)
 
+    def get_migration_ledger_state(self, item_data: List[Dict], commit: bool = False, void: bool = False) -> Dict:
+        """
+        Determines the ledger state that reflects the current financial instrument state, based on its progress and
+        item transaction data.
+
+        Parameters
+        ----------
+        item_data: list
+            The item transaction data returned by get_migration_data.
+        commit: bool
+            Commits the new financial instrument state into the model.
+        void: bool
+            If True, determines the VOID state of the financial instrument.
+
+        Returns
+        -------
+        dict
+            The new ledger balances, indexed by (account_uuid, unit_uuid, balance_type).
+        """
+        cogs_adjustment = defaultdict(lambda: Decimal('0.00'))
+        inventory_adjustment = defaultdict(lambda: Decimal('0.00'))
+        progress = self.get_progress()
+
+        if isinstance(self, lazy_loader.get_bill_model()):
+
+            for item in item_data:
+                account_uuid_expense = item.get('item_model__expense_account__uuid')
+                account_uuid_inventory = item.get('item_model__inventory_account__uuid')
+                if account_uuid_expense:
+                    item['account_uuid'] = account_uuid_expense
+                    item['account_balance_type'] = item.get('item_model__expense_account__balance_type')
+                elif account_uuid_inventory:
+                    item['account_uuid'] = account_uuid_inventory
+                    item['account_balance_type'] = item.get('item_model__inventory_account__balance_type')
+
+        elif isinstance(self, lazy_loader.get_invoice_model()):
+
+            for item in item_data:
+
+                account_uuid_earnings = item.get('item_model__earnings_account__uuid')
+                account_uuid_cogs = item.get('item_model__cogs_account__uuid')
+                account_uuid_inventory = item.get('item_model__inventory_account__uuid')
+
+                if account_uuid_earnings:
+                    item['account_uuid'] = account_uuid_earnings
+                    item['account_balance_type'] = item.get('item_model__earnings_account__balance_type')
+
+                if account_uuid_cogs and account_uuid_inventory:
+
+                    try:
+                        irq = item.get('item_model__inventory_received')
+                        irv = item.get('item_model__inventory_received_value')
+                        # kept up to date by the perpetual inventory, if enabled...
+                        cogs_unit_cost = item.get('item_model__inventory_unit_cost')
+                        tot_amt = 0
+                        if cogs_unit_cost is None and irq is not None and irv is not None and irq != 0:
+                            cogs_unit_cost = irv / irq
+                        if cogs_unit_cost:
+                            qty = item.get('quantity', Decimal('0.00'))
+                            if not isinstance(qty, Decimal):
+                                qty = Decimal.from_float(qty)
+                            tot_amt = round(cogs_unit_cost * qty, 2)
+                    except ZeroDivisionError:
+                        tot_amt = 0
+
+                    if tot_amt != 0:
+                        # keeps track of necessary transactions to increase COGS account...
+                        cogs_adjustment[(
+                            account_uuid_cogs,
+                            item.get('entity_unit__uuid'),
+                            item.get('item_model__cogs_account__balance_type')
+                        )] += tot_amt * progress
+
+                        # keeps track of necessary transactions to reduce inventory account...
+                        inventory_adjustment[(
+                            account_uuid_inventory,
+                            item.get('entity_unit__uuid'),
+                            item.get('item_model__inventory_account__balance_type')
+                        )] -= tot_amt * progress
+
+        item_data_gb = groupby(item_data,
+                               key=lambda a: (a['account_uuid'],
+                                              a['entity_unit__uuid'],
+                                              a['account_balance_type']))
+
+        # scaling down item amount based on progress...
+        progress_item_idx = {
+            idx: round(sum(a['account_unit_total'] for a in ad) * progress, 2) for idx, ad in item_data_gb
+        }
+
+        # tuple ( unit_uuid, total_amount ) sorted by uuid...
+        # sorting before group by...
+        ua_gen = list((k[1], v) for k, v in progress_item_idx.items())
+        ua_gen.sort(key=lambda a: str(a[0]) if a[0] else '')
+
+        unit_amounts = {
+            u: sum(a[1] for a in l) for u, l in groupby(ua_gen, key=lambda x: x[0])
+        }
+        total_amount = sum(unit_amounts.values())
+
+        # { unit_uuid: float (percent) }
+        unit_percents = {
+            k: (v / total_amount) if progress and total_amount else Decimal('0.00') for k, v in unit_amounts.items()
+        }
+
+        if not void:
+            new_state = self.get_state(commit=commit)
+        else:
+            new_state = self.void_state(commit=commit)
+
+        amount_paid_split = self.split_amount(
+            amount=new_state['amount_paid'],
+            unit_split=unit_percents,
+            account_uuid=self.cash_account_id,
+            account_balance_type='debit'
+        )
+        amount_prepaid_split = self.split_amount(
+            amount=new_state['amount_receivable'],
+            unit_split=unit_percents,
+            account_uuid=self.prepaid_account_id,
+            account_balance_type='debit'
+        )
+        amount_unearned_split = self.split_amount(
+            amount=new_state['amount_unearned'],
+            unit_split=unit_percents,
+            account_uuid=self.unearned_account_id,
+            account_balance_type='credit'
+        )
+
+        new_ledger_state = dict()
+        new_ledger_state.update(amount_paid_split)
+        new_ledger_state.update(amount_prepaid_split)
+        new_ledger_state.update(amount_unearned_split)
+
+        if inventory_adjustment and cogs_adjustment:
+            new_ledger_state.update(cogs_adjustment)
+            new_ledger_state.update(inventory_adjustment)
+
+        new_ledger_state.update(progress_item_idx)
+        return new_ledger_state
+
+    @staticmethod
+    def get_ledger_state_diff(current_ledger_state: Dict, new_ledger_state: Dict) -> Dict:
+        """
+        Determines the adjustments needed to take the ledger from its current state to the new state.
+
+        Parameters
+        ----------
+        current_ledger_state: dict
+            The current ledger balances, indexed by (account_uuid, unit_uuid, balance_type).
+        new_ledger_state: dict
+            The new ledger balances, indexed by (account_uuid, unit_uuid, balance_type).
+
+        Returns
+        -------
+        dict
+            The non-zero adjustments, indexed by (account_uuid, unit_uuid, balance_type).
+        """
+        # list of all keys involved
+        idx_keys = set(list(current_ledger_state) + list(new_ledger_state))
+
+        # difference between new vs current
+        diff_idx = {
+            k: new_ledger_state.get(k, Decimal('0.00')) - current_ledger_state.get(k, Decimal('0.00')) for k in
+            idx_keys
+        }
+
+        # eliminates transactions with no amount...
+        return {
+            k: v for k, v in diff_idx.items() if v
+        }
+
+    @classmethod
+    def get_ledger_states(cls, ledger_uuids: Iterable[UUID]) -> Dict[UUID, Dict]:
+        """
+        Determines the current state of many LedgerModels with a single query. The balances are the same as the ones
+        determined by migrate_state from the LedgerModel digest.
+
+        Parameters
+        ----------
+        ledger_uuids: iterable
+            The LedgerModel UUIDs.
+
+        Returns
+        -------
+        dict
+            The ledger balances indexed by (account_uuid, unit_uuid, balance_type), by LedgerModel UUID.
+        """
+        TransactionModel = lazy_loader.get_txs_model()
+        txs_qs = TransactionModel.objects.filter(
+            journal_entry__ledger__uuid__in=list(ledger_uuids)
+        ).not_closing_entry().posted().values(
+            'journal_entry__ledger__uuid',
+            'journal_entry__entity_unit__uuid',
+            'account__uuid',
+            'account__balance_type',
+            'tx_type'
+        ).annotate(
+            amount_total=Sum('amount')
+        ).order_by()
+
+        ledger_states = defaultdict(lambda: defaultdict(lambda: Decimal('0.00')))
+        for tx in txs_qs:
+            balance_type = tx['account__balance_type']
+            ledger_states[tx['journal_entry__ledger__uuid']][(
+                tx['account__uuid'],
+                tx['journal_entry__entity_unit__uuid'],
+                balance_type
+            )] += tx['amount_total'] if tx['tx_type'] == balance_type else -tx['amount_total']
+        return ledger_states
+
+    @classmethod
+    def migrate_state_many(cls,
+                           models_list: List,
+                           entity_model,
+                           je_timestamp: Optional[Union[str, date, datetime]] = None) -> Dict:
+        """
+        Migrates the state of many financial instruments of the same EntityModel into the books at once. The current
+        ledger states and the item transaction data of all instruments are fetched with one query each, the new
+        states are determined in memory, and all resulting JournalEntryModels and TransactionModels are bulk created
+        through commit_txs_bulk. One posted JournalEntryModel is created per instrument and EntityUnitModel.
+
+        All instruments must be eligible for migration. Raises ValidationError if any JournalEntryModel could not be
+        committed, in which case nothing is committed.
+
+        Parameters
+        ----------
+        models_list: list
+            The financial instruments to migrate, with their new state already determined in memory. The ledger and
+            the cash, prepaid and unearned accounts should be selected.
+        entity_model: EntityModel
+            The EntityModel all financial instruments belong to.
+        je_timestamp: date
+            The JournalEntryModel date to be used for this migration. Defaults to localtime.
+
+        Returns
+        -------
+        dict
+            The new JournalEntryModels by financial instrument UUID.
+        """
+        AccountModel = lazy_loader.get_account_model()
+        EntityUnitModel = lazy_loader.get_entity_unit_model()
+        ItemTransactionModel = lazy_loader.get_item_transaction_model()
+        TransactionModel = lazy_loader.get_txs_model()
+
+        je_timestamp = validate_io_timestamp(dt=je_timestamp) if je_timestamp else get_localtime()
+        ledger_states = cls.get_ledger_states(ledger_uuids=[m.ledger_id for m in models_list])
+
+        rel_field = f'{cls.REL_NAME_PREFIX}_model__uuid'
+        itemtxs_qs = ItemTransactionModel.objects.filter(**{f'{rel_field}__in': [m.uuid for m in models_list]})
+        item_data = defaultdict(list)
+        for item in cls.get_migration_data_values(itemtxs_qs, rel_field):
+            item_data[item.pop(rel_field)].append(item)
+
+        diffs = {
+            m.uuid: cls.get_ledger_state_diff(
+                current_ledger_state=ledger_states[m.ledger_id],
+                new_ledger_state=m.get_migration_ledger_state(item_data=item_data[m.uuid], commit=True)
+            ) for m in models_list
+        }
+
+        account_uuids = set(k[0] for diff_idx in diffs.values() for k in diff_idx)
+        unit_uuids = set(k[1] for diff_idx in diffs.values() for k in diff_idx if k[1])
+        account_models = {a.uuid: a for a in AccountModel.objects.filter(uuid__in=account_uuids)}
+        unit_models = {u.uuid: u for u in EntityUnitModel.objects.filter(uuid__in=unit_uuids)}
+
+        entries = list()
+        for m in models_list:
+            diff_idx = diffs[m.uuid]
+            for unit_uuid in set(k[1] for k in diff_idx):
+                txs_models = [
+                    TransactionModel(
+                        account=account_models[acc_uuid],
+                        amount=abs(round(amt, 2)),
+                        tx_type=m.get_tx_type(acc_bal_type=bal_type, adjustment_amount=amt),
+                        description=m.get_migrate_state_desc()
+                    ) for (acc_uuid, u, bal_type), amt in diff_idx.items() if u == unit_uuid
+                ]
+                check_tx_balance(tx_data=txs_models, perform_correction=True)
+                entries.append((m, {
+                    'je_timestamp': je_timestamp,
+                    'je_ledger_model': m.ledger,
+                    'je_unit_model': unit_models.get(unit_uuid),
+                    'je_desc': m.get_migrate_state_desc(),
+                    'je_origin': 'migration',
+                    'je_posted': True,
+                    'je_txs': [{
+                        'account': tx.account,
+                        'amount': tx.amount,
+                        'tx_type': tx.tx_type,
+                        'description': tx.description
+                    } for tx in txs_models]
+                }))
+
+        je_models = defaultdict(list)
+        with transaction.atomic():
+            bulk_result = entity_model.commit_txs_bulk(entries=[entry for _, entry in entries])
+            if bulk_result.has_errors():
+                i, error = next(iter(bulk_result.errors.items()))
+                raise ValidationError(f'{cls.REL_NAME_PREFIX.upper()} {entries[i][0].uuid} migration failed: {error}')
+
+        for i, je_model in bulk_result.je_models.items():
+            je_models[entries[i][0].uuid].append(je_model)
+        return je_models
+
+    @classmethod
+    def make_payment_many(cls,
+                          models_list: Iterable,
+                          payment_date: Optional[Union[date, datetime]] = None,
+                          cash_account=None,
+                          payment_amounts: Optional[Dict] = None) -> Tuple[List, Dict]:
+        """
+        Applies payments to many financial instruments of the same EntityModel at once. The new state of every
+        instrument is determined in memory, the resulting JournalEntryModels and TransactionModels are bulk created by
+        migrate_state_many, and all instruments are updated with a single query.
+
+        Instruments that cannot accept the payment are skipped and reported. The remaining payments are committed
+        in a single database transaction.
+
+        Parameters
+        ----------
+        models_list: iterable
+            The financial instruments or UUIDs to apply payments to.
+        payment_date: date or datetime
+            Date or timestamp of the payments. Defaults to localtime.
+        cash_account: AccountModel
+            Optional cash AccountModel of the payment run. Instruments using a different cash account are skipped.
+        payment_amounts: dict
+            Optional payment amount by instrument UUID. Defaults to the open amount of each instrument.
+
+        Returns
+        -------
+        tuple
+            The paid financial instruments and the errors of the skipped ones, by UUID.
+        """
+        payment_amounts = payment_amounts or dict()
+        if not payment_date:
+            payment_date = get_localtime()
+
+        model_uuids = [getattr(m, 'uuid', m) for m in models_list]
+        paid_models = list()
+        errors = dict()
+
+        with transaction.atomic():
+            models_qs = cls.objects.filter(uuid__in=model_uuids).select_related(
+                'ledger',
+                'ledger__entity',
+                'cash_account',
+                'prepaid_account',
+                'unearned_account'
+            ).select_for_update(of=('self',))
+
+            entity_model = None
+            for model in models_qs:
+                if entity_model is None:
+                    entity_model = model.ledger.entity
+                try:
+                    if model.ledger.entity_id != entity_model.uuid:
+                        raise ValidationError(_('All payments must belong to the same entity.'))
+                    if not model.can_make_payment() or not model.can_migrate():
+                        raise ValidationError(_(f'{cls.REL_NAME_PREFIX.upper()} {model.uuid} cannot accept payments.'))
+                    if cash_account is not None and model.cash_account_id != cash_account.uuid:
+                        raise ValidationError(_(f'{cls.REL_NAME_PREFIX.upper()} cash account must be {cash_account}.'))
+
+                    payment_amount = payment_amounts.get(model.uuid, model.amount_due - model.amount_paid)
+                    if payment_amount <= 0:
+                        raise ValidationError(_('Payment amount must be greater than zero.'))
+
+                    model.make_payment(payment_amount=payment_amount,
+                                       payment_date=payment_date,
+                                       commit=False,
+                                       raise_exception=True)
+                    paid_models.append(model)
+                except ValidationError as e:
+                    errors[model.uuid] = e
+
+            for model_uuid in set(model_uuids).difference(m.uuid for m in paid_models).difference(errors):
+                errors[model_uuid] = ValidationError(_(f'{cls.REL_NAME_PREFIX.upper()} {model_uuid} not found.'))
+
+            if paid_models:
+                cls.migrate_state_many(models_list=paid_models, entity_model=entity_model, je_timestamp=payment_date)
+
+                updated = get_localtime()
+                for model in paid_models:
+                    model.updated = updated
+                cls.objects.bulk_update(paid_models, fields=[
+                    'amount_paid',
+                    'amount_earned',
+                    'amount_unearned',
+                    'amount_receivable',
+                    'updated'
+                ])
+
+        return paid_models, errors
+
     def migrate_state(self,
                       # todo: remove usermodel param...
                       user_model,
@@ -581,165 +977,59 @@ class AccrualMixIn(models.Model):
         Returns
         -------
         tuple
-            A tuple of the ItemTransactionModel and the Digest Result from IOMixIn.
+            A tuple of the ItemTransactionModel and the Digest Result from IOMixIn. The Digest Result is None if the
+            current ledger state was read from the LedgerModel state snapshot.
         """
 
         if self.can_migrate() or force_migrate:
 
-            # getting current ledger state
-            # todo: validate itemtxs_qs...?
-            io_digest = self.ledger.digest(
-                user_model=user_model,
-                entity_slug=entity_slug,
-                process_groups=True,
-                process_roles=False,
-                process_ratios=False,
-                signs=False,
-                by_unit=True
-            )
-
-            io_data = io_digest.get_io_data()
+            io_data = None
+            current_ledger_state = None
+            use_state_snapshot = ledger_settings.DJANGO_LEDGER_USE_LEDGER_STATE_SNAPSHOTS
+
+            # getting current ledger state from the snapshot, if still valid...
+            if use_state_snapshot:
+                state_fingerprint = self.ledger.get_state_snapshot_fingerprint()
+                current_ledger_state = self.ledger.get_state_snapshot(fingerprint=state_fingerprint)
+            state_snapshot_valid = current_ledger_state is not None
+
+            if current_ledger_state is None or ledger_settings.DJANGO_LEDGER_VERIFY_LEDGER_STATE_SNAPSHOTS:
+                # getting current ledger state
+                # todo: validate itemtxs_qs...?
+                io_digest = self.ledger.digest(
+                    user_model=user_model,
+                    entity_slug=entity_slug,
+                    process_groups=True,
+                    process_roles=False,
+                    process_ratios=False,
+                    signs=False,
+                    by_unit=True
+                )
+
+                io_data = io_digest.get_io_data()
+
+                accounts_data = io_data['accounts']
+
+                # Index (account_uuid, unit_uuid, balance_type, role)
+                digest_ledger_state = {
+                    (a['account_uuid'], a['unit_uuid'], a['balance_type']): a['balance'] for a in accounts_data
+                    # (a['account_uuid'], a['unit_uuid'], a['balance_type'], a['role']): a['balance'] for a in digest_data
+                }
 
-            accounts_data = io_data['accounts']
+                if current_ledger_state is not None:
+                    if {k: v for k, v in current_ledger_state.items() if v} != {
+                        k: v for k, v in digest_ledger_state.items() if v
+                    }:
+                        raise ValidationError(f'Ledger {self.ledger_id} state snapshot does not match its digest.')
 
-            # Index (account_uuid, unit_uuid, balance_type, role)
-            current_ledger_state = {
-                (a['account_uuid'], a['unit_uuid'], a['balance_type']): a['balance'] for a in accounts_data
-                # (a['account_uuid'], a['unit_uuid'], a['balance_type'], a['role']): a['balance'] for a in digest_data
-            }
+                current_ledger_state = digest_ledger_state
 
             item_data = list(self.get_migration_data(queryset=itemtxs_qs))
-            cogs_adjustment = defaultdict(lambda: Decimal('0.00'))
-            inventory_adjustment = defaultdict(lambda: Decimal('0.00'))
-            progress = self.get_progress()
-
-            if isinstance(self, lazy_loader.get_bill_model()):
-
-                for item in item_data:
-                    account_uuid_expense = item.get('item_model__expense_account__uuid')
-                    account_uuid_inventory = item.get('item_model__inventory_account__uuid')
-                    if account_uuid_expense:
-                        item['account_uuid'] = account_uuid_expense
-                        item['account_balance_type'] = item.get('item_model__expense_account__balance_type')
-                    elif account_uuid_inventory:
-                        item['account_uuid'] = account_uuid_inventory
-                        item['account_balance_type'] = item.get('item_model__inventory_account__balance_type')
-
-            elif isinstance(self, lazy_loader.get_invoice_model()):
-
-                for item in item_data:
-
-                    account_uuid_earnings = item.get('item_model__earnings_account__uuid')
-                    account_uuid_cogs = item.get('item_model__cogs_account__uuid')
-                    account_uuid_inventory = item.get('item_model__inventory_account__uuid')
-
-                    if account_uuid_earnings:
-                        item['account_uuid'] = account_uuid_earnings
-                        item['account_balance_type'] = item.get('item_model__earnings_account__balance_type')
-
-                    if account_uuid_cogs and account_uuid_inventory:
-
-                        try:
-                            irq = item.get('item_model__inventory_received')
-                            irv = item.get('item_model__inventory_received_value')
-                            tot_amt = 0
-                            if irq is not None and irv is not None and irq != 0:
-                                qty = item.get('quantity', Decimal('0.00'))
-                                if not isinstance(qty, Decimal):
-                                    qty = Decimal.from_float(qty)
-                                cogs_unit_cost = irv / irq
-                                tot_amt = round(cogs_unit_cost * qty, 2)
-                        except ZeroDivisionError:
-                            tot_amt = 0
-
-                        if tot_amt != 0:
-                            # keeps track of necessary transactions to increase COGS account...
-                            cogs_adjustment[(
-                                account_uuid_cogs,
-                                item.get('entity_unit__uuid'),
-                                item.get('item_model__cogs_account__balance_type')
-                            )] += tot_amt * progress
-
-                            # keeps track of necessary transactions to reduce inventory account...
-                            inventory_adjustment[(
-                                account_uuid_inventory,
-                                item.get('entity_unit__uuid'),
-                                item.get('item_model__inventory_account__balance_type')
-                            )] -= tot_amt * progress
-
-            item_data_gb = groupby(item_data,
-                                   key=lambda a: (a['account_uuid'],
-                                                  a['entity_unit__uuid'],
-                                                  a['account_balance_type']))
-
-            # scaling down item amount based on progress...
-            progress_item_idx = {
-                idx: round(sum(a['account_unit_total'] for a in ad) * progress, 2) for idx, ad in item_data_gb
-            }
-
-            # tuple ( unit_uuid, total_amount ) sorted by uuid...
-            # sorting before group by...
-            ua_gen = list((k[1], v) for k, v in progress_item_idx.items())
-            ua_gen.sort(key=lambda a: str(a[0]) if a[0] else '')
-
-            unit_amounts = {
-                u: sum(a[1] for a in l) for u, l in groupby(ua_gen, key=lambda x: x[0])
-            }
-            total_amount = sum(unit_amounts.values())
-
-            # { unit_uuid: float (percent) }
-            unit_percents = {
-                k: (v / total_amount) if progress and total_amount else Decimal('0.00') for k, v in unit_amounts.items()
-            }
-
-            if not void:
-                new_state = self.get_state(commit=commit)
-            else:
-                new_state = self.void_state(commit=commit)
-
-            amount_paid_split = self.split_amount(
-                amount=new_state['amount_paid'],
-                unit_split=unit_percents,
-                account_uuid=self.cash_account_id,
-                account_balance_type='debit'
-            )
-            amount_prepaid_split = self.split_amount(
-                amount=new_state['amount_receivable'],
-                unit_split=unit_percents,
-                account_uuid=self.prepaid_account_id,
-                account_balance_type='debit'
-            )
-            amount_unearned_split = self.split_amount(
-                amount=new_state['amount_unearned'],
-                unit_split=unit_percents,
-                account_uuid=self.unearned_account_id,
-                account_balance_type='credit'
-            )
-
-            new_ledger_state = dict()
-            new_ledger_state.update(amount_paid_split)
-            new_ledger_state.update(amount_prepaid_split)
-            new_ledger_state.update(amount_unearned_split)
-
-            if inventory_adjustment and cogs_adjustment:
-                new_ledger_state.update(cogs_adjustment)
-                new_ledger_state.update(inventory_adjustment)
-
-            new_ledger_state.update(progress_item_idx)
+            new_ledger_state = self.get_migration_ledger_state(item_data=item_data, commit=commit, void=void)
 
             # list of all keys involved
             idx_keys = set(list(current_ledger_state) + list(new_ledger_state))
-
-            # difference between new vs current
-            diff_idx = {
-                k: new_ledger_state.get(k, Decimal('0.00')) - current_ledger_state.get(k, Decimal('0.00')) for k in
-                idx_keys
-            }
-
-            # eliminates transactions with no amount...
-            diff_idx = {
-                k: v for k, v in diff_idx.items() if v
-            }
+            diff_idx = self.get_ledger_state_diff(current_ledger_state, new_ledger_state)
 
             if commit:
                 JournalEntryModel = lazy_loader.get_journal_entry_model()
@@ -774,8 +1064,11 @@ class AccrualMixIn(models.Model):
                     )) for (acc_uuid, unit_uuid, bal_type), amt in diff_idx.items() if amt
                 ]
 
-                for unit_uuid, tx in txs_list:
-                    tx.clean()
+                # root accounts of all transactions are resolved at once...
+                txs_validation_batch = lazy_loader.get_txs_validation_batch_context()
+                with txs_validation_batch(txs_models=[tx for _, tx in txs_list]):
+                    for unit_uuid, tx in txs_list:
+                        tx.clean()
 
                 for uid in unit_uuids:
                     # validates each unit txs independently...
@@ -786,9 +1079,13 @@ class AccrualMixIn(models.Model):
                 check_tx_balance(tx_data=txs, perform_correction=True)
                 TransactionModel.objects.bulk_create(txs)
 
+                # account roles of all units are resolved at once...
+                JournalEntryVerificationContext = lazy_loader.get_je_verification_context_class()
+                verification_context = JournalEntryVerificationContext(txs_models=txs)
+
                 for _, je in je_list.items():
                     # will independently verify and populate appropriate activity for JE.
-                    je.clean(verify=True)
+                    je.clean(verify=True, verification_context=verification_context)
                     if je.is_verified():
                         je.mark_as_locked(commit=False, raise_exception=True)
                         je.mark_as_posted(commit=False, verify=False, raise_exception=True)
@@ -800,6 +1097,40 @@ class AccrualMixIn(models.Model):
                         fields=['posted', 'locked', 'activity']
                     )
 
+                    if use_state_snapshot:
+                        # the new state is the current state plus the posted migration transactions...
+                        new_snapshot_state = defaultdict(lambda: Decimal('0.00'), current_ledger_state)
+                        if self.ledger.is_posted():
+                            balance_types = {acc_uuid: bal_type for acc_uuid, _, bal_type in diff_idx}
+                            for unit_uuid, tx in txs_list:
+                                bal_type = balance_types[tx.account_id]
+                                new_snapshot_state[(tx.account_id, unit_uuid, bal_type)] += (
+                                    tx.amount if tx.tx_type == bal_type else -tx.amount
+                                )
+                        self.ledger.set_state_snapshot(
+                            ledger_state=new_snapshot_state,
+                            fingerprint=self.ledger.get_state_snapshot_fingerprint(),
+                            commit=True
+                        )
+
+                    EntityModel = lazy_loader.get_entity_model()
+                    EntityModel.increment_data_version(entity_uuid=self.ledger.entity_id)
+
+                    if ledger_settings.DJANGO_LEDGER_USE_DAILY_BALANCES:
+                        AccountDailyBalanceModel = lazy_loader.get_daily_balance_model()
+                        AccountDailyBalanceModel.objects.refresh_for_journal_entries(
+                            je_models=[je for _, je in je_list.items()],
+                            entity_model=entity_slug
+                        )
+
+                elif use_state_snapshot and not diff_idx and not state_snapshot_valid:
+                    # nothing was posted, the current state is still accurate...
+                    self.ledger.set_state_snapshot(
+                        ledger_state=current_ledger_state,
+                        fingerprint=state_fingerprint,
+                        commit=True
+                    )
+
             return item_data, io_data
         else:
             if raise_exception:
@@ -1364,14 +1695,26 @@ class ItemizeMixIn(models.Model):
 
                 if operation == self.ITEMIZE_APPEND:
                     ItemTransactionModel.objects.bulk_create(objs=itemtxs_batch)
+                    self.update_perpetual_inventory()
                     itemtxs_qs, _ = self.get_itemtxs_data(lazy_agg=True)
                     return itemtxs_qs
                 elif operation == self.ITEMIZE_REPLACE:
                     itemtxs_qs, _ = self.get_itemtxs_data(lazy_agg=True)
                     itemtxs_qs.delete()
-                    return ItemTransactionModel.objects.bulk_create(objs=itemtxs_batch)
+                    itemtxs_batch = ItemTransactionModel.objects.bulk_create(objs=itemtxs_batch)
+                    self.update_perpetual_inventory()
+                    return itemtxs_batch
             return itemtxs_batch
 
+    def update_perpetual_inventory(self):
+        """
+        Posts the ItemTransactionModels of the financial instrument to the perpetual inventory of their ItemModels.
+        Only takes place if DJANGO_LEDGER_USE_PERPETUAL_INVENTORY is enabled.
+        """
+        if ledger_settings.DJANGO_LEDGER_USE_PERPETUAL_INVENTORY:
+            ItemTransactionModel = lazy_loader.get_item_transaction_model()
+            ItemTransactionModel.objects.post_inventory(itemtxs_qs=self.itemtransactionmodel_set.all())
+
     def validate_itemtxs_qs(self):
         """
         Validates that the provided item transaction list is valid.
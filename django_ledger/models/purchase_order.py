@@ -22,10 +22,10 @@ from typing import Tuple, List, Union, Optional, Dict
 from uuid import uuid4
 
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError, ObjectDoesNotExist
+from django.core.exceptions import ValidationError
 from django.core.validators import MinLengthValidator
-from django.db import models, transaction, IntegrityError
-from django.db.models import Q, Sum, Count, F
+from django.db import models, transaction
+from django.db.models import Q, Sum, Count
 from django.db.models.functions import Coalesce
 from django.db.models.signals import pre_save
 from django.shortcuts import get_object_or_404
@@ -37,7 +37,7 @@ from django_ledger.models.bill import BillModel, BillModelQuerySet
 from django_ledger.models.entity import EntityModel
 from django_ledger.models.items import ItemTransactionModel, ItemTransactionModelQuerySet, ItemModelQuerySet, ItemModel
 from django_ledger.models.mixins import CreateUpdateMixIn, MarkdownNotesMixIn, ItemizeMixIn
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 from django_ledger.settings import DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING, DJANGO_LEDGER_PO_NUMBER_PREFIX
 
 PO_NUMBER_CHARS = ascii_uppercase + digits
@@ -106,8 +106,7 @@ class PurchaseOrderModelManager(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(entity__admin=user_model) |
-            Q(entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'entity')
         )
 
     def for_entity(self, entity_slug, user_model) -> PurchaseOrderModelQuerySet:
@@ -122,7 +121,7 @@ class PurchaseOrderModelManager(models.Manager):
         """
         qs = self.for_user(user_model)
         if isinstance(entity_slug, EntityModel):
-            qs = qs.filter(entity=entity_slug)
+            return qs.filter(entity=entity_slug)
         return qs.filter(entity__slug__exact=entity_slug)
 
 
@@ -983,6 +982,7 @@ class PurchaseOrderModelAbstract(CreateUpdateMixIn,
                 'po_status',
                 'updated'
             ])
+            self.update_perpetual_inventory()
 
     def get_mark_as_fulfilled_html_id(self):
         """
@@ -1057,6 +1057,7 @@ class PurchaseOrderModelAbstract(CreateUpdateMixIn,
                 'po_status',
                 'updated'
             ])
+            self.update_perpetual_inventory()
 
     def get_mark_as_void_html_id(self):
         """
@@ -1134,38 +1135,12 @@ class PurchaseOrderModelAbstract(CreateUpdateMixIn,
         EntityModel = lazy_loader.get_entity_model()
         entity_model = EntityModel.objects.get(uuid__exact=self.entity_id)
         fy_key = entity_model.get_fy_for_date(dt=self.date_draft)
-        try:
-            LOOKUP = {
-                'entity_model_id__exact': self.entity_id,
-                'entity_unit_id': None,
-                'fiscal_year': fy_key,
-                'key__exact': EntityStateModel.KEY_PURCHASE_ORDER
-            }
-
-            state_model_qs = EntityStateModel.objects.filter(**LOOKUP).select_related(
-                'entity_model').select_for_update()
-            state_model = state_model_qs.get()
-            state_model.sequence = F('sequence') + 1
-            state_model.save()
-            state_model.refresh_from_db()
-            return state_model
-        except ObjectDoesNotExist:
-            EntityModel = lazy_loader.get_entity_model()
-            entity_model = EntityModel.objects.get(uuid__exact=self.entity_id)
-            fy_key = entity_model.get_fy_for_date(dt=self.date_draft)
-
-            LOOKUP = {
-                'entity_model_id': entity_model.uuid,
-                'entity_unit_id': None,
-                'fiscal_year': fy_key,
-                'key': EntityStateModel.KEY_PURCHASE_ORDER,
-                'sequence': 1
-            }
-            state_model = EntityStateModel.objects.create(**LOOKUP)
-            return state_model
-        except IntegrityError as e:
-            if raise_exception:
-                raise e
+        return EntityStateModel.objects.get_next_state_model(
+            entity_model_id=self.entity_id,
+            entity_unit_id=None,
+            fiscal_year=fy_key,
+            key=EntityStateModel.KEY_PURCHASE_ORDER
+        )
 
     def generate_po_number(self, commit: bool = False) -> str:
         """
@@ -15,8 +15,10 @@ role in the production of financial statements and sets its foundation in the Tr
 amd aggregate transactions at the Database layer without the need of pulling all TransactionModels into memory for the
 production of financial statements.
 """
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, date
-from typing import List, Union, Optional
+from typing import Dict, Iterable, List, Union, Optional
 from uuid import uuid4, UUID
 
 from django.contrib.auth import get_user_model
@@ -27,7 +29,8 @@ from django.db.models import Q, QuerySet
 from django.db.models.signals import pre_save
 from django.utils.translation import gettext_lazy as _
 
-from django_ledger.io.io_core import validate_io_timestamp
+from django_ledger.io.io_core import validate_io_timestamp, get_timestamp_filter
+from django_ledger.io.roles import ROOT_GROUP
 from django_ledger.models.accounts import AccountModel
 from django_ledger.models.bill import BillModel
 from django_ledger.models.entity import EntityModel
@@ -35,7 +38,7 @@ from django_ledger.models.invoice import InvoiceModel
 from django_ledger.models.ledger import LedgerModel
 from django_ledger.models.mixins import CreateUpdateMixIn
 from django_ledger.models.unit import EntityUnitModel
-from django_ledger.models.utils import lazy_loader
+from django_ledger.models.utils import lazy_loader, get_entity_access_q
 
 UserModel = get_user_model()
 
@@ -44,6 +47,12 @@ class TransactionModelValidationError(ValidationError):
     pass
 
 
+_txs_validation_batch: ContextVar[Optional['TransactionModelValidationBatch']] = ContextVar(
+    'django_ledger_txs_validation_batch',
+    default=None
+)
+
+
 class TransactionModelQuerySet(QuerySet):
     """
     A custom defined EntityUnitModel Queryset.
@@ -149,6 +158,7 @@ class TransactionModelQuerySet(QuerySet):
         to_date: str or date or datetime
             A string, date or datetime  representing the maximum point in time used to filter the QuerySet.
             If date is used, dates are inclusive. (i.e 12/20/2022 will also include the 20th day).
+            If DJANGO_LEDGER_USE_TIMESTAMP_RANGE_FILTERS is enabled, dates are translated into timestamp ranges.
 
         Returns
         -------
@@ -160,7 +170,7 @@ class TransactionModelQuerySet(QuerySet):
             to_date = validate_io_timestamp(to_date)
 
         if isinstance(to_date, date):
-            return self.filter(journal_entry__timestamp__date__lte=to_date)
+            return self.filter(**get_timestamp_filter('journal_entry__timestamp', to_date, lookup='lte'))
         return self.filter(journal_entry__timestamp__lte=to_date)
 
     def from_date(self, from_date: Union[str, date, datetime]):
@@ -174,6 +184,7 @@ class TransactionModelQuerySet(QuerySet):
         from_date: str or date or datetime
             A string, date or datetime  representing the minimum point in time used to filter the QuerySet.
             If date is used, dates are inclusive. (i.e 12/20/2022 will also include the 20th day).
+            If DJANGO_LEDGER_USE_TIMESTAMP_RANGE_FILTERS is enabled, dates are translated into timestamp ranges.
 
         Returns
         -------
@@ -184,7 +195,7 @@ class TransactionModelQuerySet(QuerySet):
             from_date = validate_io_timestamp(from_date)
 
         if isinstance(from_date, date):
-            return self.filter(journal_entry__timestamp__date__gte=from_date)
+            return self.filter(**get_timestamp_filter('journal_entry__timestamp', from_date, lookup='gte'))
 
         return self.filter(journal_entry__timestamp__gte=from_date)
 
@@ -224,8 +235,7 @@ class TransactionModelAdmin(models.Manager):
         if user_model.is_superuser:
             return qs
         return qs.filter(
-            Q(journal_entry__ledger__entity__admin=user_model) |
-            Q(journal_entry__ledger__entity__managers__in=[user_model])
+            get_entity_access_q(user_model, 'journal_entry__ledger__entity')
         )
 
     def for_entity(self,
@@ -474,6 +484,7 @@ class TransactionModelAbstract(CreateUpdateMixIn):
             models.Index(fields=['tx_type']),
             models.Index(fields=['account']),
             models.Index(fields=['journal_entry']),
+            models.Index(fields=['journal_entry', 'account']),
             models.Index(fields=['created']),
             models.Index(fields=['updated'])
         ]
@@ -485,8 +496,40 @@ class TransactionModelAbstract(CreateUpdateMixIn):
                                                   x4=self.tx_type,
                                                   x5=self.account.balance_type)
 
+    def is_root_account(self) -> bool:
+        """
+        Determines if the TransactionModel account is a root account.
+        Served from the active TransactionModelValidationBatch, if any.
+
+        Returns
+        -------
+        bool
+        """
+        validation_batch = get_txs_validation_batch()
+        if validation_batch is not None:
+            is_root = validation_batch.is_root_account(self)
+            if is_root is not None:
+                return is_root
+        return self.account.is_root_account()
+
+    def is_journal_entry_locked(self) -> bool:
+        """
+        Determines if the TransactionModel journal entry is locked.
+        Served from the active TransactionModelValidationBatch, if any.
+
+        Returns
+        -------
+        bool
+        """
+        validation_batch = get_txs_validation_batch()
+        if validation_batch is not None:
+            is_locked = validation_batch.is_journal_entry_locked(self)
+            if is_locked is not None:
+                return is_locked
+        return self.journal_entry.is_locked()
+
     def clean(self):
-        if self.account_id and self.account.is_root_account():
+        if self.account_id and self.is_root_account():
             raise TransactionModelValidationError(
                 message=_('Cannot transact on root accounts')
             )
@@ -498,8 +541,94 @@ class TransactionModel(TransactionModelAbstract):
     """
 
 
+class TransactionModelValidationBatch:
+    """
+    Resolves the journal entry lock state and the root account status of a set of TransactionModels with one query
+    per related table, so that TransactionModel.clean and the pre_save validation become dictionary lookups.
+    Related instances already cached on the TransactionModels are used as they are.
+
+    The lock state is a snapshot taken when the batch is created. TransactionModels whose journal entry or account
+    is not part of the batch are validated individually, as usual.
+
+    Parameters
+    ----------
+    txs_models: iterable
+        The TransactionModels to be validated.
+    """
+
+    def __init__(self, txs_models: Iterable[TransactionModel]):
+        txs_models = list(txs_models)
+        self.JE_LOCKED: Dict[UUID, bool] = dict()
+        self.ROOT_ACCOUNTS: Dict[UUID, bool] = dict()
+
+        for tx_model in txs_models:
+            if tx_model.account_id and TransactionModel.account.is_cached(tx_model):
+                self.ROOT_ACCOUNTS[tx_model.account_id] = tx_model.account.is_root_account()
+
+        account_uuids = set(
+            tx_model.account_id for tx_model in txs_models
+            if tx_model.account_id and tx_model.account_id not in self.ROOT_ACCOUNTS
+        )
+        if account_uuids:
+            self.ROOT_ACCOUNTS.update({
+                account_uuid: role in ROOT_GROUP for account_uuid, role in AccountModel.objects.filter(
+                    uuid__in=account_uuids
+                ).values_list('uuid', 'role')
+            })
+
+        je_uuids = set(
+            tx_model.journal_entry_id for tx_model in txs_models
+            if tx_model.journal_entry_id and not TransactionModel.journal_entry.is_cached(tx_model)
+        )
+        if je_uuids:
+            JournalEntryModel = lazy_loader.get_journal_entry_model()
+            self.JE_LOCKED.update({
+                je_model.uuid: je_model.is_locked() for je_model in JournalEntryModel.objects.filter(
+                    uuid__in=je_uuids
+                ).select_related('ledger', 'ledger__entity')
+            })
+
+    def is_root_account(self, tx_model: TransactionModel) -> Optional[bool]:
+        return self.ROOT_ACCOUNTS.get(tx_model.account_id)
+
+    def is_journal_entry_locked(self, tx_model: TransactionModel) -> Optional[bool]:
+        if TransactionModel.journal_entry.is_cached(tx_model):
+            return None
+        return self.JE_LOCKED.get(tx_model.journal_entry_id)
+
+
+def get_txs_validation_batch() -> Optional[TransactionModelValidationBatch]:
+    """
+    The TransactionModelValidationBatch active in the current context, if any.
+
+    Returns
+    -------
+    TransactionModelValidationBatch
+    """
+    return _txs_validation_batch.get()
+
+
+@contextmanager
+def txs_validation_batch(txs_models: Iterable[TransactionModel]):
+    """
+    Activates a TransactionModelValidationBatch for the given TransactionModels for the duration of the context.
+
+    Examples
+    ________
+        >>> with txs_validation_batch(txs_models=txs_list):
+        ...     for tx_model in txs_list:
+        ...         tx_model.clean()
+        ...         tx_model.save()
+    """
+    token = _txs_validation_batch.set(TransactionModelValidationBatch(txs_models=txs_models))
+    try:
+        yield _txs_validation_batch.get()
+    finally:
+        _txs_validation_batch.reset(token)
+
+
 def transactionmodel_presave(instance: TransactionModel, **kwargs):
-    if instance.journal_entry_id and instance.journal_entry.is_locked():
+    if instance.journal_entry_id and instance.is_journal_entry_locked():
         raise TransactionModelValidationError(
             message=_('Cannot modify transactions on locked journal entries')
         )
@@ -5,6 +5,9 @@ Copyright© EDMA Group Inc licensed under the GPLv3 Agreement.
 Contributions to this module:
     * Miguel Sanda <msanda@arrobalytics.com>
 """
+from typing import Optional
+
+from django.db.models import Q, Exists, OuterRef
 
 
 class LazyLoader:
@@ -13,6 +16,7 @@ class LazyLoader:
     """
     ENTITY_MODEL = None
     ENTITY_STATE_MODEL = None
+    ENTITY_MANAGEMENT_MODEL = None
     UNIT_MODEL = None
     ACCOUNT_MODEL = None
     BANK_ACCOUNT_MODEL = None
@@ -32,6 +36,9 @@ class LazyLoader:
     ESTIMATE_MODEL = None
     CLOSING_ENTRY_MODEL = None
     CLOSING_ENTRY_TRANSACTION_MODEL = None
+    DAILY_BALANCE_MODEL = None
+    JE_VERIFICATION_CONTEXT_CLASS = None
+    TXS_VALIDATION_BATCH_CONTEXT = None
 
     ENTITY_DATA_GENERATOR = None
 
@@ -51,6 +58,12 @@ class LazyLoader:
             self.ENTITY_STATE_MODEL = EntityStateModel
         return self.ENTITY_STATE_MODEL
 
+    def get_entity_management_model(self):
+        if not self.ENTITY_MANAGEMENT_MODEL:
+            from django_ledger.models import EntityManagementModel
+            self.ENTITY_MANAGEMENT_MODEL = EntityManagementModel
+        return self.ENTITY_MANAGEMENT_MODEL
+
     def get_bank_account_model(self):
         if not self.BANK_ACCOUNT_MODEL:
             from django_ledger.models import BankAccountModel
@@ -171,6 +184,24 @@ class LazyLoader:
             self.CLOSING_ENTRY_TRANSACTION_MODEL = ClosingEntryTransactionModel
         return self.CLOSING_ENTRY_TRANSACTION_MODEL
 
+    def get_daily_balance_model(self):
+        if not self.DAILY_BALANCE_MODEL:
+            from django_ledger.models import AccountDailyBalanceModel
+            self.DAILY_BALANCE_MODEL = AccountDailyBalanceModel
+        return self.DAILY_BALANCE_MODEL
+
+    def get_je_verification_context_class(self):
+        if not self.JE_VERIFICATION_CONTEXT_CLASS:
+            from django_ledger.models.journal_entry import JournalEntryVerificationContext
+            self.JE_VERIFICATION_CONTEXT_CLASS = JournalEntryVerificationContext
+        return self.JE_VERIFICATION_CONTEXT_CLASS
+
+    def get_txs_validation_batch_context(self):
+        if not self.TXS_VALIDATION_BATCH_CONTEXT:
+            from django_ledger.models.transactions import txs_validation_batch
+            self.TXS_VALIDATION_BATCH_CONTEXT = txs_validation_batch
+        return self.TXS_VALIDATION_BATCH_CONTEXT
+
     def get_balance_sheet_report_class(self):
         if not self.BALANCE_SHEET_REPORT_CLASS:
             from django_ledger.report.balance_sheet import BalanceSheetReport
@@ -191,3 +222,43 @@ class LazyLoader:
 
 
 lazy_loader = LazyLoader()
+
+
+def get_entity_access_q(user_model, entity_field: Optional[str] = None) -> Q:
+    """
+    Builds the filter that scopes a QuerySet to the EntityModels the user has access to. The user has access to an
+    EntityModel if:
+        1. Is the Administrator.
+        2. Is a manager.
+
+    Manager access is expressed as a correlated EXISTS subquery against the EntityManagementModel instead of a join on
+    the EntityModel managers, so the filtered QuerySet never returns one row per manager.
+
+    Parameters
+    ----------
+    user_model
+        Logged in and authenticated django UserModel instance.
+    entity_field: str
+        The lookup path from the filtered model to its EntityModel, e.g. "ledger__entity". Must be None when
+        filtering the EntityModel itself.
+
+    Returns
+    -------
+    Q
+        The Q object to be applied to the QuerySet.
+    """
+    if entity_field:
+        admin_lookup = f'{entity_field}__admin'
+        entity_ref = OuterRef(entity_field)
+    else:
+        admin_lookup = 'admin'
+        entity_ref = OuterRef('uuid')
+    EntityManagementModel = lazy_loader.get_entity_management_model()
+    return Q(**{admin_lookup: user_model}) | Q(
+        Exists(
+            EntityManagementModel.objects.filter(
+                entity_id=entity_ref,
+                user=user_model
+            )
+        )
+    )
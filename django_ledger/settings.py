@@ -29,11 +29,43 @@ try:
 except ImportError:
     DJANGO_LEDGER_PDF_SUPPORT_ENABLED = False
 
+try:
+    import numpy
+
+    DJANGO_LEDGER_NUMPY_SUPPORT_ENABLED = True
+except ImportError:
+    DJANGO_LEDGER_NUMPY_SUPPORT_ENABLED = False
+
 logger.info(f'Django Ledger GraphQL Enabled: {DJANGO_LEDGER_GRAPHQL_SUPPORT_ENABLED}')
 
 DJANGO_LEDGER_USE_CLOSING_ENTRIES = getattr(settings, 'DJANGO_LEDGER_USE_CLOSING_ENTRIES', True)
+DJANGO_LEDGER_DIGEST_ENGINE = getattr(settings, 'DJANGO_LEDGER_DIGEST_ENGINE', 'python')
+DJANGO_LEDGER_USE_TIMESTAMP_RANGE_FILTERS = getattr(settings, 'DJANGO_LEDGER_USE_TIMESTAMP_RANGE_FILTERS', True)
+DJANGO_LEDGER_USE_DAILY_BALANCES = getattr(settings, 'DJANGO_LEDGER_USE_DAILY_BALANCES', False)
+DJANGO_LEDGER_DAILY_BALANCES_BATCH_SIZE = getattr(settings, 'DJANGO_LEDGER_DAILY_BALANCES_BATCH_SIZE', 500)
+DJANGO_LEDGER_USE_PERPETUAL_INVENTORY = getattr(settings, 'DJANGO_LEDGER_USE_PERPETUAL_INVENTORY', False)
+DJANGO_LEDGER_DIGEST_CACHE_ENABLED = getattr(settings, 'DJANGO_LEDGER_DIGEST_CACHE_ENABLED', False)
+DJANGO_LEDGER_DIGEST_CACHE_NAME = getattr(settings, 'DJANGO_LEDGER_DIGEST_CACHE_NAME', 'default')
+DJANGO_LEDGER_DIGEST_CACHE_TIMEOUT = getattr(settings, 'DJANGO_LEDGER_DIGEST_CACHE_TIMEOUT', 3600)
+DJANGO_LEDGER_DIGEST_CACHE_KEY_PREFIX = getattr(settings, 'DJANGO_LEDGER_DIGEST_CACHE_KEY_PREFIX', 'djl-digest')
+DJANGO_LEDGER_DIGEST_PROFILING_ENABLED = getattr(settings, 'DJANGO_LEDGER_DIGEST_PROFILING_ENABLED', False)
+DJANGO_LEDGER_DIGEST_PROFILE_HOOK = getattr(settings, 'DJANGO_LEDGER_DIGEST_PROFILE_HOOK', None)
+DJANGO_LEDGER_COMMIT_TXS_BULK_BATCH_SIZE = getattr(settings, 'DJANGO_LEDGER_COMMIT_TXS_BULK_BATCH_SIZE', 500)
+DJANGO_LEDGER_USE_LEDGER_STATE_SNAPSHOTS = getattr(settings, 'DJANGO_LEDGER_USE_LEDGER_STATE_SNAPSHOTS', False)
+DJANGO_LEDGER_VERIFY_LEDGER_STATE_SNAPSHOTS = getattr(settings, 'DJANGO_LEDGER_VERIFY_LEDGER_STATE_SNAPSHOTS', False)
+DJANGO_LEDGER_NET_SUMMARY_BUCKET_EDGES = getattr(settings, 'DJANGO_LEDGER_NET_SUMMARY_BUCKET_EDGES', (0, 30, 60, 90))
+DJANGO_LEDGER_USE_ASYNC_API_VIEWS = getattr(settings, 'DJANGO_LEDGER_USE_ASYNC_API_VIEWS', False)
 DJANGO_LEDGER_DEFAULT_CLOSING_ENTRY_CACHE_TIMEOUT = getattr(settings,
                                                             'DJANGO_LEDGER_DEFAULT_CLOSING_ENTRY_CACHE_TIMEOUT', 3600)
+DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE = getattr(settings, 'DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE', False)
+DJANGO_LEDGER_CLOSING_ENTRY_CACHE_NAME = getattr(settings, 'DJANGO_LEDGER_CLOSING_ENTRY_CACHE_NAME', 'default')
+DJANGO_LEDGER_ACCOUNT_INDEX_LRU_SIZE = getattr(settings, 'DJANGO_LEDGER_ACCOUNT_INDEX_LRU_SIZE', 128)
+DJANGO_LEDGER_USE_ACCOUNT_INDEX_CACHE = getattr(settings, 'DJANGO_LEDGER_USE_ACCOUNT_INDEX_CACHE', False)
+DJANGO_LEDGER_ACCOUNT_INDEX_CACHE_NAME = getattr(settings, 'DJANGO_LEDGER_ACCOUNT_INDEX_CACHE_NAME', 'default')
+DJANGO_LEDGER_ACCOUNT_INDEX_CACHE_TIMEOUT = getattr(settings, 'DJANGO_LEDGER_ACCOUNT_INDEX_CACHE_TIMEOUT', 3600)
+DJANGO_LEDGER_USE_AUTHORIZATION_CACHE = getattr(settings, 'DJANGO_LEDGER_USE_AUTHORIZATION_CACHE', False)
+DJANGO_LEDGER_AUTHORIZATION_CACHE_NAME = getattr(settings, 'DJANGO_LEDGER_AUTHORIZATION_CACHE_NAME', 'default')
+DJANGO_LEDGER_AUTHORIZATION_CACHE_TIMEOUT = getattr(settings, 'DJANGO_LEDGER_AUTHORIZATION_CACHE_TIMEOUT', 3600)
 DJANGO_LEDGER_LOGIN_URL = getattr(settings, 'DJANGO_LEDGER_LOGIN_URL', settings.LOGIN_URL)
 DJANGO_LEDGER_BILL_NUMBER_LENGTH = getattr(settings, 'DJANGO_LEDGER_BILL_NUMBER_LENGTH', 10)
 DJANGO_LEDGER_INVOICE_NUMBER_LENGTH = getattr(settings, 'DJANGO_LEDGER_INVOICE_NUMBER_LENGTH', 10)
@@ -62,6 +94,10 @@ DJANGO_LEDGER_PRODUCT_NUMBER_PREFIX = getattr(settings, 'DJANGO_LEDGER_PRODUCT_N
 DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING = getattr(settings, 'DJANGO_LEDGER_DOCUMENT_NUMBER_PADDING', 10)
 DJANGO_LEDGER_JE_NUMBER_NO_UNIT_PREFIX = getattr(settings, 'DJANGO_LEDGER_JE_NUMBER_NO_UNIT_PREFIX', '000')
 
+# Document number block sizes by EntityStateModel key (i.e. {'je': 100}). Keys not listed are allocated one by one,
+# without gaps. See EntityStateModelManager for the gap policy of block allocated keys.
+DJANGO_LEDGER_DOCUMENT_NUMBER_BLOCK_SIZES = getattr(settings, 'DJANGO_LEDGER_DOCUMENT_NUMBER_BLOCK_SIZES', dict())
+
 DJANGO_LEDGER_BILL_MODEL_ABSTRACT_CLASS = getattr(settings,
                                                   'DJANGO_LEDGER_BILL_MODEL_ABSTRACT_CLASS',
                                                   'django_ledger.models.bill.BillModelAbstract')
@@ -1,4 +1,6 @@
-from django_ledger.models import EntityModelValidationError, AccountModel
+from django_ledger.io.io_account_index import AccountIndexCache
+from django_ledger.io.roles import ASSET_CA_CASH, ROOT_ASSETS, ROOT_COA
+from django_ledger.models import EntityModelValidationError, AccountModel, EntityModel
 from django_ledger.tests.base import DjangoLedgerBaseTest
 
 
@@ -14,3 +16,50 @@ class AccountModelTests(DjangoLedgerBaseTest):
         self.assertEqual(entity_model.get_default_coa(raise_exception=False),
                          None,
                          msg='No exception should be raised when raise_exception is False')
+
+    def test_account_index(self):
+        entity_model = self.create_entity_model()
+        entity_model.populate_default_coa(activate_accounts=True)
+
+        account_index = entity_model.get_account_index()
+        account_model_qs = entity_model.get_coa_accounts(active=True)
+        self.assertEqual(len(account_index.get_accounts()), account_model_qs.count())
+
+        cash_account = account_model_qs.is_role_default().get(role=ASSET_CA_CASH)
+        self.assertEqual(account_index.get_default_account_for_role(role=ASSET_CA_CASH).uuid, cash_account.uuid)
+        self.assertEqual(account_index.get_account_by_code(cash_account.code).uuid, cash_account.uuid)
+        self.assertEqual(account_index.get_account_by_uuid(str(cash_account.uuid)).code, cash_account.code)
+        self.assertEqual([a.role for a in account_index.get_ancestors(cash_account)], [ROOT_COA, ROOT_ASSETS])
+
+        with self.assertRaises(AttributeError, msg='AccountIndex must be immutable'):
+            account_index.ROWS = tuple()
+
+        # served from the instance, including the account CoA & entity...
+        with self.assertNumQueries(0):
+            account_model = entity_model.get_account_index().get_default_account_for_role(role=ASSET_CA_CASH)
+            self.assertEqual(account_model.coa_model.entity.slug, entity_model.slug)
+
+        # indexes built within a transaction are only shared once it commits...
+        AccountIndexCache.clear()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            EntityModel.objects.get(uuid__exact=entity_model.uuid).get_account_index()
+        lru_kwargs = dict(entity_uuid=entity_model.uuid,
+                          coa_model_id=entity_model.default_coa_id,
+                          accounts_version=entity_model.accounts_version)
+        self.assertIsNone(AccountIndexCache.get_lru(**lru_kwargs))
+        for callback in callbacks:
+            callback()
+        self.assertIsNotNone(AccountIndexCache.get_lru(**lru_kwargs))
+
+        # any account update invalidates the index...
+        cash_account.deactivate()
+        entity_model_fresh = EntityModel.objects.get(uuid__exact=entity_model.uuid)
+        with self.assertRaises(AccountModel.DoesNotExist):
+            entity_model_fresh.get_account_index().get_default_account_for_role(role=ASSET_CA_CASH, active=True)
+
+        self.assertFalse(entity_model.get_account_index(refresh=True).get_account_by_uuid(cash_account.uuid).active)
+
+        # stale instances must not overwrite the accounts version...
+        entity_model.accounts_version = 0
+        entity_model.save()
+        self.assertEqual(entity_model.get_accounts_version(), entity_model_fresh.accounts_version)
@@ -1,6 +1,12 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import override_settings
 from django.urls import reverse
 
 from dev_env.settings import LOGIN_URL
+from django_ledger.models import EntityModel, EntityManagementModel
 from django_ledger.tests.base import DjangoLedgerBaseTest
 
 
@@ -71,3 +77,28 @@ class AuthTest(DjangoLedgerBaseTest):
 
         response = self.client.post(logout_url)
         self.assertRedirects(response, expected_url=login_url)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_authorization_map_cache(self):
+        entity_model = self.get_random_entity_model()
+        entity_url = reverse('django_ledger:entity-dashboard', kwargs={'entity_slug': entity_model.slug})
+        manager_model = get_user_model().objects.create_user(username='testmanager', password=self.PASSWORD)
+        cache_key = EntityModel.get_authorization_map_cache_key(user_id=manager_model.pk)
+
+        with patch('django_ledger.views.mixins.DJANGO_LEDGER_USE_AUTHORIZATION_CACHE', True), \
+                patch('django_ledger.models.entity.DJANGO_LEDGER_USE_AUTHORIZATION_CACHE', True):
+            self.client.login(username='testmanager', password=self.PASSWORD)
+            response = self.client.get(entity_url)
+            self.assertEqual(response.status_code, 403)
+            self.assertEqual(caches['default'].get(cache_key), dict())
+
+            entity_management_model = EntityManagementModel.objects.create(entity=entity_model, user=manager_model)
+            self.assertIsNone(caches['default'].get(cache_key), msg='Map must be invalidated when access is granted')
+            response = self.client.get(entity_url, follow=True)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(caches['default'].get(cache_key), {entity_model.slug: (entity_model.uuid, 'read')})
+
+            # a stale map would still grant access...
+            entity_management_model.delete()
+            response = self.client.get(entity_url)
+            self.assertEqual(response.status_code, 403)
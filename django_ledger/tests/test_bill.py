@@ -1,17 +1,20 @@
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 from random import choice
+from unittest.mock import patch
 from urllib.parse import urlparse
 from uuid import uuid4
 
 from django.contrib.auth import get_user_model
+from django.db.models import F
 from django.urls import reverse
 
 from django_ledger.io.io_core import get_localdate
 from django_ledger.io.roles import ASSET_CA_CASH, ASSET_CA_PREPAID, LIABILITY_CL_DEFERRED_REVENUE, \
     LIABILITY_CL_ACC_PAYABLE
-from django_ledger.models import EntityModel, BillModel, VendorModel
+from django_ledger.models import EntityModel, BillModel, VendorModel, LedgerModel, TransactionModel
 from django_ledger.tests.base import DjangoLedgerBaseTest
+from django_ledger.utils import accruable_net_summary
 from django_ledger.urls.bill import urlpatterns as bill_urls
 
 UserModel = get_user_model()
@@ -91,6 +94,106 @@ class BillModelTests(DjangoLedgerBaseTest):
 
 
 
+    def test_migrate_state_ledger_snapshot(self):
+        bill_model: BillModel = BillModel.objects.approved().filter(
+            amount_paid__lt=F('amount_due') - 3
+        ).select_related('ledger', 'ledger__entity').first()
+        self.assertIsNotNone(bill_model, msg='No approved open bills available.')
+
+        with patch.multiple('django_ledger.settings',
+                            DJANGO_LEDGER_USE_LEDGER_STATE_SNAPSHOTS=True,
+                            DJANGO_LEDGER_VERIFY_LEDGER_STATE_SNAPSHOTS=True):
+            # first migration builds the snapshot from the digest...
+            bill_model.make_payment(payment_amount=Decimal('1.00'), commit=True)
+            fingerprint = bill_model.ledger.get_state_snapshot_fingerprint()
+            self.assertIsNotNone(bill_model.ledger.get_state_snapshot(fingerprint=fingerprint))
+
+            # snapshot must match the digest after the migration...
+            bill_model.make_payment(payment_amount=Decimal('1.00'), commit=True)
+
+        with patch.multiple('django_ledger.settings', DJANGO_LEDGER_USE_LEDGER_STATE_SNAPSHOTS=True):
+            with patch.object(LedgerModel, 'digest') as ledger_digest:
+                bill_model.make_payment(payment_amount=Decimal('1.00'), commit=True)
+                ledger_digest.assert_not_called()
+
+            bill_model.ledger.refresh_from_db()
+            fingerprint = bill_model.ledger.get_state_snapshot_fingerprint()
+            snapshot_state = bill_model.ledger.get_state_snapshot(fingerprint=fingerprint)
+            cash_state = sum(v for (account_uuid, _, _), v in snapshot_state.items()
+                             if account_uuid == bill_model.cash_account_id)
+            self.assertEqual(abs(cash_state), bill_model.amount_paid)
+
+    def test_pay_many(self):
+        bill_model = BillModel.objects.approved().filter(amount_paid__lt=F('amount_due') - 1).first()
+        self.assertIsNotNone(bill_model, msg='No approved open bills available.')
+        entity_model = bill_model.ledger.entity
+        bill_models = list(BillModel.objects.approved().filter(
+            ledger__entity=entity_model,
+            amount_paid__lt=F('amount_due') - 1
+        )[:5])
+        amounts_paid = {b.uuid: b.amount_paid for b in bill_models}
+
+        paid_bills, errors = BillModel.objects.pay_many(
+            bill_models=bill_models + [uuid4()],
+            payment_amounts={bill_model.uuid: Decimal('1.00')}
+        )
+        self.assertEqual(len(paid_bills), len(bill_models))
+        self.assertEqual(len(errors), 1)
+
+        for paid_bill in paid_bills:
+            paid_bill.refresh_from_db()
+            if paid_bill.uuid == bill_model.uuid:
+                self.assertEqual(paid_bill.amount_paid, amounts_paid[paid_bill.uuid] + Decimal('1.00'))
+            else:
+                self.assertEqual(paid_bill.amount_paid, paid_bill.amount_due)
+
+            # the ledger already reflects the new bill state, no further adjustments are needed...
+            txs_qs = TransactionModel.objects.filter(journal_entry__ledger_id=paid_bill.ledger_id)
+            txs_count = txs_qs.count()
+            paid_bill.migrate_state(user_model=None, entity_slug=entity_model.slug)
+            self.assertEqual(txs_qs.count(), txs_count)
+
+    def test_accruable_net_summary(self):
+        bill_qs = BillModel.objects.filter(amount_due__gt=0)
+        bill_models = list(bill_qs[:4])
+        self.assertEqual(len(bill_models), 4, msg='Not enough bills available.')
+        localdate = get_localdate()
+        for bill_model, days in zip(bill_models, (-5, 10, 45, 200)):
+            bill_model.accrue = False
+            bill_model.amount_paid = Decimal('0.00')
+            bill_model.date_due = localdate + timedelta(days=days)
+        BillModel.objects.bulk_update(bill_models, fields=['accrue', 'amount_paid', 'date_due'])
+
+        expected = {'net_0': 0.0, 'net_30': 0.0, 'net_60': 0.0, 'net_90': 0.0, 'net_90+': 0.0}
+        expected_by_vendor = dict()
+        for bill_model in bill_qs:
+            due_in = bill_model.due_in_days()
+            if due_in is None or due_in == 0:
+                net_group = 'net_0'
+            else:
+                net_group = bill_model.net_due_group()
+            amount_open = float(bill_model.get_amount_open())
+            expected[net_group] += amount_open
+            vendor_nets = expected_by_vendor.setdefault(bill_model.vendor_id, {k: 0.0 for k in expected})
+            vendor_nets[net_group] += amount_open
+
+        with self.assertNumQueries(1):
+            net_summary = accruable_net_summary(bill_qs)
+        self.assertEqual(set(net_summary), set(expected))
+        for k, v in expected.items():
+            self.assertAlmostEqual(net_summary[k], v, places=2)
+
+        with self.assertNumQueries(1):
+            net_summary_by_vendor = accruable_net_summary(bill_qs, group_by='vendor')
+        self.assertEqual(set(net_summary_by_vendor), set(expected_by_vendor))
+        for vendor_uuid, vendor_nets in expected_by_vendor.items():
+            for k, v in vendor_nets.items():
+                self.assertAlmostEqual(net_summary_by_vendor[vendor_uuid][k], v, places=2)
+
+        net_summary = accruable_net_summary(bill_qs, bucket_edges=(0, 45))
+        self.assertEqual(list(net_summary), ['net_0', 'net_45', 'net_45+'])
+        self.assertAlmostEqual(sum(net_summary.values()), sum(expected.values()), places=2)
+
     def test_bill_list(self):
 
         self.login_client()
@@ -1,9 +1,11 @@
+from datetime import timedelta
 from random import choice
 from urllib.parse import urlparse
 
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from django_ledger.models import TransactionModel
 from django_ledger.tests.base import DjangoLedgerBaseTest
 from django_ledger.urls.closing_entry import urlpatterns as closing_entry_urls
 
@@ -30,6 +32,62 @@ class ClosingEntryModelTests(DjangoLedgerBaseTest):
                     post_closing_entry=True
                 )
 
+    def test_close_books_for_range(self):
+        entity_model = self.get_random_entity_model()
+        start_date = self.START_DATE.date()
+        end_date = start_date + timedelta(days=120)
+
+        ce_results = entity_model.close_books_for_range(
+            start_date=start_date,
+            end_date=end_date,
+            force_update=True
+        )
+        closing_dates = entity_model.get_closing_dates_for_range(start_date=start_date, end_date=end_date)
+        self.assertEqual([ce_model.closing_date for ce_model, _ in ce_results], closing_dates)
+
+        entity_model.refresh_from_db()
+        closing_dates_meta = entity_model.fetch_closing_entry_dates_meta()
+        for closing_date in closing_dates:
+            self.assertIn(closing_date, closing_dates_meta)
+
+        # chained closing entries must match closing entries computed from inception...
+        for ce_model, _ in ce_results:
+            self.assertTrue(ce_model.is_posted())
+            _, ce_txs_expected = entity_model.get_closing_entry_digest_for_date(
+                closing_date=ce_model.closing_date,
+                closing_entry_model=ce_model,
+                use_closing_entry=False
+            )
+            ce_txs = ce_model.closingentrytransactionmodel_set.all()
+            self.assertEqual(
+                {(ce.account_model_id, ce.unit_model_id, ce.activity): (ce.tx_type, ce.balance) for ce in ce_txs},
+                {(ce.account_model_id, ce.unit_model_id, ce.activity): (ce.tx_type, ce.balance)
+                 for ce in ce_txs_expected}
+            )
+
+    def test_close_books_for_range_force_update(self):
+        entity_model = self.get_random_entity_model()
+        start_date = self.START_DATE.date()
+        end_date = start_date + timedelta(days=120)
+
+        def get_ce_state():
+            ce_txs_qs = TransactionModel.objects.for_entity(entity_slug=entity_model).is_closing_entry()
+            io_result = entity_model.python_digest(to_date=end_date, use_closing_entries=True)
+            return (
+                ce_txs_qs.count(),
+                {(acc['account_uuid'], acc['tx_type']): round(acc['balance'], 2) for acc in io_result.accounts_digest}
+            )
+
+        entity_model.close_books_for_range(start_date=start_date, end_date=end_date, force_update=True)
+        ce_state = get_ce_state()
+        ledger_count = entity_model.ledgermodel_set.count()
+
+        # replacing posted closing entries must not leave their ledgers & transactions behind...
+        ce_results = entity_model.close_books_for_range(start_date=start_date, end_date=end_date, force_update=True)
+        self.assertTrue(all(ce_model.is_posted() for ce_model, _ in ce_results))
+        self.assertEqual(entity_model.ledgermodel_set.count(), ledger_count)
+        self.assertEqual(get_ce_state(), ce_state)
+
     def test_protected_views(self):
         self.logout_client()
         entity_model = self.get_random_entity_model()
@@ -0,0 +1,43 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command, CommandError
+from django.db import OperationalError
+
+from django_ledger.models import EntityStateModel, JournalEntryModel
+from django_ledger.tests.base import DjangoLedgerBaseTest
+
+
+class BenchmarkDocumentNumbersCommandTest(DjangoLedgerBaseTest):
+
+    def test_benchmark_single_worker(self):
+        entity_model = self.get_random_entity_model()
+        stdout = StringIO()
+        call_command('benchmark_document_numbers',
+                     entity_slug=entity_model.slug,
+                     workers=1,
+                     documents=5,
+                     keys=[EntityStateModel.KEY_JOURNAL_ENTRY, EntityStateModel.KEY_VENDOR],
+                     stdout=stdout)
+
+        output = stdout.getvalue().splitlines()
+        self.assertEqual(len(output), 3)
+        for line in output[1:]:
+            _key, _block, docs, *_, failed, unique, _gapless = line.split()
+            self.assertEqual(docs, '5')
+            self.assertEqual(failed, '0')
+            self.assertEqual(unique, 'True')
+
+    def test_benchmark_lock_retries(self):
+        entity_model = self.get_random_entity_model()
+        with patch('django_ledger.management.commands.benchmark_document_numbers.sleep') as sleep_mock, \
+                patch.object(JournalEntryModel, '_get_next_state_model',
+                             side_effect=OperationalError('database is locked')):
+            with self.assertRaisesMessage(CommandError, '2 document numbers not allocated'):
+                call_command('benchmark_document_numbers',
+                             entity_slug=entity_model.slug,
+                             workers=1,
+                             documents=2,
+                             keys=[EntityStateModel.KEY_JOURNAL_ENTRY],
+                             stdout=StringIO())
+            self.assertTrue(sleep_mock.called)
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import path, reverse
+
+from dev_env.urls import urlpatterns as dev_env_urlpatterns
+from django_ledger import views
+from django_ledger.tests.base import DjangoLedgerBaseTest
+
+UserModel = get_user_model()
+
+# async API views are only routed when DJANGO_LEDGER_USE_ASYNC_API_VIEWS is enabled at import time...
+urlpatterns = [
+    path('async-api/entity/<slug:entity_slug>/data/pnl/',
+         views.AsyncPnLAPIView.as_view(),
+         name='async-entity-json-pnl'),
+    path('async-api/entity/<slug:entity_slug>/data/net-payables/',
+         views.AsyncPayableNetAPIView.as_view(),
+         name='async-entity-json-net-payables'),
+    path('async-api/entity/<slug:entity_slug>/data/net-receivables/',
+         views.AsyncReceivableNetAPIView.as_view(),
+         name='async-entity-json-net-receivables'),
+] + dev_env_urlpatterns
+
+
+@override_settings(ROOT_URLCONF='django_ledger.tests.test_djl_api')
+class AsyncAPIViewTest(DjangoLedgerBaseTest):
+    ASYNC_API_VIEWS = {
+        'async-entity-json-pnl': 'django_ledger:entity-json-pnl',
+        'async-entity-json-net-payables': 'django_ledger:entity-json-net-payables',
+        'async-entity-json-net-receivables': 'django_ledger:entity-json-net-receivables',
+    }
+
+    def test_async_api_views(self):
+        entity_model = self.get_random_entity_model()
+        self.login_client()
+
+        for async_view_name, view_name in self.ASYNC_API_VIEWS.items():
+            with self.subTest(view_name=async_view_name):
+                async_url = reverse(async_view_name, kwargs={'entity_slug': entity_model.slug})
+                response = self.CLIENT.get(async_url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['results']['entity_slug'], entity_model.slug)
+
+                # async views must return the same data as their sync counterparts...
+                sync_url = reverse(view_name, kwargs={'entity_slug': entity_model.slug})
+                self.assertEqual(response.json(), self.CLIENT.get(sync_url).json())
+
+    def test_async_api_views_unauthorized(self):
+        entity_model = self.get_random_entity_model()
+        login_path = reverse('django_ledger:login')
+        UserModel.objects.create_user(username='api-outsider', password=self.PASSWORD)
+
+        async_urls = [
+            reverse(async_view_name, kwargs={'entity_slug': entity_model.slug})
+            for async_view_name in self.ASYNC_API_VIEWS
+        ]
+
+        self.logout_client()
+        for async_url in async_urls:
+            with self.subTest(url=async_url):
+                response = self.CLIENT.get(async_url, follow=False)
+                self.assertEqual(response.status_code, 302)
+                self.assertTrue(response.url.startswith(login_path))
+
+        # authenticated users without access to the entity are denied...
+        self.CLIENT.login(username='api-outsider', password=self.PASSWORD)
+        for async_url in async_urls:
+            with self.subTest(url=async_url):
+                response = self.CLIENT.get(async_url, follow=False)
+                self.assertEqual(response.status_code, 403)
@@ -1,13 +1,16 @@
 from datetime import date
+from decimal import Decimal
 from random import choice
+from unittest.mock import patch
 from urllib.parse import urlparse
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.urls import reverse
 
 from django_ledger.io.io_core import get_localdate
-from django_ledger.models import EntityModel
+from django_ledger.models import EntityModel, EntityStateModel, ItemTransactionModel, InvoiceModel
 from django_ledger.tests.base import DjangoLedgerBaseTest
 from django_ledger.urls.entity import urlpatterns as entity_urls
 
@@ -49,6 +52,138 @@ class EntityModelTests(DjangoLedgerBaseTest):
                 else:
                     start_month += 1
 
+    # STATE Tests...
+    def test_state_model_sequence_blocks(self):
+        entity_model = self.get_random_entity_model()
+        EntityStateModel.objects.clear_sequence_blocks()
+
+        def get_next_sequence():
+            return EntityStateModel.objects.get_next_state_model(
+                entity_model_id=entity_model.uuid,
+                key=EntityStateModel.KEY_VENDOR
+            ).sequence
+
+        def get_db_sequence():
+            return EntityStateModel.objects.get(entity_model_id=entity_model.uuid,
+                                                key=EntityStateModel.KEY_VENDOR).sequence
+
+        # strict mode, every number is allocated from the database...
+        seq = get_next_sequence()
+        self.assertEqual(get_next_sequence(), seq + 1)
+        self.assertEqual(get_db_sequence(), seq + 1)
+
+        with patch.dict('django_ledger.models.entity.DJANGO_LEDGER_DOCUMENT_NUMBER_BLOCK_SIZES',
+                        {EntityStateModel.KEY_VENDOR: 5}):
+            with self.captureOnCommitCallbacks(execute=True):
+                block_lo = get_next_sequence()
+            self.assertEqual(block_lo, seq + 2)
+            self.assertEqual(get_db_sequence(), block_lo + 4)
+
+            # the rest of the block is allocated in memory...
+            with self.assertNumQueries(0):
+                block_seqs = [get_next_sequence() for _ in range(4)]
+            self.assertEqual(block_seqs, list(range(block_lo + 1, block_lo + 5)))
+
+            # ...until exhausted.
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(get_next_sequence(), block_lo + 5)
+            self.assertEqual(get_db_sequence(), block_lo + 9)
+
+        EntityStateModel.objects.clear_sequence_blocks()
+
+    def test_state_model_sequence_blocks_within_transaction(self):
+        entity_model = self.get_random_entity_model()
+        EntityStateModel.objects.clear_sequence_blocks()
+
+        def get_next_sequence(key=EntityStateModel.KEY_CUSTOMER):
+            return EntityStateModel.objects.get_next_state_model(
+                entity_model_id=entity_model.uuid,
+                key=key
+            ).sequence
+
+        def get_db_sequence():
+            return EntityStateModel.objects.get(entity_model_id=entity_model.uuid,
+                                                key=EntityStateModel.KEY_CUSTOMER).sequence
+
+        with patch.dict('django_ledger.models.entity.DJANGO_LEDGER_DOCUMENT_NUMBER_BLOCK_SIZES',
+                        {EntityStateModel.KEY_CUSTOMER: 5}):
+
+            # uncommitted blocks are used by the rest of the transaction...
+            with transaction.atomic():
+                seqs = [get_next_sequence() for _ in range(8)]
+            self.assertEqual(seqs, list(range(seqs[0], seqs[0] + 8)))
+            self.assertEqual(get_db_sequence(), seqs[0] + 9)
+
+        with patch.dict('django_ledger.models.entity.DJANGO_LEDGER_DOCUMENT_NUMBER_BLOCK_SIZES',
+                        {EntityStateModel.KEY_ITEM: 5}):
+
+            # ...unless the savepoint the block was reserved in is rolled back.
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        rolled_back_seq = get_next_sequence(key=EntityStateModel.KEY_ITEM)
+                        raise ValueError
+                except ValueError:
+                    pass
+                seqs = [get_next_sequence(key=EntityStateModel.KEY_ITEM) for _ in range(3)]
+            self.assertEqual(seqs, list(range(rolled_back_seq, rolled_back_seq + 3)))
+
+        EntityStateModel.objects.clear_sequence_blocks()
+
+    @patch('django_ledger.settings.DJANGO_LEDGER_USE_PERPETUAL_INVENTORY', True)
+    def test_perpetual_inventory(self):
+        entity_model = self.get_random_entity_model()
+        entity_model.reconcile_inventory(commit=True)
+        self.assertEqual(entity_model.reconcile_inventory(), dict())
+
+        # everything is posted, nothing left to apply...
+        itemtxs_qs = ItemTransactionModel.objects.for_entity_inventory(entity_slug=entity_model.slug)
+        self.assertEqual(ItemTransactionModel.objects.post_inventory(itemtxs_qs=itemtxs_qs), list())
+
+        # un-receiving inventory reverses what was posted...
+        received_itx = itemtxs_qs.filter(inventory_posted_quantity__gt=0).select_related('item_model').first()
+        self.assertIsNotNone(received_itx)
+        item_model = received_itx.item_model
+        ItemTransactionModel.objects.filter(uuid__exact=received_itx.uuid).update(
+            po_item_status=ItemTransactionModel.STATUS_ORDERED
+        )
+        received_itx.po_model.update_perpetual_inventory()
+        qty_received = item_model.inventory_quantity_received
+        item_model.refresh_from_db()
+        self.assertEqual(item_model.inventory_quantity_received,
+                         qty_received - received_itx.inventory_posted_quantity)
+        self.assertEqual(entity_model.reconcile_inventory(), dict())
+
+        # invoicing inventory...
+        item_model = entity_model.get_items_products().filter(
+            for_inventory=True,
+            inventory_quantity_received__gt=0
+        ).first()
+        self.assertIsNotNone(item_model)
+        unit_cost = item_model.inventory_unit_cost
+        qty_invoiced = item_model.inventory_quantity_invoiced
+        invoice_model = entity_model.create_invoice(
+            customer_model=entity_model.get_customers().first(),
+            terms=InvoiceModel.TERMS_ON_RECEIPT,
+            commit=True
+        )
+        for quantity, operation in [(2.0, invoice_model.ITEMIZE_APPEND), (3.0, invoice_model.ITEMIZE_REPLACE)]:
+            invoice_model.migrate_itemtxs(
+                itemtxs={
+                    item_model.item_number: {'quantity': quantity, 'unit_cost': 10.0, 'total_amount': quantity * 10}
+                },
+                operation=operation,
+                commit=True
+            )
+            item_model.refresh_from_db()
+            self.assertEqual(item_model.inventory_quantity_invoiced, qty_invoiced + Decimal.from_float(quantity))
+            self.assertEqual(item_model.inventory_unit_cost, unit_cost)
+            self.assertEqual(entity_model.reconcile_inventory(), dict())
+
+        # invoice COGS uses the current unit cost...
+        migration_data = list(invoice_model.get_migration_data())
+        self.assertEqual(migration_data[0]['item_model__inventory_unit_cost'], unit_cost)
+
 #     def test_closing_entry_meta(self):
 #         self.logger.info('test_closing_entry_creation...')
 #         for entity_model in self.ENTITY_MODEL_QUERYSET:
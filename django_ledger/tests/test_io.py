@@ -1,11 +1,29 @@
-from datetime import timedelta, datetime
+from calendar import monthrange
+from datetime import date, timedelta, datetime
+from decimal import Decimal
 from random import randint
+from unittest.mock import patch
 from zoneinfo import ZoneInfo
 
+from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
+from django_ledger.settings import DJANGO_LEDGER_NUMPY_SUPPORT_ENABLED
+
+from django_ledger.io import roles as roles_module
+from django_ledger.io.io_cache import IODigestCache
+from django_ledger.io.io_columnar import ColumnarDigestEngine, ColumnarDigestValidationError
 from django_ledger.io.io_core import IOValidationError
-from django_ledger.models import EntityModel
+from django_ledger.io.io_library import IOLibrary, IOBluePrint
+from django_ledger.io.io_profile import io_digest_profiled
+from django_ledger.io.io_registry import io_digest_registry, get_io_digest_registry
+from django_ledger.models import (EntityModel, AccountDailyBalanceModel, JournalEntryModel, TransactionModel,
+                                  JournalEntryVerificationContext, JournalEntryValidationError,
+                                  EntityManagementModel, ImportJobModel, StagedTransactionModel)
 from django_ledger.tests.base import DjangoLedgerBaseTest
 
 
@@ -195,3 +213,727 @@ class IOTest(DjangoLedgerBaseTest):
         # )
         #
         # self.assertEqual(io_digest.get_io_txs_queryset().count(), 0)
+
+    def test_digest_access_scoping(self):
+        entity_model = self.get_random_entity_model()
+        UserModel = get_user_model()
+        manager_models = [
+            UserModel.objects.create_user(username=f'manager-{i}-{entity_model.slug}', password='NeverUseThisPassword')
+            for i in range(3)
+        ]
+        EntityManagementModel.objects.bulk_create([
+            EntityManagementModel(entity=entity_model, user=user_model) for user_model in manager_models
+        ])
+
+        txs_count = TransactionModel.objects.filter(journal_entry__ledger__entity=entity_model).count()
+        self.assertTrue(txs_count > 0)
+        to_date = self.START_DATE + timedelta(days=randint(60, 120))
+
+        balances = None
+        for user_model in [self.user_model] + manager_models:
+            with self.subTest(username=user_model.username):
+                txs_qs = TransactionModel.objects.for_entity(entity_slug=entity_model, user_model=user_model)
+                self.assertEqual(txs_qs.count(), txs_count)
+                self.assertNotIn('JOIN "django_ledger_entitymanagementmodel"', str(txs_qs.query))
+
+                with CaptureQueriesContext(connection) as ctx:
+                    io_result = entity_model.python_digest(user_model=user_model, to_date=to_date)
+                digest_sql = [q['sql'] for q in ctx.captured_queries if 'django_ledger_transactionmodel' in q['sql']]
+                self.assertTrue(digest_sql)
+                self.assertFalse(any('JOIN "django_ledger_entitymanagementmodel"' in sql for sql in digest_sql))
+
+                # balances must not be multiplied by the number of managers...
+                if balances is None:
+                    balances = self.get_digest_balances(io_result.accounts_digest)
+                else:
+                    self.assertEqual(balances, self.get_digest_balances(io_result.accounts_digest))
+
+        outsider_model = UserModel.objects.create_user(username=f'outsider-{entity_model.slug}',
+                                                       password='NeverUseThisPassword')
+        self.assertFalse(TransactionModel.objects.for_entity(entity_slug=entity_model,
+                                                             user_model=outsider_model).exists())
+
+    def test_staged_transactions_for_job(self):
+        entity_model = self.get_random_entity_model()
+        UserModel = get_user_model()
+        manager_model = UserModel.objects.create_user(username=f'manager-job-{entity_model.slug}',
+                                                      password='NeverUseThisPassword')
+        outsider_model = UserModel.objects.create_user(username=f'outsider-job-{entity_model.slug}',
+                                                       password='NeverUseThisPassword')
+        EntityManagementModel.objects.create(entity=entity_model, user=manager_model)
+
+        import_job_model = ImportJobModel(
+            description='Test Import Job',
+            bank_account_model=entity_model.bankaccountmodel_set.first()
+        )
+        import_job_model.configure(commit=False)
+        import_job_model.save()
+        StagedTransactionModel.objects.create(
+            import_job=import_job_model,
+            fit_id='test-fit-id',
+            date_posted=self.START_DATE.date(),
+            amount=Decimal('100.00'),
+            name='Test Staged Transaction'
+        )
+
+        for user_model, count in [(self.user_model, 1), (manager_model, 1), (outsider_model, 0)]:
+            with self.subTest(username=user_model.username):
+                staged_txs_qs = StagedTransactionModel.objects.for_job(
+                    entity_slug=entity_model.slug,
+                    user_model=user_model,
+                    job_pk=import_job_model.uuid
+                )
+                self.assertEqual(len(staged_txs_qs), count)
+
+    def get_digest_balances(self, accounts_digest):
+        balances = dict()
+        for acc in accounts_digest:
+            k = (acc['account_uuid'], acc['unit_uuid'], acc['period_year'], acc['period_month'], acc['tx_type'])
+            balances[k] = balances.get(k, 0) + acc['balance']
+        return balances
+
+    def test_digest_columnar_engine(self):
+        entity_model = self.get_random_entity_model()
+        from_datetime = self.START_DATE
+        to_datetime = self.START_DATE + timedelta(days=randint(60, 180))
+
+        with self.assertRaises(ColumnarDigestValidationError):
+            entity_model.digest(to_date=to_datetime, engine='spark')
+
+        use_numpy = [False]
+        if DJANGO_LEDGER_NUMPY_SUPPORT_ENABLED:
+            use_numpy.append(True)
+
+        for digest_kwargs in [
+            dict(),
+            dict(from_date=from_datetime),
+            dict(by_unit=True, by_period=True),
+            dict(by_tx_type=True, signs=False),
+        ]:
+            signs = digest_kwargs.pop('signs', True)
+            io_result = entity_model.python_digest(to_date=to_datetime, engine='python', signs=signs, **digest_kwargs)
+            python_balances = self.get_digest_balances(io_result.accounts_digest)
+
+            io_result = entity_model.python_digest(to_date=to_datetime, engine='columnar', signs=signs, **digest_kwargs)
+            self.assertEqual(python_balances, self.get_digest_balances(io_result.accounts_digest))
+
+            for numpy_enabled in use_numpy:
+                with self.subTest(digest_kwargs=digest_kwargs, use_numpy=numpy_enabled):
+                    io_result = entity_model.database_digest(to_date=to_datetime, role=None, **digest_kwargs)
+                    columnar_engine = ColumnarDigestEngine(
+                        by_unit=digest_kwargs.get('by_unit', False),
+                        by_period=digest_kwargs.get('by_period', False),
+                        by_tx_type=digest_kwargs.get('by_tx_type', False),
+                        use_numpy=numpy_enabled
+                    )
+                    accounts_digest = columnar_engine.digest(rows=io_result.txs_queryset, signs=signs)
+                    self.assertEqual(python_balances, self.get_digest_balances(accounts_digest))
+
+                    for acc in accounts_digest:
+                        self.assertEqual(acc['balance_abs'], abs(acc['balance']))
+
+    def test_digest_columnar_engine_overflow(self):
+        entity_model = self.get_random_entity_model()
+        account_model = entity_model.get_default_coa_accounts().filter(role=roles_module.ASSET_CA_CASH).first()
+
+        def get_row(balance, tx_type):
+            return {
+                'account__uuid': account_model.uuid,
+                'account__role': account_model.role,
+                'account__code': account_model.code,
+                'account__name': account_model.name,
+                'account__balance_type': account_model.balance_type,
+                'tx_type': tx_type,
+                'balance': balance,
+            }
+
+        use_numpy = [False]
+        if DJANGO_LEDGER_NUMPY_SUPPORT_ENABLED:
+            use_numpy.append(True)
+
+        opposite_tx_type = TransactionModel.CREDIT if (
+                account_model.balance_type == TransactionModel.DEBIT
+        ) else TransactionModel.DEBIT
+
+        for amounts in [
+            # each amount fits into int64 minor units, their sum does not...
+            [Decimal('50000000000000000.00'), Decimal('50000000000000000.00')],
+            # a single amount does not fit into int64 minor units...
+            [Decimal('999999999999999999.99'), Decimal('0.01'), Decimal('-999999999999999999.99')],
+        ]:
+            rows = [get_row(amt, account_model.balance_type) for amt in amounts]
+            rows.append(get_row(amounts[0], opposite_tx_type))
+            for numpy_enabled in use_numpy:
+                with self.subTest(amounts=amounts, use_numpy=numpy_enabled):
+                    columnar_engine = ColumnarDigestEngine(use_numpy=numpy_enabled)
+                    accounts_digest = columnar_engine.digest(rows=rows)
+                    self.assertFalse(columnar_engine.is_int64_safe())
+                    self.assertEqual(len(accounts_digest), 1)
+                    self.assertEqual(accounts_digest[0]['balance'], sum(amounts) - amounts[0])
+
+    def test_digest_timestamp_range_filters(self):
+        entity_model = self.get_random_entity_model()
+        from_datetime = self.START_DATE
+        to_datetime = self.START_DATE + timedelta(days=randint(60, 180))
+
+        with patch('django_ledger.settings.DJANGO_LEDGER_USE_TIMESTAMP_RANGE_FILTERS', False):
+            io_result = entity_model.python_digest(from_date=from_datetime.date(), to_date=to_datetime.date())
+            self.assertIn('django_datetime_cast_date', str(io_result.txs_queryset.query))
+            date_balances = self.get_digest_balances(io_result.accounts_digest)
+
+        with patch('django_ledger.settings.DJANGO_LEDGER_USE_TIMESTAMP_RANGE_FILTERS', True):
+            io_result = entity_model.python_digest(from_date=from_datetime.date(), to_date=to_datetime.date())
+            self.assertNotIn('django_datetime_cast_date', str(io_result.txs_queryset.query))
+            range_balances = self.get_digest_balances(io_result.accounts_digest)
+
+        self.assertEqual(date_balances, range_balances)
+
+    @patch('django_ledger.settings.DJANGO_LEDGER_USE_DAILY_BALANCES', True)
+    def test_digest_daily_balances(self):
+        entity_model = self.get_random_entity_model()
+        from_datetime = self.START_DATE + timedelta(days=randint(0, 30))
+        to_datetime = from_datetime + timedelta(days=randint(60, 180))
+
+        daily_balances = AccountDailyBalanceModel.objects.rebuild(entity_model=entity_model)
+        self.assertTrue(len(daily_balances) > 0)
+        self.assertEqual(AccountDailyBalanceModel.objects.verify(entity_model=entity_model), dict())
+
+        def assert_digest_parity():
+            for digest_kwargs in [
+                dict(to_date=to_datetime),
+                dict(from_date=from_datetime, to_date=to_datetime),
+                dict(from_date=from_datetime.date(), to_date=to_datetime.date(), by_unit=True, by_period=True),
+                dict(to_date=to_datetime, by_activity=True, by_tx_type=True),
+            ]:
+                with self.subTest(digest_kwargs=digest_kwargs):
+                    io_result = entity_model.python_digest(
+                        use_daily_balances=False,
+                        use_closing_entries=False,
+                        **digest_kwargs)
+                    txs_balances = self.get_digest_balances(io_result.accounts_digest)
+
+                    io_result = entity_model.python_digest(use_daily_balances=True, **digest_kwargs)
+                    self.assertEqual(txs_balances, self.get_digest_balances(io_result.accounts_digest))
+
+        assert_digest_parity()
+
+        # daily balances are updated when the journal entry posted state changes...
+        je_model = self.get_random_je(entity_model=entity_model)
+        if je_model.ledger.is_locked():
+            je_model.ledger.unlock(commit=True)
+        je_model.mark_as_unposted(commit=True, raise_exception=True)
+        self.assertEqual(AccountDailyBalanceModel.objects.verify(entity_model=entity_model), dict())
+
+        je_model.mark_as_posted(commit=True, raise_exception=True)
+        self.assertEqual(AccountDailyBalanceModel.objects.verify(entity_model=entity_model), dict())
+
+        # ...and when the ledger posted state changes.
+        ledger_model = je_model.ledger
+        ledger_model.unpost(commit=True, raise_exception=True)
+        self.assertEqual(AccountDailyBalanceModel.objects.verify(entity_model=entity_model), dict())
+
+        assert_digest_parity()
+
+    def test_digest_many(self):
+        entity_model = self.get_random_entity_model()
+        periods = list()
+        from_datetime = self.START_DATE
+        for i in range(3):
+            to_datetime = from_datetime + timedelta(days=randint(20, 60))
+            periods.append((from_datetime, to_datetime))
+            from_datetime = to_datetime + timedelta(days=1)
+
+        with self.assertRaises(IOValidationError):
+            entity_model.digest_many(periods=[])
+
+        with self.assertNumQueries(1):
+            io_digest_list = entity_model.digest_many(periods=periods, income_statement=True)
+
+        self.assertEqual(len(io_digest_list), len(periods))
+
+        for (from_date, to_date), io_digest_many in zip(periods, io_digest_list):
+            io_digest = entity_model.digest(from_date=from_date, to_date=to_date, income_statement=True)
+            self.assertEqual(
+                self.get_digest_balances(io_digest.get_io_data()['accounts']),
+                self.get_digest_balances(io_digest_many.get_io_data()['accounts'])
+            )
+            self.assertEqual(
+                io_digest.get_income_statement_data()['net_income'],
+                io_digest_many.get_income_statement_data()['net_income'],
+            )
+
+        io_digest_list = entity_model.digest_many(periods=periods, balance_sheet_statement=True, by_unit=True)
+        for (from_date, to_date), io_digest_many in zip(periods, io_digest_list):
+            io_digest = entity_model.digest(to_date=to_date, balance_sheet_statement=True, by_unit=True)
+            self.assertEqual(
+                self.get_digest_balances(io_digest.get_io_data()['accounts']),
+                self.get_digest_balances(io_digest_many.get_io_data()['accounts'])
+            )
+
+        # periods without an upper bound, same as digest()...
+        open_periods = [(periods[1][0], None), (None, None), periods[0]]
+        io_digest_list = entity_model.digest_many(periods=open_periods)
+        for (from_date, to_date), io_digest_many in zip(open_periods, io_digest_list):
+            io_digest = entity_model.digest(from_date=from_date, to_date=to_date)
+            self.assertEqual(
+                self.get_digest_balances(io_digest.get_io_data()['accounts']),
+                self.get_digest_balances(io_digest_many.get_io_data()['accounts'])
+            )
+
+    def test_digest_roles_groups_by_period(self):
+        entity_model = self.get_random_entity_model()
+        io_digest = entity_model.digest(
+            from_date=self.START_DATE,
+            to_date=self.START_DATE + timedelta(days=randint(60, 180)),
+            by_period=True,
+            by_unit=True,
+            process_roles=True,
+            process_groups=True
+        )
+        io_data = io_digest.get_io_data()
+
+        for key, balance_by_period, balance_by_unit in [
+            ('role_balance', io_data['role_balance_by_period'], io_data['role_balance_by_unit']),
+            ('group_balance', io_data['group_balance_by_period'], io_data['group_balance_by_unit']),
+        ]:
+            for k, balance in io_data[key].items():
+                self.assertEqual(balance, sum(v.get(k, 0) for v in balance_by_period.values()))
+                self.assertEqual(balance, sum(v.get(k, 0) for v in balance_by_unit.values()))
+
+        for acc in io_data['group_account']['GROUP_ASSETS']:
+            self.assertIn(acc, io_data['role_account'][roles_module.ROLES_DIRECTORY_INDEX[acc['role']]])
+
+    def test_digest_closing_entry_checkpoints(self):
+        entity_model = self.get_random_entity_model()
+        start_date = self.START_DATE.date()
+
+        # month end closing entries within the populated date range...
+        closing_dates = list()
+        year, month = start_date.year, start_date.month
+        for _ in range(5):
+            entity_model.close_books_for_month(year=year, month=month)
+            closing_dates.append(date(year, month, monthrange(year, month)[1]))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        self.assertEqual(entity_model.get_closing_entry_checkpoint(closing_dates[2]), closing_dates[2])
+        self.assertEqual(entity_model.get_closing_entry_checkpoint(closing_dates[2], inclusive=False),
+                         closing_dates[1])
+        self.assertEqual(entity_model.get_closing_entry_checkpoint(closing_dates[2] + timedelta(days=10)),
+                         closing_dates[2])
+        self.assertIsNone(entity_model.get_closing_entry_checkpoint(closing_dates[0] - timedelta(days=1)))
+
+        for digest_kwargs in [
+            dict(to_date=closing_dates[3] + timedelta(days=12)),
+            dict(to_date=closing_dates[3]),
+            dict(from_date=closing_dates[0] + timedelta(days=1), to_date=closing_dates[3]),
+            dict(from_date=closing_dates[0] + timedelta(days=3), to_date=closing_dates[3] + timedelta(days=4)),
+            dict(from_date=closing_dates[1] + timedelta(days=10), to_date=closing_dates[2] + timedelta(days=10)),
+            dict(from_date=closing_dates[0] + timedelta(days=3), to_date=closing_dates[4] - timedelta(days=5),
+                 by_unit=True, by_activity=True),
+        ]:
+            with self.subTest(digest_kwargs=digest_kwargs):
+                io_result = entity_model.python_digest(use_closing_entries=False, **digest_kwargs)
+                txs_balances = self.get_digest_balances(io_result.accounts_digest)
+
+                io_result = entity_model.python_digest(use_closing_entries=True, **digest_kwargs)
+                ce_balances = self.get_digest_balances(io_result.accounts_digest)
+                self.assertTrue(io_result.ce_match)
+
+                # sqlite aggregates the signed amounts as floats...
+                self.assertEqual(
+                    {k: round(v, 2) for k, v in txs_balances.items() if round(v, 2)},
+                    {k: round(v, 2) for k, v in ce_balances.items() if round(v, 2)}
+                )
+
+    def test_digest_use_closing_entry(self):
+        entity_model = self.get_random_entity_model()
+        start_date = self.START_DATE.date()
+        ce_results = entity_model.close_books_for_range(
+            start_date=start_date,
+            end_date=start_date + timedelta(days=120),
+            force_update=True
+        )
+        to_date = ce_results[-1][0].closing_date + timedelta(days=5)
+
+        io_digest = entity_model.digest(to_date=to_date, use_closing_entry=False, use_cache=False)
+        self.assertFalse(io_digest.get_io_result().ce_match)
+        txs_balances = self.get_digest_balances(io_digest.get_io_result().accounts_digest)
+
+        for digest_kwargs in [
+            dict(use_closing_entry=True),
+            dict(balance_sheet_statement=True),
+        ]:
+            with self.subTest(digest_kwargs=digest_kwargs):
+                io_digest = entity_model.digest(to_date=to_date, use_cache=False, **digest_kwargs)
+                io_result = io_digest.get_io_result()
+                self.assertTrue(io_result.ce_match)
+                self.assertEqual(io_result.ce_to_date, ce_results[-1][0].closing_date)
+
+                ce_balances = self.get_digest_balances(io_result.accounts_digest)
+                # sqlite aggregates the signed amounts as floats...
+                self.assertEqual(
+                    {k: round(v, 2) for k, v in txs_balances.items() if round(v, 2)},
+                    {k: round(v, 2) for k, v in ce_balances.items() if round(v, 2)}
+                )
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_digest_closing_entry_cache(self):
+        entity_model = self.get_random_entity_model()
+        start_date = self.START_DATE.date()
+        ce_results = entity_model.close_books_for_range(
+            start_date=start_date,
+            end_date=start_date + timedelta(days=120),
+            force_update=True
+        )
+        closing_dates = [ce_model.closing_date for ce_model, _ in ce_results]
+
+        ce_data = entity_model.save_closing_entry_cache_for_date(closing_date=closing_dates[1])
+        ce_data_cached = entity_model.get_closing_entry_cache_for_date(closing_date=closing_dates[1])
+        self.assertEqual(ce_data, ce_data_cached)
+        self.assertEqual(
+            sum(ce_data_cached.balance),
+            sum(ce.balance for ce in entity_model.get_closing_entry_queryset_for_date(closing_dates[1]))
+        )
+
+        # payloads written with a different schema version are cache misses...
+        with patch('django_ledger.io.io_closing_entry_cache.CLOSING_ENTRY_CACHE_SCHEMA_VERSION', 0):
+            self.assertIsNone(entity_model.get_closing_entry_cache_for_date(closing_date=closing_dates[1]))
+
+        digest_kwargs_list = [
+            dict(to_date=closing_dates[2] + timedelta(days=12)),
+            dict(from_date=closing_dates[0] + timedelta(days=3), to_date=closing_dates[2] + timedelta(days=4),
+                 by_unit=True, by_activity=True),
+            dict(to_date=closing_dates[2], role=[roles_module.ASSET_CA_CASH], by_period=True),
+        ]
+        ce_balances_list = list()
+        for digest_kwargs in digest_kwargs_list:
+            io_result = entity_model.python_digest(use_closing_entries=True, **digest_kwargs)
+            ce_balances_list.append(self.get_digest_balances(io_result.accounts_digest))
+
+        with patch.multiple('django_ledger.settings', DJANGO_LEDGER_USE_CLOSING_ENTRY_CACHE=True):
+            for digest_kwargs in digest_kwargs_list:
+                entity_model.python_digest(use_closing_entries=True, **digest_kwargs)
+
+            # closing balances must come from the cache only...
+            TransactionModel.objects.for_entity(entity_slug=entity_model).is_closing_entry().delete()
+
+            for digest_kwargs, ce_balances in zip(digest_kwargs_list, ce_balances_list):
+                with self.subTest(digest_kwargs=digest_kwargs):
+                    with CaptureQueriesContext(connection) as ctx:
+                        io_result = entity_model.python_digest(use_closing_entries=True, **digest_kwargs)
+                    cached_balances = self.get_digest_balances(io_result.accounts_digest)
+
+                    self.assertTrue(io_result.ce_match)
+                    self.assertFalse(any('closingentrytransactionmodel' in q['sql'] for q in ctx.captured_queries))
+
+                    # sqlite aggregates the signed amounts as floats...
+                    self.assertEqual(
+                        {k: round(v, 2) for k, v in ce_balances.items() if round(v, 2)},
+                        {k: round(v, 2) for k, v in cached_balances.items() if round(v, 2)}
+                    )
+
+            # financial statements read the cache through digest()...
+            with CaptureQueriesContext(connection) as ctx:
+                io_digest = entity_model.digest(
+                    balance_sheet_statement=True,
+                    use_cache=False,
+                    **digest_kwargs_list[0]
+                )
+            io_result = io_digest.get_io_result()
+            cached_balances = self.get_digest_balances(io_result.accounts_digest)
+
+            self.assertTrue(io_result.ce_match)
+            self.assertFalse(any('closingentrytransactionmodel' in q['sql'] for q in ctx.captured_queries))
+            self.assertEqual(
+                {k: round(v, 2) for k, v in ce_balances_list[0].items() if round(v, 2)},
+                {k: round(v, 2) for k, v in cached_balances.items() if round(v, 2)}
+            )
+
+    def test_digest_profiling(self):
+        entity_model = self.get_random_entity_model()
+        profiles = list()
+
+        def receiver(sender, io_model, io_result, profile, **kwargs):
+            profiles.append(profile)
+
+        io_digest_profiled.connect(receiver)
+        try:
+            io_digest = entity_model.digest(
+                from_date=self.START_DATE,
+                to_date=self.START_DATE + timedelta(days=randint(60, 180)),
+                process_roles=True,
+                income_statement=True,
+                use_profiling=True
+            )
+            entity_model.digest(to_date=self.START_DATE + timedelta(days=30))
+        finally:
+            io_digest_profiled.disconnect(receiver)
+
+        profile = io_digest.get_io_result().profile
+        self.assertEqual(profiles, [profile])
+        self.assertEqual(
+            [s.name for s in profile.stages],
+            ['database_digest', 'aggregation', 'python_digest', 'roles', 'groups', 'income_statement']
+        )
+
+        aggregation_stage = profile.get_stage('aggregation')
+        self.assertEqual(aggregation_stage.query_count, 1)
+        self.assertTrue(aggregation_stage.rows >= len(io_digest.get_io_data()['accounts']))
+        self.assertEqual(profile.get_stage('python_digest').rows, len(io_digest.get_io_data()['accounts']))
+        self.assertEqual(profile.get_stage('groups').query_count, 0)
+
+    def test_digest_registry(self):
+        entity_model = self.get_random_entity_model()
+        digest_kwargs = dict(
+            from_date=self.START_DATE,
+            to_date=self.START_DATE + timedelta(days=randint(60, 180)),
+            process_groups=True,
+        )
+        io_digest_equity = entity_model.digest(equity_only=True, **digest_kwargs)
+        io_digest = entity_model.digest(**digest_kwargs)
+
+        with io_digest_registry() as io_registry:
+            entity_model.digest(by_period=True, by_activity=True, **digest_kwargs)
+
+            # narrower digests are derived from the registered aggregation...
+            with self.assertNumQueries(0):
+                io_digest_equity_registry = entity_model.digest(equity_only=True, **digest_kwargs)
+                io_digest_registry_ = entity_model.digest(**digest_kwargs)
+
+            self.assertEqual(io_registry.HITS, 2)
+
+        self.assertIsNone(get_io_digest_registry())
+        self.assertEqual(
+            self.get_digest_balances(io_digest_equity.get_io_data()['accounts']),
+            self.get_digest_balances(io_digest_equity_registry.get_io_data()['accounts'])
+        )
+        self.assertEqual(
+            self.get_digest_balances(io_digest.get_io_data()['accounts']),
+            self.get_digest_balances(io_digest_registry_.get_io_data()['accounts'])
+        )
+        self.assertEqual(
+            len(io_digest.get_io_data()['accounts']),
+            len(io_digest_registry_.get_io_data()['accounts'])
+        )
+        self.assertEqual(
+            io_digest.get_io_data()['group_balance'],
+            io_digest_registry_.get_io_data()['group_balance']
+        )
+
+    def test_adigest(self):
+        entity_model = self.get_random_entity_model()
+        from_datetime = self.START_DATE
+        to_datetime = self.START_DATE + timedelta(days=randint(60, 180))
+
+        io_digest = entity_model.digest_financial_statements(
+            from_date=from_datetime,
+            to_date=to_datetime
+        )
+        io_adigest = async_to_sync(entity_model.adigest)(
+            from_date=from_datetime,
+            to_date=to_datetime,
+            balance_sheet_statement=True,
+            income_statement=True,
+            cash_flow_statement=True
+        )
+        self.assertEqual(
+            self.get_digest_balances(io_digest.get_io_data()['accounts']),
+            self.get_digest_balances(io_adigest.get_io_data()['accounts'])
+        )
+        self.assertEqual(
+            io_digest.get_income_statement_data()['net_income'],
+            io_adigest.get_income_statement_data()['net_income']
+        )
+
+        io_adigest_is = async_to_sync(entity_model.adigest_income_statement)(
+            from_date=from_datetime,
+            to_date=to_datetime
+        )
+        self.assertEqual(
+            io_digest.get_income_statement_data()['net_income'],
+            io_adigest_is.get_income_statement_data()['net_income']
+        )
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_digest_cache(self):
+        entity_model = self.get_random_entity_model()
+        from_datetime = self.START_DATE
+        to_datetime = self.START_DATE + timedelta(days=randint(60, 180))
+        digest_kwargs = dict(
+            from_date=from_datetime,
+            to_date=to_datetime,
+            process_roles=True,
+            process_groups=True,
+            process_ratios=True,
+            income_statement=True,
+            balance_sheet_statement=True,
+            cash_flow_statement=True,
+            use_cache=True
+        )
+
+        IODigestCache.reset_stats()
+        io_digest = entity_model.digest(**digest_kwargs)
+        self.assertEqual(IODigestCache.get_stats()['misses'], 1)
+
+        # only the entity data version is fetched...
+        with self.assertNumQueries(1):
+            io_digest_cached = entity_model.digest(**digest_kwargs)
+
+        self.assertEqual(IODigestCache.get_stats()['hits'], 1)
+        self.assertEqual(io_digest_cached.IO_MODEL, entity_model)
+        self.assertEqual(
+            io_digest.get_income_statement_data()['net_income'],
+            io_digest_cached.get_income_statement_data()['net_income']
+        )
+        self.assertEqual(
+            self.get_digest_balances(io_digest.get_io_data()['accounts']),
+            self.get_digest_balances(io_digest_cached.get_io_data()['accounts'])
+        )
+
+        # a journal entry state change invalidates the cache...
+        data_version = entity_model.get_data_version()
+        je_model = self.get_random_je(entity_model=entity_model)
+        if je_model.ledger.is_locked():
+            je_model.ledger.unlock(commit=True)
+        je_model.mark_as_unposted(commit=True, raise_exception=True)
+        self.assertTrue(entity_model.get_data_version() > data_version)
+
+        entity_model.digest(**digest_kwargs)
+        self.assertEqual(IODigestCache.get_stats()['misses'], 2)
+
+    def test_commit_txs_bulk(self):
+        entity_model = self.get_random_entity_model()
+        ledger_model = entity_model.create_ledger(name='Bulk Ledger')
+        accounts_qs = entity_model.get_coa_accounts(active=True)
+        cash_account = accounts_qs.filter(role=roles_module.ASSET_CA_CASH).first()
+        expense_account = accounts_qs.filter(role=roles_module.EXPENSE_OPERATIONAL).first()
+        payable_account = accounts_qs.filter(role=roles_module.LIABILITY_CL_ACC_PAYABLE).first()
+
+        je_timestamp = self.START_DATE + timedelta(days=randint(400, 500))
+
+        def get_entry(credit_account, debit_account, credit_amount=100, debit_amount=100, je_posted=True):
+            return {
+                'je_timestamp': je_timestamp,
+                'je_ledger_model': ledger_model,
+                'je_posted': je_posted,
+                'je_txs': [
+                    {'account': credit_account, 'amount': credit_amount, 'tx_type': 'credit', 'description': None},
+                    {'account': debit_account, 'amount': debit_amount, 'tx_type': 'debit', 'description': None},
+                ]
+            }
+
+        entries = [
+            get_entry(cash_account, expense_account),
+            get_entry(cash_account, expense_account, debit_amount=90),
+            get_entry(payable_account, expense_account, je_posted=False),
+            {**get_entry(cash_account, expense_account), 'je_ledger_model': None},
+            get_entry(cash_account, expense_account, credit_amount=50, debit_amount=50),
+            {**get_entry(cash_account, expense_account), 'je_timestamp': 12345},
+            get_entry(cash_account.code, expense_account),
+            get_entry(cash_account, expense_account, credit_amount='100', debit_amount='100'),
+            'not-an-entry',
+        ]
+
+        data_version = entity_model.get_data_version()
+        bulk_result = entity_model.commit_txs_bulk(entries=entries, batch_size=2)
+
+        # invalid entries are reported without aborting the rest...
+        self.assertEqual(set(bulk_result.errors.keys()), {1, 3, 5, 6, 7, 8})
+        self.assertEqual(set(bulk_result.je_models.keys()), {0, 2, 4})
+        self.assertTrue(entity_model.get_data_version() > data_version)
+
+        je_qs = ledger_model.journal_entries.all().order_by('je_number')
+        self.assertEqual(je_qs.count(), 3)
+        je_numbers = [je.je_number for je in je_qs]
+        self.assertEqual(len(set(je_numbers)), 3)
+        je_sequences = [int(n.split('-')[-1]) for n in je_numbers]
+        self.assertEqual(je_sequences, list(range(je_sequences[0], je_sequences[0] + 3)))
+
+        # the activity matches the one determined by commit_txs...
+        je_model, _ = entity_model.commit_txs(**entries[0])
+        for i, je_bulk_model in bulk_result.je_models.items():
+            je_bulk_model.refresh_from_db()
+            self.assertEqual(je_bulk_model.transactionmodel_set.count(), 2)
+            self.assertEqual(je_bulk_model.is_posted(), entries[i]['je_posted'])
+            je_bulk_model.verify(force_verify=True)
+            self.assertTrue(je_bulk_model.is_verified())
+        self.assertEqual(bulk_result.je_models[0].activity, je_model.activity)
+        self.assertEqual(bulk_result.je_models[2].activity, None)
+
+    def test_io_cursor_dispatch_many(self):
+        entity_model = self.get_random_entity_model()
+        accounts_qs = entity_model.get_coa_accounts(active=True)
+        cash_account = accounts_qs.filter(role=roles_module.ASSET_CA_CASH).first()
+        expense_account = accounts_qs.filter(role=roles_module.EXPENSE_OPERATIONAL).first()
+
+        library = IOLibrary(name='dispatch-many-library')
+
+        def expense_blueprint(amount, description=None) -> IOBluePrint:
+            blueprint = IOBluePrint()
+            blueprint.debit(account_code=expense_account.code, amount=amount, description=description)
+            blueprint.credit(account_code=cash_account.code, amount=amount, description=description)
+            return blueprint
+
+        library.register(expense_blueprint)
+        cursor = library.get_cursor(entity_model=entity_model, user_model=self.user_model)
+
+        with patch.object(library, 'get_blueprint', wraps=library.get_blueprint) as get_blueprint:
+            dispatched = cursor.dispatch_many(
+                'expense_blueprint',
+                kwargs_iterable=[
+                    {'amount': 10 + i, 'ledger_model': 'dispatch-many-1' if i % 2 else 'dispatch-many-2'}
+                    for i in range(10)
+                ])
+            self.assertEqual(dispatched, 10)
+            self.assertEqual(get_blueprint.call_count, 1)
+
+        results = cursor.commit(post_journal_entries=False)
+        self.assertTrue(cursor.is_committed())
+
+        for ledger_xid in ('dispatch-many-1', 'dispatch-many-2'):
+            ledger_model = entity_model.ledgermodel_set.get(ledger_xid=ledger_xid)
+            je_model = results[ledger_model]['journal_entry']
+            self.assertEqual(ledger_model.journal_entries.count(), 1)
+            self.assertEqual(je_model.transactionmodel_set.count(), 10)
+            je_model.verify(force_verify=True)
+            self.assertTrue(je_model.is_verified())
+
+    def test_commit_txs_in_memory_verification(self):
+        entity_model = self.get_random_entity_model()
+        ledger_model = entity_model.create_ledger(name='In Memory Verification Ledger')
+        accounts_qs = entity_model.get_coa_accounts(active=True)
+        cash_account = accounts_qs.filter(role=roles_module.ASSET_CA_CASH).first()
+        expense_account = accounts_qs.filter(role=roles_module.EXPENSE_OPERATIONAL).first()
+
+        je_model, txs_models = entity_model.commit_txs(
+            je_timestamp=self.START_DATE + timedelta(days=randint(400, 500)),
+            je_ledger_model=ledger_model,
+            je_posted=True,
+            je_txs=[
+                {'account': cash_account, 'amount': 100, 'tx_type': 'credit', 'description': None},
+                {'account': expense_account, 'amount': 100, 'tx_type': 'debit', 'description': None},
+            ]
+        )
+        self.assertTrue(je_model.is_posted())
+        self.assertEqual(je_model.activity, JournalEntryModel.OPERATING_ACTIVITY)
+
+        # account roles are resolved with a single query...
+        with self.assertNumQueries(1):
+            verification_context = JournalEntryVerificationContext(
+                txs_models=[TransactionModel(journal_entry_id=tx.journal_entry_id,
+                                             account_id=tx.account_id,
+                                             amount=tx.amount,
+                                             tx_type=tx.tx_type) for tx in txs_models]
+            )
+
+        je_model = JournalEntryModel.objects.select_related('ledger__entity').get(uuid__exact=je_model.uuid)
+        je_model.activity = None
+        with self.assertNumQueries(0):
+            txs_list, verified = je_model.verify(force_verify=True, verification_context=verification_context)
+        self.assertTrue(verified)
+        self.assertEqual(len(txs_list), 2)
+        self.assertEqual(je_model.activity, JournalEntryModel.OPERATING_ACTIVITY)
+
+        txs_list[0].amount += 1
+        with self.assertRaises(JournalEntryValidationError):
+            je_model.verify(force_verify=True, verification_context=verification_context)
@@ -14,7 +14,7 @@ from django_ledger.forms.transactions import (
 from django_ledger.io.io_core import get_localdate
 from django_ledger.models import (
     TransactionModel, EntityModel, AccountModel, LedgerModel, JournalEntryModel,
-    TransactionModelValidationError, JournalEntryValidationError
+    TransactionModelValidationError, JournalEntryValidationError, txs_validation_batch
 )
 from django_ledger.tests.base import DjangoLedgerBaseTest
 
@@ -33,6 +33,28 @@ class TransactionModelTest(DjangoLedgerBaseTest):
         with self.assertRaises(ValidationError):
             txs_model.full_clean()
 
+    def test_validation_batch(self):
+        entity_model = self.get_random_entity_model()
+        txs_qs = TransactionModel.objects.for_entity(entity_slug=entity_model).order_by('journal_entry_id')[:20]
+        je_locked = {tx.journal_entry_id: tx.journal_entry.is_locked() for tx in txs_qs}
+        txs_models = list(txs_qs.all())
+
+        # one query for accounts, one for journal entries...
+        with self.assertNumQueries(2):
+            with txs_validation_batch(txs_models=txs_models):
+                pass
+
+        with txs_validation_batch(txs_models=txs_models):
+            with self.assertNumQueries(0):
+                for tx_model in txs_models:
+                    tx_model.clean()
+                    self.assertEqual(tx_model.is_journal_entry_locked(), je_locked[tx_model.journal_entry_id])
+
+            locked_tx_model = next((tx for tx in txs_models if je_locked[tx.journal_entry_id]), None)
+            if locked_tx_model:
+                with self.assertRaises(TransactionModelValidationError):
+                    locked_tx_model.save()
+
 
 class TransactionModelFormTest(DjangoLedgerBaseTest):
 
@@ -1,24 +1,34 @@
 from django.urls import path
 
 from django_ledger import views
+from django_ledger.settings import DJANGO_LEDGER_USE_ASYNC_API_VIEWS
+
+if DJANGO_LEDGER_USE_ASYNC_API_VIEWS:
+    PnLAPIView = views.AsyncPnLAPIView
+    PayableNetAPIView = views.AsyncPayableNetAPIView
+    ReceivableNetAPIView = views.AsyncReceivableNetAPIView
+else:
+    PnLAPIView = views.PnLAPIView
+    PayableNetAPIView = views.PayableNetAPIView
+    ReceivableNetAPIView = views.ReceivableNetAPIView
 
 urlpatterns = [
     path('entity/<slug:entity_slug>/data/pnl/',
-         views.PnLAPIView.as_view(),
+         PnLAPIView.as_view(),
          name='entity-json-pnl'),
     path('entity/<slug:entity_slug>/data/net-payables/',
-         views.PayableNetAPIView.as_view(),
+         PayableNetAPIView.as_view(),
          name='entity-json-net-payables'),
     path('entity/<slug:entity_slug>/data/net-receivables/',
-         views.ReceivableNetAPIView.as_view(),
+         ReceivableNetAPIView.as_view(),
          name='entity-json-net-receivables'),
     path('unit/<slug:entity_slug>/<slug:unit_slug>/data/pnl/',
-         views.PnLAPIView.as_view(),
+         PnLAPIView.as_view(),
          name='unit-json-pnl'),
     path('unit/<slug:entity_slug>/<slug:unit_slug>/data/net-payables/',
-         views.PayableNetAPIView.as_view(),
+         PayableNetAPIView.as_view(),
          name='unit-json-net-payables'),
     path('unit/<slug:entity_slug>/<slug:unit_slug>/data/net-receivables/',
-         views.ReceivableNetAPIView.as_view(),
+         ReceivableNetAPIView.as_view(),
          name='unit-json-net-receivables'),
 ]
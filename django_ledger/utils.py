@@ -1,16 +1,18 @@
-from datetime import date
+from datetime import date, timedelta
 from importlib import import_module
-from itertools import groupby
 from random import choice
 from string import ascii_uppercase, ascii_lowercase, digits
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Case, When, F, Q, Sum, Value, Exists, OuterRef, DecimalField
+from django.db.models.functions import Coalesce
 from django.utils.dateparse import parse_date
 
 from django_ledger.io.io_core import get_localdate
-from django_ledger.models import EntityModel
+from django_ledger.models import EntityModel, JournalEntryModel
+from django_ledger.settings import DJANGO_LEDGER_NET_SUMMARY_BUCKET_EDGES
 
 UserModel = get_user_model()
 
@@ -70,32 +72,147 @@ def set_session_date_filter(request, entity_slug: str, end_date: date):
     request.session[session_key] = end_date.isoformat()
 
 
-def accruable_net_summary(queryset: QuerySet) -> dict:
+def get_accruable_net_summary_buckets(bucket_edges: Optional[Iterable[int]] = None) -> List[str]:
     """
-    A convenience function that computes current net summary of accruable models.
+    The net summary bucket names for the given bucket edges, in order. Each edge closes a bucket. The last edge also
+    opens the final bucket, i.e. edges (0, 30, 60, 90) produce net_0, net_30, net_60, net_90 and net_90+.
+
+    :param bucket_edges: Days until due date closing each bucket. Defaults to DJANGO_LEDGER_NET_SUMMARY_BUCKET_EDGES.
+    :return: A list of bucket names.
+    """
+    if bucket_edges is None:
+        bucket_edges = DJANGO_LEDGER_NET_SUMMARY_BUCKET_EDGES
+    bucket_edges = sorted(bucket_edges)
+    return [f'net_{e}' for e in bucket_edges] + [f'net_{bucket_edges[-1]}+']
+
+
+def get_accruable_net_summary_queryset(queryset: QuerySet,
+                                       bucket_edges: Optional[Iterable[int]] = None,
+                                       unit_slug: Optional[str] = None,
+                                       group_by: Optional[str] = None,
+                                       as_of: Optional[date] = None) -> Tuple[QuerySet, Dict]:
+    """
+    Builds the aggregations needed to compute the net summary of accruable models in the database.
+    The open amount of each model is assigned to a bucket based on the number of days until its due date. Past due
+    models and models without due date are assigned to the first bucket.
+
+    :param queryset: Accruable Objects Queryset.
+    :param bucket_edges: Days until due date closing each bucket. Defaults to DJANGO_LEDGER_NET_SUMMARY_BUCKET_EDGES.
+    :param unit_slug: Only includes models with journal entries on the given EntityUnitModel slug.
+    :param group_by: Optional foreign key field name to group by, i.e. "vendor" or "customer".
+    :param as_of: The date used to determine the number of days until due date. Defaults to the local date.
+    :return: A tuple of the filtered queryset and the aggregation expressions by bucket name.
+    """
+    if bucket_edges is None:
+        bucket_edges = DJANGO_LEDGER_NET_SUMMARY_BUCKET_EDGES
+    bucket_edges = sorted(bucket_edges)
+
+    if not bucket_edges:
+        raise ValueError('Must provide at least one bucket edge.')
+
+    if not as_of:
+        as_of = get_localdate()
+
+    if unit_slug:
+        queryset = queryset.filter(
+            Exists(JournalEntryModel.objects.filter(
+                ledger_id=OuterRef('ledger_id'),
+                entity_unit__slug__exact=unit_slug
+            ))
+        )
+
+    if group_by:
+        queryset = queryset.values(f'{group_by}__uuid')
+
+    amount_open = Case(
+        When(accrue=True, then=F('amount_due') - F('amount_due') * F('progress')),
+        default=F('amount_due') - F('amount_paid'),
+        output_field=DecimalField()
+    )
+
+    bucket_names = get_accruable_net_summary_buckets(bucket_edges)
+    bucket_due_dates = [as_of + timedelta(days=e) for e in bucket_edges]
+    bucket_filters = [Q(date_due__isnull=True) | Q(date_due__lte=bucket_due_dates[0])]
+    bucket_filters += [Q(date_due__gt=d0, date_due__lte=d1) for d0, d1 in zip(bucket_due_dates, bucket_due_dates[1:])]
+    bucket_filters += [Q(date_due__gt=bucket_due_dates[-1])]
+
+    aggregations = {
+        n: Coalesce(
+            Sum(Case(When(q, then=amount_open), default=Value(0), output_field=DecimalField())),
+            Value(0),
+            output_field=DecimalField()
+        ) for n, q in zip(bucket_names, bucket_filters)
+    }
+
+    queryset = queryset.order_by()
+    return queryset, aggregations
+
+
+def accruable_net_summary(queryset: QuerySet,
+                          bucket_edges: Optional[Iterable[int]] = None,
+                          unit_slug: Optional[str] = None,
+                          group_by: Optional[str] = None,
+                          as_of: Optional[date] = None) -> Dict:
+    """
+    A convenience function that computes current net summary of accruable models in a single database query.
     "net_30" group indicates the total amount is due in 30 days or less.
     "net_0" group indicates total past due amount.
 
     :param queryset: Accruable Objects Queryset.
-    :return: A dictionary summarizing current net summary 0,30,60,90,90+ bill open amounts.
+    :param bucket_edges: Days until due date closing each bucket. Defaults to DJANGO_LEDGER_NET_SUMMARY_BUCKET_EDGES.
+    :param unit_slug: Only includes models with journal entries on the given EntityUnitModel slug.
+    :param group_by: Optional foreign key field name to group by, i.e. "vendor" or "customer".
+    :param as_of: The date used to determine the number of days until due date. Defaults to the local date.
+    :return: A dictionary summarizing current net summary 0,30,60,90,90+ open amounts. If group_by is provided, a
+        dictionary of net summaries by group UUID.
     """
-    nets = {
-        'net_0': 0,
-        'net_30': 0,
-        'net_60': 0,
-        'net_90': 0,
-        'net_90+': 0
-    }
-    nets_collect = [{
-        'net_due_group': b.net_due_group(),
-        'amount_open': b.get_amount_open()
-    } for b in queryset]
-    nets_collect.sort(key=lambda b: b['net_due_group'])
-    nets_collect = {
-        g: float(sum(b['amount_open'] for b in l)) for g, l in groupby(nets_collect, key=lambda b: b['net_due_group'])
-    }
-    nets.update(nets_collect)
-    return nets
+    queryset, aggregations = get_accruable_net_summary_queryset(
+        queryset=queryset,
+        bucket_edges=bucket_edges,
+        unit_slug=unit_slug,
+        group_by=group_by,
+        as_of=as_of
+    )
+
+    if group_by:
+        return {
+            g.pop(f'{group_by}__uuid'): {n: float(v) for n, v in g.items()}
+            for g in queryset.annotate(**aggregations)
+        }
+    return {n: float(v) for n, v in queryset.aggregate(**aggregations).items()}
+
+
+async def aaccruable_net_summary(queryset: QuerySet,
+                                 bucket_edges: Optional[Iterable[int]] = None,
+                                 unit_slug: Optional[str] = None,
+                                 group_by: Optional[str] = None,
+                                 as_of: Optional[date] = None) -> Dict:
+    """
+    Asynchronous version of accruable_net_summary. The queryset is evaluated using the Django async ORM.
+
+    :param queryset: Accruable Objects Queryset.
+    :param bucket_edges: Days until due date closing each bucket. Defaults to DJANGO_LEDGER_NET_SUMMARY_BUCKET_EDGES.
+    :param unit_slug: Only includes models with journal entries on the given EntityUnitModel slug.
+    :param group_by: Optional foreign key field name to group by, i.e. "vendor" or "customer".
+    :param as_of: The date used to determine the number of days until due date. Defaults to the local date.
+    :return: A dictionary summarizing current net summary 0,30,60,90,90+ open amounts. If group_by is provided, a
+        dictionary of net summaries by group UUID.
+    """
+    queryset, aggregations = get_accruable_net_summary_queryset(
+        queryset=queryset,
+        bucket_edges=bucket_edges,
+        unit_slug=unit_slug,
+        group_by=group_by,
+        as_of=as_of
+    )
+
+    if group_by:
+        return {
+            g.pop(f'{group_by}__uuid'): {n: float(v) for n, v in g.items()}
+            async for g in queryset.annotate(**aggregations)
+        }
+    net_summary = await queryset.aaggregate(**aggregations)
+    return {n: float(v) for n, v in net_summary.items()}
 
 
 def get_end_date_from_session(entity_slug: str, request) -> date:
@@ -43,7 +43,7 @@ class BaseAccountModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             qs = AccountModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user,
             ).select_related(
                 'coa_model',
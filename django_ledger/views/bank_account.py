@@ -23,7 +23,7 @@ class BankAccountModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             self.queryset = BankAccountModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).select_related('cash_account', 'entity_model')
         return super().get_queryset()
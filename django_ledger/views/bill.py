@@ -34,7 +34,7 @@ class BillModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             self.queryset = BillModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).select_related('vendor', 'ledger', 'ledger__entity').order_by('-updated')
         return super().get_queryset()
@@ -80,7 +80,7 @@ class BillModelCreateView(DjangoLedgerSecurityMixIn, CreateView):
                 return HttpResponseBadRequest()
 
             po_qs = PurchaseOrderModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).prefetch_related('itemtransactionmodel_set')
             po_model: PurchaseOrderModel = get_object_or_404(po_qs, uuid__exact=po_pk)
@@ -97,7 +97,7 @@ class BillModelCreateView(DjangoLedgerSecurityMixIn, CreateView):
                                   }) + f'?item_uuids={po_item_uuids_qry_param}'
         elif self.for_estimate:
             estimate_qs = EstimateModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             )
             estimate_uuid = self.kwargs['ce_pk']
@@ -136,7 +136,7 @@ class BillModelCreateView(DjangoLedgerSecurityMixIn, CreateView):
         if self.for_estimate:
             ce_pk = self.kwargs['ce_pk']
             estimate_model_qs = EstimateModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user)
 
             estimate_model = get_object_or_404(estimate_model_qs, uuid__exact=ce_pk)
@@ -149,7 +149,7 @@ class BillModelCreateView(DjangoLedgerSecurityMixIn, CreateView):
                 return HttpResponseBadRequest()
             item_uuids = item_uuids.split(',')
             po_qs = PurchaseOrderModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             )
             po_model: PurchaseOrderModel = get_object_or_404(po_qs, uuid__exact=po_pk)
@@ -173,6 +173,7 @@ class BillModelCreateView(DjangoLedgerSecurityMixIn, CreateView):
             bill_model.clean()
             bill_model.save()
             po_model_items_qs.update(bill_model=bill_model)
+            bill_model.update_perpetual_inventory()
             return HttpResponseRedirect(self.get_success_url())
 
         return super(BillModelCreateView, self).form_valid(form)
@@ -265,7 +266,7 @@ class BillModelDetailView(DjangoLedgerSecurityMixIn, DetailView):
 
     def get_queryset(self):
         return BillModel.objects.for_entity(
-            entity_slug=self.kwargs['entity_slug'],
+            entity_slug=self.get_authorized_entity_instance(),
             user_model=self.request.user
         ).select_related(
             'ledger',
@@ -397,7 +398,7 @@ class BillModelUpdateView(DjangoLedgerSecurityMixIn, UpdateView):
 
     def get_queryset(self):
         return BillModel.objects.for_entity(
-            entity_slug=self.kwargs['entity_slug'],
+            entity_slug=self.get_authorized_entity_instance(),
             user_model=self.request.user
         ).select_related(
             'ledger', 'ledger__entity', 'vendor', 'cash_account',
@@ -448,6 +449,7 @@ class BillModelUpdateView(DjangoLedgerSecurityMixIn, UpdateView):
                         itemtxs.clean()
 
                     itemtxs_formset.save()
+                    bill_model.update_perpetual_inventory()
                     itemtxs_qs = bill_model.update_amount_due()
                     bill_model.get_state(commit=True)
                     bill_model.clean()
@@ -491,7 +493,7 @@ class BaseBillActionView(DjangoLedgerSecurityMixIn, RedirectView, SingleObjectMi
 
     def get_queryset(self):
         return BillModel.objects.for_entity(
-            entity_slug=self.kwargs['entity_slug'],
+            entity_slug=self.get_authorized_entity_instance(),
             user_model=self.request.user
         ).select_related('ledger', 'ledger__entity')
 
@@ -23,7 +23,7 @@ class ClosingEntryModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             qs = ClosingEntryModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).select_related('entity_model', 'ledger_model')
             if self.queryset_annotate_txs_count:
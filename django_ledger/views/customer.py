@@ -22,7 +22,7 @@ class CustomerModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             self.queryset = CustomerModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).order_by('-updated')
         return super().get_queryset()
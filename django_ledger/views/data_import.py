@@ -29,7 +29,7 @@ class ImportJobModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             self.queryset = ImportJobModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).order_by('-created').select_related('bank_account_model',
                                                   'bank_account_model__entity_model',
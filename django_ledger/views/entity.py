@@ -147,12 +147,12 @@ class EntityDeleteView(DjangoLedgerSecurityMixIn, EntityModelModelViewQuerySetMi
 
         ItemTransactionModel.objects.for_entity(
             user_model=self.request.user,
-            entity_slug=self.kwargs['entity_slug']
+            entity_slug=self.get_authorized_entity_instance()
         ).delete()
 
         TransactionModel.objects.for_entity(
             user_model=self.request.user,
-            entity_slug=self.kwargs['entity_slug']
+            entity_slug=self.get_authorized_entity_instance()
         ).delete()
 
         return super().form_valid(form=form)
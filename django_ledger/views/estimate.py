@@ -21,7 +21,7 @@ class EstimateModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             self.queryset = EstimateModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).select_related('customer', 'entity')
         return super().get_queryset()
@@ -98,19 +98,19 @@ class EstimateModelDetailView(DjangoLedgerSecurityMixIn, EstimateModelModelViewQ
         # PO Model Queryset...
         po_qs = ce_model.purchaseordermodel_set.for_entity(
             user_model=self.request.user,
-            entity_slug=self.kwargs['entity_slug']
+            entity_slug=self.get_authorized_entity_instance()
         ) if ce_model.is_approved() else ce_model.purchaseordermodel_set.none()
         context['estimate_po_model_queryset'] = po_qs
 
         invoice_qs = ce_model.invoicemodel_set.for_entity(
             user_model=self.request.user,
-            entity_slug=self.kwargs['entity_slug']
+            entity_slug=self.get_authorized_entity_instance()
         ) if ce_model.is_approved() else ce_model.invoicemodel_set.none()
         context['estimate_invoice_model_queryset'] = invoice_qs
 
         bill_qs = ce_model.billmodel_set.for_entity(
             user_model=self.request.user,
-            entity_slug=self.kwargs['entity_slug']
+            entity_slug=self.get_authorized_entity_instance()
         ) if ce_model.is_approved() else ce_model.billmodel_set.none()
         context['estimate_bill_model_queryset'] = bill_qs
 
@@ -33,7 +33,7 @@ class InvoiceModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             self.queryset = InvoiceModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).select_related('customer', 'ledger').order_by('-created')
         return super().get_queryset()
@@ -97,7 +97,7 @@ class InvoiceModelCreateView(DjangoLedgerSecurityMixIn, InvoiceModelModelViewQue
                                                      'ce_pk': self.kwargs['ce_pk']
                                                  })
             estimate_qs = EstimateModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).select_related('customer')
             estimate_model = get_object_or_404(estimate_qs, uuid__exact=self.kwargs['ce_pk'])
@@ -138,7 +138,7 @@ class InvoiceModelCreateView(DjangoLedgerSecurityMixIn, InvoiceModelModelViewQue
         if self.for_estimate:
             ce_pk = self.kwargs['ce_pk']
             estimate_model_qs = EstimateModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user)
 
             estimate_model = get_object_or_404(estimate_model_qs, uuid__exact=ce_pk)
@@ -326,6 +326,7 @@ class InvoiceModelUpdateView(DjangoLedgerSecurityMixIn, InvoiceModelModelViewQue
                         itemtxs.clean()
 
                     itemtxs_list = itemtxs_formset.save()
+                    invoice_model.update_perpetual_inventory()
                     itemtxs_qs = invoice_model.update_amount_due()
                     invoice_model.get_state(commit=True)
                     invoice_model.clean()
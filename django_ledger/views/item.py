@@ -26,7 +26,7 @@ class UnitOfMeasureModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             self.queryset = UnitOfMeasureModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             )
         return super().get_queryset()
@@ -156,7 +156,7 @@ class ProductItemModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if not self.queryset:
             self.queryset = ItemModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).products().select_related(
                 'earnings_account', 'cogs_account',
@@ -286,7 +286,7 @@ class ServiceItemModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if not self.queryset:
             self.queryset = ItemModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).services().select_related(
                 'earnings_account', 'cogs_account',
@@ -356,7 +356,7 @@ class ServiceUpdateView(DjangoLedgerSecurityMixIn,
 
     def get_queryset(self):
         return ItemModel.objects.for_entity(
-            entity_slug=self.kwargs['entity_slug'],
+            entity_slug=self.get_authorized_entity_instance(),
             user_model=self.request.user
         ).services()
 
@@ -416,7 +416,7 @@ class ExpenseItemItemModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if not self.queryset:
             self.queryset = ItemModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).expenses().select_related('expense_account', 'uom').order_by('-updated')
         return super().get_queryset()
@@ -500,7 +500,7 @@ class InventoryItemItemModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if not self.queryset:
             self.queryset = ItemModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).inventory_wip().select_related('inventory_account', 'cogs_account', 'uom').order_by('-updated')
         return super().get_queryset()
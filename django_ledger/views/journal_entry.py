@@ -22,6 +22,7 @@ from django_ledger.forms.transactions import get_transactionmodel_formset_class
 from django_ledger.io.io_core import get_localtime
 from django_ledger.models.journal_entry import JournalEntryModel
 from django_ledger.models.ledger import LedgerModel
+from django_ledger.models.transactions import txs_validation_batch
 from django_ledger.views.mixins import DjangoLedgerSecurityMixIn
 
 
@@ -63,7 +64,7 @@ class JournalEntryCreateView(DjangoLedgerSecurityMixIn, CreateView, SingleObject
     def get_queryset(self):
         return LedgerModel.objects.for_entity(
             user_model=self.request.user,
-            entity_slug=self.kwargs['entity_slug'],
+            entity_slug=self.get_authorized_entity_instance(),
         )
 
     def get_form(self, form_class=None):
@@ -259,7 +260,8 @@ class JournalEntryModelTXSDetailView(DjangoLedgerSecurityMixIn, JournalEntryMode
                 if not txs.journal_entry_id:
                     txs.journal_entry_id = je_model.uuid
 
-            txs_formset.save()
+            with txs_validation_batch(txs_models=txs_list):
+                txs_formset.save()
             messages.add_message(request, messages.SUCCESS, 'Successfully saved transactions.', extra_tags='is-success')
         else:
             messages.add_message(request,
@@ -279,7 +281,7 @@ class BaseJournalEntryActionView(DjangoLedgerSecurityMixIn, RedirectView, Single
 
     def get_queryset(self):
         return JournalEntryModel.objects.for_entity(
-            entity_slug=self.kwargs['entity_slug'],
+            entity_slug=self.get_authorized_entity_instance(),
             user_model=self.request.user
         )
 
@@ -10,6 +10,7 @@ from calendar import monthrange
 from datetime import timedelta, date
 from typing import Tuple, Optional
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
 from django.db.models import Q
@@ -17,11 +18,12 @@ from django.http import Http404, HttpResponse, HttpResponseNotFound
 from django.urls import reverse
 from django.utils.dateparse import parse_date
 from django.utils.translation import gettext_lazy as _
+from django.views.generic import View
 from django.views.generic.dates import YearMixin, MonthMixin, DayMixin
 
 from django_ledger.models import EntityModel, InvoiceModel, BillModel
 from django_ledger.models.entity import EntityModelFiscalPeriodMixIn
-from django_ledger.settings import DJANGO_LEDGER_PDF_SUPPORT_ENABLED
+from django_ledger.settings import DJANGO_LEDGER_PDF_SUPPORT_ENABLED, DJANGO_LEDGER_USE_AUTHORIZATION_CACHE
 
 
 class YearlyReportMixIn(YearMixin, EntityModelFiscalPeriodMixIn):
@@ -294,6 +296,8 @@ class SuccessUrlNextMixIn:
 
 class DjangoLedgerSecurityMixIn(PermissionRequiredMixin):
     AUTHORIZED_ENTITY_MODEL: Optional[EntityModel] = None
+    AUTHORIZED_ENTITY_ROLE: Optional[str] = None
+    AUTHORIZED_ENTITY_FIELDS = ('uuid', 'slug', 'name', 'default_coa', 'admin')
     permission_required = []
 
     def get_login_url(self):
@@ -303,8 +307,7 @@ class DjangoLedgerSecurityMixIn(PermissionRequiredMixin):
         if self.request.user.is_superuser:
             if 'entity_slug' in self.kwargs:
                 try:
-                    entity_model_qs = self.get_authorized_entity_queryset()
-                    self.AUTHORIZED_ENTITY_MODEL = entity_model_qs.get(slug__exact=self.kwargs['entity_slug'])
+                    self.AUTHORIZED_ENTITY_MODEL = self.get_authorized_entity_model(self.kwargs['entity_slug'])
                 except ObjectDoesNotExist:
                     return False
             return True
@@ -314,8 +317,7 @@ class DjangoLedgerSecurityMixIn(PermissionRequiredMixin):
                 return False
             if 'entity_slug' in self.kwargs:
                 try:
-                    entity_model_qs = self.get_authorized_entity_queryset()
-                    self.AUTHORIZED_ENTITY_MODEL = entity_model_qs.get(slug__exact=self.kwargs['entity_slug'])
+                    self.AUTHORIZED_ENTITY_MODEL = self.get_authorized_entity_model(self.kwargs['entity_slug'])
                 except ObjectDoesNotExist:
                     return False
             return True
@@ -323,8 +325,21 @@ class DjangoLedgerSecurityMixIn(PermissionRequiredMixin):
 
     def get_authorized_entity_queryset(self):
         return EntityModel.objects.for_user(
-            user_model=self.request.user).only(
-            'uuid', 'slug', 'name', 'default_coa', 'admin')
+            user_model=self.request.user).only(*self.AUTHORIZED_ENTITY_FIELDS)
+
+    def get_authorized_entity_model(self, entity_slug: str) -> EntityModel:
+        """
+        Resolves the EntityModel the user is authorized to access. When DJANGO_LEDGER_USE_AUTHORIZATION_CACHE is
+        enabled, the EntityModel UUID is taken from the cached user authorization map and the EntityModel is fetched
+        by primary key. Slugs not present in the map are resolved from the database.
+        """
+        user_model = self.request.user
+        if DJANGO_LEDGER_USE_AUTHORIZATION_CACHE and not user_model.is_superuser:
+            authorization_map = EntityModel.get_authorization_map(user_model=user_model)
+            if entity_slug in authorization_map:
+                entity_uuid, self.AUTHORIZED_ENTITY_ROLE = authorization_map[entity_slug]
+                return EntityModel.objects.only(*self.AUTHORIZED_ENTITY_FIELDS).get(uuid__exact=entity_uuid)
+        return self.get_authorized_entity_queryset().get(slug__exact=entity_slug)
 
     def get_authorized_entity_instance(self) -> Optional[EntityModel]:
         if self.AUTHORIZED_ENTITY_MODEL is None:
@@ -332,6 +347,18 @@ class DjangoLedgerSecurityMixIn(PermissionRequiredMixin):
         return self.AUTHORIZED_ENTITY_MODEL
 
 
+class DjangoLedgerAsyncSecurityMixIn(DjangoLedgerSecurityMixIn):
+    """
+    Security MixIn for async views. Permission checks run in a worker thread, so they never block the event loop.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        has_permission = await sync_to_async(self.has_permission)()
+        if not has_permission:
+            return await sync_to_async(self.handle_no_permission)()
+        return await View.dispatch(self, request, *args, **kwargs)
+
+
 class EntityUnitMixIn:
     UNIT_SLUG_KWARG = 'unit_slug'
     UNIT_SLUG_QUERY_PARAM = 'unit'
@@ -434,7 +461,7 @@ class UnpaidElementsMixIn:
 
             qs = InvoiceModel.objects.for_entity(
                 user_model=self.request.user,
-                entity_slug=self.kwargs['entity_slug']
+                entity_slug=self.get_authorized_entity_instance()
             ).approved().filter(
                 Q(date_approved__gte=from_date) &
                 Q(date_approved__lte=to_date)
@@ -453,7 +480,7 @@ class UnpaidElementsMixIn:
 
             qs = BillModel.objects.for_entity(
                 user_model=self.request.user,
-                entity_slug=self.kwargs['entity_slug']
+                entity_slug=self.get_authorized_entity_instance()
             ).unpaid().filter(
                 Q(date_approved__gte=from_date) &
                 Q(date_approved__lte=to_date)
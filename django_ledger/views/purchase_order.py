@@ -29,7 +29,7 @@ class PurchaseOrderModelModelViewQuerySetMixIn:
     def get_queryset(self):
         if self.queryset is None:
             self.queryset = PurchaseOrderModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).select_related('entity', 'ce_model')
         return super().get_queryset()
@@ -110,7 +110,7 @@ class PurchaseOrderModelCreateView(DjangoLedgerSecurityMixIn,
                                                      'ce_pk': self.kwargs['ce_pk']
                                                  })
             estimate_qs = EstimateModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             ).select_related('customer')
             estimate_model = get_object_or_404(estimate_qs, uuid__exact=self.kwargs['ce_pk'])
@@ -139,7 +139,7 @@ class PurchaseOrderModelCreateView(DjangoLedgerSecurityMixIn,
         if self.for_estimate:
             ce_pk = self.kwargs['ce_pk']
             estimate_model_qs = EstimateModel.objects.for_entity(
-                entity_slug=self.kwargs['entity_slug'],
+                entity_slug=self.get_authorized_entity_instance(),
                 user_model=self.request.user
             )
             estimate_model = get_object_or_404(estimate_model_qs, uuid__exact=ce_pk)
@@ -259,6 +259,7 @@ class PurchaseOrderModelUpdateView(DjangoLedgerSecurityMixIn,
                         itemtxs.clean()
 
                     itemtxs_list = itemtxs_formset.save()
+                    po_model.update_perpetual_inventory()
                     po_model.update_state()
                     po_model.clean()
                     po_model.save(update_fields=['po_amount',
@@ -357,7 +358,9 @@ class PurchaseOrderModelUpdateView(DjangoLedgerSecurityMixIn,
                              f'{self.object.po_number} successfully updated.',
                              extra_tags='is-success')
 
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        po_model.update_perpetual_inventory()
+        return response
 
 
 class PurchaseOrderModelDetailView(DjangoLedgerSecurityMixIn,
@@ -385,8 +388,7 @@ class PurchaseOrderModelDetailView(DjangoLedgerSecurityMixIn,
         )
         context['po_items'] = po_items_qs
         context['po_total_amount'] = sum(
-            i['po_total_amount'] for i in po_items_qs.values(
-                'po_total_amount', 'po_item_status') if i['po_item_status'] != 'cancelled')
+            i.po_total_amount for i in po_items_qs if i.po_item_status != 'cancelled')
         return context
 
 